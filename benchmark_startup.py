@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+benchmark_startup.py - Start-up time benchmark for the CLI and client
+
+Measures, each in a fresh interpreter so nothing is cached between runs:
+1. Import time of the main modules (src.main, gemini_client, hooks, prompts)
+2. Construction time of GeminiClient and of the AudioImageGenerator pipeline
+3. Wall time of `python src/main.py --help`
+4. The cost of the first SDK use (google.genai import plus Client construction)
+
+No API calls are made; a placeholder API key is used when GEMINI_API_KEY is unset.
+
+Usage:
+    python benchmark_startup.py               # 5 runs per measurement
+    python benchmark_startup.py --runs 10
+    python benchmark_startup.py --json startup.json
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import subprocess
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent
+
+# Snippets timed inside a fresh interpreter; each prints its own elapsed seconds
+MEASUREMENTS = {
+    "import src.main": "import src.main",
+    "import gemini_client": "import src.gemini.gemini_client",
+    "import audio_to_image_processor": "import src.gemini.gemini_hooks.audio_to_image_processor",
+    "import gemini_prompts": "import src.gemini.gemini_prompts",
+    "construct GeminiClient": (
+        "from src.gemini.gemini_client import GeminiClient\n"
+        "GeminiClient(api_key=KEY)"
+    ),
+    "construct AudioImageGenerator": (
+        "from src.main import AudioImageGenerator\n"
+        "from src.gemini.gemini_client import GeminiClient\n"
+        "AudioImageGenerator(client=GeminiClient(api_key=KEY))"
+    ),
+    "first SDK use": (
+        "from src.gemini.gemini_client import GeminiClient\n"
+        "GeminiClient(api_key=KEY).client"
+    ),
+}
+
+_TIMER = """
+import time, os
+KEY = os.environ.get("GEMINI_API_KEY") or "benchmark-placeholder-key"
+_started = time.perf_counter()
+{snippet}
+print(time.perf_counter() - _started)
+"""
+
+
+def time_snippet(snippet, runs):
+    """Time a snippet in fresh interpreters and return the per-run seconds"""
+    timings = []
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, "-c", _TIMER.format(snippet=snippet)],
+            cwd=ROOT, capture_output=True, text=True
+        )
+        if result.returncode != 0:
+            raise RuntimeError(result.stderr.strip().splitlines()[-1])
+        timings.append(float(result.stdout.strip().splitlines()[-1]))
+    return timings
+
+
+def time_command(command, runs):
+    """Time a whole command, including interpreter start-up"""
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run(command, cwd=ROOT, capture_output=True)
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark CLI and client start-up time")
+    parser.add_argument("--runs", type=int, default=5, help="Runs per measurement (default: 5)")
+    parser.add_argument("--json", dest="json_path", help="Write the results as JSON")
+    args = parser.parse_args()
+
+    results = {}
+    for name, snippet in MEASUREMENTS.items():
+        try:
+            results[name] = time_snippet(snippet, args.runs)
+        except RuntimeError as e:
+            print(f"{name:<34} failed: {e}")
+    results["python src/main.py --help"] = time_command(
+        [sys.executable, "src/main.py", "--help"], args.runs)
+    results["python (empty interpreter)"] = time_command([sys.executable, "-c", "pass"], args.runs)
+
+    print(f"{'measurement':<34}{'median ms':>10}{'min ms':>10}{'max ms':>10}")
+    for name, timings in results.items():
+        print(f"{name:<34}{statistics.median(timings) * 1000:>10.1f}"
+              f"{min(timings) * 1000:>10.1f}{max(timings) * 1000:>10.1f}")
+
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump({"python": sys.version, "runs": args.runs, "seconds": results}, f, indent=2)
+        print(f"Results written to {args.json_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,7 +6,14 @@ Runs the main application from the project root to ensure imports work correctly
 
 Usage:
     python run_app.py --file FILENAME.mp3   # Process a single file
-    python run_app.py --all                 # Process all MP3 files and clean output folders first
+    python run_app.py --all                 # Process new or stale MP3 files (see data_source/index.json)
+    python run_app.py --all --force         # Process all MP3 files regardless of catalogue status
+    python run_app.py --all --clean         # Clean output folders first, then process all MP3 files
+    python run_app.py --watch               # Run as a daemon, processing files as they are dropped in
+    python run_app.py --all --candidates 4  # Generate 4 images per track and link the best one
+    python run_app.py --all --batch         # Run the analyses as batch jobs (resumes after a restart)
+    python run_app.py --no-write-behind     # Sync every output file as it is written, not in the background
+    python run_app.py --similar IMAGE.png   # List generated images that look similar to IMAGE.png
 """
 
 import os
@@ -25,9 +32,9 @@ def clean_output_folders():
     # Clean images folder
     images_dir = output_dir / "images"
     if images_dir.exists():
-        # Remove all files in images directory
+        # Remove all files (and best-candidate links) in images directory
         for file_path in images_dir.glob("*.*"):
-            if file_path.is_file():
+            if file_path.is_file() or file_path.is_symlink():
                 file_path.unlink()
 
         # Clean prompts subfolder
@@ -47,12 +54,36 @@ if __name__ == "__main__":
     parser.add_argument(
         "--file", help="Process a single MP3 file from data_source folder")
     parser.add_argument("--all", action="store_true",
-                        help="Process all MP3 files in data_source folder (cleans output folders first)")
+                        help="Process new or stale MP3 files in data_source folder")
+    parser.add_argument("--clean", action="store_true",
+                        help="Clean output folders before processing")
+    parser.add_argument("--force", action="store_true",
+                        help="With --all, process every file even if its outputs are up to date")
+    parser.add_argument("--watch", action="store_true",
+                        help="Run as a daemon that processes files as they appear in data_source")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="With --watch, number of tracks processed concurrently")
+    parser.add_argument("--settle", type=float, default=5.0,
+                        help="With --watch, seconds a file must stop changing before it is processed")
+    parser.add_argument("--lookahead", type=int, default=1,
+                        help="With --all, tracks uploaded and prepared ahead of the current one (0 disables)")
+    parser.add_argument("--candidates", type=int, default=1,
+                        help="Image candidates generated in parallel per track and ranked locally")
+    parser.add_argument("--reuse-score", type=float, default=None,
+                        help="Reuse the cached image of an identical prompt scoring at least this value")
+    parser.add_argument("--batch", action="store_true",
+                        help="With --all, run the analyses as batch jobs (cheaper, resumes after a restart)")
+    parser.add_argument("--poll", type=float, default=60,
+                        help="With --batch, seconds between batch job status checks")
+    parser.add_argument("--no-write-behind", dest="write_behind", action="store_false",
+                        help="Sync every output file as it is written instead of in the background")
+    parser.add_argument("--similar", metavar="IMAGE",
+                        help="List generated images that look similar to IMAGE")
 
     args = parser.parse_args()
 
-    # Clean output folders if --all flag is used
-    if args.all:
+    # Clean output folders only when explicitly requested, so --all can skip finished tracks
+    if args.all and args.clean:
         clean_output_folders()
 
     # Import and run the main function from src/main.py
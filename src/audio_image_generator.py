@@ -0,0 +1,272 @@
+"""
+audio_image_generator.py - The generator behind the main.py command line
+
+AudioImageGenerator ties the pipeline to the data_source folder: it keeps the catalogue
+index in step with the folder, decides which tracks are new or stale, and runs them one by
+one, as a batch or from the watch-folder daemon. main.py builds it from the command line.
+
+Exports:
+- AudioImageGenerator(client=None, prefetch_lookahead: int = 1, image_candidates: int = 1,
+                      reuse_min_score: float | None = None, write_behind: bool = True)
+  - get_audio_files(pending_only=False) -> List[Path]
+  - adopt_existing_outputs() -> None, clean_output_directories() -> None
+  - process_audio_file(audio_path) -> Dict, process_all(...) -> List[Dict]
+  - find_similar_covers(image_path, max_distance=10, limit=10) -> List[Dict]
+  - watch(max_workers=1, settle_seconds=5.0, poll_interval=2.0) -> None
+
+Related files:
+- src/main.py: The command line
+- src/gemini/gemini_client.py
+- src/gemini/gemini_utilities/catalogue_index.py
+- src/gemini/gemini_hooks/watch_folder_daemon.py
+- src/gemini/gemini_utilities/image_index.py
+"""
+
+import logging
+import itertools
+from pathlib import Path
+from typing import Callable, Dict, Any, List, Optional
+
+# main.py puts the repository root on sys.path when it is run from src/
+from src.gemini.gemini_client import GeminiClient, AudioImageProcessor
+from src.gemini.gemini_utilities.catalogue_index import CatalogueIndex
+from src.gemini.gemini_hooks.watch_folder_daemon import WatchFolderDaemon
+from src.discord.discord_client import DiscordClient
+
+logger = logging.getLogger(__name__)
+
+
+class AudioImageGenerator:
+    """Pipeline for generating images from audio files using Gemini API with Discord integration"""
+
+    def __init__(self, client=None, prefetch_lookahead: int = 1, image_candidates: int = 1,
+                 reuse_min_score: Optional[float] = None, write_behind: bool = True):
+        """
+        Initialize the generator with client and processor
+
+        Args:
+            client: Optional GeminiClient instance
+            prefetch_lookahead: Tracks prepared (uploaded, token-counted) ahead of the
+                current one when processing several files; 0 disables prefetching
+            image_candidates: Image candidates generated in parallel and ranked per track
+            reuse_min_score: Reuse the cached image of an identical prompt scoring at least
+                this value instead of generating a new one (None disables reuse)
+            write_behind: Sync output files on a background thread instead of after every
+                step; each track's outputs are on disk before it is recorded as done
+        """
+        # Initialize Gemini client
+        self.client = client or GeminiClient()
+
+        # Initialize the audio processor from gemini_client.py
+        self.processor = AudioImageProcessor(
+            client=self.client, prefetch_lookahead=prefetch_lookahead,
+            image_candidates=image_candidates, reuse_min_score=reuse_min_score,
+            write_behind=write_behind)
+
+        # Set up data directory and its catalogue index; stages rendered with older
+        # prompt templates are rescheduled
+        self.data_dir = Path("data_source")
+        self.catalogue = CatalogueIndex(
+            self.data_dir, prompt_versions=self.processor.processor.prompt_versions)
+        self.processor.processor.catalogue = self.catalogue
+
+        # Get a reference to the Discord client
+        self.discord_client = self.client.discord_client or DiscordClient()
+
+        logger.info("AudioImageGenerator initialized with Discord integration")
+
+    def get_audio_files(self, pending_only: bool = False) -> List[Path]:
+        """
+        Get MP3 files from the data source directory via the catalogue index
+
+        Args:
+            pending_only: Only return tracks that are new or have stale outputs
+
+        Returns:
+            List of paths to MP3 files
+        """
+        self.catalogue.scan()
+        self.adopt_existing_outputs()
+
+        if pending_only:
+            return self.catalogue.pending_tracks()
+
+        mp3_files = [Path(record["path"])
+                     for _, record in sorted(self.catalogue.tracks.items())]
+        logger.info(f"Found {len(mp3_files)} MP3 files in data_source folder")
+        return mp3_files
+
+    def adopt_existing_outputs(self):
+        """
+        Record outputs that already exist on disk for tracks the catalogue has no
+        stage status for (e.g. outputs produced before the index existed).
+        """
+        adopted = 0
+        for record in self.catalogue.tracks.values():
+            if record.get("stages"):
+                continue
+
+            stem = Path(record["path"]).stem
+            stage_outputs = {
+                "analysis": [self.processor.analysis_dir / f"{stem}_analysis.txt",
+                             self.processor.analysis_dir / f"{stem}_refined_analysis.txt"],
+                "revision": [self.processor.analysis_dir / f"{stem}_revised_analysis.txt"],
+                "prompt": [self.processor.prompt_dir / f"{stem}_prompt.json"],
+                # Images keep the extension of the format the API returned
+                "image": (sorted(self.processor.image_dir.glob(f"{stem}_best.*")) +
+                          sorted(self.processor.image_dir.glob(f"{stem}_image.*")))[:1] or
+                         [self.processor.image_dir / f"{stem}_image.png"]
+            }
+            for stage, outputs in stage_outputs.items():
+                if all(output.exists() for output in outputs):
+                    self.catalogue.mark_stage(
+                        record["path"], stage, "done", outputs=[str(output) for output in outputs])
+                    adopted += 1
+
+        if adopted:
+            self.catalogue.save()
+            logger.info(f"Adopted {adopted} existing stage outputs into the catalogue")
+
+    def clean_output_directories(self):
+        """
+        Clean the output directories before processing files.
+        This is optional and only used when explicitly requested.
+        """
+        for path in [
+            self.processor.image_dir,
+            self.processor.prompt_dir,
+            self.processor.analysis_dir
+        ]:
+            # Keep the directory but delete its contents
+            if path.exists():
+                for file in path.glob("*"):
+                    file.unlink()
+                logger.info(f"Cleaned directory: {path}")
+
+        # Outputs are gone, so every stage must run again
+        self.processor.processor.artifacts.clear()
+        self.catalogue.reset_stages()
+        logger.info("Output directories cleaned")
+
+    def process_audio_file(self, audio_path: Path) -> Dict[str, Any]:
+        """
+        Process a single audio file through the processor pipeline
+
+        Args:
+            audio_path: Path to the audio file
+
+        Returns:
+            Dictionary with results of the processing
+        """
+        # Delegate to the processor and record the outcome in the catalogue
+        self.catalogue.scan()
+        result = self.processor.process_audio_file(audio_path)
+        self.catalogue.record_result(audio_path, result)
+        return result
+
+    def process_all(self, clean_first=False, force=False, batch=False,
+                    poll_interval: float = 60) -> List[Dict[str, Any]]:
+        """
+        Process the MP3 files in the data source directory that are new or stale
+
+        Args:
+            clean_first: Whether to clean output directories before processing
+            force: Process every track, even those whose outputs are up to date
+            batch: Run the text steps as batch jobs for all tracks instead of online calls
+            poll_interval: With batch, seconds between job status checks
+
+        Returns:
+            List of dictionaries with processing results
+        """
+        # Clean output directories if requested
+        if clean_first:
+            self.clean_output_directories()
+
+        # Only schedule new or stale tracks unless forced
+        audio_files = self.get_audio_files(pending_only=not force)
+        if not audio_files:
+            logger.info("All catalogue tracks are up to date, nothing to process")
+            return []
+
+        # Process the files through the processor and record each outcome
+        if batch:
+            results = self.processor.process_multiple_files_batch(
+                audio_files, poll_interval=poll_interval)
+        else:
+            results = self.processor.process_multiple_files(audio_files)
+        for audio_path, result in zip(audio_files, results):
+            self.catalogue.record_result(audio_path, result)
+
+        return results
+
+    def find_similar_covers(self, image_path: Path, max_distance: int = 10,
+                            limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        Find generated images that look similar to an image
+
+        Args:
+            image_path: Path to the query image
+            max_distance: Maximum perceptual-hash distance
+            limit: Maximum number of results
+
+        Returns:
+            List of dictionaries with path, track, distance and score, closest first
+        """
+        image_index = self.processor.processor.image_index
+        added = image_index.scan(self.processor.image_dir)
+        if added:
+            logger.info(f"Indexed {added} images not in the image index yet")
+        return image_index.find_similar(image_path, max_distance=max_distance, limit=limit)
+
+    def watch(self, max_workers: int = 1, settle_seconds: float = 5.0,
+              poll_interval: float = 2.0):
+        """
+        Run as a daemon: keep this generator (and its warm clients) alive and process
+        tracks as they are dropped into the data source directory.
+
+        Args:
+            max_workers: Number of tracks processed concurrently
+            settle_seconds: How long a file must stop changing before it is ingested
+            poll_interval: Seconds between folder checks
+        """
+        self.adopt_existing_outputs()
+        daemon = WatchFolderDaemon(
+            process_fn=None,
+            worker_factory=self._watch_worker_factory(),
+            catalogue=self.catalogue,
+            max_workers=max_workers,
+            settle_seconds=settle_seconds,
+            poll_interval=poll_interval
+        )
+        daemon.install_signal_handlers()
+        daemon.run()
+
+    def _watch_worker_factory(self) -> Callable[[], Callable[[Path], Dict[str, Any]]]:
+        """
+        Build the watch daemon's worker factory. The first worker uses this generator's
+        processor and every other one its own, sharing the client, artifact store and
+        catalogue, so concurrent tracks do not share the processor's per-track state.
+
+        Returns:
+            Function that builds the process function of one worker
+        """
+        base = self.processor.processor
+        workers = itertools.count()
+
+        def make_worker() -> Callable[[Path], Dict[str, Any]]:
+            processor = base
+            if next(workers):
+                # type(base) keeps the processor module out of start-up imports
+                processor = type(base)(
+                    self.client, image_candidates=base.image_candidates,
+                    reuse_min_score=base.reuse_min_score, artifact_store=base.artifacts,
+                    write_behind=base.write_behind, analysis_archive=base.analysis_archive)
+                processor.catalogue = self.catalogue
+
+            def process(audio_path: Path) -> Dict[str, Any]:
+                # The daemon scans the catalogue before it queues a track
+                result = processor.process_audio_file(audio_path)
+                self.catalogue.record_result(audio_path, result)
+                return result
+            return process
+        return make_worker
@@ -0,0 +1,140 @@
+"""
+discord_messages.py - Formatted Discord messages for the Gemini pipeline
+
+Errors (with optional JSON context), analysis results and run summaries, each formatted
+for Discord and sent to its own webhook.
+
+DiscordMessages is the message half of DiscordClient; it expects the client's
+webhook_errors, webhook_ai_analysis, webhook_ai_materials, send_to_webhook() and
+send_to_discord_webhook().
+
+Exports:
+- DiscordMessages
+  - send_error(error, context=None) -> bool
+  - send_analysis_results(analysis, source=None, username="AI Analysis") -> bool
+  - send_summary(title, summary, details=None, username="Gemini Pipeline") -> bool
+
+Related files: src/discord/discord_client.py
+"""
+
+import json
+import logging
+from typing import Dict, Any, Optional, Union, List
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+
+class DiscordMessages:
+    """Error, analysis and summary messages sent to their webhooks"""
+
+    def send_error(self, error: Union[str, Exception], context: Dict[str, Any] = None) -> bool:
+        """
+        Send an error message to the errors webhook.
+
+        Args:
+            error: The error message or exception to send
+            context: Optional context information about when the error occurred
+
+        Returns:
+            True if the message was sent successfully, False otherwise
+        """
+        if not self.webhook_errors:
+            logger.warning("Error webhook URL not configured")
+            return False
+
+        # Format error message
+        if isinstance(error, Exception):
+            error_message = f"**Error:** `{type(error).__name__}: {str(error)}`"
+        else:
+            error_message = f"**Error:** `{error}`"
+
+        # Add context if provided
+        context_message = ""
+        if context:
+            context_message = "\n\n**Context:**\n```json\n" + \
+                json.dumps(context, indent=2) + "\n```"
+
+        # Combine message parts
+        full_message = error_message + context_message
+
+        # Send to webhook
+        success = self.send_to_webhook(
+            self.webhook_errors,
+            full_message,
+            username="Error Reporter"
+        )
+
+        # Log the error
+        if success:
+            logger.info(f"Error sent to Discord: {str(error)}")
+        else:
+            logger.error(f"Failed to send error to Discord: {str(error)}")
+
+        return success
+
+    def send_analysis_results(self, analysis: str, source: str = None, username: str = "AI Analysis") -> bool:
+        """
+        Send AI analysis results to the analysis webhook.
+
+        Args:
+            analysis: The analysis text to send
+            source: Optional source information (e.g., file being analyzed)
+            username: Username to display in Discord
+
+        Returns:
+            True if the message was sent successfully, False otherwise
+        """
+        if not self.webhook_ai_analysis:
+            logger.warning("Analysis webhook URL not configured")
+            return False
+
+        # Format message with source if provided
+        message = analysis
+        if source:
+            message = f"**Source:** `{source}`\n\n{analysis}"
+
+        # Send to webhook
+        return self.send_to_discord_webhook(
+            self.webhook_ai_analysis,
+            message,
+            username=username
+        )
+
+    def send_summary(self, title: str, summary: str, details: Optional[List[Dict[str, Any]]] = None, username: str = "Gemini Pipeline") -> bool:
+        """
+        Send a summary message to the materials webhook.
+
+        Args:
+            title: The title of the summary
+            summary: The summary text
+            details: Optional list of details to include
+            username: Username to display in Discord
+
+        Returns:
+            True if the message was sent successfully, False otherwise
+        """
+        if not self.webhook_ai_materials:
+            logger.warning("Materials webhook URL not configured")
+            return False
+
+        # Format the message
+        message = f"**{title}**\n\n{summary}"
+
+        # Add details if provided
+        if details:
+            message += "\n\n**Details:**"
+            for i, detail in enumerate(details):
+                status = "✅ Success" if detail.get(
+                    "success", False) else "❌ Failed"
+                error_info = f" - Error: {detail.get('error', 'Unknown error')}" if not detail.get(
+                    "success", False) else ""
+                message += f"\n{i+1}. {detail.get('name', f'Item {i+1}')} - {
+                    status}{error_info}"
+
+        # Send to webhook
+        return self.send_to_discord_webhook(
+            self.webhook_ai_materials,
+            message,
+            username=username
+        )
@@ -7,6 +7,8 @@ Exports the main classes and processors:
 - AudioProcessor: Process audio files
 - ImageProcessor: Process image generation
 
+Exports are imported on first use, so importing a submodule stays cheap.
+
 Related files:
 - src/gemini/gemini_client.py: Main client implementation
 - src/gemini/gemini_apis/: API functions
@@ -15,13 +17,20 @@ Related files:
 - src/gemini/gemini_utilities/: Utility functions
 """
 
-from src.gemini.gemini_client import GeminiClient
-from src.gemini.gemini_hooks import (
-    AudioProcessor,
-    ImageProcessor,
-    AudioToImageProcessor,
-    ConversationManager
-)
+from src.gemini.gemini_utilities.lazy_import import lazy_exports
+
+# Submodules are imported on first access to one of their exports
+_EXPORTS = {
+    'src.gemini.gemini_client': ('GeminiClient',),
+    'src.gemini.gemini_hooks': (
+        'AudioProcessor',
+        'ImageProcessor',
+        'AudioToImageProcessor',
+        'ConversationManager',
+    )
+}
+
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
 
 __all__ = [
     'GeminiClient',
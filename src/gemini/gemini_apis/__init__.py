@@ -6,8 +6,15 @@ Exports low-level API functions for direct interaction with Gemini:
 - Audio API: Audio processing and analysis
 - Image API: Image generation and analysis
 - File API: File upload, listing, and deletion
-- Chat API: Chat session management
+- Chat API: Chat session management, cached system instructions and warm chats
 - Multimodal API: Analyzing mixed content types
+- Transport: The single google.genai transport every call goes through
+- Middleware: ModelRequest and the layers around every call (cache, limiter, retry, hedging,
+  timeout, metrics), and call_context for step tags and deadlines
+- Key pool: Quota-aware balancing over several API keys
+- Model router: Per-step model tiers with quota and latency fallback
+- Batch API: Batch job backends for offline catalogue runs
+- Token accounting: Preflight input-token estimates that feed the tokens-per-minute limits
 
 Related files:
 - src/gemini/gemini_client.py: Main client that uses these APIs
@@ -17,12 +24,14 @@ from src.gemini.gemini_apis.core_api import (
     send_to_discord,
     send_error_to_discord,
     generate_content,
-    generate_image
+    generate_image,
+    generate_image_candidates
 )
 
 from src.gemini.gemini_apis.audio_api import (
     analyze_audio,
-    create_audio_analysis_prompt
+    create_audio_analysis_prompt,
+    is_uploaded_file
 )
 
 from src.gemini.gemini_apis.image_api import (
@@ -34,7 +43,11 @@ from src.gemini.gemini_apis.image_api import (
 from src.gemini.gemini_apis.chat_api import (
     create_chat,
     send_message,
-    get_chat_history
+    get_chat_history,
+    stream_message_async,
+    instruction_hash,
+    InstructionCache,
+    WarmChatPool
 )
 
 from src.gemini.gemini_apis.multimodal_api import (
@@ -48,16 +61,61 @@ from src.gemini.gemini_apis.file_api import (
     upload_file
 )
 
+from src.gemini.gemini_apis.transport import (
+    GeminiTransport,
+    as_transport,
+    legacy_sdk_enabled
+)
+
+from src.gemini.gemini_apis.middleware import (
+    ModelRequest,
+    call_context,
+    Middleware,
+    CacheMiddleware,
+    RateLimitMiddleware,
+    RetryMiddleware,
+    TimeoutMiddleware,
+    HedgingMiddleware,
+    MetricsMiddleware,
+    CallCancelled,
+    default_middleware
+)
+
+from src.gemini.gemini_apis.key_pool import (
+    ApiKeyPool,
+    KeyPoolMiddleware,
+    parse_api_keys
+)
+
+from src.gemini.gemini_apis.model_router import (
+    ModelRouter,
+    ModelRouterMiddleware,
+    default_tiers
+)
+
+from src.gemini.gemini_apis.batch_api import (
+    BatchBackend,
+    GeminiBatchBackend,
+    LocalBatchBackend
+)
+
+from src.gemini.gemini_apis.token_accounting import (
+    TokenAccountant,
+    TokenAccountingMiddleware
+)
+
 __all__ = [
     # Core API
     'send_to_discord',
     'send_error_to_discord',
     'generate_content',
     'generate_image',
+    'generate_image_candidates',
 
     # Audio API
     'analyze_audio',
     'create_audio_analysis_prompt',
+    'is_uploaded_file',
 
     # Image API
     'analyze_image',
@@ -68,6 +126,10 @@ __all__ = [
     'create_chat',
     'send_message',
     'get_chat_history',
+    'stream_message_async',
+    'instruction_hash',
+    'InstructionCache',
+    'WarmChatPool',
 
     # Multimodal API
     'analyze_multimodal',
@@ -76,5 +138,42 @@ __all__ = [
     # File API
     'list_files',
     'delete_file',
-    'upload_file'
+    'upload_file',
+
+    # Transport
+    'GeminiTransport',
+    'as_transport',
+    'legacy_sdk_enabled',
+
+    # Middleware
+    'ModelRequest',
+    'call_context',
+    'Middleware',
+    'CacheMiddleware',
+    'RateLimitMiddleware',
+    'RetryMiddleware',
+    'TimeoutMiddleware',
+    'HedgingMiddleware',
+    'MetricsMiddleware',
+    'CallCancelled',
+    'default_middleware',
+
+    # Key pool
+    'ApiKeyPool',
+    'KeyPoolMiddleware',
+    'parse_api_keys',
+
+    # Model router
+    'ModelRouter',
+    'ModelRouterMiddleware',
+    'default_tiers',
+
+    # Batch API
+    'BatchBackend',
+    'GeminiBatchBackend',
+    'LocalBatchBackend',
+
+    # Token accounting
+    'TokenAccountant',
+    'TokenAccountingMiddleware'
 ]
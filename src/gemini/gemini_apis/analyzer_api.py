@@ -7,11 +7,12 @@ Provides interfaces for:
 - Multimodal content analysis
 
 Dependencies:
-- google.generativeai
+- google.genai (through the shared transport)
 - PIL
 - dotenv
 
 Related files:
+- src/gemini/gemini_apis/transport.py
 - src/gemini/gemini_utilities/rate_limiter.py
 - src/gemini/gemini_client.py
 """
@@ -21,11 +22,12 @@ import logging
 from typing import List, Dict, Any, Optional, Union
 from io import BytesIO
 from PIL import Image
-import google.generativeai as genai
-# Import the modern Google AI client API
-from google import genai as modern_genai
-from google.genai import types
 from ..gemini_utilities.rate_limiter import RateLimiter
+from ..gemini_utilities.lazy_import import lazy_import
+from .transport import as_transport
+
+# The SDK is imported on first use rather than at startup
+types = lazy_import("google.genai.types")
 
 logger = logging.getLogger(__name__)
 
@@ -41,14 +43,15 @@ class AnalyzerAPI:
             api_key: Gemini API key
             model_name: The model to use for analysis
             rate_limiter: Rate limiter instance to control API usage
-            client: Optional modern client instance
+            client: Optional transport or modern client instance
         """
         self.api_key = api_key
         self.model_name = model_name
         self.rate_limiter = rate_limiter
 
-        # Use the provided client or initialize a new one
-        self.client = client or modern_genai.Client(api_key=api_key)
+        # Route every call through the shared transport (built here if none is provided);
+        # calls count against this API's limiter through the transport's middleware
+        self.transport = as_transport(client, api_key=api_key).limited_by(rate_limiter)
 
         # Set flag for checking client availability
         self.has_modern_client = client is not None
@@ -68,40 +71,24 @@ class AnalyzerAPI:
         Returns:
             Analysis text
         """
-        # Apply rate limiting
-        self.rate_limiter.check_and_wait()
-
         # Handle both file paths and Image objects
         if isinstance(image_path_or_object, str):
             image = Image.open(image_path_or_object)
         else:
             image = image_path_or_object
 
-        # Use the modern client API
-        try:
-            config = types.GenerateContentConfig(
-                temperature=temperature,
-                max_output_tokens=8100
-            )
-
-            response = self.client.models.generate_content(
-                model=self.model_name,
-                contents=[prompt, image],
-                config=config
-            )
-
-            return response.text
-        except Exception as e:
-            logger.warning(f"Modern API failed for image analysis: {e}")
+        config = types.GenerateContentConfig(
+            temperature=temperature,
+            max_output_tokens=8100
+        )
 
-            # Fall back to legacy implementation
-            model = genai.GenerativeModel(model_name=self.model_name)
-            response = model.generate_content(
-                contents=[image, prompt],
-                generation_config={"temperature": temperature}
-            )
+        response = self.transport.generate_content(
+            model=self.model_name,
+            contents=[prompt, image],
+            config=config
+        )
 
-            return response.text
+        return response.text
 
     def analyze_audio(self, audio_path_or_file: Union[str, Any], prompt: str) -> str:
         """
@@ -114,57 +101,24 @@ class AnalyzerAPI:
         Returns:
             Analysis text
         """
-        # Apply rate limiting
-        self.rate_limiter.check_and_wait()
+        # If given a path, upload the file first; other objects are used directly
+        if isinstance(audio_path_or_file, str):
+            audio_file = self.transport.upload_file(file=audio_path_or_file)
+        else:
+            audio_file = audio_path_or_file
 
-        try:
-            # If given a path, upload the file using the modern API
-            if isinstance(audio_path_or_file, str):
-                audio_file = self.client.files.upload(file=audio_path_or_file)
-
-                config = types.GenerateContentConfig(
-                    temperature=0.4,
-                    max_output_tokens=8100
-                )
-
-                response = self.client.models.generate_content(
-                    model=self.model_name,
-                    contents=[prompt, audio_file],
-                    config=config
-                )
-
-                return response.text
-            else:
-                # For non-string objects, try using them directly
-                config = types.GenerateContentConfig(
-                    temperature=0.4,
-                    max_output_tokens=8100
-                )
-
-                response = self.client.models.generate_content(
-                    model=self.model_name,
-                    contents=[prompt, audio_path_or_file],
-                    config=config
-                )
-
-                return response.text
+        config = types.GenerateContentConfig(
+            temperature=0.4,
+            max_output_tokens=8100
+        )
 
-        except Exception as e:
-            logger.warning(f"Modern API failed for audio analysis: {e}")
-
-            # Fall back to legacy implementation using old API
-            if isinstance(audio_path_or_file, str):
-                audio_file = genai.upload_file(path=audio_path_or_file)
-            else:
-                audio_file = audio_path_or_file
-
-            # Use the GenerativeModel to analyze the audio file
-            model = genai.GenerativeModel(model_name=self.model_name)
-            response = model.generate_content(
-                contents=[prompt, audio_file]
-            )
+        response = self.transport.generate_content(
+            model=self.model_name,
+            contents=[prompt, audio_file],
+            config=config
+        )
 
-            return response.text
+        return response.text
 
     def analyze_multimodal(self,
                            contents: List[Union[str, Dict, Image.Image, Any]],
@@ -179,17 +133,13 @@ class AnalyzerAPI:
         Returns:
             Analysis text
         """
-        # Apply rate limiting
-        self.rate_limiter.check_and_wait()
+        config = types.GenerateContentConfig(
+            temperature=temperature,
+            max_output_tokens=8100
+        )
 
         try:
-            # Use the modern client API
-            config = types.GenerateContentConfig(
-                temperature=temperature,
-                max_output_tokens=8100
-            )
-
-            response = self.client.models.generate_content(
+            response = self.transport.generate_content(
                 model=self.model_name,
                 contents=contents,
                 config=config
@@ -197,28 +147,8 @@ class AnalyzerAPI:
 
             return response.text
         except Exception as e:
-            logger.warning(f"Modern API failed for multimodal analysis: {e}")
-
-            # Fall back to legacy implementation
-            try:
-                # Create a model instance for multimodal analysis
-                model = genai.GenerativeModel(
-                    self.model_name,
-                    generation_config={
-                        "temperature": temperature,
-                        "max_output_tokens": 8100
-                    }
-                )
-
-                # Generate response with multimodal content
-                response = model.generate_content(contents)
-
-                # Return the text response
-                return response.text
-
-            except Exception as inner_e:
-                logger.error(f"Error in multimodal analysis: {str(inner_e)}")
-                raise
+            logger.error(f"Error in multimodal analysis: {str(e)}")
+            raise
 
     def upload_file(self, file_path: str) -> Any:
         """
@@ -230,14 +160,4 @@ class AnalyzerAPI:
         Returns:
             File object reference
         """
-        # Apply rate limiting - file uploads count against the API rate
-        self.rate_limiter.check_and_wait()
-
-        try:
-            # Use the modern client API
-            return self.client.files.upload(file=file_path)
-        except Exception as e:
-            logger.warning(f"Modern API file upload failed: {e}")
-
-            # Fall back to legacy implementation
-            return genai.upload_file(path=file_path)
+        return self.transport.upload_file(file=file_path)
@@ -0,0 +1,106 @@
+"""
+gemini_apis/api_key.py - One API key of a key pool
+
+Each key has its own RateLimiter, health state and google.genai client, created when the
+key is first used.
+
+Exports:
+- parse_api_keys(value: str) -> List[str]: Keys from a comma/whitespace separated string
+- ApiKey(key: str, index: int, rate_limiter: RateLimiter)
+  - label, client, available(now) -> bool, headroom() -> Tuple
+
+Related files:
+- src/gemini/gemini_apis/api_key_pool.py: ApiKeyPool
+- src/gemini/gemini_apis/key_pool.py: KeyPoolMiddleware
+"""
+
+import re
+import time
+from functools import cached_property
+from typing import List, Optional, Tuple
+
+from ..gemini_utilities.lazy_import import lazy_import
+from ..gemini_utilities.rate_limiter import RateLimiter
+
+# The SDK is imported when the first key is used
+modern_genai = lazy_import("google.genai")
+
+
+def parse_api_keys(value: Optional[str]) -> List[str]:
+    """
+    Parse a list of API keys.
+
+    Args:
+        value: Keys separated by commas and/or whitespace
+
+    Returns:
+        List of unique keys in their original order
+    """
+    keys = [key for key in re.split(r"[,\s]+", value or "") if key]
+    return list(dict.fromkeys(keys))
+
+
+def _status_code(error: Exception) -> Optional[int]:
+    """HTTP status of an SDK error, if it has one"""
+    status = getattr(error, "code", None) or getattr(error, "status_code", None)
+    return status if isinstance(status, int) else None
+
+
+class ApiKey:
+    """One API key with its own limits, health and SDK client"""
+
+    def __init__(self, key: str, index: int, rate_limiter: RateLimiter):
+        """
+        Initialize a pool member.
+
+        Args:
+            key: The API key
+            index: Position in the pool (used in labels)
+            rate_limiter: Limits for this key
+        """
+        self.key = key
+        self.index = index
+        self.rate_limiter = rate_limiter
+        self.healthy = True
+        self.consecutive_failures = 0
+        self.cooldown_until = 0.0
+        self.calls = 0
+        self.failures = 0
+
+    @property
+    def label(self) -> str:
+        """Name safe to log: position and the last four characters of the key"""
+        return f"key{self.index + 1}(...{self.key[-4:]})"
+
+    @cached_property
+    def client(self):
+        """google.genai client for this key (imports the SDK on first use)"""
+        return modern_genai.Client(api_key=self.key)
+
+    def day_remaining(self) -> int:
+        """Calls left in this key's daily budget"""
+        return self.rate_limiter.get_status()["day"]["remaining"]
+
+    def available(self, now: Optional[float] = None) -> bool:
+        """
+        Check whether the key can take requests.
+
+        Args:
+            now: Current time.monotonic() value
+
+        Returns:
+            bool: True if healthy, not cooling down and not drained
+        """
+        now = time.monotonic() if now is None else now
+        return self.healthy and now >= self.cooldown_until and self.day_remaining() > 0
+
+    def headroom(self) -> Tuple[bool, int, int]:
+        """
+        Sort key for choosing between keys.
+
+        Returns:
+            (has calls left this minute, calls left today, calls left this minute)
+        """
+        status = self.rate_limiter.get_status()
+        minute_remaining = status["minute"]["remaining"]
+        return minute_remaining > 0, status["day"]["remaining"], minute_remaining
@@ -0,0 +1,213 @@
+"""
+gemini_apis/api_key_pool.py - Quota-aware choice between the keys of a pool
+
+ApiKeyPool sends each request to the healthy key with the most remaining quota and keeps
+uploads, caches, chats and batch jobs pinned to the key that created them. A key whose
+daily budget is used up is drained, keys that hit quota errors or are refused access (403)
+cool down for a while, and keys that are rejected as invalid (401) are taken out of rotation.
+
+Exports:
+- QUOTA_COOLDOWN, FORBIDDEN_COOLDOWN, FAILURE_COOLDOWN, MAX_CONSECUTIVE_FAILURES
+- ApiKeyPool(api_keys: List[str], max_calls_per_minute: int = 60, max_calls_per_day: int = 500)
+  - choose(exclude=()) -> ApiKey, find(label) -> ApiKey | None
+  - owner(resource_name) -> ApiKey | None, pin(resource_name, key)
+  - has_headroom() -> bool
+  - report_success(key), report_failure(key, error), get_status() -> Dict[str, Any]
+
+Related files:
+- src/gemini/gemini_apis/api_key.py: ApiKey
+- src/gemini/gemini_apis/key_pool.py: KeyPoolMiddleware, which routes requests with the pool
+"""
+
+import time
+import logging
+import threading
+import weakref
+from typing import Any, Dict, Iterable, List, Optional
+
+from ..gemini_utilities.rate_limiter import RateLimiter
+from .api_key import ApiKey, _status_code
+
+logger = logging.getLogger(__name__)
+
+# Seconds a key rests after a quota error, and after repeated failures
+QUOTA_COOLDOWN = 60.0
+FORBIDDEN_COOLDOWN = 60.0
+FAILURE_COOLDOWN = 30.0
+MAX_CONSECUTIVE_FAILURES = 3
+
+
+class ApiKeyPool:
+    """Routes requests over several API keys by remaining quota and health"""
+
+    def __init__(self, api_keys: List[str], max_calls_per_minute: int = 60,
+                 max_calls_per_day: int = 500):
+        """
+        Initialize the pool.
+
+        Args:
+            api_keys: The API keys
+            max_calls_per_minute: Per-key calls per minute
+            max_calls_per_day: Per-key calls per day
+
+        Raises:
+            ValueError: If no keys are given
+        """
+        if not api_keys:
+            raise ValueError("An API key pool needs at least one key")
+
+        self.keys = [ApiKey(key, index, RateLimiter(max_calls_per_minute, max_calls_per_day))
+                     for index, key in enumerate(api_keys)]
+        self._pins: Dict[str, ApiKey] = {}
+        self._chat_pins: "weakref.WeakKeyDictionary[Any, ApiKey]" = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    def choose(self, exclude: Iterable[ApiKey] = ()) -> ApiKey:
+        """
+        Choose the available key with the most headroom.
+
+        Args:
+            exclude: Keys not to choose (e.g. ones that just failed)
+
+        Returns:
+            ApiKey
+
+        Raises:
+            RuntimeError: If every key is drained, cooling down or unhealthy
+        """
+        now = time.monotonic()
+        with self._lock:
+            candidates = [key for key in self.keys
+                          if key not in exclude and key.available(now)]
+            if not candidates:
+                raise RuntimeError(
+                    f"No API key available: {self._describe_unavailable(now)}")
+            return max(candidates, key=lambda key: key.headroom())
+
+    def find(self, label: str) -> Optional[ApiKey]:
+        """
+        Get a key by its label.
+
+        Args:
+            label: ApiKey.label, e.g. saved with a batch run
+
+        Returns:
+            The ApiKey, or None if no key of the pool has that label
+        """
+        return next((key for key in self.keys if key.label == label), None)
+
+    def has_headroom(self) -> bool:
+        """
+        Check whether any key can take one more call this minute (e.g. for a hedge).
+
+        Returns:
+            bool: True if an available key has calls left this minute
+        """
+        now = time.monotonic()
+        with self._lock:
+            return any(key.available(now) and key.headroom()[0] for key in self.keys)
+
+    def _describe_unavailable(self, now: float) -> str:
+        """One-line reason per key why it cannot be chosen"""
+        reasons = []
+        for key in self.keys:
+            if not key.healthy:
+                reasons.append(f"{key.label} rejected")
+            elif now < key.cooldown_until:
+                reasons.append(f"{key.label} cooling down {key.cooldown_until - now:.0f}s")
+            elif key.day_remaining() <= 0:
+                reasons.append(f"{key.label} daily budget used")
+            else:
+                reasons.append(f"{key.label} excluded")
+        return ", ".join(reasons)
+
+    def pin(self, resource: Any, key: ApiKey) -> None:
+        """
+        Pin an uploaded file, cached content or chat session to the key that owns it.
+
+        Args:
+            resource: Resource name (e.g. "files/abc") or a chat session object
+            key: Owning key
+        """
+        with self._lock:
+            if isinstance(resource, str):
+                self._pins[resource] = key
+            else:
+                self._chat_pins[resource] = key
+
+    def owner(self, resource: Any) -> Optional[ApiKey]:
+        """
+        Get the key a resource is pinned to.
+
+        Args:
+            resource: Resource name or chat session object
+
+        Returns:
+            The owning ApiKey, or None if the resource is not pinned
+        """
+        with self._lock:
+            if isinstance(resource, str):
+                return self._pins.get(resource)
+            return self._chat_pins.get(resource)
+
+    def report_success(self, key: ApiKey) -> None:
+        """Record a successful call"""
+        with self._lock:
+            key.calls += 1
+            key.consecutive_failures = 0
+
+    def report_failure(self, key: ApiKey, error: Exception) -> None:
+        """
+        Record a failed call and update the key's health.
+
+        Quota errors and refused access cool the key down, invalid keys leave the rotation
+        and repeated other failures cool it down for a shorter time. A 403 usually means the
+        request used a resource of another key, so it does not remove a working key.
+
+        Args:
+            key: The key the call used
+            error: The exception raised by the call
+        """
+        status = _status_code(error)
+        with self._lock:
+            key.calls += 1
+            key.failures += 1
+            key.consecutive_failures += 1
+            if status == 429:
+                key.cooldown_until = time.monotonic() + QUOTA_COOLDOWN
+                logger.warning(f"{key.label} hit its quota, cooling down {QUOTA_COOLDOWN:.0f}s")
+            elif status == 403:
+                key.cooldown_until = time.monotonic() + FORBIDDEN_COOLDOWN
+                logger.warning(f"{key.label} was refused access (403), cooling down "
+                               f"{FORBIDDEN_COOLDOWN:.0f}s")
+            elif status == 401:
+                key.healthy = False
+                logger.error(f"{key.label} was rejected ({status}), removing it from the pool")
+            elif key.consecutive_failures >= MAX_CONSECUTIVE_FAILURES:
+                key.cooldown_until = time.monotonic() + FAILURE_COOLDOWN
+                key.consecutive_failures = 0
+                logger.warning(
+                    f"{key.label} failed {MAX_CONSECUTIVE_FAILURES} times in a row, "
+                    f"cooling down {FAILURE_COOLDOWN:.0f}s")
+
+    def get_status(self) -> Dict[str, Any]:
+        """
+        Get the state of every key.
+
+        Returns:
+            Dictionary of key label -> available, healthy, calls, failures, cooldown
+            seconds and the key's rate limit status
+        """
+        now = time.monotonic()
+        with self._lock:
+            pinned = len(self._pins)
+            status = {key.label: {
+                "available": key.available(now),
+                "healthy": key.healthy,
+                "calls": key.calls,
+                "failures": key.failures,
+                "cooldown_seconds": max(0.0, key.cooldown_until - now),
+                "limits": key.rate_limiter.get_status()
+            } for key in self.keys}
+        status["pinned_resources"] = pinned
+        return status
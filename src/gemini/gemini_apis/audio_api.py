@@ -3,20 +3,28 @@ gemini_apis/audio_api.py - Audio processing and analysis API for Gemini
 
 Provides functions for processing and analyzing audio files:
 - analyze_audio(client, audio_path_or_file, prompt, temperature): Analyzes audio with Gemini
+  (accepts a path, BytesIO, or an already uploaded Gemini file reference)
 - create_audio_analysis_prompt(): Returns a detailed prompt for comprehensive audio analysis
 
 Related files:
 - src/gemini/gemini_client.py: Main client that uses these API functions
 - src/gemini/gemini_apis/core_api.py: Core API functions used by this module
+- src/gemini/gemini_hooks/track_prefetcher.py: Produces uploaded file references ahead of time
 """
 
 import os
 import tempfile
 import logging
-from typing import Union, Optional, Tuple
+from typing import Union, Optional, Tuple, Any
 from io import BytesIO
 from pathlib import Path
-from google.genai import types
+
+from ..gemini_utilities.lazy_import import lazy_import
+from .transport import as_transport
+from .model_router import DEFAULT_TEXT_MODEL
+
+# The SDK is imported on the first request rather than at startup
+types = lazy_import("google.genai.types")
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -62,19 +70,33 @@ def create_audio_analysis_prompt() -> str:
     """
 
 
-def analyze_audio(client, audio_path_or_file: Union[str, BytesIO, Path],
+def is_uploaded_file(audio_path_or_file) -> bool:
+    """
+    Check whether an object is a file reference returned by the Gemini Files API.
+
+    Args:
+        audio_path_or_file: Object to check
+
+    Returns:
+        bool: True for uploaded file references (objects with a uri and mime_type)
+    """
+    return hasattr(audio_path_or_file, "uri") and hasattr(audio_path_or_file, "mime_type")
+
+
+def analyze_audio(client, audio_path_or_file: Union[str, BytesIO, Path, Any],
                   prompt: Optional[str] = None,
                   temperature: float = 0.4,
-                  model_name: str = "gemini-2.0-flash") -> str:
+                  model_name: str = DEFAULT_TEXT_MODEL) -> str:
     """
     Analyze audio content with a text prompt for guidance.
 
     Args:
         client: Initialized Gemini client instance
-        audio_path_or_file: Path to audio file, Path object, or BytesIO object
+        audio_path_or_file: Path to audio file, Path object, BytesIO object, or uploaded file reference
         prompt: Text prompt to guide the analysis (if None, uses default analysis prompt)
         temperature: Controls randomness (0.0-2.0)
-        model_name: Model name to use (default: gemini-2.0-flash)
+        model_name: Model name to use (default: gemini-2.0-flash; the model router may
+            pick another tier for calls tagged with a pipeline step)
 
     Returns:
         str: Analysis text from Gemini
@@ -87,9 +109,24 @@ def analyze_audio(client, audio_path_or_file: Union[str, BytesIO, Path],
     if isinstance(audio_path_or_file, Path):
         audio_path_or_file = str(audio_path_or_file)
 
+    # Reuse an upload that was already made (e.g. by the track prefetcher)
+    if is_uploaded_file(audio_path_or_file):
+        config = types.GenerateContentConfig(
+            temperature=temperature,
+            max_output_tokens=8192
+        )
+
+        response = as_transport(client).generate_content(
+            model=model_name,
+            contents=[prompt, audio_path_or_file],
+            config=config
+        )
+
+        return response.text
+
     # Upload the file using the modern API if it's a path
     if isinstance(audio_path_or_file, str):
-        uploaded_file = client.files.upload(
+        uploaded_file = as_transport(client).upload_file(
             file=audio_path_or_file)
 
         config = types.GenerateContentConfig(
@@ -97,7 +134,7 @@ def analyze_audio(client, audio_path_or_file: Union[str, BytesIO, Path],
             max_output_tokens=8192
         )
 
-        response = client.models.generate_content(
+        response = as_transport(client).generate_content(
             model=model_name,
             contents=[prompt, uploaded_file],
             config=config
@@ -114,14 +151,14 @@ def analyze_audio(client, audio_path_or_file: Union[str, BytesIO, Path],
             temp_path = temp_file.name
 
         try:
-            uploaded_file = client.files.upload(file=temp_path)
+            uploaded_file = as_transport(client).upload_file(file=temp_path)
 
             config = types.GenerateContentConfig(
                 temperature=temperature,
                 max_output_tokens=8192
             )
 
-            response = client.models.generate_content(
+            response = as_transport(client).generate_content(
                 model=model_name,
                 contents=[prompt, uploaded_file],
                 config=config
@@ -0,0 +1,249 @@
+"""
+gemini_apis/batch_api.py - Batch job backends for offline catalogue runs
+
+Batch jobs run many generate_content requests at a lower price and outside the interactive
+quota, in exchange for latency (results arrive within hours instead of seconds). Requests
+are written as JSONL (one {"key": ..., "request": GenerateContentRequest} per line),
+uploaded with the Files API and submitted as one job; the job is polled until it finishes
+and its result file is downloaded and matched back to the request keys.
+
+GeminiBatchBackend talks to the Gemini Batch API through the shared transport. Uploaded
+files and batch jobs belong to the key that created them, so with a key pool every request
+of the backend goes to one key, chosen on first use; the runner saves that key with its
+state so a resumed run keeps using it.
+LocalBatchBackend is a stand-in with the same interface that answers every request with a
+local function, for tests and dry runs; its jobs are persisted too, so resuming works the
+same way.
+
+Exports:
+- BATCH_FILE_MIME_TYPE, FINISHED_STATES, job_state, build_request, write_requests,
+  parse_results (see batch_requests.py)
+- BatchBackend: Interface; key, upload_audio(path), submit(model, requests_path, display_name),
+  poll(job_name) -> str, results(job_name) -> Dict[str, Dict[str, Any]]
+- GeminiBatchBackend(client=None, key: str = None)
+- LocalBatchBackend(responder: Callable[[str, Dict[str, Any]], str], jobs_dir: Path)
+
+Related files:
+- src/gemini/gemini_apis/batch_requests.py: The JSONL request and result formats
+- src/gemini/gemini_hooks/batch_runner.py: Runs the pipeline stage by stage on a backend
+- src/gemini/gemini_apis/transport.py: create_batch, get_batch and download_file
+"""
+
+import json
+import time
+import uuid
+import logging
+import mimetypes
+import contextlib
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+# The request and result formats are re-exported, so callers keep importing them from here
+from .batch_requests import (BATCH_FILE_MIME_TYPE, FINISHED_STATES, build_request, job_state,
+                             parse_results, write_requests)
+from .key_pool import KeyPoolMiddleware
+from .middleware import call_context
+from .transport import as_transport
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Seconds to wait for an uploaded audio file to leave the PROCESSING state
+UPLOAD_ACTIVE_TIMEOUT = 120
+UPLOAD_POLL_INTERVAL = 2
+
+
+class BatchBackend:
+    """Interface of the batch backends"""
+
+    # Label of the API key the backend's files and jobs belong to (None without a key pool)
+    key: Optional[str] = None
+
+    def upload_audio(self, audio_path: Path) -> Dict[str, str]:
+        """
+        Make an audio file available to batch requests.
+
+        Args:
+            audio_path: Path to the audio file
+
+        Returns:
+            Dictionary with the file's "name", "uri" and "mime_type"
+        """
+        raise NotImplementedError
+
+    def submit(self, model: str, requests_path: Path, display_name: str) -> str:
+        """
+        Submit a JSONL request file as one job.
+
+        Args:
+            model: Model name for every request of the job
+            requests_path: JSONL file from write_requests
+            display_name: Human-readable job name
+
+        Returns:
+            str: Job name to poll
+        """
+        raise NotImplementedError
+
+    def poll(self, job_name: str) -> str:
+        """
+        Get the state of a job.
+
+        Args:
+            job_name: Name returned by submit
+
+        Returns:
+            str: Normalized state (see job_state)
+        """
+        raise NotImplementedError
+
+    def results(self, job_name: str) -> Dict[str, Dict[str, Any]]:
+        """
+        Get the results of a finished job.
+
+        Args:
+            job_name: Name returned by submit
+
+        Returns:
+            Dictionary of request key -> {"text", "error"} (see parse_results)
+        """
+        raise NotImplementedError
+
+
+class GeminiBatchBackend(BatchBackend):
+    """Runs batch jobs with the Gemini Batch API"""
+
+    def __init__(self, client=None, key: Optional[str] = None):
+        """
+        Initialize the backend.
+
+        Args:
+            client: GeminiTransport or google.genai client
+            key: Label of the pool key to run on (chosen on first use if None)
+        """
+        self.transport = as_transport(client)
+        self.key = key
+        layer = self.transport.layer(KeyPoolMiddleware)
+        self._pool = layer.pool if layer is not None else None
+
+    def _on_key(self):
+        """Context that sends the requests made in it with the backend's key"""
+        if self._pool is None:
+            return contextlib.nullcontext()
+        if self.key is None:
+            self.key = self._pool.choose().label
+            logger.info(f"Batch jobs run on {self.key}")
+        return call_context(api_key=self.key)
+
+    def upload_audio(self, audio_path: Path) -> Dict[str, str]:
+        with self._on_key():
+            return self._upload_audio(audio_path)
+
+    def _upload_audio(self, audio_path: Path) -> Dict[str, str]:
+        """Upload an audio file and wait until it can be used"""
+        uploaded = self.transport.upload_file(file=str(audio_path))
+
+        deadline = time.monotonic() + UPLOAD_ACTIVE_TIMEOUT
+        state = getattr(uploaded.state, "name", uploaded.state)
+        while state == "PROCESSING":
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"Upload {uploaded.name} still processing")
+            time.sleep(UPLOAD_POLL_INTERVAL)
+            uploaded = self.transport.get_file(name=uploaded.name)
+            state = getattr(uploaded.state, "name", uploaded.state)
+        if state == "FAILED":
+            raise RuntimeError(f"Upload {uploaded.name} failed processing")
+
+        return {"name": uploaded.name, "uri": uploaded.uri, "mime_type": uploaded.mime_type}
+
+    def submit(self, model: str, requests_path: Path, display_name: str) -> str:
+        with self._on_key():
+            uploaded = self.transport.upload_file(
+                file=str(requests_path),
+                config={"display_name": display_name, "mime_type": BATCH_FILE_MIME_TYPE})
+            job = self.transport.create_batch(
+                model=model, src=uploaded.name, config={"display_name": display_name})
+        logger.info(f"Submitted batch job {job.name} ({display_name}) on {model}")
+        return job.name
+
+    def poll(self, job_name: str) -> str:
+        with self._on_key():
+            return job_state(self.transport.get_batch(job_name))
+
+    def results(self, job_name: str) -> Dict[str, Dict[str, Any]]:
+        with self._on_key():
+            job = self.transport.get_batch(job_name)
+            result_file = getattr(getattr(job, "dest", None), "file_name", None)
+            if not result_file:
+                raise RuntimeError(f"Batch job {job_name} has no result file ({job_state(job)})")
+            return parse_results(self.transport.download_file(result_file))
+
+
+class LocalBatchBackend(BatchBackend):
+    """Stand-in backend that answers batch requests locally"""
+
+    def __init__(self, responder: Callable[[str, Dict[str, Any]], str], jobs_dir: Path):
+        """
+        Initialize the stand-in.
+
+        Args:
+            responder: Returns the response text for (model, request) and raises for errors
+            jobs_dir: Directory where jobs and their results are kept
+        """
+        self.responder = responder
+        self.jobs_dir = Path(jobs_dir)
+
+    def _job_path(self, job_name: str) -> Path:
+        """File holding a job's description"""
+        return self.jobs_dir / f"{job_name.split('/')[-1]}.json"
+
+    def upload_audio(self, audio_path: Path) -> Dict[str, str]:
+        audio_path = Path(audio_path).resolve()
+        mime_type = mimetypes.guess_type(audio_path.name)[0] or "audio/mpeg"
+        return {"name": f"local/{audio_path.name}", "uri": audio_path.as_uri(),
+                "mime_type": mime_type}
+
+    def submit(self, model: str, requests_path: Path, display_name: str) -> str:
+        job_name = f"local-batches/{uuid.uuid4().hex[:12]}"
+        self.jobs_dir.mkdir(parents=True, exist_ok=True)
+        with open(self._job_path(job_name), "w", encoding="utf-8") as f:
+            json.dump({"model": model, "requests_path": str(requests_path),
+                       "display_name": display_name, "state": "pending"}, f, indent=2)
+        logger.info(f"Submitted local batch job {job_name} ({display_name})")
+        return job_name
+
+    def poll(self, job_name: str) -> str:
+        job_path = self._job_path(job_name)
+        with open(job_path, "r", encoding="utf-8") as f:
+            job = json.load(f)
+        if job["state"] != "pending":
+            return job["state"]
+
+        # The job runs when it is first polled, like a job that finished overnight
+        lines = []
+        with open(job["requests_path"], "r", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                try:
+                    text = self.responder(job["model"], entry["request"])
+                    lines.append({"key": entry["key"], "response": {
+                        "candidates": [{"content": {"parts": [{"text": text}]}}]}})
+                except Exception as e:
+                    lines.append({"key": entry["key"], "error": {"message": str(e)}})
+
+        results_path = job_path.with_name(job_path.stem + "_results.jsonl")
+        write_requests(results_path, lines)
+        job.update({"state": "succeeded", "results_path": str(results_path)})
+        with open(job_path, "w", encoding="utf-8") as f:
+            json.dump(job, f, indent=2)
+        return job["state"]
+
+    def results(self, job_name: str) -> Dict[str, Dict[str, Any]]:
+        with open(self._job_path(job_name), "r", encoding="utf-8") as f:
+            job = json.load(f)
+        if "results_path" not in job:
+            raise RuntimeError(f"Local batch job {job_name} has not run yet")
+        return parse_results(Path(job["results_path"]).read_bytes())
@@ -0,0 +1,134 @@
+"""
+gemini_apis/batch_requests.py - Request and result files of batch jobs
+
+A batch job reads its requests from a JSONL file, one {"key": ..., "request":
+GenerateContentRequest} per line, and writes a JSONL result file whose lines carry the same
+keys with a response or an error.
+
+Exports:
+- BATCH_FILE_MIME_TYPE: MIME type of uploaded request files
+- FINISHED_STATES: Job states after which a job no longer changes
+- job_state(job) -> str: Normalized job state ("pending", "running", "succeeded", ...)
+- build_request(key: str, prompt: str, audio_file: Dict[str, str], temperature: float,
+  max_output_tokens: int = 8192) -> Dict[str, Any]: One JSONL request line
+- write_requests(path: Path, requests: List[Dict[str, Any]]) -> int
+- parse_results(data: Union[bytes, str]) -> Dict[str, Dict[str, Any]]: key -> text or error
+
+Related files:
+- src/gemini/gemini_apis/batch_api.py: The backends that submit and read these files
+"""
+
+import json
+from pathlib import Path
+from typing import Any, Dict, List, Union
+
+BATCH_FILE_MIME_TYPE = "jsonl"
+
+FINISHED_STATES = ("succeeded", "partially_succeeded", "failed", "cancelled", "expired")
+
+
+def job_state(job: Any) -> str:
+    """
+    Get the normalized state of a batch job.
+
+    Args:
+        job: SDK batch job (its state is e.g. JobState.JOB_STATE_SUCCEEDED)
+
+    Returns:
+        str: Lowercase state without prefix, e.g. "running" or "succeeded"
+    """
+    state = getattr(job, "state", None)
+    name = str(getattr(state, "name", state) or "unspecified")
+    for prefix in ("JOB_STATE_", "BATCH_STATE_"):
+        if name.startswith(prefix):
+            name = name[len(prefix):]
+    return name.lower()
+
+
+def build_request(key: str, prompt: str, audio_file: Dict[str, str], temperature: float,
+                  max_output_tokens: int = 8192) -> Dict[str, Any]:
+    """
+    Build one JSONL request line for a prompt about an uploaded audio file.
+
+    Args:
+        key: Key the result is matched back with
+        prompt: Prompt text
+        audio_file: Uploaded file with "uri" and "mime_type"
+        temperature: Sampling temperature
+        max_output_tokens: Maximum response tokens
+
+    Returns:
+        Dictionary with the key and the GenerateContentRequest
+    """
+    return {
+        "key": key,
+        "request": {
+            "contents": [{
+                "role": "user",
+                "parts": [
+                    {"text": prompt},
+                    {"file_data": {"file_uri": audio_file["uri"],
+                                   "mime_type": audio_file["mime_type"]}}
+                ]
+            }],
+            "generation_config": {
+                "temperature": temperature,
+                "max_output_tokens": max_output_tokens
+            }
+        }
+    }
+
+
+def write_requests(path: Path, requests: List[Dict[str, Any]]) -> int:
+    """
+    Write request lines to a JSONL file.
+
+    Args:
+        path: File to write
+        requests: Request lines from build_request
+
+    Returns:
+        int: Number of lines written
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        for request in requests:
+            f.write(json.dumps(request) + "\n")
+    return len(requests)
+
+
+def _response_text(response: Dict[str, Any]) -> str:
+    """Text of a GenerateContentResponse in its JSON form"""
+    candidates = response.get("candidates") or []
+    if not candidates:
+        return ""
+    parts = (candidates[0].get("content") or {}).get("parts") or []
+    return "".join(part.get("text", "") for part in parts)
+
+
+def parse_results(data: Union[bytes, str]) -> Dict[str, Dict[str, Any]]:
+    """
+    Parse a JSONL result file.
+
+    Args:
+        data: Contents of the result file
+
+    Returns:
+        Dictionary of request key -> {"text": str or None, "error": str or None}
+    """
+    if isinstance(data, bytes):
+        data = data.decode("utf-8")
+
+    results = {}
+    for line in data.splitlines():
+        if not line.strip():
+            continue
+        entry = json.loads(line)
+        error = entry.get("error") or entry.get("status")
+        if error:
+            results[entry["key"]] = {"text": None, "error": json.dumps(error)
+                                     if not isinstance(error, str) else error}
+        else:
+            results[entry["key"]] = {"text": _response_text(entry.get("response") or {}),
+                                     "error": None}
+    return results
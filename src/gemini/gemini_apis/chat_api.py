@@ -2,24 +2,71 @@
 gemini_apis/chat_api.py - Chat and conversation API for Gemini
 
 Provides functions for managing chat sessions with Gemini:
-- create_chat(client, model_name, system_instruction): Creates a new chat session
-- send_message(chat, text, stream): Sends a message to an existing chat session
+- create_chat(client, model_name, system_instruction, instruction_cache, history): Creates a
+  new chat session
+- send_message(chat, text, stream, client): Sends a message to an existing chat session
+- stream_message_async(chat, message, client, config): Streams a turn on the event loop
 - get_chat_history(chat): Gets the conversation history from a chat session
+- instruction_hash(system_instruction) -> str: Short hash identifying a system instruction
+- InstructionCache(client, ttl, min_tokens): Cached contents holding long system instructions
+- WarmChatPool(client, model_name, instruction_cache, size): Ready chats per instruction
+
+The system instruction is sent natively in the chat's config, so creating a chat makes no
+model call and the instruction is not part of the history resent with every turn. A long
+instruction shared by many chats can be stored once as cached content; the chats then
+refer to it by name and its tokens are billed at the cached rate.
 
 Related files:
+- src/gemini/gemini_apis/instruction_cache.py: InstructionCache and instruction_hash
 - src/gemini/gemini_client.py: Main client that uses these chat functions
 - src/gemini/gemini_hooks/conversation_manager.py: Higher-level conversation management
+- src/gemini/gemini_apis/key_pool.py: Pins cached contents and their chats to one key
 """
 
+import time
 import logging
-from typing import Optional, List, Any
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Optional, List, Any, AsyncIterator, Dict, Deque, Tuple
+
+from ..gemini_utilities.lazy_import import lazy_import
+from .transport import as_transport
+# The instruction cache is re-exported, so callers keep importing it from here
+from .instruction_cache import (CACHE_RENEW_MARGIN, DEFAULT_CACHE_TTL,
+                                MIN_CACHED_INSTRUCTION_TOKENS, InstructionCache, instruction_hash)
+
+# The SDK is imported when the first chat is created
+types = lazy_import("google.genai.types")
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Ready chats kept per instruction by WarmChatPool
+DEFAULT_WARM_CHATS = 2
+
+
+def _chat_config(model_name: str, system_instruction: Optional[str],
+                 instruction_cache: Optional[InstructionCache]) -> Tuple[Any, Optional[float]]:
+    """
+    Build the config of a new chat.
+
+    Returns:
+        Tuple of the GenerateContentConfig (or None) and the expiry time of the cached
+        instruction it refers to (None if the instruction is inline)
+    """
+    if not system_instruction:
+        return None, None
+    cached = instruction_cache.get(model_name, system_instruction) if instruction_cache else None
+    if cached is not None:
+        return types.GenerateContentConfig(cached_content=cached[0]), cached[1]
+    return types.GenerateContentConfig(system_instruction=system_instruction), None
+
 
-def create_chat(client, model_name: str, system_instruction: Optional[str] = None):
+def create_chat(client, model_name: str, system_instruction: Optional[str] = None,
+                instruction_cache: Optional[InstructionCache] = None,
+                history: Optional[List[Any]] = None):
     """
     Create a new chat session with an optional system instruction.
 
@@ -27,21 +74,125 @@ def create_chat(client, model_name: str, system_instruction: Optional[str] = Non
         client: Gemini client instance
         model_name: Name of the model to use for the chat
         system_instruction: Optional instruction to guide the model's behavior
+        instruction_cache: Optional cache through which long instructions are shared
+        history: Optional earlier messages to continue from
 
     Returns:
         The chat object
     """
-    # Create a chat session using client API
-    chat = client.chats.create(model=model_name)
+    config, _ = _chat_config(model_name, system_instruction, instruction_cache)
+
+    # The instruction travels in the chat's config; no priming message is sent
+    return as_transport(client).create_chat(model=model_name, config=config, history=history)
+
+
+class WarmChatPool:
+    """Ready-made chats per system instruction, replenished in the background"""
+
+    def __init__(self, client, model_name: str,
+                 instruction_cache: Optional[InstructionCache] = None,
+                 size: int = DEFAULT_WARM_CHATS):
+        """
+        Initialize the pool.
+
+        Creating a chat object makes no model call; what a warm chat saves is the cached
+        content of its instruction, which is created (or renewed) off the request path.
+
+        Args:
+            client: Transport (or client) the chats use
+            model_name: Model of the chats
+            instruction_cache: Optional cache for long instructions
+            size: Ready chats to keep per instruction
+        """
+        self.transport = as_transport(client)
+        self.model_name = model_name
+        self.instruction_cache = instruction_cache
+        self.size = size
+        self._lock = threading.Lock()
+        # instruction hash -> ready (chat, expiry time of its cached instruction or None)
+        self._ready: Dict[str, Deque[Tuple[Any, Optional[float]]]] = {}
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="chat-warmer")
+        self._stats = {"hits": 0, "misses": 0, "created": 0}
+
+    def _new_chat(self, system_instruction: Optional[str]) -> Tuple[Any, Optional[float]]:
+        """Create a chat and the expiry time of its cached instruction"""
+        config, expires_at = _chat_config(self.model_name, system_instruction,
+                                          self.instruction_cache)
+        chat = self.transport.create_chat(model=self.model_name, config=config)
+        with self._lock:
+            self._stats["created"] += 1
+        return chat, expires_at
+
+    def warm(self, system_instruction: Optional[str] = None) -> Future:
+        """
+        Fill the pool for an instruction in the background.
+
+        Args:
+            system_instruction: The instruction
 
-    # Send system instruction as first message if provided
-    if system_instruction:
-        chat.send_message(f"System: {system_instruction}")
+        Returns:
+            Future that resolves when the instruction has size ready chats
+        """
+        return self._executor.submit(self._fill, system_instruction)
 
-    return chat
+    def _fill(self, system_instruction: Optional[str]) -> None:
+        """Create chats until the instruction has size ready ones (runs on the warmer thread)"""
+        key = instruction_hash(system_instruction)
+        while True:
+            with self._lock:
+                if len(self._ready.setdefault(key, deque())) >= self.size:
+                    return
+            try:
+                ready = self._new_chat(system_instruction)
+            except Exception as e:
+                logger.warning(f"Warming a chat for instruction {key} failed: {str(e)}")
+                return
+            with self._lock:
+                self._ready[key].append(ready)
 
+    def acquire(self, system_instruction: Optional[str] = None):
+        """
+        Take a ready chat for an instruction (or create one) and refill the pool.
 
-def send_message(chat, text: str, stream: bool = False):
+        Args:
+            system_instruction: Optional instruction to guide the model's behavior
+
+        Returns:
+            A new chat object that is not handed out again
+        """
+        key = instruction_hash(system_instruction)
+        chat = None
+        with self._lock:
+            ready = self._ready.get(key) or deque()
+            while ready and chat is None:
+                candidate, expires_at = ready.popleft()
+                # Chats whose cached instruction is about to expire are dropped
+                if expires_at is None or expires_at - CACHE_RENEW_MARGIN > time.time():
+                    chat = candidate
+            self._stats["hits" if chat is not None else "misses"] += 1
+
+        if chat is None:
+            chat, _ = self._new_chat(system_instruction)
+        self.warm(system_instruction)
+        return chat
+
+    def get_status(self) -> Dict[str, Any]:
+        """
+        Get the state of the pool.
+
+        Returns:
+            Dictionary with ready chats per instruction hash and hit, miss and creation counts
+        """
+        with self._lock:
+            return {"ready": {key: len(chats) for key, chats in self._ready.items()},
+                    **self._stats}
+
+    def shutdown(self) -> None:
+        """Stop the warmer thread"""
+        self._executor.shutdown(wait=True)
+
+
+def send_message(chat, text: str, stream: bool = False, client=None):
     """
     Send a message to the chat session.
 
@@ -49,6 +200,7 @@ def send_message(chat, text: str, stream: bool = False):
         chat: Chat session object
         text: The message text to send
         stream: Whether to stream the response
+        client: Transport (or client) whose middleware the message goes through
 
     Returns:
         Chat response or stream
@@ -56,10 +208,44 @@ def send_message(chat, text: str, stream: bool = False):
     # Send message to Gemini
     if stream:
         # Handle streaming response
-        return chat.send_message_stream(text)
+        return as_transport(client).send_message_stream(chat, text)
     else:
         # Handle regular response
-        return chat.send_message(text)
+        return as_transport(client).send_message(chat, text)
+
+
+async def stream_message_async(chat, message: Any, client=None,
+                               config: Any = None) -> AsyncIterator[Any]:
+    """
+    Stream a turn of a chat session on the event loop.
+
+    The turn runs on an async chat seeded with the chat's history and is recorded in the
+    chat when the stream completes, so the same chat can be used by the sync functions
+    afterwards. A stream that is cancelled part way leaves the chat unchanged.
+
+    Args:
+        chat: Chat session object
+        message: Message text or list of content items
+        client: Transport (or client) whose middleware the message goes through
+        config: Optional GenerateContentConfig for this turn (replaces the chat's own)
+
+    Yields:
+        Response chunks
+    """
+    transport = as_transport(client)
+    history = chat.get_history()
+    async_chat = transport.create_async_chat(
+        model=chat._model, config=getattr(chat, "_config", None), history=history,
+        continues=chat)
+
+    async for chunk in transport.send_message_stream_async(async_chat, message, config=config):
+        yield chunk
+
+    # The async chat holds the seeded history followed by the new turn
+    turn = async_chat.get_history(curated=False)[len(history):]
+    if turn:
+        chat.record_history(user_input=turn[0], model_output=turn[1:],
+                            is_valid=len(async_chat.get_history()) > len(history))
 
 
 def get_chat_history(chat) -> List[Any]:
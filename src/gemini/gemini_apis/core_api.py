@@ -5,19 +5,27 @@ Provides low-level functions for interacting with the Gemini API:
 - send_to_discord(response, prompt, is_final, source, content_type): Sends a Gemini response to Discord
 - send_error_to_discord(error, prompt): Sends an error to Discord safely without risking recursion
 - generate_content(prompt, temperature, system_instruction): Generates text based on a prompt
-- generate_image(prompt, temperature): Generates an image based on a text prompt
+- generate_image(prompt, temperature, model_name): Generates an image based on a text prompt (returned undecoded)
+- generate_image_candidates(prompt, temperature, count): Generates several images in parallel
 
 Related files:
 - src/gemini/gemini_client.py: Main client that orchestrates these API calls
 - src/discord/discord_client.py: Client for Discord integration
+- src/gemini/gemini_utilities/generated_image.py: Lazily decoded image wrapper
 """
 
 import os
 import logging
-from typing import Dict, Optional, Tuple, Union, Any
-from io import BytesIO
-from PIL import Image
-from google.genai import types
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple, Union, Any
+from ..gemini_utilities.generated_image import GeneratedImage
+from ..gemini_utilities.lazy_import import lazy_import
+from .transport import as_transport
+from .model_router import DEFAULT_IMAGE_MODEL
+
+# The SDK is imported on the first request rather than at startup
+types = lazy_import("google.genai.types")
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -153,7 +161,7 @@ def generate_content(client, model_name: str, prompt: str, temperature: float =
     if system_instruction:
         config.system_instruction = system_instruction
 
-    response = client.models.generate_content(
+    response = as_transport(client).generate_content(
         model=model_name,
         contents=prompt,
         config=config
@@ -162,7 +170,8 @@ def generate_content(client, model_name: str, prompt: str, temperature: float =
     return response.text
 
 
-def generate_image(client, prompt: str, temperature: float = 0.9) -> Tuple[Optional[str], Optional[Image.Image]]:
+def generate_image(client, prompt: str, temperature: float = 0.9,
+                   model_name: str = DEFAULT_IMAGE_MODEL) -> Tuple[Optional[str], Optional[GeneratedImage]]:
     """
     Generate an image based on a text prompt using Gemini's experimental model.
 
@@ -170,9 +179,11 @@ def generate_image(client, prompt: str, temperature: float = 0.9) -> Tuple[Optio
         client: Initialized Gemini client instance
         prompt: Text description of the image to generate
         temperature: Controls randomness (0.0-2.0)
+        model_name: Image generation model (the model router may pick another image tier)
 
     Returns:
-        Tuple of (response_text, image): The description text and generated image
+        Tuple of (response_text, image): The description text and the generated image as
+        returned by the API (decoded only if a caller accesses it as a PIL image)
     """
     logger.info("Attempting image generation with experimental model")
 
@@ -182,8 +193,8 @@ def generate_image(client, prompt: str, temperature: float = 0.9) -> Tuple[Optio
         response_modalities=["Text", "Image"]
     )
 
-    response = client.models.generate_content(
-        model="gemini-2.0-flash-exp-image-generation",
+    response = as_transport(client).generate_content(
+        model=model_name,
         contents=prompt,
         config=config
     )
@@ -196,8 +207,8 @@ def generate_image(client, prompt: str, temperature: float = 0.9) -> Tuple[Optio
         if part.text is not None:
             description_text = part.text
         elif hasattr(part, "inline_data") and part.inline_data:
-            generated_image = Image.open(
-                BytesIO(part.inline_data.data))
+            generated_image = GeneratedImage(
+                part.inline_data.data, part.inline_data.mime_type)
 
     if generated_image:
         logger.info("Successfully generated image with experimental model")
@@ -205,3 +216,42 @@ def generate_image(client, prompt: str, temperature: float = 0.9) -> Tuple[Optio
         logger.info("No image in response from experimental model")
 
     return description_text, generated_image
+
+
+def generate_image_candidates(client, prompt: str, temperature: float = 0.9,
+                              count: int = 2) -> List[Tuple[Optional[str], GeneratedImage]]:
+    """
+    Generate several image candidates for the same prompt with parallel requests.
+
+    The image generation model returns a single image per response, so candidates are
+    requested concurrently instead of through candidate_count.
+
+    Args:
+        client: Initialized Gemini client instance
+        prompt: Text description of the image to generate
+        temperature: Controls randomness (0.0-2.0)
+        count: Number of candidates to request
+
+    Returns:
+        List of (description_text, image) tuples for the requests that returned an image
+    """
+    logger.info(f"Requesting {count} image candidates in parallel")
+
+    with ThreadPoolExecutor(max_workers=count, thread_name_prefix="image-candidate") as executor:
+        # Each request keeps the caller's call_context tags
+        futures = [executor.submit(contextvars.copy_context().run,
+                                   generate_image, client, prompt, temperature)
+                   for _ in range(count)]
+
+    candidates = []
+    for index, future in enumerate(futures):
+        try:
+            description_text, generated_image = future.result()
+        except Exception as e:
+            logger.warning(f"Image candidate {index + 1} failed: {str(e)}")
+            continue
+        if generated_image is not None:
+            candidates.append((description_text, generated_image))
+
+    logger.info(f"Received {len(candidates)} of {count} image candidates")
+    return candidates
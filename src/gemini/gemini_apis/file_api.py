@@ -14,6 +14,8 @@ Related files:
 import logging
 from typing import List, Any
 
+from .transport import as_transport
+
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -30,7 +32,7 @@ def list_files(client) -> List[Any]:
         List of file objects
     """
     try:
-        files = list(client.files.list())
+        files = as_transport(client).list_files()
         logger.info(f"Listed {len(files)} files")
         return files
     except Exception as e:
@@ -50,7 +52,7 @@ def delete_file(client, file_name: str) -> bool:
         True if successful, False otherwise
     """
     try:
-        client.files.delete(name=file_name)
+        as_transport(client).delete_file(name=file_name)
         logger.info(f"Deleted file: {file_name}")
         return True
     except Exception as e:
@@ -70,7 +72,7 @@ def upload_file(client, file_path: str) -> Any:
         File object reference
     """
     try:
-        file = client.files.upload(file=file_path)
+        file = as_transport(client).upload_file(file=file_path)
         logger.info(f"Uploaded file: {file_path}")
         return file
     except Exception as e:
@@ -0,0 +1,177 @@
+"""
+gemini_apis/hedging_middleware.py - Hedged requests for calls slower than their step's p95
+
+The layer learns the latency of each step from its recent calls. A call still running
+after its step's quantile gets a duplicate, when the hedge budget, the deadline and the
+quota allow it, and the first response wins.
+
+Exports:
+- HedgingMiddleware(quantile: float = 0.95, min_samples: int = 10, window: int = 100,
+  max_hedge_ratio: float = 0.1, has_quota=None, operations=("generate_content",))
+  - threshold(step: str) -> float | None, get_status() -> Dict[str, Any]
+
+Related files:
+- src/gemini/gemini_apis/middleware.py: Builds the layer with the chain's quota check
+- src/gemini/gemini_apis/model_request.py: ModelRequest.copy() and cancellation
+"""
+
+import math
+import time
+import queue
+import logging
+import threading
+import contextvars
+from collections import deque
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from .model_request import Middleware, ModelRequest
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class HedgingMiddleware(Middleware):
+    """Sends a duplicate of calls that run longer than their step usually takes"""
+
+    def __init__(self, quantile: float = 0.95, min_samples: int = 10, window: int = 100,
+                 max_hedge_ratio: float = 0.1,
+                 has_quota: Optional[Callable[[ModelRequest], bool]] = None,
+                 operations: Iterable[str] = ("generate_content",)):
+        """
+        Initialize the hedging layer.
+
+        Args:
+            quantile: Latency quantile of a step after which a call is hedged
+            min_samples: Calls a step needs before its latency is trusted
+            window: Recent latencies kept per step
+            max_hedge_ratio: Upper bound for hedges as a share of all calls
+            has_quota: Whether the limits left room for one more call of a request
+                (None means the limits are not checked)
+            operations: Operations that may be hedged
+        """
+        self.quantile = quantile
+        self.min_samples = min_samples
+        self.window = window
+        self.max_hedge_ratio = max_hedge_ratio
+        self.has_quota = has_quota
+        self.operations = set(operations)
+        self.calls = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self._latencies: Dict[str, deque] = {}
+        self._lock = threading.Lock()
+
+    def threshold(self, step: str) -> Optional[float]:
+        """
+        Get the latency after which a call of a step is hedged.
+
+        Args:
+            step: Step tag of the call
+
+        Returns:
+            The step's latency quantile in seconds, or None until enough calls were seen
+        """
+        with self._lock:
+            samples = sorted(self._latencies.get(step, ()))
+        if len(samples) < self.min_samples:
+            return None
+        return samples[max(0, math.ceil(self.quantile * len(samples)) - 1)]
+
+    def _observe(self, step: str, seconds: float) -> None:
+        """Add the latency of a successful call to its step"""
+        with self._lock:
+            self._latencies.setdefault(step, deque(maxlen=self.window)).append(seconds)
+
+    def _may_hedge(self, request: ModelRequest) -> bool:
+        """Check the hedge budget, the deadline and the quota, and reserve a hedge"""
+        remaining = request.remaining()
+        if remaining is not None and remaining <= 0:
+            return False
+        with self._lock:
+            if self.hedges + 1 > self.max_hedge_ratio * self.calls:
+                return False
+        if self.has_quota is not None and not self.has_quota(request):
+            return False
+        with self._lock:
+            self.hedges += 1
+        return True
+
+    def _start(self, request: ModelRequest, call_next: Callable[[ModelRequest], Any],
+               outcomes: "queue.Queue") -> None:
+        """Run an attempt on a daemon thread that reports to the outcomes queue"""
+        def run():
+            started = time.perf_counter()
+            try:
+                response = call_next(request)
+            except BaseException as e:
+                outcomes.put((request, None, e))
+                return
+            self._observe(request.step, time.perf_counter() - started)
+            outcomes.put((request, response, None))
+
+        threading.Thread(target=contextvars.copy_context().run, args=(run,),
+                         name="gemini-hedge", daemon=True).start()
+
+    def __call__(self, request: ModelRequest, call_next: Callable[[ModelRequest], Any]) -> Any:
+        if request.operation not in self.operations:
+            return call_next(request)
+        with self._lock:
+            self.calls += 1
+
+        threshold = self.threshold(request.step)
+        if threshold is None:
+            started = time.perf_counter()
+            response = call_next(request)
+            self._observe(request.step, time.perf_counter() - started)
+            return response
+
+        # Copied before the primary starts, as inner layers fill in the model and client
+        hedge = request.copy()
+        hedge.tags["hedge"] = True
+        outcomes: "queue.Queue" = queue.Queue()
+        self._start(request, call_next, outcomes)
+        try:
+            _, response, error = outcomes.get(timeout=threshold)
+        except queue.Empty:
+            pass
+        else:
+            if error is not None:
+                raise error
+            return response
+
+        attempts = [request]
+        if self._may_hedge(request):
+            logger.info(f"{request.step} is slower than its p{self.quantile * 100:g} of "
+                        f"{threshold:.1f}s, sending a hedged request")
+            self._start(hedge, call_next, outcomes)
+            attempts.append(hedge)
+
+        # The timeout layer bounds every attempt, so each one reports back
+        errors = []
+        for _ in attempts:
+            finished, response, error = outcomes.get()
+            if error is None:
+                # The first response wins; the other attempt is no longer waited for
+                for attempt in attempts:
+                    if attempt is not finished:
+                        attempt.cancelled.set()
+                if finished is hedge:
+                    with self._lock:
+                        self.hedge_wins += 1
+                return response
+            errors.append(error)
+        raise errors[0]
+
+    def get_status(self) -> Dict[str, Any]:
+        """
+        Get the hedging state.
+
+        Returns:
+            Dictionary with calls, hedges, hedge wins and the hedge threshold per step
+        """
+        with self._lock:
+            steps = list(self._latencies)
+            status = {"calls": self.calls, "hedges": self.hedges, "hedge_wins": self.hedge_wins}
+        status["thresholds"] = {step: self.threshold(step) for step in steps}
+        return status
@@ -9,14 +9,20 @@ Provides functions for processing, analyzing and generating images:
 Related files:
 - src/gemini/gemini_client.py: Main client that uses these API functions
 - src/gemini/gemini_apis/core_api.py: Core API functions used by this module
+- src/gemini/gemini_utilities/generated_image.py: Lazily decoded image wrapper
 """
 
 import logging
 from typing import Union, Optional, Tuple, Dict, Any
-from io import BytesIO
 from pathlib import Path
 from PIL import Image
-from google.genai import types
+
+from ..gemini_utilities.generated_image import GeneratedImage
+from ..gemini_utilities.lazy_import import lazy_import
+from .transport import as_transport
+
+# The SDK is imported on the first request rather than at startup
+types = lazy_import("google.genai.types")
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -52,7 +58,7 @@ def analyze_image(client, image_path_or_file: Union[str, Image.Image, Path],
         max_output_tokens=8192
     )
 
-    response = client.models.generate_content(
+    response = as_transport(client).generate_content(
         model=client.model_name,
         contents=[prompt, image],
         config=config
@@ -81,7 +87,7 @@ def create_fallback_image(error_message: str = None, color: tuple = (255, 0, 0))
     return fallback_image
 
 
-def process_generated_image(response) -> Tuple[Optional[str], Optional[Image.Image]]:
+def process_generated_image(response) -> Tuple[Optional[str], Optional[GeneratedImage]]:
     """
     Extract text description and image from a Gemini image generation response.
 
@@ -89,7 +95,8 @@ def process_generated_image(response) -> Tuple[Optional[str], Optional[Image.Ima
         response: Response from Gemini image generation API
 
     Returns:
-        Tuple of (description_text, generated_image)
+        Tuple of (description_text, generated_image), where generated_image keeps the raw
+        bytes and MIME type from the response
     """
     description_text = None
     generated_image = None
@@ -99,7 +106,7 @@ def process_generated_image(response) -> Tuple[Optional[str], Optional[Image.Ima
         if part.text is not None:
             description_text = part.text
         elif hasattr(part, "inline_data") and part.inline_data:
-            generated_image = Image.open(
-                BytesIO(part.inline_data.data))
+            generated_image = GeneratedImage(
+                part.inline_data.data, part.inline_data.mime_type)
 
     return description_text, generated_image
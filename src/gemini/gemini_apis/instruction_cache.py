@@ -0,0 +1,129 @@
+"""
+gemini_apis/instruction_cache.py - Long chat system instructions stored as cached content
+
+A long instruction shared by many chats is created once as cached content per model; the
+chats then refer to it by name and its tokens are billed at the cached rate. Instructions
+shorter than min_tokens are sent inline, and an entry close to expiring is renewed.
+
+Exports:
+- DEFAULT_CACHE_TTL, MIN_CACHED_INSTRUCTION_TOKENS, CACHE_RENEW_MARGIN
+- instruction_hash(system_instruction) -> str: Short hash identifying a system instruction
+- InstructionCache(client, ttl, min_tokens): Cached contents holding long system instructions
+  - get(model, system_instruction) -> Tuple[str, float] | None, clear() -> None
+
+Related files:
+- src/gemini/gemini_apis/chat_api.py: Creates the chats that refer to the cached instructions
+- src/gemini/gemini_apis/key_pool.py: Pins cached contents and their chats to one key
+"""
+
+import time
+import hashlib
+import logging
+import threading
+from typing import Optional, Dict, Tuple
+
+from ..gemini_utilities.lazy_import import lazy_import
+from ..gemini_utilities.token_utils import estimate_text_tokens
+from .transport import as_transport
+
+# The SDK is imported when the first instruction is cached
+types = lazy_import("google.genai.types")
+
+logger = logging.getLogger(__name__)
+
+# Lifetime of a cached instruction, in seconds
+DEFAULT_CACHE_TTL = 3600
+
+# Instructions shorter than this are sent inline (the API rejects smaller caches)
+MIN_CACHED_INSTRUCTION_TOKENS = 4096
+
+# A cached instruction this close to expiring is not handed to new chats
+CACHE_RENEW_MARGIN = 300
+
+
+def instruction_hash(system_instruction: Optional[str]) -> str:
+    """
+    Get a short hash identifying a system instruction.
+
+    Args:
+        system_instruction: The instruction, or None for chats without one
+
+    Returns:
+        str: 16 hex characters of its SHA-256 digest ("none" for no instruction)
+    """
+    if not system_instruction:
+        return "none"
+    return hashlib.sha256(system_instruction.encode("utf-8")).hexdigest()[:16]
+
+
+class InstructionCache:
+    """Cached contents holding long system instructions, shared by the chats that use them"""
+
+    def __init__(self, client=None, ttl: int = DEFAULT_CACHE_TTL,
+                 min_tokens: int = MIN_CACHED_INSTRUCTION_TOKENS):
+        """
+        Initialize the cache.
+
+        Args:
+            client: Transport (or client) the cached contents are created through
+            ttl: Lifetime of each cached instruction in seconds
+            min_tokens: Estimated tokens from which an instruction is cached
+        """
+        self.transport = as_transport(client)
+        self.ttl = ttl
+        self.min_tokens = min_tokens
+        self._lock = threading.Lock()
+        # (model, instruction hash) -> (cached content name or None, expiry time)
+        self._entries: Dict[Tuple[str, str], Tuple[Optional[str], float]] = {}
+
+    def get(self, model: str, system_instruction: Optional[str]) -> Optional[Tuple[str, float]]:
+        """
+        Get the cached content holding an instruction, creating it if needed.
+
+        Args:
+            model: Model the chats use (cached contents are per model)
+            system_instruction: The instruction
+
+        Returns:
+            Tuple of the cached content name and its expiry time (time.time()), or None if
+            the instruction is too short to cache or caching it failed
+        """
+        if not system_instruction or estimate_text_tokens(system_instruction) < self.min_tokens:
+            return None
+
+        key = (model, instruction_hash(system_instruction))
+        with self._lock:
+            name, expires_at = self._entries.get(key, (None, 0.0))
+            if expires_at - CACHE_RENEW_MARGIN > time.time():
+                return (name, expires_at) if name else None
+
+            try:
+                cached = self.transport.create_cached_content(
+                    model=model,
+                    config=types.CreateCachedContentConfig(
+                        system_instruction=system_instruction,
+                        ttl=f"{self.ttl}s",
+                        display_name=f"chat-instruction-{key[1]}"
+                    )
+                )
+                name = cached.name
+                logger.info(f"Cached system instruction {key[1]} for {model} as {name}")
+            except Exception as e:
+                # Chats fall back to the inline instruction until the entry expires
+                name = None
+                logger.warning(f"Caching system instruction {key[1]} failed: {str(e)}")
+            expires_at = time.time() + self.ttl
+            self._entries[key] = (name, expires_at)
+            return (name, expires_at) if name else None
+
+    def clear(self) -> None:
+        """Delete every cached instruction (chats that still refer to one fail afterwards)"""
+        with self._lock:
+            entries, self._entries = self._entries, {}
+        for name, _ in entries.values():
+            if not name:
+                continue
+            try:
+                self.transport.delete_cached_content(name)
+            except Exception as e:
+                logger.warning(f"Deleting cached instruction {name} failed: {str(e)}")
@@ -0,0 +1,193 @@
+"""
+gemini_apis/key_pool.py - Pool of API keys with quota-aware load balancing
+
+Spreads requests over several project keys, each with its own RateLimiter and SDK client.
+Every request goes to the healthy key with the most remaining quota, except requests that
+reference an uploaded file, cached content or batch job: those must use the key that
+created it, so uploads, caches and batch jobs are pinned to their owning key. A key whose
+daily budget is used up is drained (no longer chosen), keys that hit quota errors or are
+refused access (403, e.g. to another key's file) cool down for a while, and keys that are
+rejected as invalid (401) are taken out of rotation. A block of work whose requests must all
+use one key (e.g. a batch job and its uploads) names it with call_context(api_key=label). Quota errors fail over to another key.
+Files are recognized both as upload references and as file_data parts that carry their URI.
+
+GeminiClient builds a pool when GEMINI_API_KEYS (comma separated) lists several keys.
+
+Exports:
+- parse_api_keys(value: str) -> List[str]: Keys from a comma/whitespace separated string
+- ApiKey(key: str, index: int, rate_limiter: RateLimiter)
+  - label, client, available(now) -> bool, headroom() -> Tuple
+- ApiKeyPool(api_keys: List[str], max_calls_per_minute: int = 60, max_calls_per_day: int = 500)
+  - choose(exclude=()) -> ApiKey, find(label) -> ApiKey | None
+  - owner(resource_name) -> ApiKey | None, pin(resource_name, key)
+  - has_headroom() -> bool
+  - report_success(key), report_failure(key, error), get_status() -> Dict[str, Any]
+- KeyPoolMiddleware(pool: ApiKeyPool): Middleware layer that routes each request to a key
+
+Related files:
+- src/gemini/gemini_apis/api_key.py: One key with its limits and client
+- src/gemini/gemini_apis/api_key_pool.py: Choosing, pinning and cooling down keys
+- src/gemini/gemini_apis/middleware.py: The middleware chain this layer is part of
+- src/gemini/gemini_apis/transport.py: Sends each request with the client chosen here
+- src/gemini/gemini_client.py: Builds a pool when several keys are configured
+- src/gemini/gemini_utilities/rate_limiter.py: Per-key limits
+"""
+
+import re
+import logging
+from typing import Any, Callable, List, Optional
+
+from .middleware import MODEL_OPERATIONS, Middleware, ModelRequest
+# The keys and the pool are re-exported, so callers keep importing them from here
+from .api_key import ApiKey, _status_code, parse_api_keys
+from .api_key_pool import (FAILURE_COOLDOWN, FORBIDDEN_COOLDOWN, MAX_CONSECUTIVE_FAILURES,
+                           QUOTA_COOLDOWN, ApiKeyPool)
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Operations that count against a key's quota
+QUOTA_OPERATIONS = MODEL_OPERATIONS + ("upload_file",)
+
+# Uploaded files are named "files/{id}"; their URIs end with that name
+_FILE_NAME = re.compile(r"\bfiles/[^/?#\s]+")
+
+
+def _file_references(item: Any, names: List[str]) -> None:
+    """Collect the names of the uploaded files a content item refers to"""
+    if item is None or isinstance(item, (str, bytes)):
+        return
+    if isinstance(item, (list, tuple)):
+        for element in item:
+            _file_references(element, names)
+        return
+
+    if isinstance(item, dict):
+        file_data = item.get("file_data") or item.get("fileData")
+        parts = item.get("parts")
+        uri = (file_data or {}).get("file_uri") or (file_data or {}).get("fileUri")
+    else:
+        # Uploaded file references carry their name and URI
+        if getattr(item, "uri", None) and isinstance(getattr(item, "name", None), str):
+            names.append(item.name)
+            return
+        file_data = getattr(item, "file_data", None)
+        parts = getattr(item, "parts", None)
+        uri = getattr(file_data, "file_uri", None)
+
+    # Parts built with Part.from_uri only carry the file's URI
+    if isinstance(uri, str):
+        match = _FILE_NAME.search(uri)
+        if match:
+            names.append(match.group(0))
+    if isinstance(parts, (list, tuple)):
+        _file_references(parts, names)
+
+
+def _resource_names(request: ModelRequest) -> List[str]:
+    """Names of uploaded files and cached contents a request refers to"""
+    names = []
+    for param in ("name", "src"):
+        if isinstance(request.params.get(param), str):
+            names.append(request.params[param])
+
+    _file_references(request.contents, names)
+    _file_references(request.params.get("history"), names)
+
+    cached_content = getattr(request.config, "cached_content", None)
+    if cached_content is None and isinstance(request.config, dict):
+        cached_content = request.config.get("cached_content")
+    if cached_content:
+        names.append(cached_content)
+    return names
+
+
+class KeyPoolMiddleware(Middleware):
+    """Routes each request to a key of the pool and applies that key's limits"""
+
+    def __init__(self, pool: ApiKeyPool):
+        """
+        Initialize the layer.
+
+        Args:
+            pool: The key pool
+        """
+        self.pool = pool
+
+    def _pinned_key(self, request: ModelRequest) -> Optional[ApiKey]:
+        """The key a request must use because of its context or the resources it refers to"""
+        label = request.tags.get("api_key")
+        if label is not None:
+            key = self.pool.find(label)
+            if key is None:
+                raise RuntimeError(f"{label}, which this work runs on, is not in the key pool")
+            return key
+        chat = request.params.get("chat")
+        if chat is not None:
+            return self.pool.owner(chat)
+        for name in _resource_names(request):
+            owner = self.pool.owner(name)
+            if owner is not None:
+                return owner
+        return None
+
+    def _send(self, key: ApiKey, request: ModelRequest,
+              call_next: Callable[[ModelRequest], Any]) -> Any:
+        """Send a request with a key, counting it against the key's limits"""
+        if request.operation in QUOTA_OPERATIONS:
+            key.rate_limiter.check_and_wait(tokens=request.tokens or 0)
+        request.client = key.client
+        try:
+            response = call_next(request)
+        except Exception as e:
+            self.pool.report_failure(key, e)
+            raise
+        self.pool.report_success(key)
+        return response
+
+    def _pin_result(self, key: ApiKey, request: ModelRequest, response: Any) -> None:
+        """Pin what a request created to the key that created it"""
+        name = getattr(response, "name", None)
+        if request.operation == "create_chat":
+            self.pool.pin(response, key)
+        elif isinstance(name, str) and (request.operation == "upload_file"
+                                        or name.startswith(("cachedContents/", "batches/"))):
+            self.pool.pin(name, key)
+        # A finished batch job's result file belongs to the job's key
+        result_file = getattr(getattr(response, "dest", None), "file_name", None)
+        if request.operation == "get_batch" and isinstance(result_file, str):
+            self.pool.pin(result_file, key)
+
+    def __call__(self, request: ModelRequest, call_next: Callable[[ModelRequest], Any]) -> Any:
+        if request.operation == "list_files":
+            # Files live per key, so list them from every key
+            files = []
+            for key in self.pool.keys:
+                for file in self._send(key, request, call_next):
+                    self.pool.pin(file.name, key)
+                    files.append(file)
+            return files
+
+        pinned = self._pinned_key(request)
+        if pinned is not None:
+            if not pinned.healthy:
+                raise RuntimeError(f"{pinned.label}, which owns this request's files, was rejected")
+            response = self._send(pinned, request, call_next)
+            self._pin_result(pinned, request, response)
+            return response
+
+        # Fail over to another key on quota errors until every key has been tried
+        tried: List[ApiKey] = []
+        while True:
+            key = self.pool.choose(exclude=tried)
+            try:
+                response = self._send(key, request, call_next)
+            except Exception as e:
+                tried.append(key)
+                if _status_code(e) != 429 or len(tried) == len(self.pool.keys):
+                    raise
+                logger.warning(f"Retrying {request.step} on another key after a quota error")
+                continue
+            self._pin_result(key, request, response)
+            return response
@@ -0,0 +1,120 @@
+"""
+gemini_apis/metrics_middleware.py - Call, error, latency and token metrics per step
+
+Exports:
+- MetricsMiddleware(): get_metrics() -> Dict[str, Any], summary() -> str, reset()
+
+Related files:
+- src/gemini/gemini_apis/middleware.py: The innermost layer of the standard chain
+- src/gemini/gemini_client.py: Reports the metrics of the client's transport
+"""
+
+import time
+import threading
+from typing import Any, Callable, Dict, Iterator, Optional
+
+from .model_request import Middleware, ModelRequest
+
+
+class MetricsMiddleware(Middleware):
+    """Records calls, errors, latency and token usage per step and operation"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """Clear all recorded metrics"""
+        with self._lock:
+            self._metrics: Dict[str, Dict[str, Any]] = {}
+
+    def _record(self, request: ModelRequest, seconds: float, response: Any = None,
+                error: Optional[Exception] = None) -> None:
+        """Add one call to the metrics of its step"""
+        usage = getattr(response, "usage_metadata", None)
+        key = f"{request.step} | {request.operation}"
+        with self._lock:
+            entry = self._metrics.setdefault(key, {
+                "step": request.step,
+                "operation": request.operation,
+                "model": request.model,
+                "calls": 0,
+                "errors": 0,
+                "retries": 0,
+                "hedges": 0,
+                "total_seconds": 0.0,
+                "max_seconds": 0.0,
+                "prompt_tokens": 0,
+                "output_tokens": 0
+            })
+            entry["calls"] += 1
+            entry["errors"] += error is not None
+            entry["retries"] += request.attempt > 1
+            entry["hedges"] += bool(request.tags.get("hedge"))
+            entry["total_seconds"] += seconds
+            entry["max_seconds"] = max(entry["max_seconds"], seconds)
+            if usage is not None:
+                entry["prompt_tokens"] += getattr(usage, "prompt_token_count", None) or 0
+                entry["output_tokens"] += getattr(usage, "candidates_token_count", None) or 0
+
+    def _measure(self, request: ModelRequest, stream: Iterator[Any],
+                 started: float) -> Iterator[Any]:
+        """Pass a stream's chunks through, and record the call once it ends"""
+        last, error = None, None
+        try:
+            for chunk in stream:
+                if getattr(chunk, "usage_metadata", None) is not None:
+                    last = chunk
+                yield chunk
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            self._record(request, time.perf_counter() - started, response=last, error=error)
+
+    def __call__(self, request: ModelRequest, call_next: Callable[[ModelRequest], Any]) -> Any:
+        started = time.perf_counter()
+        try:
+            response = call_next(request)
+        except Exception as e:
+            self._record(request, time.perf_counter() - started, error=e)
+            raise
+        if request.operation.endswith("_stream") and isinstance(response, Iterator):
+            # Streams are recorded when they end, with the usage of their last chunk
+            return self._measure(request, response, started)
+        self._record(request, time.perf_counter() - started, response=response)
+        return response
+
+    def get_metrics(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get the recorded metrics.
+
+        Returns:
+            Dictionary of "step | operation" -> calls, errors, retries, hedges,
+            total/mean/max seconds and prompt/output tokens
+        """
+        with self._lock:
+            metrics = {key: dict(entry) for key, entry in self._metrics.items()}
+        for entry in metrics.values():
+            entry["mean_seconds"] = entry["total_seconds"] / entry["calls"]
+        return metrics
+
+    def summary(self) -> str:
+        """
+        Format the recorded metrics as a table.
+
+        Returns:
+            str: One line per step and operation
+        """
+        metrics = self.get_metrics()
+        if not metrics:
+            return "No Gemini calls recorded"
+
+        width = max(len(key) for key in metrics)
+        lines = [f"{'step | operation':<{width}}  calls  errors  retries  mean s   max s   tokens in/out"]
+        for key, entry in sorted(metrics.items()):
+            lines.append(
+                f"{key:<{width}}  {entry['calls']:>5}  {entry['errors']:>6}  {entry['retries']:>7}"
+                f"  {entry['mean_seconds']:>6.1f}  {entry['max_seconds']:>6.1f}"
+                f"   {entry['prompt_tokens']}/{entry['output_tokens']}")
+        return "\n".join(lines)
@@ -0,0 +1,121 @@
+"""
+gemini_apis/middleware.py - Composable middleware around every Gemini call
+
+Every SDK call made through GeminiTransport becomes a ModelRequest that is passed down a
+chain of layers before reaching the SDK. Each layer is a callable taking the request and
+the next handler, so cross-cutting behaviour is written once and applies to every call:
+
+    cache -> tokens -> limiter -> retry -> hedging -> router -> key pool -> timeout -> metrics
+        -> transport
+
+Callers can tag the requests they make (e.g. with the pipeline step and track) through
+call_context; the tags travel with each request and group the recorded metrics. A
+call_context can also set a deadline: every call made inside it, retries and hedges
+included, must finish before the deadline, and each attempt is sent with an HTTP timeout
+of the time that is left, so a stuck call is aborted instead of holding its worker.
+
+The request and the layers live in their own modules; this module assembles the chain.
+
+Exports:
+- MODEL_OPERATIONS: Operations that run a model (and count against the quota)
+- ModelRequest(operation: str, model: str = None, contents=None, config=None, cacheable: bool = False,
+  timeout: float = None, **params)
+  - deadline, remaining() -> float | None, copy() -> ModelRequest, cancelled (threading.Event)
+  - tokens: Estimated input tokens, set by the token accounting layer
+- call_context(deadline: float = None, **tags): Context manager that tags the requests made
+  inside it and optionally gives them a deadline in seconds
+- current_tags() -> Dict[str, Any]: Tags of the enclosing call_context
+- Middleware: Base layer; __call__(request, call_next) passes the request on
+- CacheMiddleware(max_entries: int = 256, operations=("count_tokens",))
+- RateLimitMiddleware(rate_limiter: RateLimiter, operations=MODEL_OPERATIONS + ("upload_file",))
+- RetryMiddleware(max_attempts: int = 3, base_delay: float = 2.0, max_delay: float = 30.0)
+- TimeoutMiddleware(timeout: float = 600.0)
+- HedgingMiddleware(quantile: float = 0.95, min_samples: int = 10, max_hedge_ratio: float = 0.1,
+  has_quota=None): Fires a duplicate of calls slower than their step's learned p95
+- MetricsMiddleware(): get_metrics() -> Dict[str, Any], summary() -> str, reset()
+- is_retryable(error: Exception) -> bool
+- default_middleware(rate_limiter=None, key_pool=None, router=None, accountant=None, ..., hedging=True)
+  -> List[Middleware]: The standard chain
+
+Related files:
+- src/gemini/gemini_apis/model_request.py: ModelRequest, call_context and the Middleware base
+- src/gemini/gemini_apis/middleware_layers.py: Cache, rate limit, retry and timeout layers
+- src/gemini/gemini_apis/hedging_middleware.py, metrics_middleware.py: The other layers
+- src/gemini/gemini_apis/transport.py: Runs the chain in call_model
+- src/gemini/gemini_client.py: Builds the client's transport with the default chain
+- src/gemini/gemini_utilities/rate_limiter.py: Limits used by RateLimitMiddleware
+- src/gemini/gemini_apis/token_accounting.py: Token estimates charged against the limits
+"""
+
+from typing import List, Optional
+
+from ..gemini_utilities.rate_limiter import RateLimiter
+# The request and the layers are re-exported, so callers import them from here
+from .model_request import (MODEL_OPERATIONS, CallCancelled, Middleware, ModelRequest,
+                            call_context, current_tags)
+from .middleware_layers import (CacheMiddleware, RateLimitMiddleware, RetryMiddleware,
+                                TimeoutMiddleware, is_retryable)
+from .hedging_middleware import HedgingMiddleware
+from .metrics_middleware import MetricsMiddleware
+
+
+def default_middleware(rate_limiter: Optional[RateLimiter] = None, key_pool=None, router=None,
+                       accountant=None, cache_size: int = 256, max_attempts: int = 3,
+                       timeout: Optional[float] = 600.0, hedging: bool = True) -> List[Middleware]:
+    """
+    Build the standard chain: cache -> tokens -> limiter -> retry -> hedging -> router ->
+    key pool -> timeout -> metrics.
+
+    Args:
+        rate_limiter: Limits to apply to all calls (no limiter layer when None)
+        key_pool: Optional ApiKeyPool; its layer routes each call to a key and applies
+            that key's limits. It sits inside the retry layer, so a retried call can move
+            to another key
+        router: Optional ModelRouter; its layer picks the model of each step-tagged call
+            and applies per-model limits. It sits inside the retry layer, so a retried
+            call is routed again
+        accountant: Optional TokenAccountant; its layer estimates each call's input tokens
+            before the limiters, which charge them against their tokens-per-minute buckets
+        cache_size: Maximum cached responses
+        max_attempts: Attempts per request for transient failures
+        timeout: Default seconds per call (None disables timeouts)
+        hedging: Hedge calls slower than their step's p95 while the limits leave room
+
+    Returns:
+        List of layers, outermost first
+    """
+    def has_quota(request: ModelRequest) -> bool:
+        """Whether the limits leave room for a hedge, which is then counted against them"""
+        if router is not None and not router.has_headroom(request):
+            return False
+        if key_pool is not None and not key_pool.has_headroom():
+            return False
+        if rate_limiter is not None:
+            # The shared limiter sits outside the hedging layer, so count the hedge here;
+            # a hedge is only worth sending if it does not have to wait
+            if rate_limiter.get_status()["day"]["remaining"] <= 0:
+                return False
+            if rate_limiter.reserve(tokens=request.tokens or 0):
+                return False
+        return True
+
+    layers: List[Middleware] = [CacheMiddleware(max_entries=cache_size)]
+    if accountant is not None:
+        from .token_accounting import TokenAccountingMiddleware
+        layers.append(TokenAccountingMiddleware(accountant))
+    if rate_limiter is not None:
+        layers.append(RateLimitMiddleware(rate_limiter))
+    layers.append(RetryMiddleware(max_attempts=max_attempts))
+    if hedging:
+        layers.append(HedgingMiddleware(has_quota=has_quota))
+    if router is not None:
+        from .model_router import ModelRouterMiddleware
+        layers.append(ModelRouterMiddleware(router))
+    if key_pool is not None:
+        from .key_pool import KeyPoolMiddleware
+        layers.append(KeyPoolMiddleware(key_pool))
+    layers.extend([
+        TimeoutMiddleware(timeout=timeout),
+        MetricsMiddleware()
+    ])
+    return layers
@@ -0,0 +1,213 @@
+"""
+gemini_apis/middleware_layers.py - Cache, rate limit, retry and timeout layers
+
+Exports:
+- CacheMiddleware(max_entries: int = 256, operations=("count_tokens",))
+- RateLimitMiddleware(rate_limiter: RateLimiter, operations=MODEL_OPERATIONS + ("upload_file",))
+- RetryMiddleware(max_attempts: int = 3, base_delay: float = 2.0, max_delay: float = 30.0)
+- TimeoutMiddleware(timeout: float = 600.0)
+- is_retryable(error: Exception) -> bool
+
+Related files:
+- src/gemini/gemini_apis/middleware.py: The standard chain these layers are part of
+- src/gemini/gemini_apis/model_request.py: ModelRequest and the Middleware base
+- src/gemini/gemini_utilities/rate_limiter.py: Limits used by RateLimitMiddleware
+"""
+
+import time
+import random
+import hashlib
+import logging
+import threading
+import contextvars
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from ..gemini_utilities.rate_limiter import RateLimiter
+from .model_request import MODEL_OPERATIONS, Middleware, ModelRequest, _fingerprint
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# HTTP statuses worth retrying: request timeout, quota/rate limit and server errors
+RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+
+
+class CacheMiddleware(Middleware):
+    """LRU cache of responses for cacheable requests"""
+
+    def __init__(self, max_entries: int = 256, operations: Iterable[str] = ("count_tokens",)):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of cached responses
+            operations: Operations that are always cached; other requests are cached
+                only when marked cacheable
+        """
+        self.max_entries = max_entries
+        self.operations = set(operations)
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _key(self, request: ModelRequest) -> Optional[str]:
+        """Cache key of a request, or None if it cannot be cached"""
+        if not (request.cacheable or request.operation in self.operations):
+            return None
+        parts = [_fingerprint(request.contents), _fingerprint(request.config)]
+        if None in parts:
+            return None
+        return hashlib.sha256(
+            "\n".join([request.operation, str(request.model)] + parts).encode("utf-8")).hexdigest()
+
+    def __call__(self, request: ModelRequest, call_next: Callable[[ModelRequest], Any]) -> Any:
+        key = self._key(request)
+        if key is None:
+            return call_next(request)
+
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+
+        response = call_next(request)
+
+        with self._lock:
+            self._entries[key] = response
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return response
+
+
+class RateLimitMiddleware(Middleware):
+    """Applies a RateLimiter to the requests that count against the API quota"""
+
+    def __init__(self, rate_limiter: RateLimiter,
+                 operations: Iterable[str] = MODEL_OPERATIONS + ("upload_file",)):
+        """
+        Initialize the limiter layer.
+
+        Args:
+            rate_limiter: Limits to apply
+            operations: Operations that count against the limits (file uploads count
+                against the API rate as well)
+        """
+        self.rate_limiter = rate_limiter
+        self.operations = set(operations)
+
+    def __call__(self, request: ModelRequest, call_next: Callable[[ModelRequest], Any]) -> Any:
+        if request.operation in self.operations:
+            self.rate_limiter.check_and_wait(tokens=request.tokens or 0)
+        return call_next(request)
+
+
+def is_retryable(error: Exception) -> bool:
+    """
+    Check whether a failed call is worth retrying.
+
+    Args:
+        error: The exception raised by the call
+
+    Returns:
+        bool: True for timeouts, connection errors, rate limiting and server errors
+    """
+    if isinstance(error, (TimeoutError, ConnectionError)):
+        return True
+    status = getattr(error, "code", None) or getattr(error, "status_code", None)
+    return isinstance(status, int) and status in RETRYABLE_STATUS_CODES
+
+
+class RetryMiddleware(Middleware):
+    """Retries transient failures with exponential backoff and jitter"""
+
+    def __init__(self, max_attempts: int = 3, base_delay: float = 2.0, max_delay: float = 30.0,
+                 retry_on: Callable[[Exception], bool] = is_retryable):
+        """
+        Initialize the retry layer.
+
+        Args:
+            max_attempts: Attempts per request, including the first
+            base_delay: Delay before the first retry in seconds (doubles per retry)
+            max_delay: Upper bound for a single delay in seconds
+            retry_on: Decides whether an exception is transient
+        """
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retry_on = retry_on
+
+    def __call__(self, request: ModelRequest, call_next: Callable[[ModelRequest], Any]) -> Any:
+        while True:
+            try:
+                return call_next(request)
+            except Exception as e:
+                if (request.attempt >= self.max_attempts or request.cancelled.is_set()
+                        or not self.retry_on(e)):
+                    raise
+                delay = min(self.max_delay, self.base_delay * 2 ** (request.attempt - 1))
+                delay *= random.uniform(0.5, 1.0)
+                remaining = request.remaining()
+                if remaining is not None and remaining <= delay:
+                    # A retry could not finish before the deadline
+                    raise
+                logger.warning(
+                    f"{request.step} failed (attempt {request.attempt}/{self.max_attempts}), "
+                    f"retrying in {delay:.1f}s: {str(e)}")
+                time.sleep(delay)
+                request.attempt += 1
+
+
+class TimeoutMiddleware(Middleware):
+    """Abandons calls that take longer than their timeout"""
+
+    def __init__(self, timeout: Optional[float] = 600.0,
+                 operations: Iterable[str] = MODEL_OPERATIONS + ("upload_file", "count_tokens")):
+        """
+        Initialize the timeout layer.
+
+        Args:
+            timeout: Default seconds per call (None disables it; requests may override it)
+            operations: Operations the timeout applies to
+        """
+        self.timeout = timeout
+        self.operations = set(operations)
+
+    def __call__(self, request: ModelRequest, call_next: Callable[[ModelRequest], Any]) -> Any:
+        if request.operation not in self.operations:
+            return call_next(request)
+        timeout = request.timeout if request.timeout is not None else self.timeout
+        remaining = request.remaining()
+        if remaining is not None:
+            if remaining <= 0:
+                raise TimeoutError(f"{request.step} missed its deadline before it was sent")
+            timeout = remaining if timeout is None else min(timeout, remaining)
+        if timeout is None:
+            return call_next(request)
+        # The SDK aborts the HTTP request itself, so the worker below is freed as well
+        request.http_timeout = timeout
+
+        outcome: Dict[str, Any] = {}
+
+        def run():
+            try:
+                outcome["response"] = call_next(request)
+            except BaseException as e:
+                outcome["error"] = e
+
+        # The SDK call cannot be interrupted, so it runs on a daemon thread that the
+        # caller stops waiting for; the request's tags are carried over
+        worker = threading.Thread(target=contextvars.copy_context().run, args=(run,),
+                                  name="gemini-call", daemon=True)
+        worker.start()
+        worker.join(timeout)
+
+        if worker.is_alive():
+            raise TimeoutError(f"{request.step} did not finish within {timeout:g}s")
+        if "error" in outcome:
+            raise outcome["error"]
+        return outcome["response"]
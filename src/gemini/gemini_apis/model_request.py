@@ -0,0 +1,192 @@
+"""
+gemini_apis/model_request.py - The request that travels through the middleware chain
+
+Every SDK call made through GeminiTransport becomes a ModelRequest. Callers tag the
+requests they make (e.g. with the pipeline step and track) through call_context, and a
+call_context can also give every call inside it a deadline.
+
+Exports:
+- MODEL_OPERATIONS: Operations that run a model (and count against the quota)
+- ModelRequest(operation: str, model: str = None, contents=None, config=None, cacheable: bool = False,
+  timeout: float = None, **params)
+  - deadline, remaining() -> float | None, copy() -> ModelRequest, cancelled (threading.Event)
+  - tokens: Estimated input tokens, set by the token accounting layer
+- call_context(deadline: float = None, **tags): Context manager that tags the requests made
+  inside it and optionally gives them a deadline in seconds
+- current_tags() -> Dict[str, Any]: Tags of the enclosing call_context
+- Middleware: Base layer; __call__(request, call_next) passes the request on
+- CallCancelled: Raised for a request cancelled before it was sent
+
+Related files:
+- src/gemini/gemini_apis/middleware.py: The layers and the standard chain
+- src/gemini/gemini_apis/transport.py: Builds a ModelRequest for every SDK call
+"""
+
+import copy
+import json
+import time
+import hashlib
+import threading
+import contextvars
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Optional
+
+# Operations that run the model; chat turns are model calls too
+MODEL_OPERATIONS = ("generate_content", "generate_content_stream", "send_message",
+                    "send_message_stream")
+
+_call_tags: contextvars.ContextVar = contextvars.ContextVar("gemini_call_tags", default={})
+
+
+class CallCancelled(Exception):
+    """Raised for a request that was cancelled before it was sent (e.g. a losing hedge)"""
+
+
+@contextmanager
+def call_context(deadline: Optional[float] = None, **tags):
+    """
+    Tag every request made inside the block (nested blocks add to the outer tags).
+
+    Args:
+        deadline: Seconds from now by which every call in the block must finish; a nested
+            block cannot extend the deadline of the block around it
+        **tags: Tags such as step="Step 1" or track="song.mp3"
+    """
+    outer = _call_tags.get()
+    if deadline is not None:
+        deadline_at = time.monotonic() + deadline
+        if outer.get("deadline_at") is not None:
+            deadline_at = min(deadline_at, outer["deadline_at"])
+        tags["deadline_at"] = deadline_at
+    token = _call_tags.set({**outer, **tags})
+    try:
+        yield
+    finally:
+        _call_tags.reset(token)
+
+
+def current_tags() -> Dict[str, Any]:
+    """
+    Get the tags of the enclosing call_context.
+
+    Returns:
+        Dictionary of tags (empty outside any call_context)
+    """
+    return dict(_call_tags.get())
+
+
+class ModelRequest:
+    """A single SDK call as it travels through the middleware chain"""
+
+    def __init__(self, operation: str, model: Optional[str] = None, contents: Any = None,
+                 config: Any = None, cacheable: bool = False, timeout: Optional[float] = None,
+                 **params):
+        """
+        Describe an SDK call.
+
+        Args:
+            operation: Transport operation, e.g. "generate_content" or "upload_file"
+            model: Model name, for model operations
+            contents: Prompt text or list of content items
+            config: Optional SDK config
+            cacheable: Whether the response may be served from the cache
+            timeout: Seconds before the call is abandoned (None uses the layer default)
+            **params: Further operation arguments (file, name, chat, message, history)
+        """
+        self.operation = operation
+        self.model = model
+        self.contents = contents
+        self.config = config
+        self.cacheable = cacheable
+        self.timeout = timeout
+        self.params = params
+        self.tags = current_tags()
+        self.attempt = 1
+        # SDK client to send the request with; None uses the transport's own
+        self.client = None
+        # HTTP timeout in seconds for the SDK call, set by the timeout layer
+        self.http_timeout: Optional[float] = None
+        # Set when nobody waits for the response any more
+        self.cancelled = threading.Event()
+        # Estimated input tokens and their breakdown, set by the token accounting layer
+        self.tokens: Optional[int] = None
+        self.token_estimate: Optional[Dict[str, int]] = None
+
+    @property
+    def step(self) -> str:
+        """Step tag used to group metrics (the operation when untagged)"""
+        return self.tags.get("step") or self.operation
+
+    @property
+    def deadline(self) -> Optional[float]:
+        """time.monotonic() value by which the call must finish, if it has a deadline"""
+        return self.tags.get("deadline_at")
+
+    def remaining(self) -> Optional[float]:
+        """
+        Get the time left before the deadline.
+
+        Returns:
+            Seconds left (negative once the deadline has passed), or None without a deadline
+        """
+        if self.deadline is None:
+            return None
+        return self.deadline - time.monotonic()
+
+    def copy(self) -> "ModelRequest":
+        """
+        Copy the request for a parallel attempt (e.g. a hedge).
+
+        Returns:
+            A ModelRequest with its own tags, client choice and cancellation flag
+        """
+        duplicate = copy.copy(self)
+        duplicate.tags = dict(self.tags)
+        duplicate.params = dict(self.params)
+        duplicate.client = None
+        duplicate.http_timeout = None
+        duplicate.cancelled = threading.Event()
+        return duplicate
+
+    def __repr__(self) -> str:
+        return f"ModelRequest({self.operation}, model={self.model}, step={self.step!r})"
+
+
+class Middleware:
+    """Base middleware layer; subclasses override __call__"""
+
+    def __call__(self, request: ModelRequest, call_next: Callable[[ModelRequest], Any]) -> Any:
+        """
+        Handle a request.
+
+        Args:
+            request: The request
+            call_next: The rest of the chain
+
+        Returns:
+            The SDK response
+        """
+        return call_next(request)
+
+
+def _fingerprint(value: Any) -> Optional[str]:
+    """Stable description of request contents for cache keys; None if not hashable"""
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return repr(value)
+    if isinstance(value, bytes):
+        return "bytes:" + hashlib.sha256(value).hexdigest()
+    if isinstance(value, (list, tuple)):
+        parts = [_fingerprint(item) for item in value]
+        return None if None in parts else "[" + ",".join(parts) + "]"
+    if isinstance(value, dict):
+        parts = [(str(key), _fingerprint(item)) for key, item in sorted(value.items())]
+        return None if any(part is None for _, part in parts) else repr(parts)
+    if getattr(value, "uri", None) and getattr(value, "mime_type", None):
+        # Uploaded file references are identified by their URI
+        return f"file:{value.uri}"
+    if hasattr(value, "tobytes") and hasattr(value, "size") and hasattr(value, "mode"):
+        # PIL images
+        return f"image:{value.mode}:{value.size}:" + hashlib.sha256(value.tobytes()).hexdigest()
+    if hasattr(value, "model_dump"):
+        return json.dumps(value.model_dump(exclude_none=True, mode="json"), sort_keys=True)
+    return None
@@ -0,0 +1,235 @@
+"""
+gemini_apis/model_router.py - Cost- and latency-aware model routing per pipeline step
+
+The pipeline makes very different calls: long multi-listen analyses that need the full
+model, a short JSON image prompt a lite model handles well, and image generation that only
+the image model can do. Model tiers describe the configured models (quality, relative cost,
+capabilities and their own per-model limits), and each pipeline step declares what it needs
+(capabilities, minimum quality, latency SLO). For every call tagged with a step the router
+picks the cheapest tier that meets the step's needs, so cheap steps never spend the quota
+of the expensive model.
+
+A tier that runs out of quota (a 429, or no calls left in its budget) cools down and the
+call falls back to the next tier; a tier that keeps breaching a step's latency SLO is
+demoted for that step for a while. Every choice is recorded with its reason.
+
+Exports:
+- DEFAULT_TEXT_MODEL, DEFAULT_LITE_MODEL, DEFAULT_IMAGE_MODEL: Default model names
+- STEP_REQUIREMENTS: Step name prefix -> requirements of the pipeline steps
+- default_tiers(text_model: str = DEFAULT_TEXT_MODEL, lite_model: str = DEFAULT_LITE_MODEL,
+  image_model: str = DEFAULT_IMAGE_MODEL, key_count: int = 1) -> Dict[str, Dict[str, Any]]
+- ModelTier(name: str, model: str, quality: int = 1, cost: float = 1.0, capabilities=("text",),
+  max_calls_per_minute: int = 60, max_calls_per_day: int = 500, max_tokens_per_minute: int = None)
+- ModelRouter(tiers: Dict[str, Dict[str, Any]] = None, requirements: Dict[str, Dict[str, Any]] = None,
+  default_tier: str = "standard")
+  - requirements_for(step) -> Tuple[str, Dict] | None
+  - candidates(step, tokens: int = 0) -> List[Tuple[ModelTier, str]]
+  - tier_for_model(model) -> ModelTier, has_headroom(request) -> bool
+  - report_success(...), report_failure(...), get_decisions(track=None) -> List[Dict],
+    get_status() -> Dict[str, Any], summary() -> str (see router_feedback.py)
+- ModelRouterMiddleware(router: ModelRouter): Middleware layer that routes and limits model calls
+
+Related files:
+- src/gemini/gemini_apis/model_tiers.py: The tiers and the step requirements
+- src/gemini/gemini_apis/router_feedback.py: Cooldowns, SLO demotion and the decision log
+- src/gemini/gemini_apis/middleware.py: The middleware chain this layer is part of
+- src/gemini/gemini_apis/key_pool.py: Fails over between keys before the router changes model
+- src/gemini/gemini_client.py: Builds the default router
+- src/gemini/gemini_hooks/audio_to_image_processor.py: Tags its calls with the step names
+"""
+
+import time
+import logging
+import threading
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from .middleware import MODEL_OPERATIONS, Middleware, ModelRequest
+# The tiers and the feedback settings are re-exported, so callers keep importing them from here
+from .model_tiers import (DEFAULT_IMAGE_MODEL, DEFAULT_LITE_MODEL, DEFAULT_TEXT_MODEL,
+                          STEP_REQUIREMENTS, ModelTier, default_tiers)
+from .router_feedback import (DECISION_HISTORY, QUOTA_COOLDOWN, SLO_BREACH_LIMIT, SLO_COOLDOWN,
+                              RouterFeedback)
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Operations whose model may be chosen by the router (chat turns stay on their chat's model)
+ROUTED_OPERATIONS = ("generate_content", "generate_content_stream")
+
+
+class ModelRouter(RouterFeedback):
+    """Chooses a model tier for each pipeline step and records the choices"""
+
+    def __init__(self, tiers: Optional[Dict[str, Dict[str, Any]]] = None,
+                 requirements: Optional[Dict[str, Dict[str, Any]]] = None,
+                 default_tier: str = "standard"):
+        """
+        Initialize the router.
+
+        Args:
+            tiers: Tier name -> ModelTier arguments (default: default_tiers())
+            requirements: Step name prefix -> requirements (default: STEP_REQUIREMENTS)
+            default_tier: Tier whose limits apply to calls for models no tier names
+
+        Raises:
+            ValueError: If default_tier is not one of the tiers
+        """
+        tiers = default_tiers() if tiers is None else tiers
+        self.tiers = {name: ModelTier(name, **config) for name, config in tiers.items()}
+        if default_tier not in self.tiers:
+            raise ValueError(f"Unknown default tier: {default_tier}")
+        self.default_tier = default_tier
+        self.requirements = dict(STEP_REQUIREMENTS if requirements is None else requirements)
+
+        # (step requirement, tier name) -> consecutive SLO breaches and demotion end
+        self._slo_breaches: Dict[Tuple[str, str], int] = {}
+        self._demoted_until: Dict[Tuple[str, str], float] = {}
+        self._decisions: Deque[Dict[str, Any]] = deque(maxlen=DECISION_HISTORY)
+        self._choices: Dict[Tuple[str, str], int] = {}
+        self._lock = threading.Lock()
+
+    def requirements_for(self, step: Optional[str]) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """
+        Find the requirements of a step.
+
+        Args:
+            step: The call_context step name, e.g. "Step 1: Musical Foundation and Hook Analysis"
+
+        Returns:
+            (matching prefix, requirements), or None if the step declares none
+        """
+        if not step:
+            return None
+        # The longest matching prefix wins, so specific entries override general ones
+        matches = [prefix for prefix in self.requirements if step.startswith(prefix)]
+        if not matches:
+            return None
+        prefix = max(matches, key=len)
+        return prefix, self.requirements[prefix]
+
+    def tier_for_model(self, model: Optional[str]) -> ModelTier:
+        """
+        Get the tier that serves a model.
+
+        Args:
+            model: Model name
+
+        Returns:
+            The tier with that model, or the default tier
+        """
+        for tier in self.tiers.values():
+            if tier.model == model:
+                return tier
+        return self.tiers[self.default_tier]
+
+    def has_headroom(self, request: ModelRequest) -> bool:
+        """
+        Check whether one more call of a request fits the limits (e.g. for a hedge).
+
+        Args:
+            request: The request
+
+        Returns:
+            bool: True if a tier that could serve it is not out of quota
+        """
+        candidates = (self.candidates(request.tags.get("step"), request.tokens or 0)
+                      if request.operation in ROUTED_OPERATIONS else [])
+        if candidates:
+            return any(not reason for _, reason in candidates)
+        return self.tier_for_model(request.model).exhausted(tokens=request.tokens or 0) is None
+
+    def candidates(self, step: str, tokens: int = 0) -> List[Tuple[ModelTier, str]]:
+        """
+        Rank the tiers that can serve a step, best choice first.
+
+        Tiers that meet the step's minimum quality come first, cheapest first; lower
+        quality tiers follow as fallbacks, best first. Tiers that are out of quota or
+        demoted for the step keep their place but carry the reason.
+
+        Args:
+            step: The call_context step name
+            tokens: Estimated input tokens of the call, checked against per-minute token limits
+
+        Returns:
+            List of (tier, reason it cannot be used right now or "" if it can); empty if
+            the step declares no requirements
+        """
+        match = self.requirements_for(step)
+        if match is None:
+            return []
+        prefix, needs = match
+        min_quality = needs.get("min_quality", 1)
+        capable = [tier for tier in self.tiers.values()
+                   if set(needs.get("needs", ())) <= tier.capabilities]
+        capable.sort(key=lambda tier: (tier.quality < min_quality,
+                                       tier.cost if tier.quality >= min_quality else -tier.quality))
+
+        now = time.monotonic()
+        ranked = []
+        with self._lock:
+            for tier in capable:
+                reason = tier.exhausted(now, tokens)
+                if reason is None and now < self._demoted_until.get((prefix, tier.name), 0.0):
+                    reason = f"latency SLO of {needs['latency_slo']:g}s breached"
+                ranked.append((tier, reason or ""))
+        return ranked
+
+
+class ModelRouterMiddleware(Middleware):
+    """Chooses the model of each step-tagged call and applies the chosen model's limits"""
+
+    def __init__(self, router: ModelRouter):
+        """
+        Initialize the layer.
+
+        Args:
+            router: The model router
+        """
+        self.router = router
+
+    def _send(self, tier: ModelTier, reason: str, request: ModelRequest,
+              call_next: Callable[[ModelRequest], Any]) -> Any:
+        """Send a request with a tier's model, counting it against the tier's limits"""
+        tier.rate_limiter.check_and_wait(tokens=request.tokens or 0)
+        request.model = tier.model
+        started = time.perf_counter()
+        try:
+            response = call_next(request)
+        except Exception as e:
+            self.router.report_failure(request, tier, reason,
+                                       time.perf_counter() - started, e)
+            raise
+        self.router.report_success(request, tier, reason, time.perf_counter() - started)
+        return response
+
+    def __call__(self, request: ModelRequest, call_next: Callable[[ModelRequest], Any]) -> Any:
+        if request.operation not in MODEL_OPERATIONS:
+            return call_next(request)
+
+        candidates = (self.router.candidates(request.tags.get("step"), request.tokens or 0)
+                      if request.operation in ROUTED_OPERATIONS else [])
+        if not candidates:
+            # Untagged calls and chat turns keep their model but count against its limits
+            tier = self.router.tier_for_model(request.model)
+            return self._send(tier, "requested", request, call_next)
+
+        # When every tier is out of quota the preferred one is used anyway and waits
+        usable = [position for position, (_, reason) in enumerate(candidates) if not reason] or [0]
+        failed: List[str] = []
+        for attempt, position in enumerate(usable):
+            tier = candidates[position][0]
+            # Why the better-ranked tiers were passed over
+            passed_over = [f"{skipped.name}: {reason}"
+                           for skipped, reason in candidates[:position] if reason] + failed
+            try:
+                return self._send(tier, "; ".join(passed_over) or "preferred", request, call_next)
+            except Exception as e:
+                status = getattr(e, "code", None) or getattr(e, "status_code", None)
+                if status != 429 or attempt == len(usable) - 1:
+                    raise
+                failed.append(f"{tier.name}: quota error")
+                logger.warning(
+                    f"Falling back from {tier.model} to {candidates[usable[attempt + 1]][0].model} "
+                    f"for {request.step} after a quota error")
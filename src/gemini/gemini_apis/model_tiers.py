@@ -0,0 +1,142 @@
+"""
+gemini_apis/model_tiers.py - The model tiers and what each pipeline step needs
+
+A tier is one configured model with its quality rank, relative cost, capabilities and its
+own per-model limits; each pipeline step declares the capabilities, minimum quality and
+latency SLO it needs. ModelRouter picks among the tiers with these.
+
+Exports:
+- DEFAULT_TEXT_MODEL, DEFAULT_LITE_MODEL, DEFAULT_IMAGE_MODEL: Default model names
+- STEP_REQUIREMENTS: Step name prefix -> requirements of the pipeline steps
+- default_tiers(text_model: str = DEFAULT_TEXT_MODEL, lite_model: str = DEFAULT_LITE_MODEL,
+  image_model: str = DEFAULT_IMAGE_MODEL, key_count: int = 1) -> Dict[str, Dict[str, Any]]
+- ModelTier(name: str, model: str, quality: int = 1, cost: float = 1.0, capabilities=("text",),
+  max_calls_per_minute: int = 60, max_calls_per_day: int = 500, max_tokens_per_minute: int = None)
+  - exhausted(now=None, tokens: int = 0) -> str | None
+
+Related files:
+- src/gemini/gemini_apis/model_router.py: Routes the calls over the tiers
+- src/gemini/gemini_utilities/rate_limiter.py: The per-tier limits
+"""
+
+import time
+from typing import Any, Dict, Iterable, Optional
+
+from ..gemini_utilities.rate_limiter import RateLimiter
+
+DEFAULT_TEXT_MODEL = "gemini-2.0-flash"
+DEFAULT_LITE_MODEL = "gemini-2.0-flash-lite"
+DEFAULT_IMAGE_MODEL = "gemini-2.0-flash-exp-image-generation"
+
+# What each pipeline step needs, keyed by the prefix of its call_context step name.
+# min_quality: lowest tier quality that serves the step normally (lower tiers are only
+# a fallback); needs: capabilities the model must have; latency_slo: seconds per call
+STEP_REQUIREMENTS: Dict[str, Dict[str, Any]] = {
+    "Step 1": {"min_quality": 2, "needs": ("audio",), "latency_slo": 180.0},
+    "Step 2": {"min_quality": 2, "needs": ("audio",), "latency_slo": 180.0},
+    "Step 3": {"min_quality": 2, "needs": ("audio",), "latency_slo": 180.0},
+    "Step 4": {"min_quality": 2, "needs": ("audio",), "latency_slo": 180.0},
+    "Step 5": {"min_quality": 2, "needs": ("audio",), "latency_slo": 180.0},
+    "Final Integrated Analysis": {"min_quality": 2, "needs": ("audio",), "latency_slo": 240.0},
+    "Refinement": {"min_quality": 2, "needs": ("audio",), "latency_slo": 180.0},
+    "Revised Final Analysis": {"min_quality": 2, "needs": ("audio",), "latency_slo": 180.0},
+    "Image Prompt Generation": {"min_quality": 1, "needs": ("audio",), "latency_slo": 60.0},
+    "Image Pre-listen": {"min_quality": 1, "needs": ("audio",), "latency_slo": 60.0},
+    "Image Generation": {"min_quality": 1, "needs": ("image_output",), "latency_slo": 120.0},
+}
+
+
+def default_tiers(text_model: str = DEFAULT_TEXT_MODEL, lite_model: str = DEFAULT_LITE_MODEL,
+                  image_model: str = DEFAULT_IMAGE_MODEL,
+                  key_count: int = 1) -> Dict[str, Dict[str, Any]]:
+    """
+    Build the default tier configuration.
+
+    The limits are per key, and the tiers are shared by every key of a pool, so they are
+    multiplied by the number of keys; the pool's per-key limiters keep each key in budget.
+
+    Args:
+        text_model: Model of the standard tier
+        lite_model: Model of the cheap tier
+        image_model: Model of the image generation tier
+        key_count: Number of API keys the calls are spread over
+
+    Returns:
+        Dictionary of tier name -> ModelTier arguments
+    """
+    tiers = {
+        "lite": {"model": lite_model, "quality": 1, "cost": 1.0,
+                 "capabilities": ("text", "audio"),
+                 "max_calls_per_minute": 60, "max_calls_per_day": 1500,
+                 "max_tokens_per_minute": 1_000_000},
+        "standard": {"model": text_model, "quality": 2, "cost": 4.0,
+                     "capabilities": ("text", "audio"),
+                     "max_calls_per_minute": 60, "max_calls_per_day": 500,
+                     "max_tokens_per_minute": 1_000_000},
+        "image": {"model": image_model, "quality": 2, "cost": 4.0,
+                  "capabilities": ("text", "image_output"),
+                  "max_calls_per_minute": 60, "max_calls_per_day": 500,
+                  "max_tokens_per_minute": 1_000_000},
+    }
+    scale = max(key_count, 1)
+    for tier in tiers.values():
+        for limit in ("max_calls_per_minute", "max_calls_per_day", "max_tokens_per_minute"):
+            tier[limit] *= scale
+    return tiers
+
+
+class ModelTier:
+    """One configured model with its quality, cost, capabilities and limits"""
+
+    def __init__(self, name: str, model: str, quality: int = 1, cost: float = 1.0,
+                 capabilities: Iterable[str] = ("text",), max_calls_per_minute: int = 60,
+                 max_calls_per_day: int = 500, max_tokens_per_minute: Optional[int] = None):
+        """
+        Initialize a tier.
+
+        Args:
+            name: Tier name, e.g. "lite"
+            model: Model name sent to the API
+            quality: Quality rank (higher is better)
+            cost: Relative cost per call, used to prefer cheaper tiers
+            capabilities: What the model can do, e.g. "audio" or "image_output"
+            max_calls_per_minute: Calls per minute for this model
+            max_calls_per_day: Calls per day for this model
+            max_tokens_per_minute: Input tokens per minute for this model (None for no limit)
+        """
+        self.name = name
+        self.model = model
+        self.quality = quality
+        self.cost = cost
+        self.capabilities = set(capabilities)
+        self.rate_limiter = RateLimiter(max_calls_per_minute, max_calls_per_day,
+                                        max_tokens_per_minute)
+        self.cooldown_until = 0.0
+        self.calls = 0
+        self.failures = 0
+
+    def exhausted(self, now: Optional[float] = None, tokens: int = 0) -> Optional[str]:
+        """
+        Check whether the tier is out of quota.
+
+        Args:
+            now: Current time.monotonic() value
+            tokens: Estimated input tokens of the call that would be sent
+
+        Returns:
+            The reason it cannot take calls right now, or None if it can
+        """
+        now = time.monotonic() if now is None else now
+        if now < self.cooldown_until:
+            return f"quota cooldown {self.cooldown_until - now:.0f}s"
+        status = self.rate_limiter.get_status()
+        if status["day"]["remaining"] <= 0:
+            return "daily budget used"
+        if status["minute"]["remaining"] <= 0:
+            return "minute budget used"
+        if self.rate_limiter.tokens_exceed_limit(tokens):
+            return "minute token budget used"
+        return None
+
+    def __repr__(self) -> str:
+        return f"ModelTier({self.name}, model={self.model})"
@@ -13,7 +13,12 @@ Related files:
 import logging
 from typing import List, Union, Dict, Any
 from PIL import Image
-from google.genai import types
+
+from ..gemini_utilities.lazy_import import lazy_import
+from .transport import as_transport
+
+# The SDK is imported on the first request rather than at startup
+types = lazy_import("google.genai.types")
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -63,7 +68,7 @@ def analyze_multimodal(client, contents: List[Union[str, Dict, Image.Image, Any]
         max_output_tokens=8192
     )
 
-    response = client.models.generate_content(
+    response = as_transport(client).generate_content(
         model=client.model_name,
         contents=contents,
         config=config
@@ -0,0 +1,178 @@
+"""
+gemini_apis/router_feedback.py - What the model router learns from the calls it routed
+
+A tier that runs out of quota (a 429) cools down so calls fall back to the next tier, and a
+tier that keeps breaching a step's latency SLO is demoted for that step for a while. Every
+call is recorded with the tier that served it and why it was chosen.
+
+RouterFeedback is the reporting half of ModelRouter; it expects the router's tiers,
+requirements_for() and the state ModelRouter.__init__ sets up (_lock, _decisions, _choices,
+_slo_breaches and _demoted_until).
+
+Exports:
+- QUOTA_COOLDOWN, SLO_COOLDOWN, SLO_BREACH_LIMIT, DECISION_HISTORY
+- RouterFeedback
+  - report_success(request, tier, reason, seconds) -> None
+  - report_failure(request, tier, reason, seconds, error) -> None
+  - get_decisions(track=None) -> List[Dict], get_status() -> Dict[str, Any], summary() -> str
+
+Related files:
+- src/gemini/gemini_apis/model_router.py: ModelRouter and its middleware layer
+- src/gemini/gemini_apis/model_tiers.py: ModelTier
+"""
+
+import time
+import logging
+from typing import Any, Dict, List, Optional
+
+from .middleware import ModelRequest
+from .model_tiers import ModelTier
+
+logger = logging.getLogger(__name__)
+
+# Seconds a tier rests after a quota error, and a tier is demoted for a step after
+# this many consecutive SLO breaches
+QUOTA_COOLDOWN = 60.0
+SLO_COOLDOWN = 300.0
+SLO_BREACH_LIMIT = 2
+
+# Number of decisions kept for get_decisions
+DECISION_HISTORY = 1000
+
+
+class RouterFeedback:
+    """Cooldowns, SLO demotion and the decision log of a ModelRouter"""
+
+    def _record(self, request: ModelRequest, tier: ModelTier, reason: str, seconds: float,
+                error: Optional[Exception] = None) -> None:
+        """Add a routing decision to the history"""
+        decision = {
+            "time": time.time(),
+            "step": request.step,
+            "track": request.tags.get("track"),
+            "operation": request.operation,
+            "tier": tier.name,
+            "model": tier.model,
+            "reason": reason,
+            "seconds": round(seconds, 3),
+            "error": str(error) if error is not None else None
+        }
+        with self._lock:
+            self._decisions.append(decision)
+            key = (request.step, tier.model)
+            self._choices[key] = self._choices.get(key, 0) + 1
+
+    def report_success(self, request: ModelRequest, tier: ModelTier, reason: str,
+                       seconds: float) -> None:
+        """
+        Record a successful call and check it against the step's latency SLO.
+
+        Args:
+            request: The request
+            tier: The tier that served it
+            reason: Why the tier was chosen
+            seconds: Call duration
+        """
+        with self._lock:
+            tier.calls += 1
+        self._check_slo(request, tier, seconds)
+        self._record(request, tier, reason, seconds)
+
+    def report_failure(self, request: ModelRequest, tier: ModelTier, reason: str,
+                       seconds: float, error: Exception) -> None:
+        """
+        Record a failed call; quota errors cool the tier down and timeouts count as SLO breaches.
+
+        Args:
+            request: The request
+            tier: The tier that served it
+            reason: Why the tier was chosen
+            seconds: Call duration
+            error: The exception raised by the call
+        """
+        status = getattr(error, "code", None) or getattr(error, "status_code", None)
+        with self._lock:
+            tier.calls += 1
+            tier.failures += 1
+            if status == 429:
+                tier.cooldown_until = time.monotonic() + QUOTA_COOLDOWN
+                logger.warning(
+                    f"{tier.model} hit its quota, cooling the {tier.name} tier down "
+                    f"{QUOTA_COOLDOWN:.0f}s")
+        if isinstance(error, TimeoutError):
+            self._check_slo(request, tier, float("inf"))
+        self._record(request, tier, reason, seconds, error)
+
+    def _check_slo(self, request: ModelRequest, tier: ModelTier, seconds: float) -> None:
+        """Count consecutive SLO breaches of a tier for a step and demote it when they add up"""
+        match = self.requirements_for(request.tags.get("step"))
+        if match is None or match[1].get("latency_slo") is None:
+            return
+        prefix, needs = match
+        key = (prefix, tier.name)
+        with self._lock:
+            if seconds <= needs["latency_slo"]:
+                self._slo_breaches.pop(key, None)
+                return
+            self._slo_breaches[key] = self._slo_breaches.get(key, 0) + 1
+            if self._slo_breaches[key] < SLO_BREACH_LIMIT:
+                return
+            self._slo_breaches.pop(key)
+            self._demoted_until[key] = time.monotonic() + SLO_COOLDOWN
+        logger.warning(
+            f"{tier.model} breached the {needs['latency_slo']:g}s latency SLO of {prefix} "
+            f"{SLO_BREACH_LIMIT} times in a row, preferring other tiers for {SLO_COOLDOWN:.0f}s")
+
+    def get_decisions(self, track: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Get the recorded routing decisions.
+
+        Args:
+            track: Only return the decisions for calls tagged with this track
+
+        Returns:
+            List of decisions (step, track, operation, tier, model, reason, seconds, error),
+            oldest first
+        """
+        with self._lock:
+            decisions = list(self._decisions)
+        if track is not None:
+            decisions = [decision for decision in decisions if decision["track"] == track]
+        return decisions
+
+    def get_status(self) -> Dict[str, Any]:
+        """
+        Get the state of every tier.
+
+        Returns:
+            Dictionary of tier name -> model, calls, failures, cooldown seconds, why it is
+            unavailable (or None) and its rate limit status
+        """
+        now = time.monotonic()
+        with self._lock:
+            return {tier.name: {
+                "model": tier.model,
+                "calls": tier.calls,
+                "failures": tier.failures,
+                "cooldown_seconds": max(0.0, tier.cooldown_until - now),
+                "unavailable": tier.exhausted(now),
+                "limits": tier.rate_limiter.get_status()
+            } for tier in self.tiers.values()}
+
+    def summary(self) -> str:
+        """
+        Format the models chosen per step as a table.
+
+        Returns:
+            str: One line per step and model
+        """
+        with self._lock:
+            choices = dict(self._choices)
+        if not choices:
+            return "No routed Gemini calls recorded"
+
+        width = max(len(step) for step, _ in choices)
+        lines = [f"{'step':<{width}}  {'model':<40}  calls"]
+        for (step, model), count in sorted(choices.items()):
+            lines.append(f"{step:<{width}}  {model:<40}  {count:>5}")
+        return "\n".join(lines)
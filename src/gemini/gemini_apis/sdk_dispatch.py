@@ -0,0 +1,264 @@
+"""
+gemini_apis/sdk_dispatch.py - Performs transport requests with the SDK
+
+The innermost handler of GeminiTransport's middleware chain: each ModelRequest is sent
+with the google.genai client (or the client a layer chose for it, e.g. a pooled key),
+using the HTTP timeout the chain set. Streams are opened here by reading their first
+chunk. The legacy google.generativeai SDK is optional: it is imported only when
+GEMINI_ENABLE_LEGACY_SDK is set (or enable_legacy=True is passed), and is then used as a
+fallback for failed generate and upload calls.
+
+Exports:
+- LEGACY_SDK_ENV: Name of the environment variable that enables the legacy SDK
+- legacy_sdk_enabled() -> bool: Whether the legacy SDK fallback is enabled
+- SdkDispatch: Base of GeminiTransport; client, legacy and the per-operation SDK calls
+  (expects api_key and enable_legacy to be set)
+
+Related files:
+- src/gemini/gemini_apis/transport.py: GeminiTransport, which builds the chain around this
+- src/gemini/gemini_apis/model_request.py: ModelRequest and CallCancelled
+"""
+
+import os
+import logging
+from functools import cached_property
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from ..gemini_utilities.lazy_import import lazy_import
+from .model_request import CallCancelled, ModelRequest
+
+# The SDK is imported when the first client is built
+modern_genai = lazy_import("google.genai")
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+LEGACY_SDK_ENV = "GEMINI_ENABLE_LEGACY_SDK"
+
+# Generation settings the legacy SDK accepts in its generation_config
+_LEGACY_CONFIG_FIELDS = ("temperature", "max_output_tokens", "top_p", "top_k",
+                         "stop_sequences", "response_mime_type", "candidate_count")
+
+
+def _opened(stream: Iterable[Any]) -> Iterator[Any]:
+    """
+    Open a response stream by reading its first chunk.
+
+    The SDK streams are lazy generators that send the request on the first read, so
+    this makes errors and latency of the request happen inside the middleware chain.
+
+    Args:
+        stream: Response stream from the SDK
+
+    Returns:
+        Iterator over all of the stream's chunks, the first one included
+    """
+    stream = iter(stream)
+    try:
+        first = next(stream)
+    except StopIteration:
+        return iter(())
+
+    def chunks():
+        yield first
+        yield from stream
+    return chunks()
+
+
+def _with_http_timeout(config: Any, seconds: Optional[float]) -> Any:
+    """
+    Add an HTTP timeout to a request config, unless the config sets its own.
+
+    Args:
+        config: GenerateContentConfig, dict or None
+        seconds: Timeout in seconds (None leaves the config unchanged)
+
+    Returns:
+        The config with http_options.timeout (in milliseconds) set
+    """
+    if seconds is None:
+        return config
+    timeout_ms = max(1, int(seconds * 1000))
+    if config is None:
+        return {"http_options": {"timeout": timeout_ms}}
+    if isinstance(config, dict):
+        if config.get("http_options"):
+            return config
+        return {**config, "http_options": {"timeout": timeout_ms}}
+    if getattr(config, "http_options", None) is not None or not hasattr(config, "model_copy"):
+        return config
+    # model_copy does not validate, so the options must already be an HttpOptions
+    return config.model_copy(
+        update={"http_options": modern_genai.types.HttpOptions(timeout=timeout_ms)})
+
+
+def legacy_sdk_enabled() -> bool:
+    """
+    Check whether the legacy google.generativeai fallback is enabled.
+
+    Returns:
+        bool: True if GEMINI_ENABLE_LEGACY_SDK is set to 1/true/yes/on
+    """
+    return os.environ.get(LEGACY_SDK_ENV, "").strip().lower() in ("1", "true", "yes", "on")
+
+
+def _legacy_config(config: Any) -> Tuple[Optional[str], Dict[str, Any]]:
+    """
+    Translate a google.genai generation config for the legacy SDK.
+
+    Args:
+        config: GenerateContentConfig, dict or None
+
+    Returns:
+        Tuple of (system_instruction, generation_config)
+
+    Raises:
+        ValueError: If the config uses settings the legacy SDK does not support
+    """
+    if config is None:
+        return None, {}
+
+    values = dict(config) if isinstance(config, dict) else config.model_dump(exclude_none=True)
+    system_instruction = values.pop("system_instruction", None)
+
+    unsupported = sorted(set(values) - set(_LEGACY_CONFIG_FIELDS))
+    if unsupported:
+        raise ValueError(f"Legacy SDK does not support config fields: {unsupported}")
+
+    return system_instruction, values
+
+
+class SdkDispatch:
+    """Sends each request to the SDK client (or the legacy SDK as a fallback)"""
+
+    @cached_property
+    def client(self):
+        """google.genai client (imports the SDK on first use)"""
+        return modern_genai.Client(api_key=self.api_key)
+
+    @cached_property
+    def legacy(self):
+        """
+        The legacy google.generativeai module, configured with the API key.
+
+        Raises:
+            RuntimeError: If the legacy SDK is not enabled
+        """
+        if not self.enable_legacy:
+            raise RuntimeError(
+                f"The legacy google.generativeai SDK is disabled; set {LEGACY_SDK_ENV}=1 to enable it")
+
+        import google.generativeai as legacy_genai
+        legacy_genai.configure(api_key=self.api_key)
+        logger.info("Legacy google.generativeai SDK enabled as a fallback")
+        return legacy_genai
+
+    def _dispatch(self, request: ModelRequest) -> Any:
+        """Innermost handler: perform the request with the SDK"""
+        if request.cancelled.is_set():
+            raise CallCancelled(f"{request.step} was cancelled before it was sent")
+        return getattr(self, f"_send_{request.operation}")(request)
+
+    @staticmethod
+    def _config(request: ModelRequest) -> Any:
+        """Request config with the HTTP timeout chosen by the middleware"""
+        config = request.config
+        if config is None and request.http_timeout is not None and "chat" in request.params:
+            # A turn's config replaces the chat's own, so the timeout goes on a copy of it
+            config = getattr(request.params["chat"], "_config", None)
+        return _with_http_timeout(config, request.http_timeout)
+
+    def _client(self, request: ModelRequest):
+        """SDK client for a request: the one chosen by the middleware (e.g. a key pool) or the default"""
+        return request.client if request.client is not None else self.client
+
+    def _legacy_model(self, model: str, config: Any) -> Tuple[Any, Dict[str, Any]]:
+        """Build a legacy GenerativeModel and generation_config for a request"""
+        system_instruction, generation_config = _legacy_config(config)
+        legacy_model = self.legacy.GenerativeModel(
+            model_name=model, system_instruction=system_instruction)
+        return legacy_model, generation_config
+
+    def _send_generate_content(self, request: ModelRequest) -> Any:
+        try:
+            return self._client(request).models.generate_content(
+                model=request.model, contents=request.contents, config=self._config(request))
+        except Exception as e:
+            if not self.enable_legacy:
+                raise
+            logger.warning(f"Generation failed, retrying with the legacy SDK: {e}")
+            try:
+                legacy_model, generation_config = self._legacy_model(request.model, request.config)
+            except ValueError:
+                raise e
+            return legacy_model.generate_content(
+                request.contents, generation_config=generation_config)
+
+    def _send_generate_content_stream(self, request: ModelRequest) -> Iterator[Any]:
+        try:
+            return _opened(self._client(request).models.generate_content_stream(
+                model=request.model, contents=request.contents, config=self._config(request)))
+        except Exception as e:
+            if not self.enable_legacy:
+                raise
+            logger.warning(f"Streaming failed, retrying with the legacy SDK: {e}")
+            try:
+                legacy_model, generation_config = self._legacy_model(request.model, request.config)
+            except ValueError:
+                raise e
+            return _opened(legacy_model.generate_content(
+                request.contents, generation_config=generation_config, stream=True))
+
+    def _send_count_tokens(self, request: ModelRequest) -> Any:
+        return self._client(request).models.count_tokens(model=request.model, contents=request.contents)
+
+    def _send_upload_file(self, request: ModelRequest) -> Any:
+        file = request.params["file"]
+        try:
+            if request.config is None:
+                return self._client(request).files.upload(file=file)
+            return self._client(request).files.upload(file=file, config=request.config)
+        except Exception as e:
+            if not self.enable_legacy or not isinstance(file, (str, os.PathLike)):
+                raise
+            logger.warning(f"File upload failed, retrying with the legacy SDK: {e}")
+            return self.legacy.upload_file(path=file)
+
+    def _send_get_file(self, request: ModelRequest) -> Any:
+        return self._client(request).files.get(name=request.params["name"])
+
+    def _send_delete_file(self, request: ModelRequest) -> None:
+        self._client(request).files.delete(name=request.params["name"])
+
+    def _send_list_files(self, request: ModelRequest) -> List[Any]:
+        return list(self._client(request).files.list())
+
+    def _send_create_batch(self, request: ModelRequest) -> Any:
+        return self._client(request).batches.create(
+            model=request.model, src=request.params["src"], config=request.config)
+
+    def _send_get_batch(self, request: ModelRequest) -> Any:
+        return self._client(request).batches.get(name=request.params["name"])
+
+    def _send_download_file(self, request: ModelRequest) -> bytes:
+        return self._client(request).files.download(file=request.params["name"])
+
+    def _send_create_cached_content(self, request: ModelRequest) -> Any:
+        return self._client(request).caches.create(model=request.model, config=request.config)
+
+    def _send_delete_cached_content(self, request: ModelRequest) -> None:
+        self._client(request).caches.delete(name=request.params["name"])
+
+    def _send_create_chat(self, request: ModelRequest) -> Any:
+        client = self._client(request)
+        chats = client.aio.chats if request.params.get("aio") else client.chats
+        return chats.create(
+            model=request.model, config=request.config, history=request.params.get("history"))
+
+    def _send_send_message(self, request: ModelRequest) -> Any:
+        return request.params["chat"].send_message(request.contents, config=self._config(request))
+
+    def _send_send_message_stream(self, request: ModelRequest) -> Iterator[Any]:
+        return _opened(request.params["chat"].send_message_stream(
+            request.contents, config=self._config(request)))
@@ -0,0 +1,282 @@
+"""
+gemini_apis/token_accounting.py - Preflight token accounting for every model call
+
+Knows how many input tokens a request will cost before it is sent. Text is estimated
+locally (token_utils) and calibrated against the prompt token counts the API reports
+back; audio is estimated from the duration of the uploaded file (read from its MP3
+headers when it is uploaded) and images from their size. Media parts are verified once
+with count_tokens, and exact counts are cached by content hash, so an uploaded track that
+is analysed in nine steps is counted once (or not at all, when the track prefetcher
+already counted it).
+
+The estimate is stored on the request, where the rate limiters charge it against their
+tokens-per-minute buckets. A request that would overflow the model's context window is
+logged and, by default, compressed by cutting the middle of its longest text part before
+it is sent.
+
+Exports:
+- DEFAULT_CONTEXT_WINDOW: Input token limit of models without an entry in context_windows
+- TokenAccountant(context_window: int = DEFAULT_CONTEXT_WINDOW, context_windows: Dict[str, int] = None,
+  verify_media: bool = True, overflow: str = "compress", max_cache_entries: int = 4096)
+  - estimate(contents) -> Dict[str, int], window_for(model) -> int
+  - register_upload(file_ref, path), cached_count(contents) -> int | None,
+    store_count(contents, tokens) (see token_estimates.py)
+  - get_status() -> Dict[str, Any], summary() -> str
+- TokenAccountingMiddleware(accountant: TokenAccountant): Middleware layer that estimates,
+  verifies and compresses requests and records the reported usage
+
+Related files:
+- src/gemini/gemini_apis/token_estimates.py: Local estimates and the exact count cache
+- src/gemini/gemini_utilities/token_utils.py: Local text, audio and image estimates
+- src/gemini/gemini_utilities/rate_limiter.py: Tokens-per-minute bucket fed with the estimates
+- src/gemini/gemini_apis/middleware.py: The middleware chain this layer is part of
+- src/gemini/gemini_hooks/track_prefetcher.py: Counts upload tokens ahead of time
+"""
+
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+from .model_request import MODEL_OPERATIONS, Middleware, ModelRequest
+# The estimate settings are re-exported, so callers keep importing them from here
+from .token_estimates import FALLBACK_AUDIO_BYTES_PER_SECOND, WINDOW_MARGIN, TokenEstimates
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Input token limit of the Gemini 2.0 Flash models
+DEFAULT_CONTEXT_WINDOW = 1_048_576
+
+# Requests estimated above this share of the window are counted exactly before sending
+VERIFY_FRACTION = 0.8
+
+# Weight of each reported prompt token count in the running text calibration
+CALIBRATION_WEIGHT = 0.2
+
+OVERFLOW_POLICIES = ("compress", "warn")
+
+
+class TokenAccountant(TokenEstimates):
+    """Estimates, verifies and records the input tokens of model requests"""
+
+    def __init__(self, context_window: int = DEFAULT_CONTEXT_WINDOW,
+                 context_windows: Optional[Dict[str, int]] = None, verify_media: bool = True,
+                 overflow: str = "compress", max_cache_entries: int = 4096):
+        """
+        Initialize the accountant.
+
+        Args:
+            context_window: Input token limit of models not listed in context_windows
+            context_windows: Model name -> input token limit
+            verify_media: Count audio, image and file parts with count_tokens once per
+                content hash instead of relying on the local estimate
+            overflow: "compress" to shorten requests that would overflow the window, or
+                "warn" to only log them
+            max_cache_entries: Maximum cached exact counts
+        """
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"overflow must be one of {OVERFLOW_POLICIES}, got {overflow!r}")
+        self.context_window = context_window
+        self.context_windows = dict(context_windows or {})
+        self.verify_media = verify_media
+        self.overflow = overflow
+        self.max_cache_entries = max_cache_entries
+
+        # Reported text tokens per locally estimated text token
+        self.text_ratio = 1.0
+        self._counts: "OrderedDict[str, int]" = OrderedDict()
+        self._audio_seconds: Dict[str, float] = {}
+        self._steps: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def window_for(self, model: Optional[str]) -> int:
+        """
+        Get the input token limit of a model.
+
+        Args:
+            model: Model name
+
+        Returns:
+            int: Context window in tokens
+        """
+        return self.context_windows.get(model or "", self.context_window)
+
+    def preflight(self, request: ModelRequest, count: Callable[[Any], int]) -> int:
+        """
+        Estimate a request before it is sent, verifying and compressing it if needed.
+
+        Args:
+            request: The request; its tokens (and possibly contents) are updated
+            count: Exact counter for contents (a count_tokens call)
+
+        Returns:
+            int: Input tokens of the request
+        """
+        contents = request.contents
+        chat = request.params.get("chat")
+        if chat is not None:
+            # A chat turn sends the history along with the message
+            try:
+                history = chat.get_history()
+            except Exception:
+                history = []
+            contents = [history, request.contents]
+
+        if self.verify_media and chat is None:
+            try:
+                self._verify_media(contents, count)
+            except Exception as e:
+                logger.warning(f"Token count of media failed for {request.step}: {str(e)}")
+
+        estimate = self.estimate(contents)
+        tokens = estimate["total"]
+        window = self.window_for(request.model)
+        verified = False
+        if tokens >= window * VERIFY_FRACTION and chat is None:
+            exact = self.cached_count(contents)
+            if exact is None:
+                try:
+                    exact = count(contents)
+                    self.store_count(contents, exact)
+                except Exception as e:
+                    logger.warning(f"Token count failed for {request.step}: {str(e)}")
+            if exact is not None:
+                tokens, verified = exact, True
+
+        compressed = False
+        if tokens > window * (1 - WINDOW_MARGIN):
+            if self.overflow == "compress" and chat is None:
+                shortened = self._compress(contents, tokens, window)
+                compressed = shortened is not contents
+            if compressed:
+                scale = tokens / max(estimate["total"], 1)
+                request.contents = shortened
+                estimate = self.estimate(shortened)
+                logger.warning(f"{request.step}: request of about {tokens} tokens would "
+                               f"overflow the {window}-token window of {request.model}, "
+                               f"compressed to about {int(estimate['total'] * scale)}")
+                tokens = int(estimate["total"] * scale)
+            else:
+                logger.warning(f"{request.step}: request of about {tokens} tokens exceeds the "
+                               f"{window}-token window of {request.model}")
+
+        request.tokens = tokens
+        request.token_estimate = estimate
+        with self._lock:
+            stats = self._step_stats(request.step)
+            stats["calls"] += 1
+            stats["estimated"] += tokens
+            stats["verified"] += int(verified)
+            stats["compressed"] += int(compressed)
+        return tokens
+
+    def _step_stats(self, step: str) -> Dict[str, int]:
+        """Counters of a step (call with the lock held)"""
+        return self._steps.setdefault(step, {"calls": 0, "estimated": 0, "verified": 0,
+                                             "compressed": 0, "reported_calls": 0,
+                                             "reported_estimated": 0, "reported": 0})
+
+    def record_usage(self, request: ModelRequest, response: Any) -> None:
+        """
+        Compare a request's estimate with the prompt tokens the API reported.
+
+        Args:
+            request: The request, after preflight
+            response: The SDK response
+        """
+        usage = getattr(response, "usage_metadata", None)
+        reported = getattr(usage, "prompt_token_count", None)
+        estimate = getattr(request, "token_estimate", None)
+        if not isinstance(reported, int) or not estimate:
+            return
+
+        with self._lock:
+            stats = self._step_stats(request.step)
+            stats["reported_calls"] += 1
+            stats["reported_estimated"] += request.tokens
+            stats["reported"] += reported
+
+            # Calibrate the text estimate with the text share of the reported count
+            reported_text = reported - estimate["media"]
+            if estimate["raw_text"] > 0 and reported_text > 0:
+                self.text_ratio += CALIBRATION_WEIGHT * (
+                    reported_text / estimate["raw_text"] - self.text_ratio)
+
+    def get_status(self) -> Dict[str, Any]:
+        """
+        Get the accounting counters.
+
+        Returns:
+            Dictionary with the text calibration, cached counts and per-step counters
+        """
+        with self._lock:
+            return {
+                "text_ratio": round(self.text_ratio, 3),
+                "cached_counts": len(self._counts),
+                "known_audio": len(self._audio_seconds),
+                "steps": {step: dict(stats) for step, stats in self._steps.items()}
+            }
+
+    def summary(self) -> str:
+        """
+        Format the per-step estimates as a table.
+
+        Returns:
+            str: One line per step with calls, estimated tokens and estimate error
+        """
+        status = self.get_status()
+        lines = [f"{'Step':<60}{'Calls':>6}{'Tokens':>10}{'Error':>8}"]
+        for step, stats in sorted(status["steps"].items()):
+            error = "-"
+            if stats["reported"]:
+                error = f"{(stats['reported_estimated'] - stats['reported']) / stats['reported']:+.0%}"
+            lines.append(f"{step[:59]:<60}{stats['calls']:>6}{stats['estimated']:>10}{error:>8}")
+        lines.append(f"Text calibration: x{status['text_ratio']}, "
+                     f"{status['cached_counts']} cached exact counts")
+        return "\n".join(lines)
+
+
+class TokenAccountingMiddleware(Middleware):
+    """Estimates the input tokens of model calls before they reach the limiters"""
+
+    def __init__(self, accountant: TokenAccountant):
+        """
+        Initialize the layer.
+
+        Args:
+            accountant: The token accountant
+        """
+        self.accountant = accountant
+
+    def _counter(self, request: ModelRequest,
+                 call_next: Callable[[ModelRequest], Any]) -> Callable[[Any], int]:
+        """Exact counter that sends count_tokens down the rest of the chain"""
+        def count(contents: Any) -> int:
+            count_request = ModelRequest("count_tokens", model=request.model, contents=contents)
+            count_request.tags = {**request.tags, "step": "Token count"}
+            return call_next(count_request).total_tokens
+        return count
+
+    def __call__(self, request: ModelRequest, call_next: Callable[[ModelRequest], Any]) -> Any:
+        if request.operation == "upload_file":
+            response = call_next(request)
+            self.accountant.register_upload(response, request.params.get("file"))
+            return response
+
+        if request.operation == "count_tokens":
+            # Counts made elsewhere (e.g. by the track prefetcher) fill the cache as well
+            response = call_next(request)
+            total = getattr(response, "total_tokens", None)
+            if isinstance(total, int):
+                self.accountant.store_count(request.contents, total)
+            return response
+
+        if request.operation not in MODEL_OPERATIONS:
+            return call_next(request)
+
+        self.accountant.preflight(request, self._counter(request, call_next))
+        response = call_next(request)
+        self.accountant.record_usage(request, response)
+        return response
@@ -0,0 +1,197 @@
+"""
+gemini_apis/token_estimates.py - Local input token estimates and the exact count cache
+
+Text is estimated locally and scaled by the accountant's calibration, audio from the
+duration of the uploaded file and images from their size. Exact counts from count_tokens
+are cached by content hash. Requests that would overflow the context window are shortened
+by cutting the middle of their longest text item.
+
+TokenEstimates is the estimating half of TokenAccountant; it expects the accountant's
+text_ratio, max_cache_entries, _lock, _counts and _audio_seconds.
+
+Exports:
+- WINDOW_MARGIN, FALLBACK_AUDIO_BYTES_PER_SECOND
+- TokenEstimates
+  - register_upload(file_ref, path), cached_count(contents) -> int | None,
+    store_count(contents, tokens), estimate(contents) -> Dict[str, int]
+
+Related files:
+- src/gemini/gemini_apis/token_accounting.py: TokenAccountant and its middleware layer
+- src/gemini/gemini_utilities/token_utils.py: Local text, audio and image estimates
+"""
+
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from ..gemini_utilities.track_metadata import get_mp3_duration
+from ..gemini_utilities.token_utils import (
+    estimate_audio_tokens, estimate_image_tokens, estimate_text_tokens, truncate_text)
+from .model_request import _fingerprint
+
+# Share of the window left free; longer requests are compressed (or logged)
+WINDOW_MARGIN = 0.02
+
+# Assumed bitrate of audio whose duration cannot be read from its headers (128 kbit/s)
+FALLBACK_AUDIO_BYTES_PER_SECOND = 16000
+
+
+class TokenEstimates:
+    """Estimates of request contents, with exact counts cached by content hash"""
+
+    def register_upload(self, file_ref: Any, path: Any) -> None:
+        """
+        Remember the duration of an uploaded audio file for later estimates.
+
+        Args:
+            file_ref: Uploaded file reference (with name and uri)
+            path: Local path the file was uploaded from
+        """
+        if not isinstance(path, (str, Path)):
+            return
+        path = Path(path)
+        seconds = get_mp3_duration(path) if path.suffix.lower() == ".mp3" else None
+        if seconds is None:
+            return
+        with self._lock:
+            for key in (getattr(file_ref, "name", None), getattr(file_ref, "uri", None)):
+                if key:
+                    self._audio_seconds[key] = seconds
+
+    def cached_count(self, contents: Any) -> Optional[int]:
+        """
+        Get the exact token count of contents counted before.
+
+        Args:
+            contents: Request contents
+
+        Returns:
+            Token count, or None if these contents were never counted
+        """
+        key = _fingerprint(contents)
+        with self._lock:
+            if key is None or key not in self._counts:
+                return None
+            self._counts.move_to_end(key)
+            return self._counts[key]
+
+    def store_count(self, contents: Any, tokens: int) -> None:
+        """
+        Cache the exact token count of contents.
+
+        Args:
+            contents: Request contents
+            tokens: Token count reported by count_tokens
+        """
+        key = _fingerprint(contents)
+        if key is None:
+            return
+        with self._lock:
+            self._counts[key] = tokens
+            while len(self._counts) > self.max_cache_entries:
+                self._counts.popitem(last=False)
+
+    def _media_estimate(self, part: Any) -> int:
+        """Local estimate of an audio, image or file part"""
+        if hasattr(part, "tobytes") and hasattr(part, "size") and hasattr(part, "mode"):
+            # PIL image
+            return estimate_image_tokens(*part.size)
+
+        file_data = getattr(part, "file_data", None)
+        inline_data = getattr(part, "inline_data", None)
+        if file_data is not None:
+            uri, mime_type, size = file_data.file_uri, file_data.mime_type, None
+        elif inline_data is not None:
+            uri, mime_type, size = None, inline_data.mime_type, len(inline_data.data or b"")
+        else:
+            uri, mime_type = getattr(part, "uri", None), getattr(part, "mime_type", None)
+            size = getattr(part, "size_bytes", None)
+
+        with self._lock:
+            seconds = self._audio_seconds.get(uri) or self._audio_seconds.get(
+                getattr(part, "name", None))
+        if seconds is None and str(mime_type or "").startswith("audio/") and size:
+            seconds = size / FALLBACK_AUDIO_BYTES_PER_SECOND
+        if seconds is not None:
+            return estimate_audio_tokens(seconds)
+        # Images of unknown size count as one tile
+        return estimate_image_tokens(0, 0)
+
+    def _parts(self, contents: Any) -> List[Tuple[str, Any]]:
+        """Flatten request contents into ("text", str) and ("media", part) items"""
+        if contents is None:
+            return []
+        if isinstance(contents, str):
+            return [("text", contents)]
+        if isinstance(contents, (list, tuple)):
+            return [item for content in contents for item in self._parts(content)]
+        if isinstance(contents, dict):
+            if "parts" in contents:
+                return self._parts(contents["parts"])
+            return [("text", contents["text"])] if "text" in contents else []
+        parts = getattr(contents, "parts", None)
+        if parts is not None and not hasattr(contents, "file_data"):
+            # A Content (role and parts)
+            return self._parts(parts)
+        text = getattr(contents, "text", None)
+        if isinstance(text, str) and not getattr(contents, "uri", None):
+            return [("text", text)]
+        return [("media", contents)]
+
+    def estimate(self, contents: Any) -> Dict[str, int]:
+        """
+        Estimate the input tokens of request contents without an API call.
+
+        Media parts use their cached exact count when they were counted before.
+
+        Args:
+            contents: Request contents
+
+        Returns:
+            Dictionary with text, media and total tokens, and the raw (uncalibrated) text estimate
+        """
+        raw_text = 0
+        media = 0
+        for kind, part in self._parts(contents):
+            if kind == "text":
+                raw_text += estimate_text_tokens(part)
+                continue
+            exact = self.cached_count([part])
+            media += exact if exact is not None else self._media_estimate(part)
+        text = int(round(raw_text * self.text_ratio))
+        return {"text": text, "raw_text": raw_text, "media": media, "total": text + media}
+
+    def _verify_media(self, contents: Any, count: Callable[[Any], int]) -> None:
+        """Count the media parts that have no exact count yet"""
+        for kind, part in self._parts(contents):
+            if kind != "media" or self.cached_count([part]) is not None:
+                continue
+            if _fingerprint([part]) is None:
+                continue
+            self.store_count([part], count([part]))
+
+    def _compress(self, contents: Any, tokens: int, window: int) -> Any:
+        """
+        Shorten the longest text item of the contents so the request fits the window.
+
+        Args:
+            contents: Request contents
+            tokens: Input tokens of the contents (exact if they were counted)
+            window: Context window to fit
+
+        Returns:
+            The shortened contents, or the contents themselves if they have no text item
+        """
+        items = [contents] if isinstance(contents, str) else contents
+        if not isinstance(items, list):
+            return contents
+        texts = [(estimate_text_tokens(item), index) for index, item in enumerate(items)
+                 if isinstance(item, str)]
+        if not texts:
+            return contents
+        longest, index = max(texts)
+        # Tokens per locally estimated token of the longest item
+        scale = tokens / max(self.estimate(contents)["total"], 1) * self.text_ratio
+        budget = window * (1 - WINDOW_MARGIN) - (tokens - longest * scale)
+        shortened = list(items)
+        shortened[index] = truncate_text(items[index], max(int(budget / scale), 0))
+        return shortened[0] if isinstance(contents, str) else shortened
@@ -0,0 +1,226 @@
+"""
+gemini_apis/transport.py - Single transport for every Gemini SDK call
+
+All model, file and chat calls go through one GeminiTransport built on the google.genai
+client, so the package has one HTTP stack, one auth setup and one place to add
+cross-cutting behaviour. Every call becomes a ModelRequest that runs through the
+transport's middleware chain (see middleware.py) in call_model before reaching the SDK.
+Model calls are sent with the HTTP timeout the chain chose for them, and requests that
+were cancelled while queued (e.g. a losing hedge) are not sent at all.
+A stream is opened inside the chain: its first chunk is read there, so the timeout,
+retries, hedging, metrics and legacy fallback cover the request itself rather than only
+the creation of a lazy iterator. Async chats (client.aio) go through the same chain: the chain runs on the
+transport's own bounded thread pool, since its limits may sleep, and the response stream is
+then read on the event loop. A turn waiting for the rate limits therefore never holds one of
+the event loop's default executor threads that other async work (e.g. session loading) needs.
+The SDK side (and the optional legacy SDK fallback) is in sdk_dispatch.py, and the file,
+batch, cache and chat calls are in transport_calls.py.
+
+Exports:
+- LEGACY_SDK_ENV: Name of the environment variable that enables the legacy SDK
+- ASYNC_CHAIN_WORKERS: Threads that run the chain for async chat turns
+- legacy_sdk_enabled() -> bool: Whether the legacy SDK fallback is enabled
+- GeminiTransport(client=None, api_key: str = None, enable_legacy: bool = None,
+  middleware: List[Middleware] = None)
+  - client: The google.genai client (built on first use from api_key)
+  - call_model(request: ModelRequest): Run a request through the middleware chain
+  - with_middleware(*layers), limited_by(rate_limiter), layer(layer_type)
+  - generate_content(model, contents, config=None), generate_content_stream(model, contents, config=None)
+  - count_tokens(model, contents)
+  - upload_file(file, config=None, chat=None), get_file(name), delete_file(name), list_files()
+  - create_chat(model, config=None, history=None, continues=None)
+  - create_batch(model, src, config=None), get_batch(name), download_file(name) -> bytes
+  - create_cached_content(model, config), delete_cached_content(name)
+  - send_message(chat, message, config=None), send_message_stream(chat, message, config=None)
+  - create_async_chat(model, config=None, history=None, continues=None),
+    send_message_stream_async(chat, message, config=None) -> AsyncIterator
+- as_transport(client=None, api_key: str = None) -> GeminiTransport:
+  Wrap a google.genai client (or pass a transport through unchanged)
+
+Related files:
+- src/gemini/gemini_apis/sdk_dispatch.py, transport_calls.py: The two halves of the class
+- src/gemini/gemini_apis/middleware.py: ModelRequest and the middleware layers
+- src/gemini/gemini_client.py: Owns the shared transport
+- src/gemini/gemini_apis/*.py: Functional APIs that route their calls through it
+- src/gemini/gemini_hooks/conversation_manager.py: Chat sessions on the transport
+"""
+
+import os
+import logging
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from functools import cached_property
+from typing import Any, Callable, Iterator, List, Optional
+
+from ..gemini_utilities.rate_limiter import RateLimiter
+from .middleware import Middleware, ModelRequest, RateLimitMiddleware, TimeoutMiddleware
+# Re-exported, so callers keep importing them from here
+from .sdk_dispatch import LEGACY_SDK_ENV, SdkDispatch, legacy_sdk_enabled
+from .transport_calls import TransportCalls
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Async chat turns that can wait in the chain at once; further turns queue for a thread
+ASYNC_CHAIN_WORKERS = 4
+
+
+class GeminiTransport(TransportCalls, SdkDispatch):
+    """Routes Gemini model, file and chat calls through one google.genai client"""
+
+    def __init__(self, client=None, api_key: Optional[str] = None,
+                 enable_legacy: Optional[bool] = None,
+                 middleware: Optional[List[Middleware]] = None):
+        """
+        Initialize the transport without building the SDK client.
+
+        Args:
+            client: Existing google.genai client to use (built from api_key when omitted)
+            api_key: Gemini API key (defaults to GEMINI_API_KEY environment variable)
+            enable_legacy: Use the legacy SDK as a fallback (defaults to GEMINI_ENABLE_LEGACY_SDK)
+            middleware: Layers every call passes through, outermost first (default: only
+                a TimeoutMiddleware, so calls on a bare client cannot hang forever)
+        """
+        self.api_key = api_key or os.environ.get("GEMINI_API_KEY")
+        self.enable_legacy = legacy_sdk_enabled() if enable_legacy is None else enable_legacy
+        self.middleware = [TimeoutMiddleware()] if middleware is None else list(middleware)
+        self._handler = self._build_chain()
+        if client is not None:
+            self.client = client
+
+    @cached_property
+    def _chain_executor(self) -> ThreadPoolExecutor:
+        """Thread pool that runs the chain for async chat turns"""
+        return ThreadPoolExecutor(max_workers=ASYNC_CHAIN_WORKERS,
+                                  thread_name_prefix="gemini-chain")
+
+    def _build_chain(self) -> Callable[[ModelRequest], Any]:
+        """Compose the middleware layers around the SDK dispatch"""
+        handler = self._dispatch
+        for layer in reversed(self.middleware):
+            handler = functools.partial(layer, call_next=handler)
+        return handler
+
+    def with_middleware(self, *layers: Middleware) -> "GeminiTransport":
+        """
+        Get a transport on the same client with extra outer layers.
+
+        Args:
+            *layers: Layers to run before this transport's own layers
+
+        Returns:
+            A new GeminiTransport sharing this one's client
+        """
+        return GeminiTransport(
+            client=self.client, api_key=self.api_key, enable_legacy=self.enable_legacy,
+            middleware=list(layers) + self.middleware)
+
+    def limited_by(self, rate_limiter: Optional[RateLimiter]) -> "GeminiTransport":
+        """
+        Get a transport whose calls count against a rate limiter.
+
+        Args:
+            rate_limiter: Limits to apply (None adds no limits)
+
+        Returns:
+            This transport if it already applies that limiter, otherwise one that does
+        """
+        if rate_limiter is None:
+            return self
+        for layer in self.middleware:
+            if isinstance(layer, RateLimitMiddleware) and layer.rate_limiter is rate_limiter:
+                return self
+        return self.with_middleware(RateLimitMiddleware(rate_limiter))
+
+    def layer(self, layer_type: type) -> Optional[Middleware]:
+        """
+        Find a middleware layer by type.
+
+        Args:
+            layer_type: Middleware class, e.g. MetricsMiddleware
+
+        Returns:
+            The first layer of that type, or None
+        """
+        for layer in self.middleware:
+            if isinstance(layer, layer_type):
+                return layer
+        return None
+
+    def call_model(self, request: ModelRequest) -> Any:
+        """
+        Send a request through the middleware chain to the SDK.
+
+        Args:
+            request: The request
+
+        Returns:
+            The SDK response
+        """
+        return self._handler(request)
+
+    def generate_content(self, model: str, contents: Any, config: Any = None, **options) -> Any:
+        """
+        Generate content.
+
+        Args:
+            model: Model name
+            contents: Prompt text or list of content items
+            config: Optional GenerateContentConfig
+            **options: Request options (cacheable, timeout)
+
+        Returns:
+            The SDK response
+        """
+        return self.call_model(ModelRequest(
+            "generate_content", model=model, contents=contents, config=config, **options))
+
+    def generate_content_stream(self, model: str, contents: Any, config: Any = None,
+                                **options) -> Iterator[Any]:
+        """
+        Generate content as a stream of response chunks.
+
+        The stream is opened (its first chunk read) inside the middleware; the rest of
+        the chunks are read by the caller.
+
+        Args:
+            model: Model name
+            contents: Prompt text or list of content items
+            config: Optional GenerateContentConfig
+            **options: Request options (timeout)
+
+        Returns:
+            Iterator of response chunks
+        """
+        return self.call_model(ModelRequest(
+            "generate_content_stream", model=model, contents=contents, config=config, **options))
+
+    def count_tokens(self, model: str, contents: Any) -> Any:
+        """
+        Count the tokens of a request.
+
+        Args:
+            model: Model name
+            contents: Prompt text or list of content items
+
+        Returns:
+            The SDK response (with total_tokens)
+        """
+        return self.call_model(ModelRequest("count_tokens", model=model, contents=contents))
+
+
+def as_transport(client=None, api_key: Optional[str] = None) -> GeminiTransport:
+    """
+    Get a transport for a client.
+
+    Args:
+        client: A GeminiTransport (returned unchanged), a google.genai client, or None
+        api_key: API key used when a new client has to be built
+
+    Returns:
+        GeminiTransport
+    """
+    if isinstance(client, GeminiTransport):
+        return client
+    return GeminiTransport(client=client, api_key=api_key)
@@ -0,0 +1,204 @@
+"""
+gemini_apis/transport_calls.py - File, batch, cache and chat calls of GeminiTransport
+
+Each method wraps its arguments in a ModelRequest and sends it through the transport's
+middleware chain. Async chat turns run the chain on the transport's own bounded thread
+pool, since its limits may sleep, and the response stream is then read on the event loop.
+
+Exports:
+- TransportCalls: Base of GeminiTransport (expects call_model and _chain_executor)
+  - upload_file(file, config=None, chat=None), get_file(name), delete_file(name), list_files()
+  - create_batch(model, src, config=None), get_batch(name), download_file(name) -> bytes
+  - create_cached_content(model, config), delete_cached_content(name)
+  - create_chat(model, config=None, history=None, continues=None)
+  - send_message(chat, message, config=None), send_message_stream(chat, message, config=None)
+  - create_async_chat(model, config=None, history=None, continues=None),
+    send_message_stream_async(chat, message, config=None) -> AsyncIterator
+
+Related files:
+- src/gemini/gemini_apis/transport.py: GeminiTransport
+- src/gemini/gemini_hooks/conversation_manager.py: Chat sessions on the transport
+"""
+
+import asyncio
+import contextlib
+from typing import Any, AsyncIterator, Iterator, List, Optional
+
+from .model_request import ModelRequest
+
+
+class TransportCalls:
+    """File, batch, cache and chat requests sent through the transport's chain"""
+
+    def upload_file(self, file: Any, config: Any = None, chat: Any = None) -> Any:
+        """
+        Upload a file for use in requests.
+
+        Args:
+            file: Path or file object to upload
+            config: Optional UploadFileConfig (e.g. mime_type)
+            chat: Optional chat the file is for (it is uploaded with that chat's key, so the
+                chat can refer to it)
+
+        Returns:
+            The uploaded file reference
+        """
+        request = ModelRequest("upload_file", config=config, file=file)
+        if chat is not None:
+            request.params["chat"] = chat
+        return self.call_model(request)
+
+    def get_file(self, name: str) -> Any:
+        """Get the current state of an uploaded file"""
+        return self.call_model(ModelRequest("get_file", name=name))
+
+    def delete_file(self, name: str) -> None:
+        """Delete an uploaded file"""
+        self.call_model(ModelRequest("delete_file", name=name))
+
+    def list_files(self) -> List[Any]:
+        """List the uploaded files"""
+        return self.call_model(ModelRequest("list_files"))
+
+    def create_batch(self, model: str, src: Any, config: Any = None) -> Any:
+        """
+        Create a batch job.
+
+        Args:
+            model: Model name
+            src: Name of an uploaded JSONL request file (or inlined requests)
+            config: Optional CreateBatchJobConfig (e.g. display_name)
+
+        Returns:
+            The SDK batch job
+        """
+        return self.call_model(ModelRequest("create_batch", model=model, config=config, src=src))
+
+    def get_batch(self, name: str) -> Any:
+        """Get the current state of a batch job"""
+        return self.call_model(ModelRequest("get_batch", name=name))
+
+    def download_file(self, name: str) -> bytes:
+        """Download a file the API produced (e.g. the results of a batch job)"""
+        return self.call_model(ModelRequest("download_file", name=name))
+
+    def create_cached_content(self, model: str, config: Any) -> Any:
+        """
+        Create cached content (e.g. a long system instruction) that requests refer to by name.
+
+        Args:
+            model: Model the cached content is for
+            config: CreateCachedContentConfig (contents or system_instruction, ttl)
+
+        Returns:
+            The SDK cached content (with its name)
+        """
+        return self.call_model(ModelRequest("create_cached_content", model=model, config=config))
+
+    def delete_cached_content(self, name: str) -> None:
+        """Delete cached content before it expires"""
+        self.call_model(ModelRequest("delete_cached_content", name=name))
+
+    def create_chat(self, model: str, config: Any = None,
+                    history: Optional[List[Any]] = None, continues: Any = None) -> Any:
+        """
+        Create a chat session.
+
+        Args:
+            model: Model name
+            config: Optional GenerateContentConfig for every turn (e.g. system_instruction)
+            history: Optional earlier turns
+            continues: Optional chat whose history this one continues (it keeps that chat's
+                key, which owns the files the history refers to)
+
+        Returns:
+            The SDK chat session
+        """
+        request = ModelRequest("create_chat", model=model, config=config, history=history)
+        if continues is not None:
+            request.params["chat"] = continues
+        return self.call_model(request)
+
+    def send_message(self, chat: Any, message: Any, config: Any = None) -> Any:
+        """
+        Send a chat turn.
+
+        Args:
+            chat: Chat session from create_chat
+            message: Message text or list of content items
+            config: Optional GenerateContentConfig for this turn (replaces the chat's own)
+
+        Returns:
+            The SDK response
+        """
+        return self.call_model(ModelRequest(
+            "send_message", model=getattr(chat, "_model", None), contents=message,
+            config=config, chat=chat))
+
+    def send_message_stream(self, chat: Any, message: Any, config: Any = None) -> Iterator[Any]:
+        """
+        Send a chat turn and stream the response.
+
+        Args:
+            chat: Chat session from create_chat
+            message: Message text or list of content items
+            config: Optional GenerateContentConfig for this turn (replaces the chat's own)
+
+        Returns:
+            Iterator of response chunks
+        """
+        return self.call_model(ModelRequest(
+            "send_message_stream", model=getattr(chat, "_model", None), contents=message,
+            config=config, chat=chat))
+
+    def create_async_chat(self, model: str, config: Any = None,
+                          history: Optional[List[Any]] = None, continues: Any = None) -> Any:
+        """
+        Create an async chat session (for send_message_stream_async).
+
+        Args:
+            model: Model name
+            config: Optional GenerateContentConfig for every turn (e.g. system_instruction)
+            history: Optional earlier turns
+            continues: Optional chat whose history this one continues (it keeps that chat's
+                key, which owns the files the history refers to)
+
+        Returns:
+            The SDK AsyncChat
+        """
+        request = ModelRequest("create_chat", model=model, config=config,
+                               history=history, aio=True)
+        if continues is not None:
+            request.params["chat"] = continues
+        return self.call_model(request)
+
+    async def send_message_stream_async(self, chat: Any, message: Any,
+                                        config: Any = None) -> AsyncIterator[Any]:
+        """
+        Send a turn of an async chat and stream the response on the event loop.
+
+        The turn is recorded in the chat's history only when the stream completes, so a
+        stream that is cancelled part way leaves the history unchanged.
+
+        Args:
+            chat: Chat session from create_async_chat
+            message: Message text or list of content items
+            config: Optional GenerateContentConfig for this turn (replaces the chat's own)
+
+        Yields:
+            Response chunks
+        """
+        request = ModelRequest("send_message_stream", model=getattr(chat, "_model", None),
+                               contents=message, config=config, chat=chat)
+        # The chain may wait for the rate limits, so it runs off the event loop on the
+        # transport's pool; what it returns is the chat's coroutine that opens the stream
+        loop = asyncio.get_running_loop()
+        try:
+            opening = await loop.run_in_executor(self._chain_executor, self.call_model, request)
+        except asyncio.CancelledError:
+            # A turn still waiting in the chain is dropped before it is sent
+            request.cancelled.set()
+            raise
+        async with contextlib.aclosing(await opening) as stream:
+            async for chunk in stream:
+                yield chunk
@@ -0,0 +1,153 @@
+"""
+gemini_chat.py - The chat session of GeminiClient
+
+create_chat takes a warm chat from the client's pool, whose long system instruction is
+already cached. Messages are sent on it whole, streamed, or streamed on the event loop
+with astream_message, and every response is relayed to Discord.
+
+GeminiChat is the chat half of GeminiClient; it expects the client's transport,
+chat_pool, chat and _send_to_discord()/_send_error_to_discord().
+
+Exports:
+- GeminiChat
+  - create_chat(system_instruction=None) -> chat
+  - send_message(text, stream=False) -> response or stream
+  - astream_message(text, sinks=None) -> AsyncIterator[str]
+  - get_chat_history() -> List
+
+Related files:
+- src/gemini/gemini_client.py: GeminiClient
+- src/gemini/gemini_apis/chat_api.py: Chat calls and the warm chat pool
+- src/gemini/gemini_hooks/stream_relay.py: Relays streamed chunks to Discord and other sinks
+"""
+
+import logging
+from typing import AsyncIterator, List, Optional
+
+from src.gemini.gemini_apis.chat_api import send_message, stream_message_async, get_chat_history
+from src.gemini.gemini_hooks.stream_relay import (
+    DiscordStreamSink,
+    StreamSink,
+    chunk_texts,
+    relay_stream
+)
+
+logger = logging.getLogger(__name__)
+
+
+class GeminiChat:
+    """Chat session with responses relayed to Discord"""
+
+    def create_chat(self, system_instruction: Optional[str] = None):
+        """
+        Create a new chat session with an optional system instruction.
+
+        Args:
+            system_instruction: Optional instruction to guide the model's behavior
+
+        Returns:
+            The chat object
+        """
+        # A warm chat whose instruction is already cached, if the pool has one ready
+        self.chat = self.chat_pool.acquire(system_instruction)
+        return self.chat
+
+    def send_message(self, text: str, stream: bool = False):
+        """
+        Send a message to the chat session and relay the response to Discord.
+
+        Args:
+            text: The message text to send
+            stream: Whether to stream the response
+
+        Returns:
+            Chat response or stream
+        """
+        try:
+            # Initialize chat if not already done
+            if self.chat is None:
+                self.create_chat()
+
+            # Send message
+            response = send_message(
+                chat=self.chat,
+                text=text,
+                stream=stream,
+                client=self.transport
+            )
+
+            # Streams are relayed to Discord once they are exhausted
+            if stream:
+                return self._relay_chunks(response, text)
+
+            self._send_to_discord(
+                response=response.text,
+                prompt=text,
+                is_final=False,
+                content_type="chat"
+            )
+
+            return response
+
+        except Exception as e:
+            logger.error(f"Error sending chat message: {str(e)}")
+            self._send_error_to_discord(e, text)
+            raise
+
+    def _relay_chunks(self, stream, text: str):
+        """Yield the chunks of a response stream, then relay the whole response to Discord"""
+        parts = []
+        for chunk in stream:
+            if chunk.text:
+                parts.append(chunk.text)
+            yield chunk
+        self._send_to_discord(
+            response="".join(parts),
+            prompt=text,
+            is_final=False,
+            content_type="chat"
+        )
+
+    async def astream_message(self, text: str,
+                              sinks: Optional[List[StreamSink]] = None) -> AsyncIterator[str]:
+        """
+        Stream a chat message on the event loop and relay the response to Discord as it arrives.
+
+        Many chats can stream concurrently on one event loop. A slow sink (Discord included)
+        slows the stream down rather than buffering it, and cancelling the task that iterates
+        the stream stops it and leaves the turn out of the chat history.
+
+        Args:
+            text: The message text to send
+            sinks: Optional further sinks for the chunks (e.g. a CallbackSink for a websocket)
+
+        Yields:
+            Response text chunks
+        """
+        if self.chat is None:
+            self.create_chat()
+
+        discord = DiscordStreamSink(
+            lambda segment, first, final: self._send_to_discord(
+                response=segment,
+                prompt=text if first else None,
+                is_final=False,
+                content_type="chat"
+            ))
+        try:
+            stream = stream_message_async(self.chat, text, client=self.transport)
+            async for chunk in relay_stream(chunk_texts(stream), [discord, *(sinks or [])]):
+                yield chunk
+        except Exception as e:
+            logger.error(f"Error streaming chat message: {str(e)}")
+            self._send_error_to_discord(e, text)
+            raise
+
+    def get_chat_history(self):
+        """
+        Get the history of the current chat session.
+
+        Returns:
+            List of chat messages
+        """
+        return get_chat_history(self.chat)
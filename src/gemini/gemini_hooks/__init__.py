@@ -6,20 +6,63 @@ Exports high-level workflow classes that coordinate API calls:
 - ImageProcessor: Image generation and processing workflows
 - ConversationManager: Chat and conversation management
 - AudioToImageProcessor: Complete audio-to-image pipeline
+- WatchFolderDaemon: Continuous watch-folder ingestion into a persistent worker pool
+- TrackPrefetcher: Background upload and token counting for upcoming tracks
+- PipelinePlanner: Elision of model calls whose results are unused
+- PipelineStep: Step definitions shared by the online and batch paths
+- BatchPipelineRunner: Resumable batch-job runs of the pipeline over many tracks
+- ChatSessionPool: Many persistent chat sessions keyed by session ID
+- Stream relay: Sinks for async streamed responses with back-pressure
+
+Exports are imported from their submodules on first use, so importing one hook does not
+load the SDKs and NumPy for all of them.
 
 Related files:
 - src/gemini/gemini_client.py: Main client that uses these hooks
 - src/gemini/gemini_apis/: Low-level API functions used by these hooks
 """
 
-from src.gemini.gemini_hooks.audio_processor import AudioProcessor
-from src.gemini.gemini_hooks.image_processor import ImageProcessor
-from src.gemini.gemini_hooks.conversation_manager import ConversationManager
-from src.gemini.gemini_hooks.audio_to_image_processor import AudioToImageProcessor
+from src.gemini.gemini_utilities.lazy_import import lazy_exports
+
+# Submodules are imported on first access to one of their exports
+_EXPORTS = {
+    'src.gemini.gemini_hooks.audio_processor': ('AudioProcessor',),
+    'src.gemini.gemini_hooks.image_processor': ('ImageProcessor',),
+    'src.gemini.gemini_hooks.conversation_manager': ('ConversationManager',),
+    'src.gemini.gemini_hooks.audio_to_image_processor': ('AudioToImageProcessor',),
+    'src.gemini.gemini_hooks.watch_folder_daemon': ('WatchFolderDaemon',),
+    'src.gemini.gemini_hooks.track_prefetcher': ('TrackPrefetcher',),
+    'src.gemini.gemini_hooks.pipeline_planner': (
+        'PipelinePlanner',
+        'DeadCallError',
+    ),
+    'src.gemini.gemini_hooks.pipeline_steps': ('PipelineStep',),
+    'src.gemini.gemini_hooks.batch_runner': ('BatchPipelineRunner',),
+    'src.gemini.gemini_hooks.session_pool': ('ChatSessionPool',),
+    'src.gemini.gemini_hooks.stream_relay': (
+        'StreamSink',
+        'CallbackSink',
+        'DiscordStreamSink',
+        'relay_stream',
+    )
+}
+
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
 
 __all__ = [
     'AudioProcessor',
     'ImageProcessor',
     'ConversationManager',
-    'AudioToImageProcessor'
+    'AudioToImageProcessor',
+    'WatchFolderDaemon',
+    'TrackPrefetcher',
+    'PipelinePlanner',
+    'DeadCallError',
+    'PipelineStep',
+    'BatchPipelineRunner',
+    'ChatSessionPool',
+    'StreamSink',
+    'CallbackSink',
+    'DiscordStreamSink',
+    'relay_stream'
 ]
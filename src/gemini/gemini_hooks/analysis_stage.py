@@ -0,0 +1,173 @@
+"""
+gemini_hooks/analysis_stage.py - The analysis and revision stages of the pipeline
+
+The analysis stage runs the analysis steps of a track in order, each listening to the
+track again and building on the earlier results, and saves every step's output. Stored
+analyses are reused unless one of them is stale or the catalogue reports that their
+prompt templates changed. The revision stage rewrites the final analysis with the
+critique of the refined analysis.
+
+AnalysisStage is the analysis half of AudioToImageProcessor; it expects the processor's
+analysis_dir, artifacts, catalogue, _has_output(), _run_step(), _save_step() and _pause().
+
+Exports:
+- AnalysisStage
+  - perform_multi_step_analysis(audio_path) -> Dict[str, Any]
+  - revise_final_analysis(audio_path, final_analysis, refined_analysis) -> Dict[str, Any]
+
+Related files:
+- src/gemini/gemini_hooks/audio_to_image_processor.py: AudioToImageProcessor
+- src/gemini/gemini_hooks/pipeline_steps.py: Step definitions shared with the batch path
+"""
+
+import logging
+from pathlib import Path
+from typing import Dict, Any
+
+from src.gemini.gemini_hooks.pipeline_planner import DeadCallError
+from src.gemini.gemini_hooks.pipeline_steps import ANALYSIS_STEPS, REVISION_STEP
+
+logger = logging.getLogger(__name__)
+
+
+class AnalysisStage:
+    """Multi-step analysis and revision of a track"""
+
+    def perform_multi_step_analysis(self, audio_path: Path) -> Dict[str, Any]:
+        """
+        Perform a comprehensive five-step analysis of the audio file.
+
+        Each step will listen to the audio file 5 times focusing on different aspects.
+
+        Steps:
+        1. Step 1: Musical Foundation and Hook Analysis (5 listening sessions)
+        2. Step 2: Sound Engineering and Production Techniques (5 listening sessions)
+        3. Step 3: Harmony, Melody, and Trend Alignment (5 listening sessions)
+        4. Step 4: Structure and Production Optimization (5 listening sessions)
+        5. Step 5: Critical Evaluation and Improvement Suggestions (5 listening sessions)
+        6. Final Analysis: Comprehensive merge of all five analyses (5 listening sessions)
+        7. Refinement: Critical review by a Musical Foundation Specialist (5 listening sessions)
+
+        Args:
+            audio_path: Path to the audio file
+
+        Returns:
+            Dictionary with paths to all analysis files
+        """
+        # Initialize results dictionary
+        results = {
+            "analysis_success": False,
+            "analysis_error": None,
+            "step1_analysis_path": None,
+            "step2_analysis_path": None,
+            "step3_analysis_path": None,
+            "step4_analysis_path": None,
+            "step5_analysis_path": None,
+            "final_analysis_path": None,
+            "refined_analysis_path": None
+        }
+
+        try:
+            # Ensure output directories exist
+            self.analysis_dir.mkdir(exist_ok=True, parents=True)
+
+            # Check if the audio file exists
+            if not audio_path.exists():
+                logger.error(f"Audio file not found: {audio_path}")
+                results["analysis_error"] = "Audio file not found"
+                return results
+
+            # Steps 1-5 and the final analysis must exist to reuse the analyses;
+            # the refinement is optional
+            required_steps = [step for step in ANALYSIS_STEPS if step.name != "refinement"]
+            step_paths = {step.name: step.output_path(self.analysis_dir, audio_path.stem)
+                          for step in ANALYSIS_STEPS}
+
+            # Check if we already have all the analyses, none of them built from an
+            # analysis that was rewritten since
+            existing = [step for step in ANALYSIS_STEPS
+                        if self._has_output(step_paths[step.name], "analysis", audio_path)]
+            if (all(step in existing for step in required_steps) and
+                    not any(self.artifacts.is_stale(step_paths[step.name]) for step in existing) and
+                    not (self.catalogue and self.catalogue.prompts_changed(audio_path, "analysis"))):
+
+                logger.info(f"Using existing analysis files for {audio_path}")
+                results["analysis_success"] = True
+                for step in existing:
+                    results[step.result_key] = str(step_paths[step.name])
+                return results
+
+            # Each step listens to the audio again and builds on the earlier results
+            prompt_versions: Dict[str, str] = {}
+            outputs: Dict[str, str] = {}
+            for index, step in enumerate(ANALYSIS_STEPS):
+                logger.info(f"Performing {step.step_name} for {audio_path}")
+                step_versions: Dict[str, str] = {}
+                outputs[step.output] = self._run_step(step, audio_path, outputs, step_versions)
+                prompt_versions.update(step_versions)
+
+                # Save the analysis with the analyses it was built from
+                results[step.result_key] = str(
+                    self._save_step(step, audio_path, outputs[step.output], step_versions))
+
+                # Pause to respect API rate limits
+                if index < len(ANALYSIS_STEPS) - 1:
+                    self._pause()
+
+            # Mark analysis as successful
+            results["analysis_success"] = True
+            results["prompt_versions"] = {"analysis": prompt_versions}
+
+        except DeadCallError:
+            raise
+        except Exception as e:
+            logger.exception(
+                f"Error performing multi-step analysis for {audio_path}: {str(e)}")
+            results["analysis_error"] = str(e)
+
+        return results
+    def revise_final_analysis(self, audio_path: Path, final_analysis: str, refined_analysis: str) -> Dict[str, Any]:
+        """
+        Revise the final analysis using insights from the refined analysis
+
+        Args:
+            audio_path: Path to the audio file
+            final_analysis: The original final analysis text
+            refined_analysis: The refined analysis text with critique and corrections
+
+        Returns:
+            Dictionary with the revised analysis path
+        """
+        results = {
+            "revision_success": False,
+            "revised_analysis_path": None,
+            "revision_error": None
+        }
+
+        try:
+            # Ensure output directories exist
+            self.analysis_dir.mkdir(exist_ok=True, parents=True)
+
+            # Generate the revised analysis with MP3 title included in Discord message
+            prompt_versions: Dict[str, str] = {}
+            revised_analysis = self._run_step(
+                REVISION_STEP, audio_path,
+                {"final_analysis": final_analysis, "refined_analysis": refined_analysis},
+                prompt_versions)
+
+            # Save the revised analysis with the analyses it was built from
+            revised_analysis_path = self._save_step(
+                REVISION_STEP, audio_path, revised_analysis, prompt_versions)
+
+            results["revision_success"] = True
+            results["prompt_versions"] = {"revision": prompt_versions}
+            results["revised_analysis_path"] = str(revised_analysis_path)
+
+        except DeadCallError:
+            raise
+        except Exception as e:
+            logger.exception(
+                f"Error revising final analysis for {audio_path}: {str(e)}")
+            results["revision_error"] = str(e)
+
+        return results
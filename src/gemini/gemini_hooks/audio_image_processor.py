@@ -0,0 +1,102 @@
+"""
+gemini_hooks/audio_image_processor.py - Legacy wrapper around AudioToImageProcessor
+
+AudioImageProcessor predates AudioToImageProcessor and keeps its interface (the output
+directories as attributes and the process_* methods) for main.py and older scripts. It
+shares the client's AudioToImageProcessor when the options match instead of building a
+second one.
+
+Exports:
+- AudioImageProcessor(client, prefetch_lookahead: int = 1, image_candidates: int = 1,
+                      reuse_min_score: float | None = None, write_behind: bool = True)
+  - process_audio_file(audio_path) -> Dict, process_multiple_files(audio_paths) -> List[Dict]
+  - process_multiple_files_batch(audio_paths, poll_interval=60) -> List[Dict]
+
+Related files:
+- src/gemini/gemini_client.py: Re-exports this class
+- src/gemini/gemini_hooks/audio_to_image_processor.py: The processor it wraps
+"""
+
+import logging
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+class AudioImageProcessor:
+    """Legacy class for processing audio files and generating images, kept for backward compatibility.
+    Uses AudioToImageProcessor internally for all operations."""
+
+    def __init__(self, client, prefetch_lookahead: int = 1, image_candidates: int = 1,
+                 reuse_min_score: Optional[float] = None, write_behind: bool = True):
+        """
+        Initialize the processor with client and output directories
+
+        Args:
+            client: Gemini client instance
+            prefetch_lookahead: Tracks prepared ahead of the current one in batch runs
+            image_candidates: Image candidates generated and ranked per track
+            reuse_min_score: Reuse a cached image of an identical prompt scoring at least this
+            write_behind: Sync output writes in the background, once per track
+        """
+        from src.gemini.gemini_hooks.audio_to_image_processor import AudioToImageProcessor
+
+        self.client = client
+        options = {"prefetch_lookahead": prefetch_lookahead,
+                   "image_candidates": max(1, image_candidates),
+                   "reuse_min_score": reuse_min_score,
+                   "write_behind": write_behind}
+
+        # Share one processor with the client instead of building a second one
+        existing = vars(client).get("audio_to_image_processor")
+        if existing is not None and all(getattr(existing, name) == value
+                                        for name, value in options.items()):
+            self.processor = existing
+        else:
+            self.processor = AudioToImageProcessor(client, **options)
+            client.audio_to_image_processor = self.processor
+
+        # Set up directories for backward compatibility
+        self.image_dir = self.processor.image_processor.image_dir
+        self.prompt_dir = self.processor.image_processor.prompt_dir
+        self.analysis_dir = self.processor.audio_processor.analysis_dir
+
+        logger.info("AudioImageProcessor initialized (legacy class)")
+
+    def process_audio_file(self, audio_path):
+        """
+        Process a single audio file through the processor pipeline
+
+        Args:
+            audio_path: Path to the audio file
+
+        Returns:
+            Dictionary with results of the processing
+        """
+        return self.processor.process_audio_file(audio_path)
+
+    def process_multiple_files(self, audio_paths):
+        """
+        Process multiple audio files
+
+        Args:
+            audio_paths: List of paths to audio files
+
+        Returns:
+            List of dictionaries with processing results
+        """
+        return self.processor.process_multiple_files(audio_paths)
+
+    def process_multiple_files_batch(self, audio_paths, poll_interval: float = 60):
+        """
+        Process multiple audio files with batch jobs (cheaper, resumable, slower)
+
+        Args:
+            audio_paths: List of paths to audio files
+            poll_interval: Seconds between job status checks
+
+        Returns:
+            List of dictionaries with processing results
+        """
+        return self.processor.process_multiple_files_batch(
+            audio_paths, poll_interval=poll_interval)
@@ -7,10 +7,14 @@ Provides high-level functions for audio processing workflows:
   - generate_image_prompt(analysis, audio_name): Creates image prompts from audio analysis
   - process_audio_file(audio_path): Processes a single audio file through the full pipeline
 
+Analyses are saved through an ArtifactStore (by default the pipeline's store under
+output_dir), since the files under output/ are read-only views of its blobs.
+
 Related files:
 - src/gemini/gemini_client.py: Main client that uses this processor
 - src/gemini/gemini_apis/audio_api.py: Lower-level audio API functions
 - src/gemini/gemini_apis/image_api.py: Used for generating images
+- src/gemini/gemini_utilities/artifact_store.py: Stores the analyses
 """
 
 import os
@@ -22,7 +26,8 @@ from pathlib import Path
 from typing import Dict, Any, List, Optional, Union
 
 from src.gemini.gemini_apis.audio_api import analyze_audio, create_audio_analysis_prompt
-from src.gemini.gemini_utilities.file_utils import save_text, save_json, ensure_directory
+from src.gemini.gemini_utilities.artifact_store import ArtifactStore, LocalArtifactStore
+from src.gemini.gemini_utilities.file_utils import save_json, ensure_directory
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -32,13 +37,16 @@ logger = logging.getLogger(__name__)
 class AudioProcessor:
     """Handles audio processing workflows for the Gemini client"""
 
-    def __init__(self, client, output_dir: str = "output"):
+    def __init__(self, client, output_dir: str = "output",
+                 artifact_store: Optional[ArtifactStore] = None):
         """
         Initialize the audio processor with client and output directories
 
         Args:
             client: Gemini client instance
             output_dir: Base directory for all outputs
+            artifact_store: Store the analyses are saved in (default: a LocalArtifactStore
+                under output_dir)
         """
         self.client = client
         self.output_dir = Path(output_dir)
@@ -47,6 +55,8 @@ class AudioProcessor:
         # Ensure directories exist
         ensure_directory(self.analysis_dir)
 
+        self.artifacts = artifact_store or LocalArtifactStore(self.output_dir)
+
         logger.info("AudioProcessor initialized")
 
     def analyze_audio(self, audio_path: Union[str, Path]) -> str:
@@ -63,7 +73,7 @@ class AudioProcessor:
         analysis_path = self.analysis_dir / f"{audio_path.stem}_analysis.txt"
 
         # Check if analysis already exists
-        if analysis_path.exists():
+        if self.artifacts.exists(analysis_path) or analysis_path.exists():
             logger.info(
                 f"Analysis already exists for {audio_path.name}, loading from file")
             return self.load_analysis(audio_path.stem)
@@ -94,19 +104,19 @@ class AudioProcessor:
             "Provide precise, quantifiable details (e.g., frequencies, timestamps, dB levels) in each section, synthesizing a multi-dimensional analysis that bridges sound and vision."
         )
 
-        # Perform the analysis using the audio_api module
+        # Perform the analysis through the Gemini client
         try:
-            from src.gemini.gemini_apis.audio_api import analyze_audio
-
-            response = analyze_audio(
-                client=self.client,
+            response = self.client.analyze_audio(
                 audio_path_or_file=audio_path,
                 prompt=prompt,
                 temperature=0.4
             )
 
             # Save the analysis
-            save_text(response, analysis_path)
+            self.artifacts.put(analysis_path, response, kind="analysis",
+                               track=audio_path.name)
+            # Callers read the file as soon as this returns, even when the store writes behind
+            self.artifacts.barrier(audio_path.name)
             logger.info(f"Saved analysis to {analysis_path}")
 
             return response
@@ -126,6 +136,9 @@ class AudioProcessor:
         """
         analysis_path = self.analysis_dir / f"{filename_stem}_analysis.txt"
 
+        analysis_text = self.artifacts.get_text(analysis_path)
+        if analysis_text is not None:
+            return analysis_text
         if not analysis_path.exists():
             logger.error(f"Analysis file not found: {analysis_path}")
             raise FileNotFoundError(
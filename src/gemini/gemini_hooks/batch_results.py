@@ -0,0 +1,153 @@
+"""
+gemini_hooks/batch_results.py - Results of the batch jobs of a pipeline run
+
+Polls a submitted job until it finishes, saves each track's result to the same output files
+an online run writes, and builds the per-track result dictionaries once every text step is
+done, generating the images online.
+
+BatchResults is the result half of BatchPipelineRunner; it expects the runner's processor,
+backend, state, poll_interval, _track() and _save_state().
+
+Exports:
+- STEP_STAGES: Step name -> catalogue stage its prompt versions are recorded under
+- BatchResults
+
+Related files:
+- src/gemini/gemini_hooks/batch_runner.py: BatchPipelineRunner
+- src/gemini/gemini_apis/batch_api.py: The backends polled here
+"""
+
+import time
+import logging
+from pathlib import Path
+from typing import Any, Dict
+
+from src.gemini.gemini_apis.batch_api import FINISHED_STATES
+from src.gemini.gemini_hooks.pipeline_steps import (
+    ANALYSIS_STEPS, IMAGE_PROMPT_STEP, REVISION_STEP, PipelineStep)
+
+logger = logging.getLogger(__name__)
+
+# Catalogue stage whose prompt versions each step's templates are recorded under
+STEP_STAGES = {step.name: "analysis" for step in ANALYSIS_STEPS}
+STEP_STAGES[REVISION_STEP.name] = "revision"
+STEP_STAGES[IMAGE_PROMPT_STEP.name] = "prompt"
+
+
+class BatchResults:
+    """Waits for batch jobs and turns their results into outputs and result dictionaries"""
+
+    def _wait(self, job: Dict[str, Any]) -> None:
+        """Poll a job until it finishes, saving each state change"""
+        while True:
+            state = self.backend.poll(job["job"])
+            if state != job["state"]:
+                logger.info(f"Batch job {job['job']} ({job['step']}): {state}")
+                job["state"] = state
+                self._save_state()
+            if state in FINISHED_STATES:
+                return
+            time.sleep(self.poll_interval)
+
+    def _collect(self, step: PipelineStep, job: Dict[str, Any]) -> None:
+        """
+        Save the results of a finished job to the tracks' output files.
+
+        Args:
+            step: The job's step
+            job: The job's state
+        """
+        if job["state"] in ("succeeded", "partially_succeeded"):
+            results = self.backend.results(job["job"])
+        else:
+            results = {}
+
+        for path in job["tracks"]:
+            audio_path = Path(path)
+            track = self._track(audio_path)
+            result = results.get(track["key"])
+            if result is None or result["error"]:
+                error = (result or {}).get("error") or f"Batch job {job['state']}"
+                logger.error(f"{step.step_name} failed for {audio_path}: {error}")
+                track["errors"][step.name] = error
+                continue
+
+            stage_versions = track["prompt_versions"].setdefault(STEP_STAGES[step.name], {})
+            stage_versions.update(job["prompt_versions"])
+            if step.filename:
+                output_path = self.processor._save_step(
+                    step, audio_path, result["text"], job["prompt_versions"])
+                track["outputs"][step.output] = str(output_path)
+            else:
+                saved = self.processor._save_image_prompt(
+                    audio_path, result["text"], job["prompt_versions"])
+                if not saved["prompt_success"]:
+                    track["errors"][step.name] = saved["prompt_error"]
+                    continue
+                track["outputs"][step.output] = saved["prompt_path"]
+
+            self.processor.client._send_to_discord(
+                response=result["text"],
+                is_final=True,
+                source=f"{step.step_name} | {audio_path.name}",
+                content_type="audio analysis" if step.listening == "analysis_listening" else "text"
+            )
+
+        # The saved state lists the outputs, so they must be on disk first
+        self.processor.artifacts.barrier()
+        self.state["jobs"].remove(job)
+        self.state["history"].append({key: job[key] for key in
+                                      ("step", "job", "model", "state", "submitted_at")})
+        self._save_state()
+
+    def _finish(self, audio_path: Path) -> Dict[str, Any]:
+        """
+        Generate the track's image online and build its result dictionary.
+
+        Args:
+            audio_path: Path to the audio file
+
+        Returns:
+            Result dictionary shaped like AudioToImageProcessor.process_audio_file's
+        """
+        track = self._track(audio_path)
+        if track["result"] is not None:
+            return track["result"]
+
+        outputs = track["outputs"]
+        errors = track["errors"]
+        analysis_errors = [errors[step.name] for step in ANALYSIS_STEPS if step.name in errors]
+        results = {
+            "audio_path": str(audio_path),
+            "analysis_success": not analysis_errors and "final_analysis" in outputs,
+            "analysis_path": None,
+            "analysis_error": analysis_errors[0] if analysis_errors else None,
+            "revised_analysis_path": outputs.get(REVISION_STEP.output),
+            "revision_success": REVISION_STEP.output in outputs,
+            "revision_error": errors.get(REVISION_STEP.name),
+            "prompt_success": IMAGE_PROMPT_STEP.output in outputs,
+            "prompt_path": outputs.get(IMAGE_PROMPT_STEP.output),
+            "prompt_error": errors.get(IMAGE_PROMPT_STEP.name),
+            "image_success": False,
+            "image_path": None,
+            "image_error": None,
+            "elided_calls": [],
+            "prompt_versions": track["prompt_versions"]
+        }
+        for step in ANALYSIS_STEPS:
+            results[step.result_key] = outputs.get(step.output)
+
+        if results["prompt_success"]:
+            try:
+                prompt_data = self.processor.artifacts.get_json(results["prompt_path"])
+                if prompt_data is None:
+                    raise FileNotFoundError(f"Prompt file not found: {results['prompt_path']}")
+                self.processor._merge_result(
+                    results, self.processor.generate_image(audio_path, prompt_data))
+            except Exception as e:
+                logger.exception(f"Error generating image for {audio_path}: {str(e)}")
+                results["image_error"] = str(e)
+
+        track["result"] = results
+        self._save_state()
+        return results
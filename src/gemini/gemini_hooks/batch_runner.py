@@ -0,0 +1,269 @@
+"""
+gemini_hooks/batch_runner.py - Offline batch runs of the pipeline over many tracks
+
+Runs the text steps of the pipeline for a whole catalogue as batch jobs: one job per step
+holds that step's request for every track, and all tracks advance stage by stage (all
+step 1 analyses, then all step 2 analyses, ...). Prompts come from the same step
+definitions as the online path and results are saved to the same artifacts, so a batch run
+leaves the output directory exactly as an online run would.
+
+The run's state (uploaded audio files, step outputs, errors, the ids of submitted jobs and
+the API key they belong to) is saved after every change, so a restarted process picks the
+run up where it stopped and polls the jobs it already submitted instead of submitting them
+again.
+
+Image generation is not a batch operation; once a track's image prompt is ready, its image
+is generated online with the processor.
+
+Exports:
+- BatchPipelineRunner(processor: AudioToImageProcessor, backend: BatchBackend,
+  state_path: Path = None, poll_interval: float = 60, max_output_tokens: int = 8192)
+  - run(audio_paths: List[Union[str, Path]]) -> List[Dict[str, Any]]
+
+Related files:
+- src/gemini/gemini_hooks/batch_results.py: Polls the jobs and saves their results
+- src/gemini/gemini_hooks/pipeline_steps.py: Step definitions shared with the online path
+- src/gemini/gemini_apis/batch_api.py: Gemini and local batch backends
+- src/gemini/gemini_hooks/audio_to_image_processor.py: Prompts, output files, image stage
+"""
+
+import os
+import json
+import time
+import logging
+import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+from src.gemini.gemini_apis.batch_api import BatchBackend, build_request, write_requests
+from src.gemini.gemini_hooks.pipeline_steps import (
+    ANALYSIS_STEPS, IMAGE_PROMPT_STEP, REVISION_STEP, PipelineStep)
+# STEP_STAGES is re-exported, so callers keep importing it from here
+from src.gemini.gemini_hooks.batch_results import STEP_STAGES, BatchResults
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+STATE_VERSION = 1
+
+DEFAULT_POLL_INTERVAL = 60
+
+# The Files API deletes uploads after 48 hours; older uploads are replaced before a stage
+UPLOAD_MAX_AGE = 46 * 3600
+
+# A failed revision falls back to the refined analysis; any other failure ends the track
+NON_FATAL_STEPS = (REVISION_STEP.name,)
+
+
+class BatchPipelineRunner(BatchResults):
+    """Runs the pipeline's text steps for many tracks as resumable batch jobs"""
+
+    def __init__(self, processor, backend: BatchBackend, state_path: Optional[Path] = None,
+                 poll_interval: float = DEFAULT_POLL_INTERVAL, max_output_tokens: int = 8192):
+        """
+        Initialize the runner.
+
+        Args:
+            processor: AudioToImageProcessor that renders prompts and owns the output files
+            backend: Batch backend the jobs are submitted to
+            state_path: File the run's state is kept in (default output/batch/batch_state.json)
+            poll_interval: Seconds between job status checks
+            max_output_tokens: Maximum response tokens per request
+        """
+        self.processor = processor
+        self.backend = backend
+        self.state_path = Path(state_path or processor.output_dir / "batch" / "batch_state.json")
+        self.work_dir = self.state_path.parent
+        self.poll_interval = poll_interval
+        self.max_output_tokens = max_output_tokens
+        self.state = self._load_state()
+        # Uploads and jobs of a resumed run belong to the key that created them
+        if self.state.get("backend_key") and (
+                self.state["jobs"] or any(track["file"] for track in self.state["tracks"].values())):
+            self.backend.key = self.state["backend_key"]
+
+    def _load_state(self) -> Dict[str, Any]:
+        """Load the saved state, or start an empty one"""
+        if self.state_path.exists():
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+            if state.get("version") == STATE_VERSION:
+                if state["jobs"]:
+                    logger.info(f"Resuming batch run with {len(state['jobs'])} submitted jobs")
+                return state
+            logger.warning(f"Ignoring batch state of version {state.get('version')}")
+        return {"version": STATE_VERSION, "next_key": 0, "tracks": {}, "jobs": [],
+                "history": []}
+
+    def _save_state(self) -> None:
+        """Save the state atomically, so a crash never leaves a half-written file"""
+        self.state["backend_key"] = self.backend.key
+        self.work_dir.mkdir(parents=True, exist_ok=True)
+        temp_path = self.state_path.with_suffix(".tmp")
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(self.state, f, indent=2)
+        os.replace(temp_path, self.state_path)
+
+    def run(self, audio_paths: List[Union[str, Path]]) -> List[Dict[str, Any]]:
+        """
+        Run the pipeline for the tracks, resuming a run that was interrupted.
+
+        Args:
+            audio_paths: Paths to the audio files
+
+        Returns:
+            List of result dictionaries shaped like AudioToImageProcessor.process_audio_file's
+        """
+        paths = [Path(audio_path) for audio_path in audio_paths]
+        for audio_path in paths:
+            self._track(audio_path)
+        self._save_state()
+
+        for step in ANALYSIS_STEPS + [REVISION_STEP, IMAGE_PROMPT_STEP]:
+            self._run_stage(step, paths)
+
+        results = [self._finish(audio_path) for audio_path in paths]
+        self.processor.image_post_processor.wait()
+
+        # The run is complete; its tracks start over the next time they are processed
+        for audio_path in paths:
+            self.state["tracks"].pop(str(audio_path), None)
+        self._save_state()
+
+        success_count = sum(1 for result in results if result.get("image_success", False))
+        logger.info(f"Batch run processed {len(results)} files, {success_count} successful")
+        return results
+
+    def _track(self, audio_path: Path) -> Dict[str, Any]:
+        """Get a track's state, registering the track on first sight"""
+        track = self.state["tracks"].get(str(audio_path))
+        if track is not None:
+            return track
+
+        track = {"key": f"track-{self.state['next_key']}", "file": None, "outputs": {},
+                 "errors": {}, "prompt_versions": {}, "result": None}
+        self.state["next_key"] += 1
+        self.state["tracks"][str(audio_path)] = track
+
+        if not audio_path.exists():
+            track["errors"][ANALYSIS_STEPS[0].name] = "Audio file not found"
+            return track
+
+        # Analyses saved by an earlier run are reused unless their prompts changed
+        catalogue = self.processor.catalogue
+        if not (catalogue and catalogue.prompts_changed(audio_path, "analysis")):
+            for step in ANALYSIS_STEPS:
+                step_path = step.output_path(self.processor.analysis_dir, audio_path.stem)
+                if (self.processor._has_output(step_path, "analysis", audio_path) and
+                        not self.processor.artifacts.is_stale(step_path)):
+                    track["outputs"][step.output] = str(step_path)
+            if track["outputs"]:
+                logger.info(f"Using {len(track['outputs'])} existing analysis files for "
+                            f"{audio_path}")
+        return track
+
+    @staticmethod
+    def _failed(track: Dict[str, Any]) -> bool:
+        """Whether a step the rest of the track depends on failed"""
+        return any(name not in NON_FATAL_STEPS for name in track["errors"])
+
+    def _inputs(self, step: PipelineStep, audio_path: Path,
+                track: Dict[str, Any]) -> Optional[Dict[str, str]]:
+        """
+        Read the earlier results a step's prompt is filled with.
+
+        Args:
+            step: The step
+            audio_path: Path to the audio file
+            track: The track's state
+
+        Returns:
+            Template slot -> text, or None if an input is missing
+        """
+        outputs = track["outputs"]
+        if step is IMAGE_PROMPT_STEP:
+            # Same choice as the online path: revised, then refined, then final analysis
+            for slot in ("revised_analysis", "refined_analysis", "final_analysis"):
+                if slot in outputs:
+                    analysis_text = self.processor.artifacts.get_text(outputs[slot])
+                    return {"analysis_text": self.processor._image_prompt_analysis(
+                        audio_path, analysis_text)}
+            return None
+
+        if not all(slot in outputs for slot in step.inputs):
+            return None
+        return {slot: self.processor.artifacts.get_text(outputs[slot]) for slot in step.inputs}
+
+    def _audio_file(self, audio_path: Path, track: Dict[str, Any]) -> Dict[str, str]:
+        """Get the track's uploaded audio file, uploading it again if it may have expired"""
+        uploaded = track["file"]
+        if uploaded is None or time.time() - uploaded["uploaded_at"] > UPLOAD_MAX_AGE:
+            uploaded = dict(self.backend.upload_audio(audio_path), uploaded_at=time.time())
+            track["file"] = uploaded
+            self._save_state()
+        return uploaded
+
+    def _model(self, step: PipelineStep) -> str:
+        """Model the step's job runs on: the router's preferred tier for the step"""
+        router = getattr(self.processor.client, "model_router", None)
+        if router is not None:
+            candidates = router.candidates(step.step_name)
+            if candidates:
+                return candidates[0][0].model
+        return self.processor.client.model_name
+
+    def _run_stage(self, step: PipelineStep, paths: List[Path]) -> None:
+        """
+        Bring every track through one step: finish the step's jobs submitted before a
+        restart, then submit one job for the tracks that still need the step.
+
+        Args:
+            step: The step
+            paths: Paths of the run's tracks
+        """
+        for job in [job for job in self.state["jobs"] if job["step"] == step.name]:
+            self._wait(job)
+            self._collect(step, job)
+
+        requests = []
+        job_tracks = []
+        prompt_versions: Dict[str, str] = {}
+        for audio_path in paths:
+            track = self._track(audio_path)
+            if (track["result"] is not None or self._failed(track) or
+                    step.output in track["outputs"] or step.name in track["errors"]):
+                continue
+            inputs = self._inputs(step, audio_path, track)
+            if inputs is None:
+                continue
+            try:
+                audio_file = self._audio_file(audio_path, track)
+            except Exception as e:
+                logger.error(f"Failed to upload {audio_path} for {step.step_name}: {str(e)}")
+                track["errors"][step.name] = str(e)
+                continue
+
+            prompt = self.processor._step_prompt(step, inputs, prompt_versions, listening=True)
+            requests.append(build_request(track["key"], prompt, audio_file, step.temperature,
+                                          max_output_tokens=self.max_output_tokens))
+            job_tracks.append(str(audio_path))
+
+        if not requests:
+            self._save_state()
+            return
+
+        requests_path = self.work_dir / f"{step.name}_{int(time.time())}.jsonl"
+        write_requests(requests_path, requests)
+        model = self._model(step)
+        job_name = self.backend.submit(
+            model, requests_path, display_name=f"{step.name}-{len(requests)}-tracks")
+        job = {"step": step.name, "job": job_name, "model": model, "tracks": job_tracks,
+               "prompt_versions": prompt_versions, "state": "pending",
+               "submitted_at": datetime.datetime.now().isoformat()}
+        self.state["jobs"].append(job)
+        self._save_state()
+        logger.info(f"{step.step_name}: {len(requests)} tracks submitted as {job_name}")
+
+        self._wait(job)
+        self._collect(step, job)
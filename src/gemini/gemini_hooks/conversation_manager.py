@@ -4,31 +4,55 @@ conversation_manager.py - Conversation management for Gemini API
 Provides functionality for:
 - Creating and managing chat sessions with Gemini API
 - Sending messages in a conversation context
+- Streaming responses on an event loop, relayed to sinks with back-pressure
 - Retrieving conversation history
+- Keeping long conversations bounded by compacting their history
+
+Every chat turn resends the whole history, so after each turn the manager compacts the
+history in the background (see history_compaction.py).
 
 Dependencies:
-- google.generativeai
+- google.genai (through the shared transport)
 - PIL
 - typing
 
 Related files:
+- src/gemini/gemini_hooks/history_compaction.py: Offloading and summarising old turns
+- src/gemini/gemini_apis/transport.py
+- src/gemini/gemini_hooks/stream_relay.py: Sinks for astream_message
+- src/gemini/gemini_apis/token_accounting.py: History token estimates
+- src/gemini/gemini_prompts/analysis_prompts.py: get_conversation_summary_prompt
 - src/gemini/gemini_utilities/rate_limiter.py
 - src/gemini/gemini_client.py
 """
 
 import logging
-from typing import List, Dict, Any, Optional, Union, Generator
+from typing import List, Dict, Any, AsyncIterator, Iterable, Optional, Union, Generator
 from PIL import Image
-import google.generativeai as genai
 from ..gemini_utilities.rate_limiter import RateLimiter
+from ..gemini_utilities.lazy_import import lazy_import
+from ..gemini_apis.transport import as_transport
+from ..gemini_apis.chat_api import stream_message_async
+from .stream_relay import StreamSink, chunk_texts, relay_stream
+# The compaction settings are re-exported, so callers keep importing them from here
+from .history_compaction import (DEFAULT_KEEP_RECENT_TURNS, DEFAULT_MAX_HISTORY_TOKENS,
+                                 DEFAULT_OFFLOAD_INLINE_BYTES, COMPACTION_WORKERS,
+                                 SUMMARY_ACKNOWLEDGEMENT, SUMMARY_PREFIX, HistoryCompaction)
+
+# The SDK is imported when the first chat is created rather than at startup
+types = lazy_import("google.genai.types")
 
 logger = logging.getLogger(__name__)
 
 
-class ConversationManager:
+class ConversationManager(HistoryCompaction):
     """Manages conversations/chat sessions with Gemini API"""
 
-    def __init__(self, api_key: str, model_name: str, rate_limiter: RateLimiter):
+    def __init__(self, api_key: str, model_name: str, rate_limiter: RateLimiter, transport=None,
+                 max_history_tokens: Optional[int] = DEFAULT_MAX_HISTORY_TOKENS,
+                 keep_recent_turns: int = DEFAULT_KEEP_RECENT_TURNS,
+                 offload_inline_bytes: Optional[int] = DEFAULT_OFFLOAD_INLINE_BYTES,
+                 summary_model: Optional[str] = None):
         """
         Initialize the conversation manager.
 
@@ -36,29 +60,73 @@ class ConversationManager:
             api_key: Gemini API key
             model_name: The model to use for the conversation
             rate_limiter: Rate limiter instance to control API usage
+            transport: Optional shared transport (or modern client) to send messages through
+            max_history_tokens: Estimated history tokens above which old turns are
+                summarised (None to never summarise)
+            keep_recent_turns: Number of recent turns that are never summarised
+            offload_inline_bytes: Size from which inline parts are replaced by uploaded
+                file references (None to keep them inline)
+            summary_model: Model that writes the summaries (defaults to model_name)
         """
         self.api_key = api_key
         self.model_name = model_name
         self.rate_limiter = rate_limiter
+        # Turns count against this manager's limiter through the transport's middleware
+        self.transport = as_transport(transport, api_key=api_key).limited_by(rate_limiter)
         self.current_chat = None
+        self.system_instruction = None
+
+        super().__init__(model_name, max_history_tokens, keep_recent_turns,
+                         offload_inline_bytes, summary_model)
 
-    def create_chat(self, system_instruction: Optional[str] = None) -> None:
+    def create_chat(self, system_instruction: Optional[str] = None,
+                    history: Optional[List[Any]] = None) -> None:
         """
         Create a new chat session.
 
         Args:
             system_instruction: Optional system instruction to guide model behavior
+            history: Optional earlier messages (SDK Contents) to continue from
         """
-        # Create chat doesn't count against rate limit
+        # Create chat doesn't count against rate limit; a running compaction is for the old chat
+        pending, self._pending = self._pending, None
+        if pending is not None:
+            pending.result()
+        # The new chat may use another key, which cannot see the files uploaded so far
+        self._offloaded.clear()
 
-        # Get the generative model
-        model = genai.GenerativeModel(
-            model_name=self.model_name,
-            system_instruction=system_instruction
-        )
+        # The system instruction is sent natively with every turn of the chat
+        self.system_instruction = system_instruction
 
         # Start a new chat session
-        self.current_chat = model.start_chat(history=[])
+        self.current_chat = self.transport.create_chat(
+            model=self.model_name,
+            config=self._message_config(),
+            history=list(history or [])
+        )
+        with self._lock:
+            self._stats.update(history_tokens=self._history_tokens(history or []),
+                               resident_bytes=self._resident_bytes(history or []))
+
+    def _message_config(self, temperature: Optional[float] = None):
+        """
+        Build the generation config for a chat turn.
+
+        A config passed with a message replaces the chat's own, so the system
+        instruction is repeated in every per-message config.
+
+        Args:
+            temperature: Optional temperature for this turn
+
+        Returns:
+            GenerateContentConfig, or None if there is nothing to set
+        """
+        if temperature is None and not self.system_instruction:
+            return None
+        return types.GenerateContentConfig(
+            temperature=temperature,
+            system_instruction=self.system_instruction
+        )
 
     def send_message(self,
                      message: Union[str, List[Union[str, Dict, Image.Image]]],
@@ -73,18 +141,18 @@ class ConversationManager:
         Returns:
             Response text
         """
-        # Apply rate limiting
-        self.rate_limiter.check_and_wait()
-
+        self._apply_compaction()
         if not self.current_chat:
             self.create_chat()
 
         # Send the message to the chat
-        response = self.current_chat.send_message(
+        response = self.transport.send_message(
+            self.current_chat,
             message,
-            generation_config={"temperature": temperature}
+            config=self._message_config(temperature)
         )
 
+        self._schedule_compaction()
         return response.text
 
     def stream_message(self,
@@ -100,23 +168,55 @@ class ConversationManager:
         Returns:
             Generator yielding response chunks
         """
-        # Apply rate limiting
-        self.rate_limiter.check_and_wait()
-
+        self._apply_compaction()
         if not self.current_chat:
             self.create_chat()
 
         # Send the message to the chat with streaming
-        response = self.current_chat.send_message(
+        response = self.transport.send_message_stream(
+            self.current_chat,
             message,
-            generation_config={"temperature": temperature},
-            stream=True
+            config=self._message_config(temperature)
         )
 
         for chunk in response:
             if chunk.text:
                 yield chunk.text
 
+        # The turn is in the history once the stream is exhausted
+        self._schedule_compaction()
+
+    async def astream_message(self,
+                              message: Union[str, List[Union[str, Dict, Image.Image]]],
+                              temperature: float = 0.7,
+                              sinks: Iterable[StreamSink] = ()) -> AsyncIterator[str]:
+        """
+        Stream a message in the current chat session on the event loop.
+
+        Many conversations can stream on one loop without a thread each. The chunks are
+        relayed to the sinks, and a sink that falls behind slows the stream down. If the
+        task iterating the stream is cancelled, the turn is not added to the history.
+
+        Args:
+            message: The message to send - can be text, image, or a list of content items
+            temperature: Controls randomness (0.0-2.0)
+            sinks: Optional sinks that receive the chunks (e.g. a DiscordStreamSink)
+
+        Yields:
+            Response text chunks
+        """
+        self._apply_compaction()
+        if not self.current_chat:
+            self.create_chat()
+
+        stream = stream_message_async(self.current_chat, message, client=self.transport,
+                                      config=self._message_config(temperature))
+        async for text in relay_stream(chunk_texts(stream), sinks):
+            yield text
+
+        # The turn is in the history once the stream is exhausted
+        self._schedule_compaction()
+
     def get_chat_history(self) -> List[Dict[str, Any]]:
         """
         Get the history of the current chat session.
@@ -125,12 +225,13 @@ class ConversationManager:
             List of messages in the chat history
         """
         # Get history doesn't count against rate limit
+        self._wait_for_compaction()
 
         if not self.current_chat:
             return []
 
         history = []
-        for message in self.current_chat.history:
+        for message in self.current_chat.get_history():
             role = "user" if message.role == "user" else "model"
 
             # Extract content which might be text or binary data
@@ -146,6 +247,13 @@ class ConversationManager:
                             "data_type": "binary_data"
                         }
                         break
+                    elif hasattr(part, "file_data") and part.file_data:
+                        content = {
+                            "mime_type": part.file_data.mime_type,
+                            "data_type": "file_reference",
+                            "file_uri": part.file_data.file_uri
+                        }
+                        break
 
             history.append({
                 "role": role,
@@ -153,3 +261,17 @@ class ConversationManager:
             })
 
         return history
+
+    def get_history_contents(self) -> List[Any]:
+        """
+        Get the raw history of the current chat session, after any running compaction.
+
+        Returns:
+            List of SDK Contents
+        """
+        self._wait_for_compaction()
+        return list(self.current_chat.get_history()) if self.current_chat else []
+
+    def close(self) -> None:
+        """Finish a running compaction"""
+        self._wait_for_compaction()
@@ -0,0 +1,278 @@
+"""
+history_compaction.py - Keeping long conversations bounded
+
+Every chat turn resends the whole history, so without bounds a long session grows in
+memory, input tokens and latency with each turn. After each turn the manager compacts
+the history in the background: inline images and other binary parts of at least
+offload_inline_bytes are uploaded with the Files API and replaced by file references,
+and once the history is estimated above max_history_tokens every turn except the last
+keep_recent_turns is replaced by a model-written summary. Compaction never holds up a
+turn: a turn that starts while it is still running is sent on the uncompacted chat, and the
+next turn after it finishes continues in a chat of the compacted history followed by the
+turns sent in the meantime. Uploads and the compacted chat use the key of the chat they
+replace, so a key pool never sees a history that refers to another key's files. All
+managers share a few compaction threads.
+
+Uploaded files expire after 48 hours, so sessions that run longer than that should be
+recreated from the summary.
+
+HistoryCompaction is the compaction half of ConversationManager; it expects the manager's
+transport, model_name, current_chat and _message_config().
+
+Exports:
+- DEFAULT_MAX_HISTORY_TOKENS, DEFAULT_KEEP_RECENT_TURNS, DEFAULT_OFFLOAD_INLINE_BYTES,
+  COMPACTION_WORKERS, SUMMARY_PREFIX, SUMMARY_ACKNOWLEDGEMENT
+- HistoryCompaction(model_name, max_history_tokens, keep_recent_turns,
+                    offload_inline_bytes, summary_model)
+  - get_compaction_stats() -> Dict[str, Any]
+
+Related files:
+- src/gemini/gemini_hooks/conversation_manager.py: ConversationManager
+- src/gemini/gemini_hooks/history_offload.py: Moving large inline parts to the Files API
+- src/gemini/gemini_apis/token_accounting.py: History token estimates
+- src/gemini/gemini_prompts/analysis_prompts.py: get_conversation_summary_prompt
+"""
+
+import time
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import List, Dict, Any, Optional
+from ..gemini_utilities.lazy_import import lazy_import
+from ..gemini_apis.middleware import call_context
+from ..gemini_apis.token_accounting import TokenAccountant, TokenAccountingMiddleware
+from ..gemini_prompts.prompt_registry import prompt_registry
+# The offload setting is re-exported, so callers keep importing it from here
+from .history_offload import DEFAULT_OFFLOAD_INLINE_BYTES, HistoryOffload
+
+types = lazy_import("google.genai.types")
+
+logger = logging.getLogger(__name__)
+
+# Estimated history tokens above which old turns are summarised
+DEFAULT_MAX_HISTORY_TOKENS = 32_000
+
+# Turns (a user message and the model's reply) that are always kept verbatim
+DEFAULT_KEEP_RECENT_TURNS = 6
+
+# Threads that compact the histories of all managers
+COMPACTION_WORKERS = 4
+
+SUMMARY_PREFIX = "Summary of the earlier conversation:\n"
+SUMMARY_ACKNOWLEDGEMENT = "Understood. I will continue from this summary."
+
+
+_executor_lock = threading.Lock()
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def _compaction_executor() -> ThreadPoolExecutor:
+    """Worker pool shared by all managers, so many conversations do not need a thread each"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=COMPACTION_WORKERS,
+                                           thread_name_prefix="chat-compaction")
+        return _executor
+
+
+class HistoryCompaction(HistoryOffload):
+    """Background compaction of a conversation's history"""
+
+    def __init__(self, model_name: str, max_history_tokens: Optional[int],
+                 keep_recent_turns: int, offload_inline_bytes: Optional[int],
+                 summary_model: Optional[str]):
+        """
+        Set up compaction; the transport must already be set.
+
+        Args:
+            model_name: The conversation's model
+            max_history_tokens: Estimated history tokens above which old turns are
+                summarised (None to never summarise)
+            keep_recent_turns: Number of recent turns that are never summarised
+            offload_inline_bytes: Size from which inline parts are replaced by uploaded
+                file references (None to keep them inline)
+            summary_model: Model that writes the summaries (defaults to model_name)
+        """
+        self.max_history_tokens = max_history_tokens
+        self.keep_recent_turns = max(keep_recent_turns, 1)
+        self.offload_inline_bytes = offload_inline_bytes
+        self.summary_model = summary_model or model_name
+
+        # History estimates share the transport's accountant (and its calibration)
+        layer = self.transport.layer(TokenAccountingMiddleware)
+        self.accountant = layer.accountant if layer is not None else TokenAccountant()
+
+        self._lock = threading.Lock()
+        self._pending: Optional[Future] = None
+        # sha256 of offloaded data -> uploaded file part, so repeated media upload once
+        self._offloaded: Dict[str, Any] = {}
+        self._stats = {
+            "compactions": 0,
+            "summarised_turns": 0,
+            "tokens_saved": 0,
+            "offloaded_parts": 0,
+            "offloaded_bytes": 0,
+            "history_tokens": 0,
+            "resident_bytes": 0,
+            "last_compaction_seconds": 0.0
+        }
+
+    def get_compaction_stats(self) -> Dict[str, Any]:
+        """
+        Get statistics about history compaction in this manager.
+
+        Returns:
+            Dictionary with the number of compactions, summarised turns, estimated input
+            tokens saved per turn, offloaded parts and bytes, and the current history's
+            estimated tokens and resident bytes
+        """
+        self._wait_for_compaction()
+        with self._lock:
+            return dict(self._stats)
+
+    def _wait_for_compaction(self) -> None:
+        """Block until a scheduled compaction has finished and continue in its chat"""
+        pending = self._pending
+        if pending is not None:
+            pending.result()
+            self._apply_compaction()
+
+    def _apply_compaction(self) -> None:
+        """Continue in the compacted chat if a compaction has finished, without waiting for one"""
+        pending = self._pending
+        if pending is None or not pending.done():
+            return
+        self._pending = None
+        result = pending.result()
+        if result is None or result[0] is not self.current_chat:
+            return
+
+        chat, history, compacted_length = result
+        # Turns sent while the compaction ran follow the compacted history verbatim
+        history = history + list(chat.get_history())[compacted_length:]
+        self.current_chat = self.transport.create_chat(
+            model=self.model_name,
+            config=self._message_config(),
+            history=history,
+            continues=chat
+        )
+        with self._lock:
+            self._stats.update(history_tokens=self._history_tokens(history),
+                               resident_bytes=self._resident_bytes(history))
+
+    def _schedule_compaction(self) -> None:
+        """Compact the history in the background after a turn"""
+        if self.max_history_tokens is None and self.offload_inline_bytes is None:
+            return
+        if self._pending is not None:
+            # Still running; the turn after it is applied schedules the next one
+            return
+        chat = self.current_chat
+        self._pending = _compaction_executor().submit(self._compact, chat,
+                                                      list(chat.get_history()))
+
+    def _compact(self, chat: Any, history: List[Any]) -> Optional[tuple]:
+        """
+        Offload large inline parts and summarise old turns of a chat's history.
+
+        Failures are logged and leave the chat as it is.
+
+        Args:
+            chat: The chat session to compact
+            history: Its history when the compaction was scheduled
+
+        Returns:
+            Tuple of the chat, the compacted history and the number of messages it
+            replaces, or None if nothing was compacted
+        """
+        started = time.monotonic()
+        try:
+            compacted_length = len(history)
+            history = list(history)
+            before = self._history_tokens(history)
+
+            offloaded = self._offload_inline_parts(history, chat)
+            turns = self._split_turns(history)
+            summarised = 0
+            if (self.max_history_tokens is not None
+                    and self._history_tokens(history) > self.max_history_tokens
+                    and len(turns) > self.keep_recent_turns):
+                old = turns[:-self.keep_recent_turns]
+                summary = self._summarise([content for turn in old for content in turn])
+                history = [
+                    types.Content(role="user", parts=[types.Part.from_text(
+                        text=SUMMARY_PREFIX + summary)]),
+                    types.Content(role="model", parts=[types.Part.from_text(
+                        text=SUMMARY_ACKNOWLEDGEMENT)])
+                ] + [content for turn in turns[-self.keep_recent_turns:] for content in turn]
+                summarised = len(old)
+
+            after = self._history_tokens(history)
+            if offloaded or summarised:
+                logger.info(f"Compacted chat history: {summarised} turns summarised, "
+                            f"{offloaded} parts offloaded, {before} -> {after} tokens")
+
+            with self._lock:
+                if offloaded or summarised:
+                    self._stats["compactions"] += 1
+                    self._stats["summarised_turns"] += summarised
+                    self._stats["tokens_saved"] += max(before - after, 0)
+                    self._stats["last_compaction_seconds"] = round(
+                        time.monotonic() - started, 3)
+                self._stats["history_tokens"] = after
+                self._stats["resident_bytes"] = self._resident_bytes(history)
+            if offloaded or summarised:
+                # The next turn continues in a chat that starts from the compacted history
+                return chat, history, compacted_length
+        except Exception as e:
+            logger.warning(f"Chat history compaction failed, keeping the history: {str(e)}")
+        return None
+
+    def _history_tokens(self, history: List[Any]) -> int:
+        """Estimated input tokens of a history"""
+        return self.accountant.estimate(history)["total"]
+
+    @staticmethod
+    def _split_turns(history: List[Any]) -> List[List[Any]]:
+        """Group a history into turns, each starting with a user message"""
+        turns = []
+        for content in history:
+            if content.role == "user" or not turns:
+                turns.append([])
+            turns[-1].append(content)
+        return turns
+
+    def _summarise(self, contents: List[Any]) -> str:
+        """
+        Summarise old turns with the summary model.
+
+        Args:
+            contents: The turns' messages
+
+        Returns:
+            str: Summary text
+        """
+        lines = []
+        for content in contents:
+            texts = []
+            for part in getattr(content, "parts", None) or []:
+                if getattr(part, "text", None):
+                    texts.append(part.text)
+                elif getattr(part, "file_data", None) is not None:
+                    texts.append(f"[{part.file_data.mime_type} file]")
+                elif getattr(part, "inline_data", None) is not None:
+                    texts.append(f"[{part.inline_data.mime_type} data]")
+            lines.append(f"{content.role}: {' '.join(texts)}")
+
+        prompt = prompt_registry.render("conversation_summary",
+                                        transcript="\n\n".join(lines))["text"]
+        with call_context(step="Conversation compaction"):
+            response = self.transport.generate_content(
+                model=self.summary_model,
+                contents=prompt,
+                config=types.GenerateContentConfig(temperature=0.2)
+            )
+        if not response.text:
+            raise ValueError("Empty summary")
+        return response.text.strip()
@@ -0,0 +1,90 @@
+"""
+history_offload.py - Large inline parts of a chat history moved to the Files API
+
+Inline images and other binary parts of at least offload_inline_bytes are uploaded once
+(with the key of the chat they belong to) and replaced by file references, so the history
+neither holds them in memory nor resends them with every turn. Uploaded files expire after
+48 hours.
+
+HistoryOffload is used by HistoryCompaction; it expects the manager's transport,
+offload_inline_bytes, _offloaded, _lock and _stats.
+
+Exports:
+- DEFAULT_OFFLOAD_INLINE_BYTES: Size from which inline parts are offloaded
+- HistoryOffload
+
+Related files:
+- src/gemini/gemini_hooks/history_compaction.py: Offloads before summarising
+"""
+
+import io
+import hashlib
+from typing import List, Any
+from ..gemini_utilities.lazy_import import lazy_import
+
+types = lazy_import("google.genai.types")
+
+# Inline parts of at least this many bytes are moved to the Files API
+DEFAULT_OFFLOAD_INLINE_BYTES = 64 * 1024
+
+
+class HistoryOffload:
+    """Replaces large inline parts of a history with uploaded file references"""
+
+    @staticmethod
+    def _resident_bytes(history: List[Any]) -> int:
+        """Bytes of text and inline data a history holds in memory"""
+        size = 0
+        for content in history:
+            for part in getattr(content, "parts", None) or []:
+                if getattr(part, "text", None):
+                    size += len(part.text.encode("utf-8"))
+                inline_data = getattr(part, "inline_data", None)
+                if inline_data is not None and inline_data.data:
+                    size += len(inline_data.data)
+        return size
+
+    def _offload_inline_parts(self, history: List[Any], chat: Any = None) -> int:
+        """
+        Replace large inline parts of a history with uploaded file references.
+
+        Args:
+            history: Chat history; its contents are replaced in place
+            chat: Chat the history belongs to (the files are uploaded with its key)
+
+        Returns:
+            int: Number of parts replaced
+        """
+        if self.offload_inline_bytes is None:
+            return 0
+
+        replaced = 0
+        for index, content in enumerate(history):
+            parts = list(getattr(content, "parts", None) or [])
+            changed = False
+            for part_index, part in enumerate(parts):
+                inline_data = getattr(part, "inline_data", None)
+                if inline_data is None or len(inline_data.data or b"") < self.offload_inline_bytes:
+                    continue
+                parts[part_index] = self._upload_part(inline_data.data, inline_data.mime_type,
+                                                      chat)
+                changed = True
+                replaced += 1
+            if changed:
+                history[index] = types.Content(role=content.role, parts=parts)
+        return replaced
+
+    def _upload_part(self, data: bytes, mime_type: str, chat: Any = None) -> Any:
+        """Upload inline data once (with the chat's key) and get a file part referencing it"""
+        digest = hashlib.sha256(data).hexdigest()
+        part = self._offloaded.get(digest)
+        if part is None:
+            uploaded = self.transport.upload_file(file=io.BytesIO(data),
+                                                  config={"mime_type": mime_type}, chat=chat)
+            part = types.Part.from_uri(file_uri=uploaded.uri,
+                                       mime_type=uploaded.mime_type or mime_type)
+            self._offloaded[digest] = part
+            with self._lock:
+                self._stats["offloaded_parts"] += 1
+                self._stats["offloaded_bytes"] += len(data)
+        return part
@@ -5,13 +5,17 @@ Provides high-level functions for image processing workflows:
 - ImageProcessor: A class that handles the image processing pipeline
   - generate_image(prompt_data, output_filename): Generates an image from a prompt
   - save_prompt(prompt_data, filename): Saves a prompt to a JSON file
-  
+
+Prompts and images are saved through an ArtifactStore (by default the pipeline's store
+under output_dir), since the files under output/ are read-only views of its blobs.
+
 Related files:
 - src/gemini/gemini_client.py: Main client that uses this processor
 - src/gemini/gemini_apis/image_api.py: Lower-level image API functions
-- src/gemini/gemini_utilities/file_utils.py: File utilities for saving images
+- src/gemini/gemini_utilities/artifact_store.py: Stores the prompts and images
 """
 
+import io
 import os
 import json
 import logging
@@ -19,7 +23,8 @@ from pathlib import Path
 from typing import Dict, Any, Optional, Union, Tuple
 from PIL import Image
 
-from src.gemini.gemini_utilities.file_utils import save_json, save_image, ensure_directory
+from src.gemini.gemini_utilities.artifact_store import ArtifactStore, LocalArtifactStore
+from src.gemini.gemini_utilities.file_utils import ensure_directory
 from src.gemini.gemini_apis.image_api import create_fallback_image
 
 # Set up logging
@@ -30,13 +35,16 @@ logger = logging.getLogger(__name__)
 class ImageProcessor:
     """Handles image processing workflows for the Gemini client"""
 
-    def __init__(self, client, output_dir: str = "output"):
+    def __init__(self, client, output_dir: str = "output",
+                 artifact_store: Optional[ArtifactStore] = None):
         """
         Initialize the image processor with client and output directories
 
         Args:
             client: Gemini client instance
             output_dir: Base directory for all outputs
+            artifact_store: Store the prompts and images are saved in (default: a
+                LocalArtifactStore under output_dir)
         """
         self.client = client
         self.output_dir = Path(output_dir)
@@ -47,8 +55,22 @@ class ImageProcessor:
         ensure_directory(self.image_dir)
         ensure_directory(self.prompt_dir)
 
+        self.artifacts = artifact_store or LocalArtifactStore(self.output_dir)
+
         logger.info("ImageProcessor initialized")
 
+    def _save_image(self, image: Any, image_path: Path, track: Optional[str]) -> None:
+        """Store a GeneratedImage (as its raw bytes) or PIL image (as PNG)"""
+        data = getattr(image, "data", None)
+        if data is None:
+            buffer = io.BytesIO()
+            image.save(buffer, format="PNG")
+            data = buffer.getvalue()
+        self.artifacts.put(image_path, data, kind="image", track=track,
+                           media_type=getattr(image, "mime_type", None))
+        # Callers open the file as soon as this returns, even when the store writes behind
+        self.artifacts.barrier(track)
+
     def save_prompt(self, prompt_data: Dict[str, Any], filename: str) -> Path:
         """
         Save a prompt to a JSON file
@@ -61,7 +83,9 @@ class ImageProcessor:
             Path: Path to the saved prompt file
         """
         prompt_path = self.prompt_dir / f"{filename}_prompt.json"
-        save_json(prompt_data, prompt_path)
+        self.artifacts.put(prompt_path, prompt_data, kind="prompt",
+                           track=prompt_data.get("audio_file"))
+        self.artifacts.barrier(prompt_data.get("audio_file"))
         return prompt_path
 
     def generate_image(self, prompt_data: Dict[str, Any], output_filename: str) -> Tuple[Optional[str], Optional[Path]]:
@@ -76,6 +100,7 @@ class ImageProcessor:
             Tuple of (description, image_path)
         """
         logger.info(f"Generating image for prompt: {output_filename}")
+        track = prompt_data.get("audio_file")
 
         # Extract the prompt text
         prompt_text = prompt_data.get("prompt", "")
@@ -110,9 +135,10 @@ class ImageProcessor:
             )
 
             if generated_image:
-                # Save the image
-                image_path = self.image_dir / f"{output_filename}_image.png"
-                save_image(generated_image, image_path)
+                # Save the image in the format the API returned
+                extension = getattr(generated_image, "extension", ".png")
+                image_path = self.image_dir / f"{output_filename}_image{extension}"
+                self._save_image(generated_image, image_path, track)
                 logger.info(f"Image saved to {image_path}")
                 return description_text, image_path
             else:
@@ -121,7 +147,7 @@ class ImageProcessor:
                 fallback = create_fallback_image(
                     error_message="No image generated", color=(100, 149, 237))
                 image_path = self.image_dir / f"{output_filename}_image.png"
-                save_image(fallback, image_path)
+                self._save_image(fallback, image_path, track)
                 return description_text, image_path
 
         except Exception as e:
@@ -130,5 +156,5 @@ class ImageProcessor:
             fallback = create_fallback_image(
                 error_message=str(e), color=(255, 0, 0))
             image_path = self.image_dir / f"{output_filename}_image.png"
-            save_image(fallback, image_path)
+            self._save_image(fallback, image_path, track)
             return f"Error: {str(e)}", image_path
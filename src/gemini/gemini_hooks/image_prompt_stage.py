@@ -0,0 +1,183 @@
+"""
+gemini_hooks/image_prompt_stage.py - The image prompt stage of the pipeline
+
+Generates the JSON image prompt of a track from its refined analysis (or, without one,
+the analysis chosen by the caller) and saves it with the analysis it was built from. A
+response that is not valid JSON is saved as a raw prompt for debugging.
+
+ImagePromptStage is the image prompt half of AudioToImageProcessor; it expects the
+processor's analysis_dir, prompt_dir, artifacts, _run_step() and _audio_metadata().
+
+Exports:
+- ImagePromptStage
+  - generate_image_prompt(audio_path, analysis_text) -> Dict[str, Any]
+
+Related files:
+- src/gemini/gemini_hooks/audio_to_image_processor.py: AudioToImageProcessor
+- src/gemini/gemini_hooks/batch_results.py: Saves batch image prompts with _save_image_prompt
+"""
+
+import json
+import logging
+from pathlib import Path
+from typing import Dict, Any
+
+from src.gemini.gemini_hooks.pipeline_planner import DeadCallError
+from src.gemini.gemini_hooks.pipeline_steps import IMAGE_PROMPT_STEP
+
+logger = logging.getLogger(__name__)
+
+
+class ImagePromptStage:
+    """Image prompt generation of a track"""
+
+    def generate_image_prompt(self, audio_path: Path, analysis_text: str) -> Dict[str, Any]:
+        """
+        Generate an image prompt based on the audio analysis
+
+        Args:
+            audio_path: Path to the audio file
+            analysis_text: The text analysis of the audio
+
+        Returns:
+            Dictionary with the prompt path
+        """
+        results = {
+            "prompt_success": False,
+            "prompt_path": None,
+            "prompt_error": None
+        }
+
+        try:
+            # Ensure output directories exist
+            self.prompt_dir.mkdir(exist_ok=True, parents=True)
+
+            # Generate the prompt content using the audio file
+            prompt_versions: Dict[str, str] = {}
+            prompt_content = self._run_step(
+                IMAGE_PROMPT_STEP, audio_path,
+                {"analysis_text": self._image_prompt_analysis(audio_path, analysis_text)},
+                prompt_versions)
+            results.update(self._save_image_prompt(audio_path, prompt_content, prompt_versions))
+
+        except DeadCallError:
+            raise
+        except Exception as e:
+            logger.exception(
+                f"Error generating image prompt for {audio_path}: {str(e)}")
+            results["prompt_error"] = str(e)
+
+        return results
+
+    def _image_prompt_analysis(self, audio_path: Path, analysis_text: str) -> str:
+        """
+        Choose the analysis the image prompt is generated from
+
+        Args:
+            audio_path: Path to the audio file
+            analysis_text: The analysis chosen by the caller
+
+        Returns:
+            The refined analysis if there is one, otherwise analysis_text
+        """
+        # Try to load the refined analysis first, fall back to final analysis if not available
+        refined_path = self.analysis_dir / \
+            f"{audio_path.stem}_refined_analysis.txt"
+        refined_analysis = self.artifacts.get_text(refined_path)
+        if refined_analysis is not None:
+            logger.info(
+                f"Using refined analysis for image prompt generation")
+            return refined_analysis
+        return analysis_text
+
+    def _image_prompt_source(self, audio_path: Path) -> Path:
+        """
+        Get the analysis an image prompt is generated from: the refined analysis when there
+        is one; without it there is no revision either, so the final analysis
+
+        Args:
+            audio_path: Path to the audio file
+
+        Returns:
+            Path of the analysis
+        """
+        refined_path = self.analysis_dir / f"{audio_path.stem}_refined_analysis.txt"
+        if self.artifacts.exists(refined_path):
+            return refined_path
+        return self.analysis_dir / f"{audio_path.stem}_analysis.txt"
+
+    def _save_image_prompt(self, audio_path: Path, prompt_content: str,
+                           prompt_versions: Dict[str, str]) -> Dict[str, Any]:
+        """
+        Parse the JSON image prompt from a model response and save it
+
+        Args:
+            audio_path: Path to the audio file
+            prompt_content: Response text of the image prompt step
+            prompt_versions: Template versions the prompt was rendered with
+
+        Returns:
+            Dictionary with the prompt path, or the parse error
+        """
+        results = {
+            "prompt_success": False,
+            "prompt_path": None,
+            "prompt_error": None
+        }
+
+        # Clean the prompt content - check for markdown code blocks and extract just the JSON
+        cleaned_content = prompt_content
+        # Check for markdown JSON code block
+        if "```json" in prompt_content:
+            # Extract content between ```json and ```
+            import re
+            json_match = re.search(
+                r'```json\s*(.*?)\s*```', prompt_content, re.DOTALL)
+            if json_match:
+                cleaned_content = json_match.group(1).strip()
+        # Or just a regular code block
+        elif "```" in prompt_content:
+            # Extract content between ``` and ```
+            import re
+            json_match = re.search(
+                r'```\s*(.*?)\s*```', prompt_content, re.DOTALL)
+            if json_match:
+                cleaned_content = json_match.group(1).strip()
+
+        try:
+            # Try to parse as JSON
+            prompt_data = json.loads(cleaned_content)
+
+            # Add timestamp and audio filename
+            import datetime
+            prompt_data["timestamp"] = datetime.datetime.now().isoformat()
+            prompt_data["audio_file"] = audio_path.name
+            prompt_data["prompt_version"] = prompt_versions["image_generation"]
+
+            # Write the prompt to file
+            prompt_path = self.prompt_dir / \
+                f"{audio_path.stem}_prompt.json"
+            self.artifacts.put(
+                prompt_path, prompt_data, kind="prompt", track=audio_path.name,
+                inputs=[self._image_prompt_source(audio_path)],
+                prompt_versions=prompt_versions, metadata=self._audio_metadata(audio_path))
+
+            logger.info(f"Image prompt saved to {prompt_path}")
+            results["prompt_success"] = True
+            results["prompt_path"] = str(prompt_path)
+            results["prompt_versions"] = {"prompt": prompt_versions}
+
+        except json.JSONDecodeError as e:
+            logger.error(f"Failed to parse prompt as JSON: {str(e)}")
+            logger.error(f"Raw content: {prompt_content}")
+            logger.error(f"Cleaned content: {cleaned_content}")
+
+            # Save the raw content for debugging
+            raw_path = self.prompt_dir / \
+                f"{audio_path.stem}_raw_prompt.txt"
+            self.artifacts.put(raw_path, prompt_content, kind="raw_prompt", track=audio_path.name,
+                               prompt_versions=prompt_versions)
+
+            results["prompt_error"] = f"JSON parse error: {str(e)}"
+
+        return results
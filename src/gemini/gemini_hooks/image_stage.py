@@ -0,0 +1,246 @@
+"""
+gemini_hooks/image_stage.py - The image stage of the audio-to-image pipeline
+
+Generates the image of a track from its saved image prompt. An indexed image generated
+from the identical prompt with a high enough score is reused instead of calling the
+image model. With several candidates, all are saved, ranked locally and {stem}_best
+links to the winner. New images are added to the perceptual-hash index, which flags
+near-identical earlier outputs, and converted copies and thumbnails are made in the
+background.
+
+ImageStage is the image half of AudioToImageProcessor; it expects the processor's client,
+image_dir, prompt_dir, artifacts, planner, image_candidates, reuse_min_score, image_index,
+image_post_processor, _render_prompt(), _step_context(), _save_image() and
+_audio_metadata().
+
+Exports:
+- ImageStage
+  - generate_image(audio_path, prompt_data) -> Dict[str, Any]
+
+Related files:
+- src/gemini/gemini_hooks/audio_to_image_processor.py: AudioToImageProcessor
+- src/gemini/gemini_utilities/image_ranking.py: Ranks image candidates
+- src/gemini/gemini_utilities/image_index.py: Perceptual-hash index and prompt reuse
+- src/gemini/gemini_utilities/generated_image.py: Background post-processing
+"""
+
+import json
+import shutil
+import logging
+from pathlib import Path
+from typing import Dict, Any, List, Tuple
+
+from src.gemini.gemini_hooks.pipeline_planner import DeadCallError
+from src.gemini.gemini_utilities.image_ranking import rank_candidates
+from src.gemini.gemini_utilities.image_index import hash_prompt
+
+logger = logging.getLogger(__name__)
+
+
+class ImageStage:
+    """Image generation, candidate ranking and indexing of a track"""
+
+    def generate_image(self, audio_path: Path, prompt_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Generate an image based on the prompt
+
+        Args:
+            audio_path: Path to the audio file
+            prompt_data: Dictionary with prompt data
+
+        Returns:
+            Dictionary with the image path
+        """
+        results = {
+            "image_success": False,
+            "image_path": None,
+            "image_error": None,
+            "elided_calls": []
+        }
+
+        try:
+            # Ensure output directories exist
+            self.image_dir.mkdir(exist_ok=True, parents=True)
+
+            # Get the main prompt from the data
+            main_prompt = prompt_data.get("prompt", "")
+            if not main_prompt:
+                raise ValueError("Prompt does not contain a 'prompt' field")
+
+            # Enhance prompt to include 5 listening sessions instruction
+            prompt_versions: Dict[str, str] = {}
+            enhanced_prompt = self._render_prompt(
+                "image_listening", prompt_versions, prompt=main_prompt)
+
+            # Short-circuit when this exact prompt already produced a good enough image
+            prompt_hash = hash_prompt(enhanced_prompt)
+            if self.reuse_min_score is not None:
+                cached = self.image_index.lookup_prompt(prompt_hash, self.reuse_min_score)
+                if cached:
+                    image_path = self.image_dir / \
+                        f"{audio_path.stem}_image{Path(cached['path']).suffix}"
+                    # Stored contents are shared, so a reused image takes no extra space
+                    cached_data = self.artifacts.get(cached["path"])
+                    if cached_data is None:
+                        cached_data = Path(cached["path"]).read_bytes()
+                    self.artifacts.put(
+                        image_path, cached_data, kind="image", track=audio_path.name,
+                        inputs=[self.prompt_dir / f"{audio_path.stem}_prompt.json"],
+                        prompt_versions=prompt_versions,
+                        metadata={**self._audio_metadata(audio_path),
+                                  "reused_from": cached["path"]})
+                    logger.info(
+                        f"Reusing {cached['path']} (score {cached['score']}) for {audio_path.name}")
+                    results.update({
+                        "image_success": True,
+                        "image_path": str(image_path),
+                        "image_reused_from": cached["path"],
+                        "prompt_versions": {"image": prompt_versions}
+                    })
+                    return results
+
+            # The pre-listen response never reaches the image model, so the planner elides it
+            if audio_path.exists() and not self.planner.should_run("image_prelisten"):
+                results["elided_calls"].append("image_prelisten")
+
+            # Generate the image, or several candidates ranked locally
+            if not self.planner.should_run("image_generation"):
+                results["elided_calls"].append("image_generation")
+                return results
+            image = None
+            image_path = None
+            if self.image_candidates > 1:
+                with self._step_context("Image Generation", audio_path):
+                    candidates = self.client.generate_image_candidates(
+                        enhanced_prompt, temperature=0.9, count=self.image_candidates
+                    )
+                if not candidates:
+                    raise ValueError("No image candidates returned by image generation model")
+                description_text, image_path, ranking = self._save_ranked_candidates(
+                    audio_path, candidates, prompt_data, prompt_versions)
+                results["image_candidates"] = ranking
+                indexed = [(Path(entry["path"]), candidates[entry["index"]][1], entry["score"])
+                           for entry in ranking]
+            else:
+                with self._step_context("Image Generation", audio_path):
+                    description_text, image = self.client.generate_image(
+                        enhanced_prompt, temperature=0.9
+                    )
+
+            # Send the description to Discord with MP3 title included
+            source_with_title = f"Image Generation | {audio_path.name}"
+            self.client._send_to_discord(
+                response=description_text if description_text else "Image generated successfully",
+                prompt=enhanced_prompt,
+                is_final=True,
+                source=source_with_title,
+                content_type="image generation"
+            )
+
+            if image_path is None:
+                if image is None:
+                    raise ValueError("No image in response from image generation model")
+
+                # Save the bytes in the format the API returned, without a decode/re-encode
+                extension = getattr(image, "extension", ".png")
+                image_path = self.image_dir / f"{audio_path.stem}_image{extension}"
+                score = rank_candidates([image], reference_text=json.dumps(prompt_data))[0]["score"]
+                self._save_image(image_path, image, audio_path, prompt_versions,
+                                 metadata={"score": score})
+                indexed = [(image_path, image, score)]
+
+            # Post-processing reads the image file
+            self.artifacts.barrier(audio_path.name)
+            self.image_post_processor.submit(image_path)
+
+            # Index the new image(s) and flag near-identical earlier outputs
+            results["image_duplicates"] = self._index_images(audio_path, indexed, prompt_hash)
+
+            logger.info(f"Image saved to {image_path}")
+            results["image_success"] = True
+            results["image_path"] = str(image_path)
+            results["prompt_versions"] = {"image": prompt_versions}
+
+        except DeadCallError:
+            raise
+        except Exception as e:
+            logger.exception(
+                f"Error generating image for {audio_path}: {str(e)}")
+            results["image_error"] = str(e)
+
+        return results
+
+    def _index_images(self, audio_path: Path, images: List[Tuple[Path, Any, float]],
+                      prompt_hash: str) -> List[str]:
+        """
+        Add saved images to the perceptual-hash index
+
+        Args:
+            audio_path: Path to the audio file
+            images: List of (image path, image, score); the first is the selected image
+            prompt_hash: Hash of the prompt that produced the images
+
+        Returns:
+            Paths of earlier images that are near-identical to the selected image
+        """
+        duplicates = []
+        try:
+            for position, (image_path, image, score) in enumerate(images):
+                entry = self.image_index.add(
+                    image_path, image=image, track=audio_path.name,
+                    prompt_hash=prompt_hash, score=score)
+                if position == 0:
+                    duplicates = [match["path"] for match in entry["duplicates"]]
+        except Exception as e:
+            logger.warning(f"Could not index images for {audio_path.name}: {str(e)}")
+        return duplicates
+
+    def _save_ranked_candidates(self, audio_path: Path, candidates: List,
+                                prompt_data: Dict[str, Any], prompt_versions: Dict[str, str]):
+        """
+        Save all image candidates, rank them and link the winner as {stem}_best
+
+        Args:
+            audio_path: Path to the audio file
+            candidates: List of (description_text, image) tuples
+            prompt_data: Prompt data whose colour words the palette should match
+            prompt_versions: Templates the image prompt was rendered with
+
+        Returns:
+            Tuple of (winner description, best link path, ranking with candidate paths)
+        """
+        ranking = rank_candidates(
+            [image for _, image in candidates], reference_text=json.dumps(prompt_data))
+
+        candidate_paths = {}
+        for rank, entry in enumerate(ranking, start=1):
+            image = candidates[entry["index"]][1]
+            extension = getattr(image, "extension", ".png")
+            candidate_path = self.image_dir / \
+                f"{audio_path.stem}_candidate{entry['index'] + 1}{extension}"
+            self._save_image(candidate_path, image, audio_path, prompt_versions,
+                             metadata={"score": entry["score"], "rank": rank})
+            candidate_paths[entry["index"]] = candidate_path
+            entry["path"] = str(candidate_path)
+
+        # The link (or copy) needs the candidate file
+        self.artifacts.barrier(audio_path.name)
+        winner = ranking[0]["index"]
+        best_path = self.image_dir / \
+            f"{audio_path.stem}_best{candidate_paths[winner].suffix}"
+        self._link_best(best_path, candidate_paths[winner])
+        logger.info(
+            f"Best of {len(candidates)} candidates: {candidate_paths[winner].name} "
+            f"(score {ranking[0]['score']})")
+
+        return candidates[winner][0], best_path, ranking
+
+    def _link_best(self, best_path: Path, target_path: Path) -> None:
+        """Point best_path at target_path (relative symlink, or a copy where symlinks fail)"""
+        for previous in self.image_dir.glob(f"{best_path.stem}.*"):
+            previous.unlink()
+        try:
+            best_path.symlink_to(target_path.name)
+        except (OSError, NotImplementedError):
+            # Windows without symlink privileges
+            shutil.copyfile(target_path, best_path)
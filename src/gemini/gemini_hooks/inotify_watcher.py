@@ -0,0 +1,73 @@
+"""
+gemini_hooks/inotify_watcher.py - Change notifications for one directory on Linux
+
+A minimal ctypes binding to inotify, so the watch-folder daemon learns about copied or
+modified files without rescanning the folder; other platforms fall back to polling.
+
+Exports:
+- InotifyWatcher(directory: Path)
+  - wait(timeout: float) -> Set[str]: Names of the files that changed
+  - close() -> None
+
+Related files:
+- src/gemini/gemini_hooks/watch_folder_daemon.py: The daemon that waits on it
+"""
+
+import os
+import select
+import struct
+from pathlib import Path
+from typing import Set
+
+# inotify constants (see <sys/inotify.h>)
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+_INOTIFY_EVENT_HEADER = struct.Struct("iIII")
+
+
+class InotifyWatcher:
+    """Minimal ctypes binding to Linux inotify for a single directory"""
+
+    def __init__(self, directory: Path):
+        import ctypes
+        import ctypes.util
+
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+        mask = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_MODIFY
+        if libc.inotify_add_watch(self._fd, os.fsencode(str(directory)), mask) < 0:
+            errno = ctypes.get_errno()
+            os.close(self._fd)
+            raise OSError(errno, f"inotify_add_watch failed for {directory}")
+
+    def wait(self, timeout: float) -> Set[str]:
+        """Wait up to timeout seconds and return the names of files that changed"""
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if not readable:
+            return set()
+
+        try:
+            buffer = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return set()
+
+        names = set()
+        offset = 0
+        while offset + _INOTIFY_EVENT_HEADER.size <= len(buffer):
+            _, _, _, name_length = _INOTIFY_EVENT_HEADER.unpack_from(buffer, offset)
+            offset += _INOTIFY_EVENT_HEADER.size
+            name = buffer[offset:offset + name_length].rstrip(b"\0")
+            offset += name_length
+            if name:
+                names.add(os.fsdecode(name))
+        return names
+
+    def close(self):
+        os.close(self._fd)
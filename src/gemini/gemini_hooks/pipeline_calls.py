@@ -0,0 +1,284 @@
+"""
+gemini_hooks/pipeline_calls.py - Prompts and model calls of the audio-to-image pipeline
+
+Prompts are rendered from the versioned prompt registry, recording the version id of
+every template a stage used, and each step's model calls are tagged with the step, the
+track and the step's deadline for the middleware. Calls that listen to the track use the
+prefetched upload when there is one, and every response is relayed to Discord with the
+track name.
+
+PipelineCalls is the model-call half of AudioToImageProcessor; it expects the processor's
+client, planner, step_deadlines and _prepared_uploads.
+
+Exports:
+- RATE_LIMIT_PAUSE: Seconds to pause between steps and between tracks
+- DEFAULT_STEP_DEADLINE, STEP_DEADLINES: Seconds each step's model calls may take
+- STAGE_PROMPTS: Registered prompt templates rendered in each catalogue stage
+- PipelineCalls
+  - prompt_versions -> Dict[str, Dict[str, str]]
+
+Related files:
+- src/gemini/gemini_hooks/audio_to_image_processor.py: AudioToImageProcessor
+- src/gemini/gemini_prompts/prompt_registry.py: Compiled prompt templates and their version ids
+- src/gemini/gemini_apis/middleware.py: Model calls are tagged with their step and deadline
+- src/gemini/gemini_hooks/pipeline_steps.py: Step definitions
+"""
+
+import time
+import logging
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+# Prompt templates are rendered through the versioned registry
+from src.gemini.gemini_prompts.prompt_registry import prompt_registry
+from src.gemini.gemini_hooks.pipeline_steps import PipelineStep
+from src.gemini.gemini_apis.middleware import call_context
+
+logger = logging.getLogger(__name__)
+
+RATE_LIMIT_PAUSE = 5  # seconds to pause between API calls
+
+# Seconds each step's model calls may take, retries and hedged duplicates included
+DEFAULT_STEP_DEADLINE = 900.0
+STEP_DEADLINES = {
+    "Final Integrated Analysis": 1200.0,
+    "Image Prompt Generation": 300.0,
+    "Image Pre-listen": 300.0,
+    "Image Generation": 600.0
+}
+
+# Registered prompt templates rendered in each catalogue stage
+STAGE_PROMPTS = {
+    "analysis": ["analysis_listening", "generation_listening", "step1", "step2", "step3", "step4",
+                 "step5", "final_integration", "refinement"],
+    "revision": ["generation_listening", "revision"],
+    "prompt": ["analysis_listening", "image_prompt_listening", "image_generation"],
+    "image": ["image_listening"]
+}
+
+
+class PipelineCalls:
+    """Prompt rendering and step-tagged model calls relayed to Discord"""
+
+    @property
+    def prompt_versions(self) -> Dict[str, Dict[str, str]]:
+        """Current prompt version ids per catalogue stage (template name -> version id)"""
+        return prompt_registry.stage_versions(STAGE_PROMPTS)
+
+    def _render_prompt(self, name: str, used_versions: Dict[str, str], **slots) -> str:
+        """
+        Render a registered prompt template and remember which version was used
+
+        Args:
+            name: Template name in the prompt registry
+            used_versions: Collects template name -> version id for the stage
+            **slots: Template slot values
+
+        Returns:
+            The rendered prompt text
+        """
+        rendered = prompt_registry.render(name, **slots)
+        used_versions[name] = rendered["version_id"]
+        logger.info(
+            f"Rendered prompt {rendered['version_id']}: ~{rendered['total_tokens']} tokens "
+            f"({rendered['static_tokens']} template, {rendered['slot_tokens']} slots)")
+        return rendered["text"]
+
+    def _step_prompt(self, step: PipelineStep, outputs: Dict[str, str],
+                     used_versions: Dict[str, str], listening: bool = False) -> str:
+        """
+        Render the prompt of a pipeline step from the results of earlier steps
+
+        Args:
+            step: The step
+            outputs: Earlier results by template slot name
+            used_versions: Collects template name -> version id for the stage
+            listening: Also wrap the prompt in the step's listening preamble (the online
+                call helpers add it themselves)
+
+        Returns:
+            The rendered prompt text
+        """
+        prompt = self._render_prompt(
+            step.template, used_versions, **{slot: outputs[slot] for slot in step.inputs})
+        if step.wrapper:
+            prompt = self._render_prompt(step.wrapper, used_versions, prompt=prompt)
+        if listening:
+            prompt = self._render_prompt(step.listening, used_versions, prompt=prompt)
+        return prompt
+
+    def _run_step(self, step: PipelineStep, audio_path: Path, outputs: Dict[str, str],
+                  used_versions: Dict[str, str]) -> str:
+        """
+        Run a pipeline step online with the audio and return its text
+
+        Args:
+            step: The step
+            audio_path: Path to the audio file
+            outputs: Earlier results by template slot name
+            used_versions: Collects template name -> version id for the stage
+
+        Returns:
+            The step's response text
+        """
+        # Every call is checked against the planner's graph (strict mode raises here)
+        if not self.planner.should_run(step.name):
+            return ""
+        prompt = self._step_prompt(step, outputs, used_versions)
+        if step.listening == "analysis_listening":
+            return self._analyze_audio_with_title(
+                audio_path=audio_path,
+                prompt=prompt,
+                temperature=step.temperature,
+                step_name=step.step_name,
+                prompt_versions=used_versions
+            )
+        return self._generate_content_with_title(
+            prompt=prompt,
+            temperature=step.temperature,
+            audio_path=audio_path,
+            step_name=step.step_name,
+            prompt_versions=used_versions
+        )
+
+    @staticmethod
+    def _merge_result(results: Dict[str, Any], stage_result: Dict[str, Any]) -> None:
+        """Update results with a stage result, merging the per-stage prompt versions"""
+        prompt_versions = {**results.get("prompt_versions", {}),
+                           **stage_result.get("prompt_versions", {})}
+        results.update(stage_result)
+        results["prompt_versions"] = prompt_versions
+    def _step_context(self, step_name: str, audio_path: Optional[Path] = None):
+        """
+        Tag the model calls of a step with its name, track and deadline.
+
+        Args:
+            step_name: Name of the pipeline step
+            audio_path: Path to the audio file the step works on
+
+        Returns:
+            call_context for the step's calls
+        """
+        tags = {"step": step_name}
+        if audio_path is not None:
+            tags["track"] = audio_path.name
+        return call_context(
+            deadline=self.step_deadlines.get(step_name, DEFAULT_STEP_DEADLINE), **tags)
+
+    def _audio_reference(self, audio_path: Path):
+        """
+        Get the audio input for a model call: the prefetched upload if there is one,
+        otherwise the path (which is uploaded by the call itself).
+
+        Args:
+            audio_path: Path to the audio file
+
+        Returns:
+            Uploaded file reference or the original path
+        """
+        return self._prepared_uploads.get(str(audio_path), audio_path)
+
+    def _analyze_audio_with_title(self, audio_path: Path, prompt: str, temperature: float = 0.4,
+                                  step_name: str = "Audio Analysis",
+                                  prompt_versions: Optional[Dict[str, str]] = None) -> str:
+        """
+        Analyze audio content with a text prompt and include the MP3 title in the Discord message.
+
+        Args:
+            audio_path: Path to the audio file
+            prompt: Text prompt to guide the analysis
+            temperature: Controls randomness (0.0-2.0)
+            step_name: Name of the analysis step for Discord message
+            prompt_versions: Collects the version id of the listening preamble
+
+        Returns:
+            Analysis text
+        """
+        # Add instruction to listen to the audio 5 times
+        enhanced_prompt = self._render_prompt(
+            "analysis_listening", prompt_versions if prompt_versions is not None else {},
+            prompt=prompt)
+
+        # Use analyze_audio from the client, but customize the source parameter;
+        # the call is tagged with the step for the client's metrics
+        with self._step_context(step_name, audio_path):
+            response_text = self.client.analyze_audio(
+                audio_path_or_file=self._audio_reference(audio_path),
+                prompt=enhanced_prompt,
+                temperature=temperature
+            )
+
+        # Send to Discord with a custom source that includes the MP3 title
+        source_with_title = f"{step_name} | {audio_path.name}"
+
+        # Use the client's _send_to_discord method to send the result to Discord
+        self.client._send_to_discord(
+            response=response_text,
+            prompt=enhanced_prompt,
+            is_final=True,
+            source=source_with_title,
+            content_type="audio analysis"
+        )
+
+        return response_text
+
+    def _generate_content_with_title(self, prompt: str, temperature: float = 0.4,
+                                     audio_path: Path = None, step_name: str = "Content Generation",
+                                     prompt_versions: Optional[Dict[str, str]] = None) -> str:
+        """
+        Generate content with a text prompt and include the MP3 title in the Discord message.
+        For steps that include audio analysis, this will analyze the audio 5 times.
+
+        Args:
+            prompt: Text prompt to generate content from
+            temperature: Controls randomness (0.0-2.0)
+            audio_path: Path to the audio file for inclusion in Discord message
+            step_name: Name of the generation step for Discord message
+            prompt_versions: Collects the version id of the listening preamble
+
+        Returns:
+            Generated text
+        """
+        # If we have an audio path, this is for a step that should include audio analysis
+        if audio_path and audio_path.exists():
+            # Add instruction to listen to the audio 5 times and include the audio file multiple times
+            enhanced_prompt = self._render_prompt(
+                "generation_listening", prompt_versions if prompt_versions is not None else {},
+                prompt=prompt)
+
+            # Use analyze_audio to ensure the model processes the audio 5 times
+            with self._step_context(step_name, audio_path):
+                response_text = self.client.analyze_audio(
+                    audio_path_or_file=self._audio_reference(audio_path),
+                    prompt=enhanced_prompt,
+                    temperature=temperature
+                )
+        else:
+            # Standard text generation without audio
+            with self._step_context(step_name):
+                response_text = self.client.generate_content(
+                    prompt=prompt,
+                    temperature=temperature
+                )
+
+        # Send to Discord with a custom source that includes the MP3 title
+        if audio_path:
+            source_with_title = f"{step_name} | {audio_path.name}"
+        else:
+            source_with_title = step_name
+
+        # Use the client's _send_to_discord method to send the result to Discord
+        self.client._send_to_discord(
+            response=response_text,
+            prompt=prompt if audio_path is None else enhanced_prompt,
+            is_final=True,
+            source=source_with_title,
+            content_type="text"
+        )
+
+        return response_text
+
+    @staticmethod
+    def _pause() -> None:
+        """Pause between model calls to respect API rate limits"""
+        time.sleep(RATE_LIMIT_PAUSE)
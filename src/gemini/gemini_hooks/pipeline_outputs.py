@@ -0,0 +1,158 @@
+"""
+gemini_hooks/pipeline_outputs.py - Saved outputs of the audio-to-image pipeline
+
+Every analysis, revision and image is written to the artifact store with the outputs it
+was built from, the prompt versions it was rendered with and the name and content hash of
+its track, so a changed input marks everything downstream as stale. Files written before
+the store existed are adopted on the way, and analyses moved to the analysis archive are
+restored into the store when they are reused.
+
+PipelineOutputs is the output half of AudioToImageProcessor; it expects the processor's
+output_dir, analysis_dir, image_dir, prompt_dir, artifacts, analysis_archive,
+_image_index and _audio_hashes.
+
+Exports:
+- SLOT_STEPS: Dict[str, PipelineStep] - Step producing each template slot
+- PipelineOutputs
+  - image_index -> ImageHashIndex
+  - clean_output_directories() -> None
+
+Related files:
+- src/gemini/gemini_hooks/audio_to_image_processor.py: AudioToImageProcessor
+- src/gemini/gemini_utilities/artifact_store.py: Outputs with their lineage, exported to output/
+- src/gemini/gemini_utilities/analysis_archive.py: Archived analyses are restored from it
+"""
+
+import io
+import logging
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+from src.gemini.gemini_hooks.pipeline_steps import ANALYSIS_STEPS, REVISION_STEP, PipelineStep
+from src.gemini.gemini_utilities.image_index import ImageHashIndex
+from src.gemini.gemini_utilities.catalogue_index import hash_file
+from src.gemini.gemini_utilities.analysis_names import parse_analysis_filename
+
+logger = logging.getLogger(__name__)
+
+# Step producing each template slot, for the lineage of the saved outputs
+SLOT_STEPS = {step.output: step for step in ANALYSIS_STEPS + [REVISION_STEP]}
+
+
+class PipelineOutputs:
+    """Output saving with lineage, archive restores and cleanup"""
+
+    @property
+    def image_index(self) -> ImageHashIndex:
+        """Perceptual-hash index of generated images (opened on first use)"""
+        if self._image_index is None:
+            self._image_index = ImageHashIndex(self.output_dir / "image_index.sqlite")
+        return self._image_index
+
+    def _audio_metadata(self, audio_path: Path) -> Dict[str, Any]:
+        """Name and content hash of the audio file an output was produced from"""
+        key = str(audio_path)
+        if key not in self._audio_hashes and audio_path.exists():
+            self._audio_hashes[key] = hash_file(audio_path)
+        return {"audio_file": audio_path.name, "audio_hash": self._audio_hashes.get(key)}
+
+    def _has_output(self, output_path: Path, kind: str, audio_path: Path) -> bool:
+        """
+        Whether an output is stored; files written before the artifact store existed are
+        recorded on the way, and analyses moved to the analysis archive are restored
+
+        Args:
+            output_path: Path of the output in the output directory
+            kind: Artifact kind of the output
+            audio_path: Path to the audio file
+
+        Returns:
+            bool: True if the output exists
+        """
+        if self.artifacts.adopt(output_path, kind, track=audio_path.name) is not None:
+            return True
+        parsed = parse_analysis_filename(output_path.name)
+        if self.analysis_archive is None or parsed is None:
+            return False
+        text = self.analysis_archive.get(*parsed)
+        if text is None:
+            return False
+        self.artifacts.put(output_path, text, kind=kind, track=audio_path.name,
+                           metadata=self._audio_metadata(audio_path))
+        logger.info(f"Restored {output_path.name} from the analysis archive")
+        return True
+
+    def _save_step(self, step: PipelineStep, audio_path: Path, text: str,
+                   prompt_versions: Dict[str, str]) -> Path:
+        """
+        Save the result of a pipeline step with the outputs it was built from
+
+        Args:
+            step: The step
+            audio_path: Path to the audio file
+            text: The step's response text
+            prompt_versions: Templates the step's prompt was rendered with
+
+        Returns:
+            Path of the output file
+        """
+        output_path = step.output_path(self.analysis_dir, audio_path.stem)
+        self.artifacts.put(
+            output_path, text, kind="revision" if step is REVISION_STEP else "analysis",
+            track=audio_path.name,
+            inputs=[SLOT_STEPS[slot].output_path(self.analysis_dir, audio_path.stem)
+                    for slot in step.inputs],
+            prompt_versions=prompt_versions, metadata=self._audio_metadata(audio_path))
+        logger.info(f"{step.step_name} saved to {output_path}")
+        return output_path
+
+    def _save_image(self, image_path: Path, image: Any, audio_path: Path,
+                    prompt_versions: Dict[str, str], metadata: Optional[Dict[str, Any]] = None) -> Path:
+        """
+        Save a generated image as the output of the track's image prompt
+
+        Args:
+            image_path: Path of the image in the image directory
+            image: GeneratedImage (its raw bytes are stored) or PIL image
+            audio_path: Path to the audio file
+            prompt_versions: Templates the image prompt was rendered with
+            metadata: Extra details, e.g. the candidate's score
+
+        Returns:
+            The image path
+        """
+        data = getattr(image, "data", None)
+        if data is None:
+            buffer = io.BytesIO()
+            image.save(buffer, format="PNG")
+            data = buffer.getvalue()
+        self.artifacts.put(
+            image_path, data, kind="image", track=audio_path.name,
+            inputs=[self.prompt_dir / f"{audio_path.stem}_prompt.json"],
+            prompt_versions=prompt_versions, media_type=getattr(image, "mime_type", None),
+            metadata={**self._audio_metadata(audio_path), **(metadata or {})})
+        return image_path
+    def clean_output_directories(self):
+        """Clean output directories used for analysis and images"""
+        # Drop the stored outputs, so they are not reused
+        self.artifacts.clear()
+
+        # Clean analysis directory
+        if self.analysis_dir.exists():
+            for file_path in self.analysis_dir.glob("*.*"):
+                if file_path.is_file() or file_path.is_symlink():
+                    file_path.unlink()
+
+        # Clean image directory (keep the prompts subfolder)
+        if self.image_dir.exists():
+            for file_path in self.image_dir.glob("*.*"):
+                if file_path.is_file() or file_path.is_symlink():
+                    file_path.unlink()
+
+        # Clean prompts directory
+        if self.prompt_dir.exists():
+            for file_path in self.prompt_dir.glob("*.*"):
+                if file_path.is_file() or file_path.is_symlink():
+                    file_path.unlink()
+
+        logger.info("Output directories cleaned")
@@ -0,0 +1,157 @@
+"""
+gemini_hooks/pipeline_planner.py - Call-elision planner for the audio-to-image pipeline
+
+Declares the model calls made per track together with the values each call consumes and
+produces. A call is live when it writes a persisted output or when a live call consumes
+one of its results; every other call is dead and is elided instead of being sent to the
+API. Elided calls are counted for the run summary. Strict mode raises for dead calls
+that are not marked "elide" in the graph, so tests fail as soon as a new dead call is
+introduced.
+
+Exports:
+- PIPELINE_CALLS: Dict[str, Dict[str, Any]] - Declared call graph of AudioToImageProcessor
+- DeadCallError: Raised in strict mode for dead or undeclared calls
+- PipelinePlanner(calls: Dict[str, Dict[str, Any]] = PIPELINE_CALLS, strict: bool = False)
+  - plan() -> Dict[str, List[str]]: Live and elided calls
+  - should_run(call_name: str) -> bool: Whether a call site should make its call
+  - get_summary() -> Dict[str, Any]: Elided calls and how often they were skipped
+
+Related files:
+- src/gemini/gemini_hooks/audio_to_image_processor.py: Consults the planner before each call
+"""
+
+import logging
+from typing import Any, Dict, List, Optional, Set
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Model calls made for one track. "inputs" are values the call's prompt is built from,
+# "outputs" the values it returns, and "persisted" marks calls whose output is written
+# to the output folder (those are always live). "elide" acknowledges a known dead call
+# that strict mode tolerates because the planner always skips it.
+PIPELINE_CALLS = {
+    "step1_analysis": {"inputs": ["audio"], "outputs": ["step1"], "persisted": True},
+    "step2_analysis": {"inputs": ["audio", "step1"], "outputs": ["step2"], "persisted": True},
+    "step3_analysis": {"inputs": ["audio", "step1", "step2"], "outputs": ["step3"],
+                       "persisted": True},
+    "step4_analysis": {"inputs": ["audio", "step1", "step2", "step3"], "outputs": ["step4"],
+                       "persisted": True},
+    "step5_analysis": {"inputs": ["audio", "step1", "step2", "step3", "step4"],
+                       "outputs": ["step5"], "persisted": True},
+    "final_integration": {"inputs": ["audio", "step1", "step2", "step3", "step4", "step5"],
+                          "outputs": ["final_analysis"], "persisted": True},
+    "refinement": {"inputs": ["audio", "final_analysis"], "outputs": ["refined_analysis"],
+                   "persisted": True},
+    "revision": {"inputs": ["audio", "final_analysis", "refined_analysis"],
+                 "outputs": ["revised_analysis"], "persisted": True},
+    "image_prompt": {"inputs": ["audio", "revised_analysis", "refined_analysis"],
+                     "outputs": ["image_prompt"], "persisted": True},
+    # Pre-listen before image generation: the image model never sees its response
+    "image_prelisten": {"inputs": ["audio"], "outputs": ["prelisten_notes"], "persisted": False,
+                        "elide": True},
+    "image_generation": {"inputs": ["image_prompt"], "outputs": ["image"], "persisted": True},
+}
+
+
+class DeadCallError(RuntimeError):
+    """Raised in strict mode when the pipeline makes a call whose result is never used"""
+
+
+class PipelinePlanner:
+    """Decides which declared pipeline calls are live and elides the rest"""
+
+    def __init__(self, calls: Optional[Dict[str, Dict[str, Any]]] = None, strict: bool = False):
+        """
+        Initialize the planner.
+
+        Args:
+            calls: Declared call graph (defaults to PIPELINE_CALLS)
+            strict: Raise DeadCallError for undeclared calls and for dead calls not marked
+                "elide", instead of eliding them
+
+        Raises:
+            DeadCallError: In strict mode, if the declared graph contains unmarked dead calls
+        """
+        self.calls = calls if calls is not None else PIPELINE_CALLS
+        self.strict = strict
+        self.elided_counts: Dict[str, int] = {}
+
+        plan = self.plan()
+        self._live: Set[str] = set(plan["live"])
+        unmarked = [name for name in plan["elided"] if not self.calls[name].get("elide")]
+        if self.strict and unmarked:
+            raise DeadCallError(
+                f"Pipeline declares calls whose results are never used: {', '.join(unmarked)}")
+        if plan["elided"]:
+            logger.info(f"Eliding calls with unused results: {', '.join(plan['elided'])}")
+
+    def plan(self) -> Dict[str, List[str]]:
+        """
+        Work backwards from the persisted calls to find every live call.
+
+        Returns:
+            Dictionary with "live" and "elided" call names, in declaration order
+        """
+        producers = {}
+        for name, call in self.calls.items():
+            for output in call.get("outputs", []):
+                producers.setdefault(output, []).append(name)
+
+        live = set()
+        pending = [name for name, call in self.calls.items() if call.get("persisted")]
+        while pending:
+            name = pending.pop()
+            if name in live:
+                continue
+            live.add(name)
+            for value in self.calls[name].get("inputs", []):
+                pending.extend(producers.get(value, []))
+
+        return {
+            "live": [name for name in self.calls if name in live],
+            "elided": [name for name in self.calls if name not in live]
+        }
+
+    def should_run(self, call_name: str) -> bool:
+        """
+        Check whether a call site should make its model call.
+
+        Undeclared calls are run (and logged) unless the planner is strict.
+
+        Args:
+            call_name: Name of the call in the call graph
+
+        Returns:
+            bool: True if the call is live
+
+        Raises:
+            DeadCallError: In strict mode, for an undeclared call or an unmarked dead call
+        """
+        if call_name not in self.calls:
+            if self.strict:
+                raise DeadCallError(f"Call '{call_name}' is not declared in the pipeline call graph")
+            logger.warning(f"Call '{call_name}' is not declared in the pipeline call graph")
+            return True
+
+        if call_name in self._live:
+            return True
+
+        if self.strict and not self.calls[call_name].get("elide"):
+            raise DeadCallError(f"Call '{call_name}' produces results nothing consumes")
+        self.elided_counts[call_name] = self.elided_counts.get(call_name, 0) + 1
+        logger.info(f"Elided dead call '{call_name}'")
+        return False
+
+    def get_summary(self) -> Dict[str, Any]:
+        """
+        Get the elided calls of the run so far.
+
+        Returns:
+            Dictionary with elided_calls (name -> times skipped) and elided_total
+        """
+        return {
+            "elided_calls": dict(self.elided_counts),
+            "elided_total": sum(self.elided_counts.values())
+        }
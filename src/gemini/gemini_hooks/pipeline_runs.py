@@ -0,0 +1,142 @@
+"""
+gemini_hooks/pipeline_runs.py - Runs of the audio-to-image pipeline over many tracks
+
+Online runs process the tracks one after another while a prefetcher hashes, uploads and
+token-counts the next ones, then log what the run cost: elided calls, calls, hedges,
+models and input tokens by step. Batch runs send every text step as one batch job for
+all tracks and resume an interrupted run's jobs.
+
+PipelineRuns is the multi-track half of AudioToImageProcessor; it expects the processor's
+client, prefetch_lookahead, max_outstanding_files, planner, image_post_processor,
+_prepared_uploads, process_audio_file() and _pause().
+
+Exports:
+- PipelineRuns
+  - process_multiple_files(audio_paths) -> List[Dict[str, Any]]
+  - process_multiple_files_batch(audio_paths, backend=None, poll_interval=60)
+    -> List[Dict[str, Any]]
+
+Related files:
+- src/gemini/gemini_hooks/audio_to_image_processor.py: AudioToImageProcessor
+- src/gemini/gemini_hooks/track_prefetcher.py: Prepares upcoming tracks during online runs
+- src/gemini/gemini_hooks/batch_runner.py: Runs the text steps as batch jobs for many tracks
+"""
+
+import logging
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Union
+
+from src.gemini.gemini_hooks.track_prefetcher import TrackPrefetcher
+from src.gemini.gemini_hooks.batch_runner import BatchPipelineRunner, DEFAULT_POLL_INTERVAL
+from src.gemini.gemini_apis.middleware import HedgingMiddleware
+from src.gemini.gemini_apis.batch_api import BatchBackend, GeminiBatchBackend
+
+logger = logging.getLogger(__name__)
+
+
+class PipelineRuns:
+    """Online and batch runs over many tracks"""
+
+    def process_multiple_files(self, audio_paths: List[Union[str, Path]]) -> List[Dict[str, Any]]:
+        """
+        Process multiple audio files into images
+
+        Args:
+            audio_paths: List of paths to audio files
+
+        Returns:
+            List of dictionaries with the analysis, prompt, and image path for each file
+        """
+        results = []
+        prefetcher = None
+        if self.prefetch_lookahead > 0 and len(audio_paths) > 1:
+            prefetcher = TrackPrefetcher(
+                self.client,
+                lookahead=self.prefetch_lookahead,
+                max_outstanding_files=max(
+                    self.max_outstanding_files, self.prefetch_lookahead + 1)
+            )
+
+        try:
+            for index, audio_path in enumerate(audio_paths):
+                logger.info(f"Processing audio file: {audio_path}")
+
+                if prefetcher:
+                    # Prepare the upcoming tracks while this one runs its model calls
+                    prefetcher.schedule(
+                        audio_paths[index:index + 1 + self.prefetch_lookahead])
+                    prepared = prefetcher.get(audio_path)
+                    if prepared.get("uploaded_file") is not None:
+                        self._prepared_uploads[str(audio_path)] = prepared["uploaded_file"]
+
+                try:
+                    result = self.process_audio_file(audio_path)
+                finally:
+                    self._prepared_uploads.pop(str(audio_path), None)
+                    if prefetcher:
+                        prefetcher.release(audio_path)
+                results.append(result)
+
+                # Add a small pause between processing to avoid rate limits
+                self._pause()
+        finally:
+            if prefetcher:
+                prefetcher.shutdown()
+            self.image_post_processor.wait()
+
+        # Create a summary
+        success_count = sum(
+            1 for r in results if r.get("image_success", False))
+        logger.info(
+            f"Processed {len(results)} files, {success_count} successful")
+
+        planner_summary = self.planner.get_summary()
+        if planner_summary["elided_total"]:
+            elided = ", ".join(f"{name} x{count}"
+                               for name, count in planner_summary["elided_calls"].items())
+            logger.info(
+                f"Elided {planner_summary['elided_total']} dead model calls ({elided})")
+
+        metrics = getattr(self.client, "metrics", None)
+        if metrics is not None:
+            logger.info(f"Gemini calls by step:\n{metrics.summary()}")
+
+        transport = getattr(self.client, "transport", None)
+        hedging = transport.layer(HedgingMiddleware) if transport is not None else None
+        if hedging is not None and hedging.hedges:
+            logger.info(f"Hedged {hedging.hedges} of {hedging.calls} calls, "
+                        f"{hedging.hedge_wins} hedges answered first")
+
+        router = getattr(self.client, "model_router", None)
+        if router is not None:
+            logger.info(f"Models chosen by step:\n{router.summary()}")
+
+        accountant = getattr(self.client, "token_accountant", None)
+        if accountant is not None:
+            logger.info(f"Input tokens by step:\n{accountant.summary()}")
+
+        return results
+
+    def process_multiple_files_batch(self, audio_paths: List[Union[str, Path]],
+                                     backend: Optional[BatchBackend] = None,
+                                     poll_interval: float = DEFAULT_POLL_INTERVAL
+                                     ) -> List[Dict[str, Any]]:
+        """
+        Process multiple audio files with batch jobs instead of online calls.
+
+        Every text step runs as one batch job for all files, which is cheaper and does not
+        use the interactive quota but takes hours. An interrupted run resumes polling its
+        submitted jobs when it is started again with the same files.
+
+        Args:
+            audio_paths: List of paths to audio files
+            backend: Batch backend (default: the Gemini Batch API via the client's transport)
+            poll_interval: Seconds between job status checks
+
+        Returns:
+            List of dictionaries with the analysis, prompt, and image path for each file
+        """
+        if backend is None:
+            backend = GeminiBatchBackend(self.client.transport)
+        runner = BatchPipelineRunner(self, backend, poll_interval=poll_interval)
+        return runner.run(audio_paths)
@@ -0,0 +1,122 @@
+"""
+gemini_hooks/pipeline_steps.py - Step definitions of the audio-to-image pipeline
+
+Each text step of the pipeline is declared once: its prompt template, the earlier outputs
+the template is filled with, the listening preamble, temperature and output file. The
+online path (AudioToImageProcessor) runs the steps one call at a time; the batch runner
+packs one step for many tracks into a single batch job. Both build their prompts from
+these definitions, so the two paths cannot drift apart.
+
+Exports:
+- PipelineStep(name: str, template: str, step_name: str, output: str, inputs=(),
+  temperature: float = 0.4, listening: str = "generation_listening", wrapper: str = None,
+  filename: str = None)
+  - output_path(directory: Path, stem: str) -> Path, result_key -> str
+- ANALYSIS_STEPS: List[PipelineStep] - Steps 1-5, final integration and refinement
+- REVISION_STEP: PipelineStep - Revision of the final analysis using the refinement
+- IMAGE_PROMPT_STEP: PipelineStep - JSON image prompt from the best available analysis
+
+Related files:
+- src/gemini/gemini_hooks/audio_to_image_processor.py: Online path
+- src/gemini/gemini_hooks/batch_runner.py: Batch path
+- src/gemini/gemini_hooks/pipeline_planner.py: Call graph keyed by the same step names
+- src/gemini/gemini_prompts/prompt_registry.py: The templates named here
+"""
+
+from pathlib import Path
+from typing import Iterable, Optional
+
+
+class PipelineStep:
+    """One model call of the pipeline and how its prompt and output are built"""
+
+    def __init__(self, name: str, template: str, step_name: str, output: str,
+                 inputs: Iterable[str] = (), temperature: float = 0.4,
+                 listening: str = "generation_listening", wrapper: Optional[str] = None,
+                 filename: Optional[str] = None):
+        """
+        Declare a step.
+
+        Args:
+            name: Call name, as in the planner's PIPELINE_CALLS
+            template: Registered prompt template of the step
+            step_name: Name used in call tags, logs and Discord messages
+            output: Template slot name under which later steps receive this step's result
+            inputs: Template slots filled with the results of earlier steps
+            temperature: Sampling temperature
+            listening: Listening preamble template that wraps the prompt with the audio
+            wrapper: Optional template the rendered prompt is wrapped in first
+            filename: Output file name pattern with a {stem} placeholder (None for steps
+                that save their result themselves)
+        """
+        self.name = name
+        self.template = template
+        self.step_name = step_name
+        self.output = output
+        self.inputs = tuple(inputs)
+        self.temperature = temperature
+        self.listening = listening
+        self.wrapper = wrapper
+        self.filename = filename
+
+    @property
+    def result_key(self) -> str:
+        """Key of the output path in the processor's result dictionaries"""
+        return f"{self.output}_path"
+
+    def output_path(self, directory: Path, stem: str) -> Path:
+        """
+        Get the file the step's result is saved to.
+
+        Args:
+            directory: Output directory
+            stem: Stem of the audio file
+
+        Returns:
+            Path of the output file
+        """
+        return directory / self.filename.format(stem=stem)
+
+    def __repr__(self) -> str:
+        return f"PipelineStep({self.name})"
+
+
+ANALYSIS_STEPS = [
+    PipelineStep("step1_analysis", "step1", "Step 1: Musical Foundation and Hook Analysis",
+                 output="step1_analysis", listening="analysis_listening",
+                 filename="{stem}_step1_analysis.txt"),
+    PipelineStep("step2_analysis", "step2", "Step 2: Sound Engineering and Production Techniques",
+                 output="step2_analysis", inputs=("step1_analysis",),
+                 filename="{stem}_step2_analysis.txt"),
+    PipelineStep("step3_analysis", "step3", "Step 3: Harmony, Melody, and Trend Alignment",
+                 output="step3_analysis", inputs=("step1_analysis", "step2_analysis"),
+                 filename="{stem}_step3_analysis.txt"),
+    PipelineStep("step4_analysis", "step4", "Step 4: Structure and Production Optimization",
+                 output="step4_analysis",
+                 inputs=("step1_analysis", "step2_analysis", "step3_analysis"),
+                 filename="{stem}_step4_analysis.txt"),
+    PipelineStep("step5_analysis", "step5", "Step 5: Critical Evaluation and Improvement Suggestions",
+                 output="step5_analysis",
+                 inputs=("step1_analysis", "step2_analysis", "step3_analysis", "step4_analysis"),
+                 filename="{stem}_step5_analysis.txt"),
+    PipelineStep("final_integration", "final_integration", "Final Integrated Analysis",
+                 output="final_analysis",
+                 inputs=("step1_analysis", "step2_analysis", "step3_analysis", "step4_analysis",
+                         "step5_analysis"),
+                 filename="{stem}_analysis.txt"),
+    # Lower temperature for a more precise critique
+    PipelineStep("refinement", "refinement",
+                 "Refinement: Critical Musical Foundation Specialist Review",
+                 output="refined_analysis", inputs=("final_analysis",), temperature=0.3,
+                 listening="analysis_listening", filename="{stem}_refined_analysis.txt"),
+]
+
+REVISION_STEP = PipelineStep(
+    "revision", "revision", "Revised Final Analysis", output="revised_analysis",
+    inputs=("final_analysis", "refined_analysis"), filename="{stem}_revised_analysis.txt")
+
+# The prompt's JSON is parsed and saved by the processor, so it has no output file here
+IMAGE_PROMPT_STEP = PipelineStep(
+    "image_prompt", "image_generation", "Image Prompt Generation", output="image_prompt",
+    inputs=("analysis_text",), temperature=0.7, listening="analysis_listening",
+    wrapper="image_prompt_listening")
@@ -0,0 +1,256 @@
+"""
+gemini_hooks/session_pool.py - Many concurrent chat sessions keyed by session ID
+
+A front end that serves many producers needs one chat per producer, not one per client.
+ChatSessionPool keeps a ConversationManager per session ID in an LRU of at most
+max_resident_sessions entries. A session that is not resident is rehydrated from the
+SessionStore on its next message; the least recently used idle sessions are saved and
+evicted when the pool is full. Every turn schedules a background save of the session's
+history, so a crash loses at most the turns still queued for the writer.
+
+Turns of one session run one at a time; turns of different sessions run concurrently.
+Each session's history is kept bounded by the ConversationManager's compaction, so memory
+is bounded by max_resident_sessions times the compacted history size.
+
+Exports:
+- DEFAULT_MAX_RESIDENT_SESSIONS: Default LRU capacity
+- ChatSessionPool(api_key: str, model_name: str, rate_limiter: RateLimiter, transport=None,
+  store: SessionStore = None, max_resident_sessions: int = 256, **manager_options)
+  - session(session_id, system_instruction=None): Context manager yielding the session's
+    ConversationManager
+  - send_message(session_id, message, temperature=0.7, system_instruction=None) -> str
+  - stream_message(session_id, message, temperature=0.7, system_instruction=None) -> Generator
+  - astream_message(session_id, message, temperature=0.7, system_instruction=None, sinks=())
+    -> AsyncIterator[str]: Streams on the event loop (see ConversationManager.astream_message)
+  - get_chat_history(session_id) -> List[Dict[str, Any]]
+  - delete_session(session_id) -> bool, list_sessions() -> List[Dict[str, Any]]
+  - get_status() -> Dict[str, Any], flush() -> None, close() -> None
+
+Related files:
+- src/gemini/gemini_hooks/session_residency.py: Loading, saving and evicting sessions
+- src/gemini/gemini_hooks/conversation_manager.py: One chat session with history compaction
+- src/gemini/gemini_utilities/session_store.py: SQLite persistence of the sessions
+- src/gemini/gemini_client.py: session_pool property
+"""
+
+import asyncio
+import logging
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, AsyncIterator, Dict, Generator, Iterable, List, Optional
+
+# ASYNC_LOCK_POLL is re-exported, so callers keep importing it from here
+from src.gemini.gemini_hooks.session_residency import ASYNC_LOCK_POLL, SessionResidency, _Session
+from src.gemini.gemini_hooks.stream_relay import StreamSink
+from src.gemini.gemini_utilities.rate_limiter import RateLimiter
+from src.gemini.gemini_utilities.session_store import SessionStore
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_RESIDENT_SESSIONS = 256
+
+
+class ChatSessionPool(SessionResidency):
+    """LRU pool of persistent chat sessions"""
+
+    def __init__(self, api_key: str, model_name: str, rate_limiter: RateLimiter, transport=None,
+                 store: Optional[SessionStore] = None,
+                 max_resident_sessions: int = DEFAULT_MAX_RESIDENT_SESSIONS,
+                 **manager_options):
+        """
+        Initialize the pool.
+
+        Args:
+            api_key: Gemini API key
+            model_name: The model to use for the conversations
+            rate_limiter: Rate limiter shared by all sessions
+            transport: Optional shared transport (or modern client) to send messages through
+            store: Session store (defaults to output/sessions.sqlite)
+            max_resident_sessions: Maximum number of sessions kept in memory
+            **manager_options: Options for each ConversationManager (e.g. max_history_tokens)
+        """
+        self.api_key = api_key
+        self.model_name = model_name
+        self.rate_limiter = rate_limiter
+        self.transport = transport
+        self.store = store or SessionStore()
+        self.max_resident_sessions = max(max_resident_sessions, 1)
+        self.manager_options = manager_options
+
+        self._lock = threading.Lock()
+        self._sessions: "OrderedDict[str, _Session]" = OrderedDict()
+        self._stats = {"created": 0, "rehydrated": 0, "evicted": 0, "turns": 0}
+
+    @contextmanager
+    def session(self, session_id: str, system_instruction: Optional[str] = None):
+        """
+        Use a session exclusively, loading or creating it if it is not resident.
+
+        Args:
+            session_id: Session ID
+            system_instruction: System instruction for a session that does not exist yet
+
+        Yields:
+            The session's ConversationManager
+        """
+        entry = self._acquire(session_id)
+        try:
+            if entry.manager is None:
+                self._load(entry, system_instruction)
+            yield entry.manager
+            self._save(entry)
+        finally:
+            entry.lock.release()
+        self._evict()
+
+    def send_message(self, session_id: str, message: Any, temperature: float = 0.7,
+                     system_instruction: Optional[str] = None) -> str:
+        """
+        Send a message in a session.
+
+        Args:
+            session_id: Session ID
+            message: The message to send - can be text, image, or a list of content items
+            temperature: Controls randomness (0.0-2.0)
+            system_instruction: System instruction if the session is new
+
+        Returns:
+            Response text
+        """
+        with self.session(session_id, system_instruction) as manager:
+            return manager.send_message(message, temperature=temperature)
+
+    def stream_message(self, session_id: str, message: Any, temperature: float = 0.7,
+                       system_instruction: Optional[str] = None) -> Generator:
+        """
+        Stream a message in a session; the session stays locked until the stream ends.
+
+        Args:
+            session_id: Session ID
+            message: The message to send - can be text, image, or a list of content items
+            temperature: Controls randomness (0.0-2.0)
+            system_instruction: System instruction if the session is new
+
+        Returns:
+            Generator yielding response chunks
+        """
+        with self.session(session_id, system_instruction) as manager:
+            yield from manager.stream_message(message, temperature=temperature)
+
+    async def astream_message(self, session_id: str, message: Any, temperature: float = 0.7,
+                              system_instruction: Optional[str] = None,
+                              sinks: Iterable[StreamSink] = ()) -> AsyncIterator[str]:
+        """
+        Stream a message in a session on the event loop.
+
+        Args:
+            session_id: Session ID
+            message: The message to send - can be text, image, or a list of content items
+            temperature: Controls randomness (0.0-2.0)
+            system_instruction: System instruction if the session is new
+            sinks: Optional sinks that receive the chunks
+
+        Yields:
+            Response text chunks
+        """
+        entry = await self._acquire_async(session_id)
+        release = True
+        try:
+            if entry.manager is None:
+                # Loading reads SQLite, so it runs off the loop; a cancelled caller leaves
+                # the lock to the load, which releases it when done
+                loading = asyncio.ensure_future(
+                    asyncio.to_thread(self._load, entry, system_instruction))
+                try:
+                    await asyncio.shield(loading)
+                except asyncio.CancelledError:
+                    release = False
+                    loading.add_done_callback(lambda _: entry.lock.release())
+                    raise
+            async for text in entry.manager.astream_message(message, temperature, sinks):
+                yield text
+            self._save(entry)
+        finally:
+            if release:
+                entry.lock.release()
+        await asyncio.to_thread(self._evict)
+
+    def get_chat_history(self, session_id: str) -> List[Dict[str, Any]]:
+        """
+        Get the history of a session.
+
+        Args:
+            session_id: Session ID
+
+        Returns:
+            List of messages in the chat history (see ConversationManager.get_chat_history)
+        """
+        with self.session(session_id) as manager:
+            return manager.get_chat_history()
+
+    def delete_session(self, session_id: str) -> bool:
+        """
+        Drop a session from memory and the store.
+
+        Args:
+            session_id: Session ID
+
+        Returns:
+            bool: True if the session existed
+        """
+        entry = self._acquire(session_id)
+        try:
+            resident = entry.manager is not None
+            if resident:
+                entry.manager.close()
+            with self._lock:
+                del self._sessions[session_id]
+            entry.manager = None
+            entry.evicted = True
+        finally:
+            entry.lock.release()
+        return self.store.delete(session_id) or resident
+
+    def list_sessions(self) -> List[Dict[str, Any]]:
+        """
+        List the stored sessions with whether they are resident.
+
+        Returns:
+            List of dictionaries with session_id, model, message_count, updated_at and resident
+        """
+        self.flush()
+        with self._lock:
+            resident = set(self._sessions)
+        return [{**session, "resident": session["session_id"] in resident}
+                for session in self.store.list_sessions()]
+
+    def get_status(self) -> Dict[str, Any]:
+        """
+        Get the state of the pool.
+
+        Returns:
+            Dictionary with resident and maximum sessions and counts of created, rehydrated and
+            evicted sessions and turns
+        """
+        with self._lock:
+            return {"resident": len(self._sessions),
+                    "max_resident": self.max_resident_sessions, **self._stats}
+
+    def flush(self) -> None:
+        """Block until all scheduled session saves are written"""
+        self.store.flush()
+
+    def close(self) -> None:
+        """Save every resident session and close the store"""
+        with self._lock:
+            entries = list(self._sessions.values())
+        for entry in entries:
+            with entry.lock:
+                if entry.manager is not None and not entry.evicted:
+                    history = entry.manager.get_history_contents()
+                    self._save(entry, history)
+                    entry.manager.close()
+        self.store.close()
@@ -0,0 +1,151 @@
+"""
+gemini_hooks/session_residency.py - Which chat sessions of a pool are in memory
+
+A pool entry holds a session's lock and, while the session is resident, its
+ConversationManager. Taking an entry moves it to the recent end of the LRU; a session that
+is not resident is rehydrated from the SessionStore, and the least recently used idle
+sessions over capacity are saved and evicted.
+
+SessionResidency is the LRU half of ChatSessionPool; it expects the pool's api_key,
+model_name, rate_limiter, transport, store, manager_options, max_resident_sessions, _lock,
+_sessions and _stats.
+
+Exports:
+- ASYNC_LOCK_POLL: Seconds between attempts to take a busy session's lock on the event loop
+- SessionResidency
+
+Related files:
+- src/gemini/gemini_hooks/session_pool.py: ChatSessionPool
+- src/gemini/gemini_utilities/session_store.py: SQLite persistence of the sessions
+"""
+
+import asyncio
+import logging
+import threading
+from typing import Any, List, Optional
+
+from src.gemini.gemini_hooks.conversation_manager import ConversationManager
+from src.gemini.gemini_utilities.lazy_import import lazy_import
+
+# The SDK is imported when the first session is rehydrated
+types = lazy_import("google.genai.types")
+
+logger = logging.getLogger(__name__)
+
+# Seconds between attempts to take a busy session's lock on the event loop
+ASYNC_LOCK_POLL = 0.05
+
+
+class _Session:
+    """A pool entry; its manager is None until the session is loaded"""
+
+    def __init__(self, session_id: str):
+        self.session_id = session_id
+        self.lock = threading.Lock()
+        self.manager: Optional[ConversationManager] = None
+        self.evicted = False
+        # The chat saved last and its generation, bumped whenever compaction replaces the chat
+        self.chat = None
+        self.generation = 0
+
+
+class SessionResidency:
+    """Loads, saves and evicts the sessions of a ChatSessionPool"""
+
+    def _acquire(self, session_id: str) -> _Session:
+        """Get a session's entry with its lock held, moving it to the recent end"""
+        while True:
+            with self._lock:
+                entry = self._sessions.get(session_id)
+                if entry is None:
+                    entry = self._sessions[session_id] = _Session(session_id)
+                else:
+                    self._sessions.move_to_end(session_id)
+            entry.lock.acquire()
+            if not entry.evicted:
+                return entry
+            # Evicted while we waited; the next entry rehydrates it
+            entry.lock.release()
+
+    async def _acquire_async(self, session_id: str) -> _Session:
+        """Like _acquire, but waits for a busy session without blocking the event loop"""
+        while True:
+            with self._lock:
+                entry = self._sessions.get(session_id)
+                if entry is None:
+                    entry = self._sessions[session_id] = _Session(session_id)
+                else:
+                    self._sessions.move_to_end(session_id)
+            # Polling keeps a cancelled waiter from taking the lock after it gave up
+            while not entry.lock.acquire(blocking=False):
+                await asyncio.sleep(ASYNC_LOCK_POLL)
+            if not entry.evicted:
+                return entry
+            entry.lock.release()
+
+    def _load(self, entry: _Session, system_instruction: Optional[str]) -> None:
+        """Rehydrate a session from the store, or start it if it is new"""
+        manager = ConversationManager(
+            api_key=self.api_key,
+            model_name=self.model_name,
+            rate_limiter=self.rate_limiter,
+            transport=self.transport,
+            **self.manager_options
+        )
+        record = self.store.load(entry.session_id)
+        if record is not None:
+            history = [types.Content.model_validate(message) for message in record["messages"]]
+            manager.create_chat(record["system_instruction"], history=history)
+            stat = "rehydrated"
+        else:
+            manager.create_chat(system_instruction)
+            stat = "created"
+
+        entry.manager, entry.chat = manager, manager.current_chat
+        with self._lock:
+            self._stats[stat] += 1
+
+    def _save(self, entry: _Session, history: Optional[List[Any]] = None) -> None:
+        """Schedule a background save of a session"""
+        manager = entry.manager
+        if manager.current_chat is not entry.chat:
+            entry.chat = manager.current_chat
+            entry.generation += 1
+        if history is None:
+            # The history is saved as it is now; a compaction still running is saved later
+            history = manager.current_chat.get_history()
+            with self._lock:
+                self._stats["turns"] += 1
+        self.store.save(entry.session_id, history, generation=entry.generation,
+                        model=manager.model_name,
+                        system_instruction=manager.system_instruction)
+
+    def _evict(self) -> None:
+        """Save and drop the least recently used idle sessions over capacity"""
+        with self._lock:
+            excess = len(self._sessions) - self.max_resident_sessions
+            victims = []
+            for entry in self._sessions.values():
+                if len(victims) >= excess:
+                    break
+                # Sessions in use stay resident
+                if entry.lock.acquire(blocking=False):
+                    victims.append(entry)
+
+        for entry in victims:
+            try:
+                if entry.manager is not None:
+                    history = entry.manager.get_history_contents()
+                    if entry.manager.current_chat is not entry.chat:
+                        self._save(entry, history)
+                    entry.manager.close()
+            except Exception as e:
+                logger.warning(f"Saving evicted chat session {entry.session_id} failed: {str(e)}")
+            finally:
+                with self._lock:
+                    if self._sessions.get(entry.session_id) is entry:
+                        del self._sessions[entry.session_id]
+                    self._stats["evicted"] += 1
+                entry.manager = None
+                entry.evicted = True
+                entry.lock.release()
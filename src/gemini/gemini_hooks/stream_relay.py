@@ -0,0 +1,202 @@
+"""
+gemini_hooks/stream_relay.py - Relay of streamed responses to sinks with back-pressure
+
+A streamed chat response is read on the event loop and fanned out to sinks (Discord, a
+websocket, a log). Every sink consumes its own bounded queue on its own task: a sink that
+falls behind fills its queue, and the relay then waits before reading the next chunk from
+the network, so a slow sink slows the stream down instead of buffering it without bound.
+Cancelling the task that iterates the relay closes the model stream and tells every
+sink the response was cut short.
+
+Exports:
+- DEFAULT_SINK_QUEUE: Chunks a sink may fall behind before the stream waits for it
+- StreamSink: Interface; async send(text), async close(text, error=None)
+- CallbackSink(callback): Calls a sync or async function with every chunk
+- DiscordStreamSink(send, segment_chars=1800): Posts the response to Discord in segments
+- chunk_texts(stream) -> AsyncIterator[str]: Text of each SDK response chunk
+- relay_stream(chunks, sinks=(), queue_size=DEFAULT_SINK_QUEUE) -> AsyncIterator[str]
+
+Related files:
+- src/gemini/gemini_hooks/conversation_manager.py: astream_message
+- src/gemini/gemini_client.py: astream_message relays to Discord
+- src/gemini/gemini_apis/transport.py: send_message_stream_async
+"""
+
+import asyncio
+import inspect
+import logging
+from contextlib import aclosing
+from typing import Any, AsyncIterator, Callable, Iterable, List, Optional
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_SINK_QUEUE = 32
+
+# Marks the end of the stream in a sink's queue
+_END = object()
+
+
+class StreamSink:
+    """Interface of the sinks a streamed response is relayed to"""
+
+    async def send(self, text: str) -> None:
+        """
+        Receive the next chunk of the response.
+
+        Args:
+            text: Chunk text
+        """
+        raise NotImplementedError
+
+    async def close(self, text: str, error: Optional[BaseException] = None) -> None:
+        """
+        Receive the end of the response.
+
+        Args:
+            text: The whole response text relayed so far
+            error: Why the stream ended early (e.g. CancelledError), or None if it completed
+        """
+
+
+class CallbackSink(StreamSink):
+    """Calls a function with every chunk (e.g. to write to a websocket)"""
+
+    def __init__(self, callback: Callable[[str], object]):
+        """
+        Initialize the sink.
+
+        Args:
+            callback: Sync or async function called with each chunk
+        """
+        self.callback = callback
+
+    async def send(self, text: str) -> None:
+        result = self.callback(text)
+        if inspect.isawaitable(result):
+            await result
+
+
+class DiscordStreamSink(StreamSink):
+    """Posts a streamed response to Discord in segments as it arrives"""
+
+    def __init__(self, send: Callable[[str, bool, bool], object], segment_chars: int = 1800):
+        """
+        Initialize the sink.
+
+        Webhooks are rate limited, so chunks are collected into segments of about
+        segment_chars (cut at a line break where possible) rather than posted one by one.
+
+        Args:
+            send: Posts one segment; called as send(text, first, final) on a worker thread
+            segment_chars: Length at which a segment is posted before the stream ends
+        """
+        self.post = send
+        self.segment_chars = segment_chars
+        self._buffer = ""
+        self._posted = 0
+        # Characters handed to send(); a cut-short stream may have relayed more
+        self._received = 0
+
+    async def _post(self, text: str, final: bool) -> None:
+        """Post a segment off the event loop"""
+        try:
+            await asyncio.to_thread(self.post, text, self._posted == 0, final)
+        except Exception as e:
+            logger.warning(f"Relaying a response segment to Discord failed: {str(e)}")
+        self._posted += 1
+
+    async def send(self, text: str) -> None:
+        self._buffer += text
+        self._received += len(text)
+        while len(self._buffer) >= self.segment_chars:
+            cut = self._buffer.rfind("\n", 0, self.segment_chars)
+            cut = cut + 1 if cut > 0 else self.segment_chars
+            segment, self._buffer = self._buffer[:cut], self._buffer[cut:]
+            await self._post(segment, final=False)
+
+    async def close(self, text: str, error: Optional[BaseException] = None) -> None:
+        if error is not None:
+            # Chunks still queued for this sink when the stream was cut short
+            self._buffer += text[self._received:] + "\n*(response interrupted)*"
+        if self._buffer or self._posted == 0:
+            await self._post(self._buffer, final=True)
+        self._buffer = ""
+
+
+async def chunk_texts(stream: AsyncIterator[Any]) -> AsyncIterator[str]:
+    """
+    Get the text of each chunk of a streamed SDK response.
+
+    Args:
+        stream: Async iterator of response chunks
+
+    Yields:
+        The non-empty chunk texts
+    """
+    async with aclosing(stream) as chunks:
+        async for chunk in chunks:
+            if chunk.text:
+                yield chunk.text
+
+
+async def _drain(sink: StreamSink, queue: "asyncio.Queue") -> None:
+    """Feed a sink from its queue until the end marker (runs as a task per sink)"""
+    while True:
+        chunk = await queue.get()
+        if chunk is _END:
+            return
+        try:
+            await sink.send(chunk)
+        except Exception as e:
+            logger.warning(f"Stream sink {type(sink).__name__} failed: {str(e)}")
+
+
+async def relay_stream(chunks: AsyncIterator[str], sinks: Iterable[StreamSink] = (),
+                       queue_size: int = DEFAULT_SINK_QUEUE) -> AsyncIterator[str]:
+    """
+    Relay a stream of text chunks to sinks while yielding them to the caller.
+
+    Args:
+        chunks: Async iterator of response text chunks
+        sinks: Sinks that receive every chunk
+        queue_size: Chunks a sink may fall behind before the stream waits for it
+
+    Yields:
+        Each chunk, once every sink has room for it
+    """
+    sinks = list(sinks)
+    queues: List[asyncio.Queue] = [asyncio.Queue(maxsize=queue_size) for _ in sinks]
+    tasks = [asyncio.create_task(_drain(sink, queue)) for sink, queue in zip(sinks, queues)]
+    parts: List[str] = []
+    error: Optional[BaseException] = None
+
+    try:
+        async with aclosing(chunks) as stream:
+            async for chunk in stream:
+                parts.append(chunk)
+                for queue in queues:
+                    # Waits while a sink is queue_size chunks behind
+                    await queue.put(chunk)
+                yield chunk
+    except BaseException as e:
+        # Cancellation and GeneratorExit included: the sinks still learn how the stream ended
+        error = e
+        raise
+    finally:
+        if error is None:
+            for queue in queues:
+                await queue.put(_END)
+            await asyncio.gather(*tasks)
+        else:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        text = "".join(parts)
+        for sink in sinks:
+            try:
+                await sink.close(text, error)
+            except Exception as e:
+                logger.warning(f"Closing stream sink {type(sink).__name__} failed: {str(e)}")
@@ -0,0 +1,255 @@
+"""
+gemini_hooks/track_prefetcher.py - Cross-track prefetching of local and remote preparation
+
+Runs the preparation work for upcoming tracks (content hashing, Gemini file upload and
+token counting) on background threads while the current track is busy with model calls,
+so each track's first model call can start immediately with an already-active upload.
+File slots and bytes are granted in schedule order, and the track a caller is waiting for
+in get() skips the queue and the caps, so a later track can never hold the capacity the
+current one needs.
+
+Exports:
+- TrackPrefetcher(client, lookahead: int = 1, max_outstanding_files: int = 4,
+                  max_prefetch_bytes: int = 256 * 1024 * 1024, count_tokens: bool = True)
+  - schedule(audio_paths: List[Path]) -> None: Start preparing tracks in the background
+  - get(audio_path: Path) -> Dict[str, Any]: Prepared track (blocks until ready)
+  - release(audio_path: Path) -> None: Delete the remote upload and free capacity
+  - shutdown() -> None
+
+Related files:
+- src/gemini/gemini_hooks/audio_to_image_processor.py: Uses prepared uploads in process_multiple_files
+- src/gemini/gemini_apis/audio_api.py: Accepts uploaded file references
+- src/gemini/gemini_apis/transport.py: Uploads, polls, counts and deletes through the transport
+- src/gemini/gemini_utilities/catalogue_index.py: Content hashing
+"""
+
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, Future
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Union
+
+from src.gemini.gemini_apis.transport import as_transport
+from src.gemini.gemini_utilities.catalogue_index import hash_file
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Seconds to wait for an uploaded file to leave the PROCESSING state
+UPLOAD_ACTIVE_TIMEOUT = 120
+UPLOAD_POLL_INTERVAL = 1
+
+
+class TrackPrefetcher:
+    """Prepares upcoming tracks in the background, bounded by remote files and bytes"""
+
+    def __init__(self, client, lookahead: int = 1, max_outstanding_files: int = 4,
+                 max_prefetch_bytes: int = 256 * 1024 * 1024, count_tokens: bool = True):
+        """
+        Initialize the prefetcher.
+
+        Args:
+            client: GeminiClient instance (or a transport or raw google.genai client)
+            lookahead: Number of upcoming tracks prepared while the current one runs
+            max_outstanding_files: Maximum number of uploaded, not yet released files
+            max_prefetch_bytes: Maximum combined size of prepared, not yet released tracks
+            count_tokens: Whether to count the audio tokens of each upload
+        """
+        self.client = client
+        self.transport = as_transport(getattr(client, "transport", client))
+        self.model_name = getattr(client, "model_name", "gemini-2.0-flash")
+        self.lookahead = max(1, lookahead)
+        self.max_outstanding_files = max(1, max_outstanding_files)
+        self.max_prefetch_bytes = max_prefetch_bytes
+        self.count_tokens = count_tokens
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.lookahead, thread_name_prefix="track-prefetch")
+        self._futures: Dict[str, Future] = {}
+        self._capacity = threading.Condition()
+        # Scheduled tracks still waiting for capacity, in schedule order
+        self._queue: List[str] = []
+        # Tracks a get() call is waiting for
+        self._awaited = set()
+        self._outstanding_files = 0
+        self._outstanding_bytes = 0
+        self._closed = False
+
+    def schedule(self, audio_paths: List[Union[str, Path]]) -> None:
+        """
+        Start preparing tracks in the background (already scheduled tracks are skipped).
+
+        Args:
+            audio_paths: Upcoming tracks, in processing order
+        """
+        for audio_path in audio_paths:
+            key = str(audio_path)
+            if key not in self._futures and not self._closed:
+                with self._capacity:
+                    self._queue.append(key)
+                self._futures[key] = self._executor.submit(self._prepare, Path(audio_path))
+
+    def get(self, audio_path: Union[str, Path]) -> Dict[str, Any]:
+        """
+        Get a prepared track, preparing it now if it was never scheduled.
+
+        The track no longer waits for its turn or for free capacity once a caller needs it.
+
+        Args:
+            audio_path: Track to fetch
+
+        Returns:
+            Dictionary with audio_path, content_hash, size, uploaded_file, token_count and
+            prepare_error (uploaded_file is None if preparation failed)
+        """
+        key = str(audio_path)
+        self.schedule([audio_path])
+        with self._capacity:
+            self._awaited.add(key)
+            self._capacity.notify_all()
+        try:
+            return self._futures[key].result()
+        finally:
+            with self._capacity:
+                self._awaited.discard(key)
+
+    def release(self, audio_path: Union[str, Path]) -> None:
+        """
+        Delete a track's remote upload and return its capacity to the prefetcher.
+
+        Args:
+            audio_path: Track whose processing has finished
+        """
+        future = self._futures.pop(str(audio_path), None)
+        if future is None:
+            return
+
+        prepared = future.result()
+        uploaded_file = prepared.get("uploaded_file")
+        if uploaded_file is not None:
+            try:
+                self.transport.delete_file(name=uploaded_file.name)
+            except Exception as e:
+                logger.warning(f"Could not delete uploaded file {uploaded_file.name}: {str(e)}")
+
+        with self._capacity:
+            if uploaded_file is not None:
+                self._outstanding_files -= 1
+            self._outstanding_bytes -= prepared.get("reserved_bytes", 0)
+            self._capacity.notify_all()
+
+    def shutdown(self) -> None:
+        """Release every prepared track and stop the background threads"""
+        self._closed = True
+        with self._capacity:
+            self._capacity.notify_all()
+        for key in list(self._futures):
+            self.release(key)
+        self._executor.shutdown(wait=True)
+
+    def _may_reserve(self, key: str, size: int) -> bool:
+        """Whether a track may take a file slot and its bytes now (call under _capacity)"""
+        if key in self._awaited:
+            return True
+        if self._queue[0] != key:
+            return False
+        return self._outstanding_files < self.max_outstanding_files and (
+            self._outstanding_bytes == 0 or
+            self._outstanding_bytes + size <= self.max_prefetch_bytes)
+
+    def _reserve(self, key: str, size: int) -> bool:
+        """
+        Block until it is a track's turn and a file slot and size bytes are free.
+
+        Returns:
+            bool: False if the prefetcher was shut down meanwhile
+        """
+        with self._capacity:
+            while not self._closed and not self._may_reserve(key, size):
+                self._capacity.wait()
+            self._leave_queue(key)
+            if self._closed:
+                return False
+            self._outstanding_files += 1
+            self._outstanding_bytes += size
+            return True
+
+    def _leave_queue(self, key: str) -> None:
+        """Let the next scheduled track take its turn (call under _capacity)"""
+        if key in self._queue:
+            self._queue.remove(key)
+            self._capacity.notify_all()
+
+    def _prepare(self, audio_path: Path) -> Dict[str, Any]:
+        """Hash, upload and token-count one track (runs on a prefetch thread)"""
+        prepared = {
+            "audio_path": str(audio_path),
+            "content_hash": None,
+            "size": None,
+            "uploaded_file": None,
+            "token_count": None,
+            "reserved_bytes": 0,
+            "prepare_error": None
+        }
+        started = time.monotonic()
+
+        try:
+            prepared["size"] = audio_path.stat().st_size
+            prepared["content_hash"] = hash_file(audio_path)
+
+            if not self._reserve(str(audio_path), prepared["size"]):
+                prepared["prepare_error"] = "Prefetcher shut down"
+                return prepared
+            prepared["reserved_bytes"] = prepared["size"]
+
+            try:
+                uploaded_file = self.transport.upload_file(file=str(audio_path))
+                prepared["uploaded_file"] = self._wait_until_active(uploaded_file)
+            except Exception:
+                # Give the slot back; release() only frees slots of successful uploads
+                with self._capacity:
+                    self._outstanding_files -= 1
+                    self._capacity.notify_all()
+                raise
+
+            if self.count_tokens:
+                try:
+                    response = self.transport.count_tokens(
+                        model=self.model_name, contents=[prepared["uploaded_file"]])
+                    prepared["token_count"] = response.total_tokens
+                except Exception as e:
+                    logger.warning(f"Token count failed for {audio_path.name}: {str(e)}")
+
+            logger.info(
+                f"Prefetched {audio_path.name} in {time.monotonic() - started:.1f}s "
+                f"({prepared['token_count']} tokens)")
+
+        except Exception as e:
+            logger.warning(f"Prefetch failed for {audio_path.name}: {str(e)}")
+            prepared["prepare_error"] = str(e)
+            # A track that failed before its reservation must not hold up the queue
+            with self._capacity:
+                self._leave_queue(str(audio_path))
+
+        return prepared
+
+    def _wait_until_active(self, uploaded_file):
+        """Poll an uploaded file until the Files API has finished processing it"""
+        deadline = time.monotonic() + UPLOAD_ACTIVE_TIMEOUT
+        while self._state_name(uploaded_file) == "PROCESSING":
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"Upload {uploaded_file.name} still processing")
+            time.sleep(UPLOAD_POLL_INTERVAL)
+            uploaded_file = self.transport.get_file(name=uploaded_file.name)
+
+        if self._state_name(uploaded_file) == "FAILED":
+            raise RuntimeError(f"Upload {uploaded_file.name} failed processing")
+        return uploaded_file
+
+    @staticmethod
+    def _state_name(uploaded_file) -> Optional[str]:
+        """Return the upload state as a plain string (e.g. "ACTIVE")"""
+        state = getattr(uploaded_file, "state", None)
+        return getattr(state, "name", state)
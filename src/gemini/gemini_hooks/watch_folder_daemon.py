@@ -0,0 +1,247 @@
+"""
+gemini_hooks/watch_folder_daemon.py - Long-running watch-folder ingestion for the pipeline
+
+Watches the data_source folder (inotify on Linux, polling elsewhere), waits until newly
+copied MP3 files have stopped changing, and feeds new or stale tracks into a persistent
+worker pool so the Gemini client, processors and caches stay warm between tracks. Tracks
+that are pending when the daemon starts settle like new files, as they may still be being
+copied. With a worker_factory, each worker thread builds its own process function (e.g.
+around a processor of its own) on its first track.
+
+Exports:
+- WatchFolderDaemon(process_fn: Callable[[Path], Dict[str, Any]] | None, catalogue: CatalogueIndex,
+                    max_workers: int = 1, settle_seconds: float = 5.0, poll_interval: float = 2.0,
+                    use_inotify: bool = True, worker_factory: Callable[[], Callable] | None = None)
+  - run() -> None: Block until stop() is called or SIGINT/SIGTERM is received, then drain
+  - stop() -> None: Request a graceful shutdown
+  - get_status() -> Dict[str, Any]
+
+Related files:
+- src/main.py: Starts the daemon for --watch
+- src/gemini/gemini_hooks/inotify_watcher.py: Change notifications on Linux
+- src/gemini/gemini_utilities/catalogue_index.py: Decides which tracks are new or stale
+"""
+
+import sys
+import time
+import signal
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, Future
+from pathlib import Path
+from typing import Callable, Dict, Any, Optional, Set, Tuple
+
+from src.gemini.gemini_hooks.inotify_watcher import InotifyWatcher
+from src.gemini.gemini_utilities.catalogue_index import CatalogueIndex
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class WatchFolderDaemon:
+    """Continuously ingests MP3 files dropped into the catalogue folder"""
+
+    def __init__(self, process_fn: Optional[Callable[[Path], Dict[str, Any]]],
+                 catalogue: CatalogueIndex, max_workers: int = 1, settle_seconds: float = 5.0,
+                 poll_interval: float = 2.0, use_inotify: bool = True,
+                 worker_factory: Optional[Callable[[], Callable[[Path], Dict[str, Any]]]] = None):
+        """
+        Initialize the daemon.
+
+        Args:
+            process_fn: Processes one track and records its result (e.g. AudioImageGenerator.process_audio_file);
+                shared by all workers, and unused when worker_factory is given
+            catalogue: Catalogue index of the watched folder
+            max_workers: Number of tracks processed concurrently
+            settle_seconds: How long a file's size and mtime must stay unchanged before it is ingested
+            poll_interval: Seconds between folder checks (and the inotify wait timeout)
+            use_inotify: Use inotify when available instead of polling only
+            worker_factory: Builds the process function of one worker thread, so workers
+                do not share per-track state
+        """
+        if process_fn is None and worker_factory is None:
+            raise ValueError("WatchFolderDaemon needs a process_fn or a worker_factory")
+        self.process_fn = process_fn
+        self.worker_factory = worker_factory
+        self._worker = threading.local()
+        self.catalogue = catalogue
+        self.watch_dir = catalogue.data_dir
+        self.max_workers = max_workers
+        self.settle_seconds = settle_seconds
+        self.poll_interval = poll_interval
+        self.use_inotify = use_inotify
+
+        self._stop_event = threading.Event()
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._in_flight: Dict[str, Future] = {}
+        # name -> (size, mtime, time the file was first seen with that size/mtime)
+        self._candidates: Dict[str, Tuple[int, float, float]] = {}
+        self._known: Dict[str, Tuple[int, float]] = {}
+        self.processed_count = 0
+        self.failed_count = 0
+
+    def install_signal_handlers(self) -> None:
+        """Stop gracefully on SIGINT/SIGTERM (main thread only)"""
+        def handle_signal(signum, frame):
+            logger.info(f"Received signal {signum}, draining in-flight tracks")
+            self.stop()
+
+        signal.signal(signal.SIGINT, handle_signal)
+        if hasattr(signal, "SIGTERM"):
+            signal.signal(signal.SIGTERM, handle_signal)
+
+    def stop(self) -> None:
+        """Request a graceful shutdown; run() returns once in-flight tracks finish"""
+        self._stop_event.set()
+
+    def get_status(self) -> Dict[str, Any]:
+        """
+        Get the current daemon status.
+
+        Returns:
+            Dictionary with in-flight tracks, pending candidates and counters
+        """
+        with self._lock:
+            return {
+                "in_flight": sorted(self._in_flight),
+                "settling": sorted(self._candidates),
+                "processed": self.processed_count,
+                "failed": self.failed_count,
+                "stopping": self._stop_event.is_set()
+            }
+
+    def run(self) -> None:
+        """Watch the folder until stopped, then drain in-flight tracks and return"""
+        watcher = self._create_watcher()
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="track-worker")
+        logger.info(
+            f"Watching {self.watch_dir} with {self.max_workers} worker(s) "
+            f"({'inotify' if watcher else 'polling'})")
+
+        try:
+            # Pick up anything that arrived or went stale while the daemon was down; it may
+            # still be being copied, so it settles like a new file
+            self.catalogue.scan()
+            self._known = self._snapshot()
+            now = time.monotonic()
+            for audio_path in self.catalogue.pending_tracks():
+                if audio_path.name in self._known:
+                    self._candidates[audio_path.name] = (*self._known[audio_path.name], now)
+            self._ingest_settled()
+
+            while not self._stop_event.is_set():
+                if watcher:
+                    changed = watcher.wait(self.poll_interval)
+                else:
+                    self._stop_event.wait(self.poll_interval)
+                    changed = set()
+                self._update_candidates(changed)
+                self._ingest_settled()
+        finally:
+            if watcher:
+                watcher.close()
+            self._drain()
+
+    def _create_watcher(self) -> Optional[InotifyWatcher]:
+        """Create an inotify watcher, or return None to fall back to polling"""
+        if not self.use_inotify or not sys.platform.startswith("linux"):
+            return None
+        try:
+            return InotifyWatcher(self.watch_dir)
+        except (OSError, AttributeError) as e:
+            logger.warning(f"inotify unavailable ({e}), falling back to polling")
+            return None
+
+    def _snapshot(self) -> Dict[str, Tuple[int, float]]:
+        """Return the (size, mtime) of every MP3 currently in the folder"""
+        snapshot = {}
+        for path in self.watch_dir.glob("*.mp3"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            snapshot[path.name] = (stat.st_size, stat.st_mtime)
+        return snapshot
+
+    def _update_candidates(self, changed: Set[str]) -> None:
+        """Track files that are new or changed since the last check"""
+        # Polling is the source of truth; inotify events only make detection immediate
+        snapshot = self._snapshot()
+        now = time.monotonic()
+
+        for name, (size, mtime) in snapshot.items():
+            if self._known.get(name) == (size, mtime) and name not in changed and name not in self._candidates:
+                continue
+            previous = self._candidates.get(name)
+            if previous is None or previous[:2] != (size, mtime):
+                self._candidates[name] = (size, mtime, now)
+
+        for name in list(self._candidates):
+            if name not in snapshot:
+                del self._candidates[name]
+        self._known = snapshot
+
+    def _ingest_settled(self) -> None:
+        """Submit candidates whose size and mtime have been stable for settle_seconds"""
+        now = time.monotonic()
+        settled = [name for name, (size, _, since) in self._candidates.items()
+                   if size > 0 and now - since >= self.settle_seconds]
+        if not settled:
+            return
+
+        self.catalogue.scan()
+        for name in settled:
+            del self._candidates[name]
+            if self.catalogue.is_stale(name):
+                self._submit(self.watch_dir / name)
+            else:
+                logger.info(f"{name} is already up to date, skipping")
+
+    def _submit(self, audio_path: Path) -> None:
+        """Queue a track on the worker pool unless it is already in flight"""
+        with self._lock:
+            if audio_path.name in self._in_flight or self._stop_event.is_set():
+                return
+            logger.info(f"Queueing {audio_path.name}")
+            future = self._executor.submit(self._process, audio_path)
+            self._in_flight[audio_path.name] = future
+
+    def _process_fn(self) -> Callable[[Path], Dict[str, Any]]:
+        """Process function of the calling worker thread (built on its first track)"""
+        if self.worker_factory is None:
+            return self.process_fn
+        process_fn = getattr(self._worker, "process_fn", None)
+        if process_fn is None:
+            process_fn = self._worker.process_fn = self.worker_factory()
+        return process_fn
+
+    def _process(self, audio_path: Path) -> None:
+        """Worker body: process one track and update counters"""
+        try:
+            result = self._process_fn()(audio_path)
+            with self._lock:
+                if result.get("image_success", False):
+                    self.processed_count += 1
+                else:
+                    self.failed_count += 1
+        except Exception as e:
+            logger.exception(f"Unhandled error processing {audio_path}: {str(e)}")
+            with self._lock:
+                self.failed_count += 1
+        finally:
+            with self._lock:
+                self._in_flight.pop(audio_path.name, None)
+
+    def _drain(self) -> None:
+        """Finish tracks that already started; queued tracks stay stale for the next run"""
+        if self._executor is None:
+            return
+        with self._lock:
+            in_flight = len(self._in_flight)
+        logger.info(f"Shutting down, waiting for {in_flight} in-flight track(s)")
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        logger.info(
+            f"Watch daemon stopped: {self.processed_count} processed, {self.failed_count} failed")
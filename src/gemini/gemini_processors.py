@@ -0,0 +1,119 @@
+"""
+gemini_processors.py - The workflow processors of GeminiClient
+
+The audio, image and audio-to-image processors, the conversation manager and the chat
+session pool are built on first use, all sharing the client's transport, and the
+audio-to-image methods of the client delegate to the pipeline processor.
+
+GeminiProcessors is the processor half of GeminiClient; it expects the client's api_key,
+model_name, rate_limiter and transport.
+
+Exports:
+- GeminiProcessors
+  - audio_processor, image_processor, audio_to_image_processor, conversation_manager,
+    session_pool: Built on first use
+  - process_audio_file(audio_path) -> Dict, process_multiple_files(audio_paths) -> List[Dict]
+  - clean_output_directories() -> None, perform_multi_step_audio_analysis(audio_path) -> Dict
+
+Related files:
+- src/gemini/gemini_client.py: GeminiClient
+- src/gemini/gemini_hooks/: The processors
+"""
+
+from functools import cached_property
+
+
+class GeminiProcessors:
+    """Processors built on first use and the pipeline methods delegating to them"""
+
+    @cached_property
+    def audio_processor(self):
+        """AudioProcessor using this client"""
+        from src.gemini.gemini_hooks.audio_processor import AudioProcessor
+        return AudioProcessor(self)
+
+    @cached_property
+    def image_processor(self):
+        """ImageProcessor using this client"""
+        from src.gemini.gemini_hooks.image_processor import ImageProcessor
+        return ImageProcessor(self)
+
+    @cached_property
+    def audio_to_image_processor(self):
+        """AudioToImageProcessor using this client (AudioImageProcessor may replace it)"""
+        from src.gemini.gemini_hooks.audio_to_image_processor import AudioToImageProcessor
+        return AudioToImageProcessor(self)
+
+    @cached_property
+    def conversation_manager(self):
+        """ConversationManager sharing this client's transport and rate limiter"""
+        from src.gemini.gemini_hooks.conversation_manager import ConversationManager
+
+        return ConversationManager(
+            api_key=self.api_key,
+            model_name=self.model_name,
+            rate_limiter=self.rate_limiter,
+            transport=self.transport
+        )
+
+    @cached_property
+    def session_pool(self):
+        """ChatSessionPool of persistent sessions sharing this client's transport"""
+        from src.gemini.gemini_hooks.session_pool import ChatSessionPool
+
+        return ChatSessionPool(
+            api_key=self.api_key,
+            model_name=self.model_name,
+            rate_limiter=self.rate_limiter,
+            transport=self.transport
+        )
+    # Audio-to-image processing methods
+    def process_audio_file(self, audio_path):
+        """
+        Process a single audio file through the entire pipeline:
+        1. Analyze audio with Gemini
+        2. Generate an image prompt
+        3. Generate an image
+
+        Args:
+            audio_path: Path to the audio file
+
+        Returns:
+            Dictionary with results of the processing
+        """
+        return self.audio_to_image_processor.process_audio_file(audio_path)
+
+    def process_multiple_files(self, audio_paths):
+        """
+        Process multiple audio files and send a summary to Discord
+
+        Args:
+            audio_paths: List of paths to audio files
+
+        Returns:
+            List of dictionaries with processing results
+        """
+        return self.audio_to_image_processor.process_multiple_files(audio_paths)
+
+    def clean_output_directories(self):
+        """
+        Clean the output directories before processing files.
+        """
+        return self.audio_to_image_processor.clean_output_directories()
+
+    def perform_multi_step_audio_analysis(self, audio_path):
+        """
+        Perform a four-step viral music analysis of an audio file:
+        1. Step 1: Core Elements and Viral Hook Foundation - identifies genre, tempo, key, mood, instrumentation, and potential viral hooks
+        2. Step 2: Sound Engineering, Techniques, and Trend Analysis - evaluates production quality, mix engineering, and trend alignment
+        3. Step 3: Harmony, Melody, and Viral Hook Refinement - analyzes harmonic structure, melodic elements, and refines viral hook potential
+        4. Step 4: Structure, Production, and Viral Hook Optimization - examines song structure, production techniques, and optimizes viral elements
+        5. Final Analysis: Comprehensive merge of all analyses focused on viral content creation
+
+        Args:
+            audio_path: Path to the audio file
+
+        Returns:
+            Dictionary with all analyses and results, with focus on viral potential
+        """
+        return self.audio_to_image_processor.perform_multi_step_analysis(audio_path)
@@ -6,6 +6,8 @@ Exports prompt templates for various tasks:
 - Generation prompts: For creating images, stories, and expanding ideas
 - Multi-step analysis prompts: For the five-step viral music analysis
 - Refinement prompts: For critical evaluation of final analysis
+- Listening prompts: Listening-session preambles and the revision prompt
+- Prompt registry: Precompiled, versioned templates of all of the above
 
 Related files:
 - src/gemini/gemini_client.py: Main client that uses these prompts
@@ -16,7 +18,8 @@ Related files:
 from src.gemini.gemini_prompts.analysis_prompts import (
     get_audio_analysis_prompt,
     get_image_analysis_prompt,
-    get_content_analysis_prompt
+    get_content_analysis_prompt,
+    get_conversation_summary_prompt
 )
 
 from src.gemini.gemini_prompts.generation_prompts import (
@@ -44,6 +47,20 @@ from src.gemini.gemini_prompts.refinement_prompt import (
     get_final_refinery_prompt
 )
 
+from src.gemini.gemini_prompts.listening_prompts import (
+    get_analysis_listening_prompt,
+    get_generation_listening_prompt,
+    get_image_prompt_listening_prompt,
+    get_image_listening_prompt,
+    get_revision_prompt
+)
+
+from src.gemini.gemini_prompts.prompt_registry import (
+    PromptTemplate,
+    PromptRegistry,
+    prompt_registry
+)
+
 __all__ = [
     # Analysis prompts
     'get_audio_analysis_prompt',
@@ -70,5 +87,17 @@ __all__ = [
     'get_refinery_analyst3_prompt',
     'get_refinery_analyst4_prompt',
     'get_refinery_analyst5_prompt',
-    'get_final_refinery_prompt'
+    'get_final_refinery_prompt',
+
+    # Listening prompts
+    'get_analysis_listening_prompt',
+    'get_generation_listening_prompt',
+    'get_image_prompt_listening_prompt',
+    'get_image_listening_prompt',
+    'get_revision_prompt',
+
+    # Prompt registry
+    'PromptTemplate',
+    'PromptRegistry',
+    'prompt_registry'
 ]
@@ -5,11 +5,13 @@ Provides prompt templates for various analysis tasks:
 - get_audio_analysis_prompt(): Returns a detailed prompt for audio analysis
 - get_image_analysis_prompt(): Returns a prompt for image analysis
 - get_content_analysis_prompt(): Returns a general content analysis prompt
+- get_conversation_summary_prompt(transcript): Returns a prompt that condenses earlier chat turns
 
 Related files:
 - src/gemini/gemini_client.py: Main client that uses these prompts
 - src/gemini/gemini_apis/audio_api.py: Uses audio analysis prompts
 - src/gemini/gemini_apis/image_api.py: Uses image analysis prompts
+- src/gemini/gemini_hooks/conversation_manager.py: Uses the conversation summary prompt
 """
 
 
@@ -123,3 +125,29 @@ def get_content_analysis_prompt() -> str:
        
     Provide a balanced analysis with specific examples from the content to support your observations.
     """
+
+
+def get_conversation_summary_prompt(transcript: str) -> str:
+    """
+    Get a prompt that condenses the earlier turns of a chat session.
+
+    Args:
+        transcript: The earlier turns, one "role: text" block per message
+
+    Returns:
+        str: Prompt for a summary that can replace the earlier turns
+    """
+    return f"""
+    The following is the earlier part of a conversation between a user and an assistant about music production, audio analysis and artwork. It will be replaced by your summary, so the conversation can continue without it.
+
+    Write a concise summary that keeps:
+    - Every decision, preference and constraint the user stated
+    - Facts established about the tracks, images and files discussed (names, keys, tempos, moods, colours)
+    - Open questions and tasks that are not finished yet
+    - What the attached media (marked in brackets) contained, as far as the conversation reveals it
+
+    Leave out greetings, repetition and superseded ideas. Write in the third person and do not address the user.
+
+    CONVERSATION:
+    {transcript}
+    """
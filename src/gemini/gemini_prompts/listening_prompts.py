@@ -0,0 +1,151 @@
+"""
+gemini_prompts/listening_prompts.py - Listening-session preambles and the revision prompt
+
+Provides the prompts the audio-to-image processor used to build inline:
+- get_analysis_listening_prompt(prompt): Five-session preamble for audio analysis calls
+- get_generation_listening_prompt(prompt): Five-session preamble for generation calls with audio
+- get_image_prompt_listening_prompt(prompt): Visual five-session preamble for image prompt generation
+- get_image_listening_prompt(prompt): Visual five-session preamble for image generation
+- get_revision_prompt(final_analysis, refined_analysis): Revised final analysis from the refinement
+
+Related files:
+- src/gemini/gemini_hooks/audio_to_image_processor.py: Wraps its model calls with these prompts
+- src/gemini/gemini_prompts/prompt_registry.py: Registers these prompts with version ids
+- src/gemini/gemini_prompts/prompt_profiler.py: Reports their share of each call's tokens
+"""
+
+
+def get_analysis_listening_prompt(prompt: str) -> str:
+    """
+    Prepend the listening-session instructions used for audio analysis calls.
+
+    Args:
+        prompt: The analysis prompt to wrap
+
+    Returns:
+        str: Prompt with the listening preamble
+    """
+    return f"""!IMPORTANT: Listen to the provided audio file at least 5 complete times before beginning your analysis.
+For each listening session, focus on a different aspect of the track.
+Listening session 1: Focus on overall impression, genre, and mood.
+Listening session 2: Focus on composition, melody, and harmony.
+Listening session 3: Focus on production techniques and sound engineering.
+Listening session 4: Focus on arrangement and structure.
+Listening session 5: Focus on details you might have missed in previous sessions.
+
+{prompt}"""
+
+
+def get_generation_listening_prompt(prompt: str) -> str:
+    """
+    Prepend the listening-session instructions used for generation calls that include audio.
+
+    Args:
+        prompt: The generation prompt to wrap
+
+    Returns:
+        str: Prompt with the listening preamble
+    """
+    return f"""!IMPORTANT: Listen to the provided audio file at least 5 complete times before proceeding.
+For each listening session, focus on a different aspect of the track.
+Listening session 1: Focus on overall impression, genre, and mood.
+Listening session 2: Focus on composition, melody, and harmony.
+Listening session 3: Focus on production techniques and sound engineering.
+Listening session 4: Focus on arrangement and structure.
+Listening session 5: Focus on details you might have missed in previous sessions.
+
+{prompt}"""
+
+
+def get_image_prompt_listening_prompt(prompt: str) -> str:
+    """
+    Prepend the visual listening-session instructions used for image prompt generation.
+
+    Args:
+        prompt: The image prompt template to wrap
+
+    Returns:
+        str: Prompt with the listening preamble
+    """
+    return f"""!IMPORTANT: Listen to the provided audio file at least 5 complete times before generating the image prompt.
+For each listening session, focus on a different aspect to visualize:
+Listening session 1: Focus on mood, atmosphere, and emotional impact.
+Listening session 2: Focus on key visual elements suggested by the genre and style.
+Listening session 3: Focus on colors, textures, and lighting that match the sound.
+Listening session 4: Focus on composition and arrangement of visual elements.
+Listening session 5: Focus on unique visual characteristics that make this track special.
+
+{prompt}"""
+
+
+def get_image_listening_prompt(prompt: str) -> str:
+    """
+    Prepend the visual listening-session instructions used for image generation.
+
+    Args:
+        prompt: The image description from the generated prompt JSON
+
+    Returns:
+        str: Prompt with the listening preamble
+    """
+    return f"""!IMPORTANT: Listen to the provided audio file at least 5 complete times before generating the image.
+For each listening session, focus on a different visual aspect:
+Listening session 1: Focus on overall mood and atmosphere for the image.
+Listening session 2: Focus on primary colors and lighting that match the track's energy.
+Listening session 3: Focus on textures and patterns suggested by the sound.
+Listening session 4: Focus on composition elements and visual rhythm.
+Listening session 5: Focus on special details that will make the image unique to this track.
+
+Now generate an image that represents this track visually:
+
+{prompt}"""
+
+
+def get_revision_prompt(final_analysis: str, refined_analysis: str) -> str:
+    """
+    Get the prompt that merges the refinement's corrections into the final analysis.
+
+    Args:
+        final_analysis: The original final analysis text
+        refined_analysis: The refined analysis text with critique and corrections
+
+    Returns:
+        str: Prompt for the revised final analysis
+    """
+    return f"""You are a music analysis system tasked with creating the most accurate analysis possible.
+!IMPORTANT: Listen to the provided audio file at least 5 complete times for each of the following purposes:
+- Listening session 1-5: Listen 5 times to ensure a thorough understanding of the track.
+- Listening session 6-10: Listen 5 more times to verify accuracy of the final analysis.
+- Listening session 11-15: Listen 5 more times to verify accuracy of the refined analysis.
+- Listening session 16-20: Listen 5 more times to perform your own critical assessment.
+- Listening session 21-25: Listen 5 final times to ensure your revised analysis is 100% accurate.
+
+For each set of 5 listening sessions, focus on:
+Session 1: Overall impression, genre, and mood
+Session 2: Composition, melody, and harmony
+Session 3: Production techniques and sound engineering
+Session 4: Arrangement and structure
+Session 5: Details you might have missed in previous sessions
+
+I have:
+1. A final analysis of an audio track
+2. A refined analysis from a critical Musical Foundation Specialist who has verified technical claims and found potential errors
+
+Your task: Create a revised version of the final analysis that incorporates the refinements, corrections, and verified details from the refined analysis. The revised analysis should be factually accurate, technically sound, and maintain the comprehensive nature of the original final analysis while correcting any inaccuracies identified in the refinement.
+
+FINAL ANALYSIS:
+{final_analysis}
+
+REFINED ANALYSIS (with verified details and corrections):
+{refined_analysis}
+
+INSTRUCTIONS:
+1. Maintain the structure and comprehensive nature of the original final analysis
+2. Incorporate all factual corrections from the refined analysis
+3. Add any important technical details highlighted in the refinement
+4. Remove any inaccurate claims identified in the refinement
+5. Keep the total length similar to the original final analysis
+6. Ensure all details are consistent and technically accurate
+
+Create a revised, corrected, and improved final analysis based on these inputs.
+"""
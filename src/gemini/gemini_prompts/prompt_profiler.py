@@ -0,0 +1,286 @@
+"""
+gemini_prompts/prompt_profiler.py - Token, redundancy and cost report for the prompt chain
+
+Renders every model call the audio-to-image pipeline makes for one track, using saved step
+outputs from output/ as sample slot values (or synthetic text when none exist), and reports:
+- tokens per section of each call (listening preambles, template instructions, each slot)
+- instruction spans repeated within and across calls, with the tokens they waste per track
+- slot values re-sent to later calls (e.g. the Step 1 output in every following step)
+- estimated cost and latency of each call and each template per track
+
+Runs offline with the estimates from token_utils; --exact counts whole prompts with the
+API's count_tokens instead.
+
+Usage:
+    python -m src.gemini.gemini_prompts.prompt_profiler [--track STEM] [--json report.json]
+(see prompt_profiler_cli.py)
+
+Exports:
+- PIPELINE_CHAIN: List[Dict[str, Any]] - Model calls made per track and how their prompts are built
+- DEFAULT_PRICING: Dict[str, float] - USD per million input/audio/output tokens
+- DEFAULT_LATENCY: Dict[str, float] - Base latency and prefill/decode throughput
+- load_sample_outputs(analysis_dir, prompt_dir, track=None, synthetic_tokens=1500) -> Dict[str, str]
+- profile_chain(outputs, audio_seconds=180.0, pricing=None, latency=None,
+                min_span_words=8, count_tokens=None) -> Dict[str, Any]
+- find_repeated_spans(texts: Dict[str, List[str]], min_words: int = 8) -> List[Dict[str, Any]]
+- count_redundant_tokens(texts: Dict[str, List[str]], min_words: int = 8) -> int
+- format_report(profile: Dict[str, Any]) -> str
+- main(argv: List[str] | None = None) -> int
+
+Related files:
+- src/gemini/gemini_prompts/prompt_samples.py: Saved outputs used as sample slot values
+- src/gemini/gemini_prompts/prompt_redundancy.py: Repeated instruction spans
+- src/gemini/gemini_prompts/prompt_profiler_cli.py: The command line
+- src/gemini/gemini_prompts/prompt_registry.py: Renders the templates
+- src/gemini/gemini_utilities/token_utils.py: Offline token estimates
+- src/gemini/gemini_hooks/audio_to_image_processor.py: The pipeline this chain mirrors
+"""
+
+import sys
+import logging
+from typing import Any, Callable, Dict, List, Optional
+
+from src.gemini.gemini_prompts.prompt_registry import prompt_registry
+from src.gemini.gemini_utilities.token_utils import estimate_text_tokens, estimate_audio_tokens
+# The sample loading and redundancy helpers are re-exported, so callers keep importing them
+# from here
+from src.gemini.gemini_prompts.prompt_samples import load_sample_outputs
+from src.gemini.gemini_prompts.prompt_redundancy import count_redundant_tokens, find_repeated_spans
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Calls made per track, in order. "wrappers" are listening preambles applied outermost
+# first, "slots" map template slots to sample outputs, "output" names the call's result
+# and "audio" marks calls that send the track along with the prompt.
+PIPELINE_CHAIN = [
+    {"call": "step1_analysis", "wrappers": ["analysis_listening"], "template": "step1",
+     "slots": {}, "output": "step1", "audio": True},
+    {"call": "step2_analysis", "wrappers": ["generation_listening"], "template": "step2",
+     "slots": {"step1_analysis": "step1"}, "output": "step2", "audio": True},
+    {"call": "step3_analysis", "wrappers": ["generation_listening"], "template": "step3",
+     "slots": {"step1_analysis": "step1", "step2_analysis": "step2"},
+     "output": "step3", "audio": True},
+    {"call": "step4_analysis", "wrappers": ["generation_listening"], "template": "step4",
+     "slots": {"step1_analysis": "step1", "step2_analysis": "step2", "step3_analysis": "step3"},
+     "output": "step4", "audio": True},
+    {"call": "step5_analysis", "wrappers": ["generation_listening"], "template": "step5",
+     "slots": {"step1_analysis": "step1", "step2_analysis": "step2", "step3_analysis": "step3",
+               "step4_analysis": "step4"},
+     "output": "step5", "audio": True},
+    {"call": "final_integration", "wrappers": ["generation_listening"],
+     "template": "final_integration",
+     "slots": {"step1_analysis": "step1", "step2_analysis": "step2", "step3_analysis": "step3",
+               "step4_analysis": "step4", "step5_analysis": "step5"},
+     "output": "final_analysis", "audio": True},
+    {"call": "refinement", "wrappers": ["analysis_listening"], "template": "refinement",
+     "slots": {"final_analysis": "final_analysis"}, "output": "refined_analysis", "audio": True},
+    {"call": "revision", "wrappers": ["generation_listening"], "template": "revision",
+     "slots": {"final_analysis": "final_analysis", "refined_analysis": "refined_analysis"},
+     "output": "revised_analysis", "audio": True},
+    {"call": "image_prompt", "wrappers": ["analysis_listening", "image_prompt_listening"],
+     "template": "image_generation", "slots": {"analysis_text": "refined_analysis"},
+     "output": "image_prompt", "audio": True},
+    {"call": "image_generation", "wrappers": [], "template": "image_listening",
+     "slots": {"prompt": "image_prompt"}, "output": None, "audio": False},
+]
+
+# USD per million tokens (gemini-2.0-flash list prices)
+DEFAULT_PRICING = {"input": 0.10, "audio": 0.70, "output": 0.40}
+
+# Time to first token plus prefill and decode throughput
+DEFAULT_LATENCY = {"base_seconds": 0.6, "input_tokens_per_second": 20000.0,
+                   "output_tokens_per_second": 150.0}
+
+# Output tokens assumed for the image call (a short description next to the image)
+IMAGE_CALL_OUTPUT_TOKENS = 100
+
+
+def _static_texts(template_name: str, rendered_text: str) -> List[str]:
+    """Literal instruction text of a template (the whole render if it is not precompiled)"""
+    template = prompt_registry.get(template_name)
+    if not template.compiled:
+        return [rendered_text]
+    return [value for kind, value in template.segments if kind == "text"]
+
+
+def _estimate_cost(input_tokens: int, audio_tokens: int, output_tokens: int,
+                   pricing: Dict[str, float], latency: Dict[str, float]) -> Dict[str, float]:
+    """Cost (USD) and latency (seconds) of one call"""
+    cost = (input_tokens * pricing["input"] + audio_tokens * pricing["audio"]
+            + output_tokens * pricing["output"]) / 1_000_000
+    seconds = (latency["base_seconds"]
+               + (input_tokens + audio_tokens) / latency["input_tokens_per_second"]
+               + output_tokens / latency["output_tokens_per_second"])
+    return {"cost_usd": round(cost, 6), "latency_seconds": round(seconds, 2)}
+
+
+def profile_chain(outputs: Dict[str, str], audio_seconds: float = 180.0,
+                  pricing: Optional[Dict[str, float]] = None,
+                  latency: Optional[Dict[str, float]] = None, min_span_words: int = 8,
+                  count_tokens: Optional[Callable[[str], int]] = None) -> Dict[str, Any]:
+    """
+    Render the per-track chain and account for its tokens, redundancy, cost and latency.
+
+    Args:
+        outputs: Sample output texts (see load_sample_outputs)
+        audio_seconds: Track duration used for the audio tokens of each audio call
+        pricing: USD per million tokens (defaults to DEFAULT_PRICING)
+        latency: Latency model (defaults to DEFAULT_LATENCY)
+        min_span_words: Minimum length of reported repeated spans
+        count_tokens: Exact token counter for whole prompts; estimates are used if None
+
+    Returns:
+        Dictionary with calls, templates, repeated_spans, resent_slots and totals
+    """
+    pricing = pricing or DEFAULT_PRICING
+    latency = latency or DEFAULT_LATENCY
+    audio_tokens = estimate_audio_tokens(audio_seconds)
+
+    calls = []
+    instruction_texts: Dict[str, List[str]] = {}
+    templates: Dict[str, Dict[str, Any]] = {}
+    resent: Dict[str, Dict[str, Any]] = {}
+
+    for step in PIPELINE_CHAIN:
+        slots = {slot: outputs[source] for slot, source in step["slots"].items()}
+        rendered = prompt_registry.render(step["template"], **slots)
+        sections = [{"section": f"{step['template']} instructions",
+                     "tokens": rendered["static_tokens"]}]
+        sections += [{"section": f"slot {slot} <- {step['slots'][slot]}", "tokens": tokens}
+                     for slot, tokens in rendered["slot_tokens"].items()]
+        texts = _static_texts(step["template"], rendered["text"])
+        used_templates = [(step["template"], rendered["static_tokens"])]
+
+        text = rendered["text"]
+        for wrapper in reversed(step["wrappers"]):
+            wrapped = prompt_registry.render(wrapper, prompt=text)
+            sections.insert(0, {"section": f"{wrapper} preamble",
+                                "tokens": wrapped["static_tokens"]})
+            texts = _static_texts(wrapper, wrapped["text"]) + texts
+            used_templates.append((wrapper, wrapped["static_tokens"]))
+            text = wrapped["text"]
+
+        input_tokens = sum(section["tokens"] for section in sections)
+        exact_tokens = count_tokens(text) if count_tokens else None
+        call_audio_tokens = audio_tokens if step["audio"] else 0
+        output_tokens = (estimate_text_tokens(outputs[step["output"]]) if step["output"]
+                         else IMAGE_CALL_OUTPUT_TOKENS)
+        estimate = _estimate_cost(exact_tokens or input_tokens, call_audio_tokens, output_tokens,
+                                  pricing, latency)
+
+        calls.append({
+            "call": step["call"],
+            "sections": sections,
+            "input_tokens": input_tokens,
+            "exact_input_tokens": exact_tokens,
+            "audio_tokens": call_audio_tokens,
+            "output_tokens": output_tokens,
+            **estimate
+        })
+        instruction_texts[step["call"]] = texts
+
+        for name, tokens in used_templates:
+            entry = templates.setdefault(name, {"template": name,
+                                                "version_id": prompt_registry.get(name).version_id,
+                                                "calls": 0, "tokens_per_track": 0})
+            entry["calls"] += 1
+            entry["tokens_per_track"] += tokens
+
+        for slot, source in step["slots"].items():
+            entry = resent.setdefault(source, {"output": source, "calls": [], "tokens_per_send": 0})
+            entry["calls"].append(step["call"])
+            entry["tokens_per_send"] = rendered["slot_tokens"].get(slot, 0)
+
+    for entry in templates.values():
+        entry.update(_estimate_cost(entry["tokens_per_track"], 0, 0, pricing, latency))
+        entry["latency_seconds"] = round(entry["tokens_per_track"] / latency["input_tokens_per_second"], 2)
+
+    resent_slots = [dict(entry, sends=len(entry["calls"]),
+                         resent_tokens=entry["tokens_per_send"] * (len(entry["calls"]) - 1))
+                    for entry in resent.values() if len(entry["calls"]) > 1]
+    resent_slots.sort(key=lambda entry: entry["resent_tokens"], reverse=True)
+
+    repeated_spans = find_repeated_spans(instruction_texts, min_span_words)
+    totals = {
+        "input_tokens": sum(call["exact_input_tokens"] or call["input_tokens"] for call in calls),
+        "audio_tokens": sum(call["audio_tokens"] for call in calls),
+        "output_tokens": sum(call["output_tokens"] for call in calls),
+        "cost_usd": round(sum(call["cost_usd"] for call in calls), 6),
+        "latency_seconds": round(sum(call["latency_seconds"] for call in calls), 2),
+        "repeated_instruction_tokens": count_redundant_tokens(instruction_texts, min_span_words),
+        "resent_slot_tokens": sum(entry["resent_tokens"] for entry in resent_slots)
+    }
+
+    return {
+        "track": outputs.get("track"),
+        "audio_seconds": audio_seconds,
+        "exact": count_tokens is not None,
+        "calls": calls,
+        "templates": sorted(templates.values(), key=lambda entry: entry["tokens_per_track"],
+                            reverse=True),
+        "repeated_spans": repeated_spans,
+        "resent_slots": resent_slots,
+        "totals": totals
+    }
+
+
+def format_report(profile: Dict[str, Any], top_spans: int = 10) -> str:
+    """
+    Format a profile as a plain-text report.
+
+    Args:
+        profile: Result of profile_chain
+        top_spans: Number of repeated spans to list
+
+    Returns:
+        str: The report
+    """
+    totals = profile["totals"]
+    lines = [
+        f"Prompt chain profile for {profile['track'] or 'synthetic sample'} "
+        f"({profile['audio_seconds']:.0f}s audio, "
+        f"{'exact' if profile['exact'] else 'estimated'} token counts)",
+        "",
+        f"{'call':<20}{'input':>9}{'audio':>8}{'output':>8}{'cost $':>11}{'secs':>8}"
+    ]
+    for call in profile["calls"]:
+        input_tokens = call["exact_input_tokens"] or call["input_tokens"]
+        lines.append(f"{call['call']:<20}{input_tokens:>9}{call['audio_tokens']:>8}"
+                     f"{call['output_tokens']:>8}{call['cost_usd']:>11.5f}{call['latency_seconds']:>8.1f}")
+        for section in call["sections"]:
+            lines.append(f"    {section['section']:<44}{section['tokens']:>7}")
+    lines += [
+        f"{'total':<20}{totals['input_tokens']:>9}{totals['audio_tokens']:>8}"
+        f"{totals['output_tokens']:>8}{totals['cost_usd']:>11.5f}{totals['latency_seconds']:>8.1f}",
+        "",
+        "Templates per track (static text only):",
+        f"{'template':<26}{'calls':>6}{'tokens':>9}{'cost $':>11}{'secs':>7}"
+    ]
+    for entry in profile["templates"]:
+        lines.append(f"{entry['template']:<26}{entry['calls']:>6}{entry['tokens_per_track']:>9}"
+                     f"{entry['cost_usd']:>11.5f}{entry['latency_seconds']:>7.2f}")
+
+    lines += ["", f"Outputs re-sent to later calls ({totals['resent_slot_tokens']} tokens per track):"]
+    for entry in profile["resent_slots"]:
+        lines.append(f"  {entry['output']:<18} sent {entry['sends']}x, "
+                     f"{entry['tokens_per_send']} tokens each, {entry['resent_tokens']} re-sent")
+
+    lines += ["", f"Repeated instruction spans ({totals['repeated_instruction_tokens']} "
+              f"tokens per track beyond the first copy):"]
+    for span in profile["repeated_spans"][:top_spans]:
+        text = span["text"] if len(span["text"]) <= 90 else span["text"][:87] + "..."
+        lines.append(f"  {span['wasted_tokens']:>6} tokens  {span['occurrences']}x "
+                     f"in {len(span['calls'])} call(s): {text}")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point; the CLI is in prompt_profiler_cli.py"""
+    from .prompt_profiler_cli import main as run
+    return run(argv)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
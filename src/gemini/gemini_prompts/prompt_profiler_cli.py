@@ -0,0 +1,77 @@
+"""
+gemini_prompts/prompt_profiler_cli.py - Command line of the prompt chain profiler
+
+Usage:
+    python -m src.gemini.gemini_prompts.prompt_profiler [--track STEM] [--json report.json]
+
+Exports:
+- main(argv: List[str] | None = None) -> int
+
+Related files:
+- src/gemini/gemini_prompts/prompt_profiler.py: The profile and its report
+"""
+
+import json
+import argparse
+from pathlib import Path
+from typing import List, Optional
+
+from src.gemini.gemini_prompts.prompt_profiler import (format_report, load_sample_outputs,
+                                                       profile_chain)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Command-line entry point.
+
+    Args:
+        argv: Arguments (defaults to sys.argv[1:])
+
+    Returns:
+        int: Exit code
+    """
+    parser = argparse.ArgumentParser(
+        description="Profile the tokens, redundancy, cost and latency of the prompt chain")
+    parser.add_argument("--track", help="Track stem whose saved outputs are used as samples")
+    parser.add_argument("--analysis-dir", default="output/analysis",
+                        help="Directory with saved analyses (default: output/analysis)")
+    parser.add_argument("--prompt-dir", default="output/images/prompts",
+                        help="Directory with saved image prompts (default: output/images/prompts)")
+    parser.add_argument("--audio-seconds", type=float,
+                        help="Track duration (default: read from data_source/<track>.mp3, else 180)")
+    parser.add_argument("--synthetic-tokens", type=int, default=1500,
+                        help="Size of the placeholder used for missing sample outputs")
+    parser.add_argument("--min-span-words", type=int, default=8,
+                        help="Minimum length in words of reported repeated spans")
+    parser.add_argument("--exact", action="store_true",
+                        help="Count whole prompts with the API's count_tokens (needs an API key)")
+    parser.add_argument("--json", dest="json_path", help="Also write the full profile as JSON")
+    args = parser.parse_args(argv)
+
+    outputs = load_sample_outputs(args.analysis_dir, args.prompt_dir, args.track,
+                                  args.synthetic_tokens)
+
+    audio_seconds = args.audio_seconds
+    if audio_seconds is None:
+        from src.gemini.gemini_utilities.catalogue_index import get_mp3_duration
+        audio_path = Path("data_source") / f"{outputs['track']}.mp3"
+        audio_seconds = (get_mp3_duration(audio_path) if audio_path.exists() else None) or 180.0
+
+    count_tokens = None
+    if args.exact:
+        from src.gemini.gemini_client import GeminiClient
+        client = GeminiClient()
+
+        def count_tokens(text: str) -> int:
+            return client.transport.count_tokens(
+                model=client.model_name, contents=text).total_tokens
+
+    profile = profile_chain(outputs, audio_seconds, min_span_words=args.min_span_words,
+                            count_tokens=count_tokens)
+    print(format_report(profile))
+
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(profile, f, indent=2)
+        print(f"\nFull profile written to {args.json_path}")
+    return 0
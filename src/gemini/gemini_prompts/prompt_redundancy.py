@@ -0,0 +1,118 @@
+"""
+gemini_prompts/prompt_redundancy.py - Instruction text repeated along the prompt chain
+
+Listening preambles and template boilerplate are resent in many calls of the chain. These
+helpers find the repeated word spans and count the tokens they cost per track.
+
+Exports:
+- find_repeated_spans(texts: Dict[str, List[str]], min_words: int = 8) -> List[Dict[str, Any]]
+- count_redundant_tokens(texts: Dict[str, List[str]], min_words: int = 8) -> int
+
+Related files:
+- src/gemini/gemini_prompts/prompt_profiler.py: Reports the repeated spans
+- src/gemini/gemini_utilities/token_utils.py: Offline token estimates
+"""
+
+import re
+from typing import Any, Dict, List
+
+from src.gemini.gemini_utilities.token_utils import estimate_text_tokens
+
+_WORD_PATTERN = re.compile(r"\S+")
+
+
+def find_repeated_spans(texts: Dict[str, List[str]], min_words: int = 8) -> List[Dict[str, Any]]:
+    """
+    Find word spans of at least min_words words that occur more than once.
+
+    Spans are grown from repeated word n-grams, so two lines sharing a long prefix (such as
+    two "!IMPORTANT: Listen ..." lines) report the shared part.
+
+    Args:
+        texts: Call name -> instruction texts sent in that call
+        min_words: Minimum span length in words
+
+    Returns:
+        List of dictionaries with text, tokens, occurrences, calls and wasted_tokens
+        (tokens of every occurrence after the first), most wasteful first
+    """
+    documents = [(call, [word.lower() for word in _WORD_PATTERN.findall(text)],
+                  _WORD_PATTERN.findall(text))
+                 for call, call_texts in texts.items() for text in call_texts]
+
+    counts: Dict[tuple, int] = {}
+    for _, words, _ in documents:
+        for start in range(len(words) - min_words + 1):
+            gram = tuple(words[start:start + min_words])
+            counts[gram] = counts.get(gram, 0) + 1
+
+    spans: Dict[str, str] = {}
+    for _, words, original in documents:
+        start = 0
+        while start <= len(words) - min_words:
+            if counts[tuple(words[start:start + min_words])] < 2:
+                start += 1
+                continue
+            end = start
+            while end + 1 <= len(words) - min_words and counts[tuple(words[end + 1:end + 1 + min_words])] >= 2:
+                end += 1
+            spans.setdefault(" ".join(words[start:end + min_words]),
+                             " ".join(original[start:end + min_words]))
+            start = end + min_words
+
+    joined = [(call, f" {' '.join(words)} ") for call, words, _ in documents]
+    results = []
+    for key, text in spans.items():
+        per_document = [(call, document.count(f" {key} ")) for call, document in joined]
+        occurrences = sum(count for _, count in per_document)
+        if occurrences < 2:
+            continue
+        tokens = estimate_text_tokens(text)
+        results.append({
+            "text": text,
+            "tokens": tokens,
+            "occurrences": occurrences,
+            "calls": sorted({call for call, count in per_document if count}),
+            "wasted_tokens": tokens * (occurrences - 1)
+        })
+
+    results.sort(key=lambda span: span["wasted_tokens"], reverse=True)
+    # Drop spans contained in a more wasteful span that covers all of their occurrences
+    kept: List[Dict[str, Any]] = []
+    for span in results:
+        if not any(span["text"].lower() in other["text"].lower()
+                   and other["occurrences"] >= span["occurrences"] for other in kept):
+            kept.append(span)
+    return kept
+
+
+def count_redundant_tokens(texts: Dict[str, List[str]], min_words: int = 8) -> int:
+    """
+    Count the tokens of instruction text already sent earlier in the chain.
+
+    A word is redundant when it is covered by a min_words-word n-gram that appeared earlier,
+    in a previous call or earlier in the same call. Unlike summing find_repeated_spans, this
+    counts overlapping spans only once.
+
+    Args:
+        texts: Call name -> instruction texts sent in that call, in chain order
+        min_words: N-gram length in words
+
+    Returns:
+        int: Estimated redundant tokens per track
+    """
+    seen = set()
+    redundant = 0
+    for call_texts in texts.values():
+        for text in call_texts:
+            original = _WORD_PATTERN.findall(text)
+            words = [word.lower() for word in original]
+            covered = [False] * len(words)
+            for start in range(len(words) - min_words + 1):
+                gram = tuple(words[start:start + min_words])
+                if gram in seen:
+                    covered[start:start + min_words] = [True] * min_words
+                seen.add(gram)
+            redundant += estimate_text_tokens(
+                " ".join(word for word, flag in zip(original, covered) if flag))
+    return redundant
@@ -0,0 +1,201 @@
+"""
+gemini_prompts/prompt_registry.py - Versioned, precompiled registry of prompt templates
+
+Compiles each prompt function once by calling it with sentinel slot markers, which splits
+its f-string into literal segments and named slots. Rendering then only joins segments,
+and every template gets a stable content hash and a version id ("name@version:hash") that
+result caches, checkpoints and the catalogue use to tell whether a prompt changed.
+Rendering also reports token estimates per slot and for the static template text.
+
+Exports:
+- PromptTemplate (see prompt_template.py)
+- PromptRegistry()
+  - register(name, function, version=1) -> PromptTemplate
+  - get(name) -> PromptTemplate, render(name, **slots) -> Dict[str, Any]
+  - names() -> List[str], manifest() -> Dict[str, str]
+  - find_version(version_id) -> PromptTemplate | None
+  - stage_versions(stage_templates: Dict[str, List[str]]) -> Dict[str, Dict[str, str]]
+- prompt_registry: PromptRegistry with every template in gemini_prompts registered
+
+Related files:
+- src/gemini/gemini_prompts/prompt_template.py: Compiling and rendering one template
+- src/gemini/gemini_prompts/*.py: The prompt functions that are registered here
+- src/gemini/gemini_utilities/token_utils.py: Token estimates
+- src/gemini/gemini_hooks/audio_to_image_processor.py: Renders prompts and records their versions
+- src/gemini/gemini_utilities/catalogue_index.py: Treats stages rendered with older prompts as stale
+"""
+
+import logging
+from typing import Any, Callable, Dict, List, Optional
+
+# PromptTemplate and SLOT_MARKER are re-exported, so callers keep importing them from here
+from src.gemini.gemini_prompts.prompt_template import SLOT_MARKER, PromptTemplate
+
+from src.gemini.gemini_prompts.analysis_prompts import (
+    get_audio_analysis_prompt,
+    get_image_analysis_prompt,
+    get_content_analysis_prompt,
+    get_conversation_summary_prompt
+)
+from src.gemini.gemini_prompts.generation_prompts import (
+    get_image_prompt_from_audio,
+    get_image_generation_prompt,
+    get_story_generation_prompt,
+    get_creative_expansion_prompt
+)
+from src.gemini.gemini_prompts.multi_step_analysis_prompts import (
+    get_step1_prompt,
+    get_step2_prompt,
+    get_step3_prompt,
+    get_step4_prompt,
+    get_step5_prompt,
+    get_final_integration_prompt
+)
+from src.gemini.gemini_prompts.refinement_prompt import (
+    get_refinement_prompt,
+    get_refinery_analyst1_prompt,
+    get_refinery_analyst2_prompt,
+    get_refinery_analyst3_prompt,
+    get_refinery_analyst4_prompt,
+    get_refinery_analyst5_prompt,
+    get_final_refinery_prompt
+)
+from src.gemini.gemini_prompts.listening_prompts import (
+    get_analysis_listening_prompt,
+    get_generation_listening_prompt,
+    get_image_prompt_listening_prompt,
+    get_image_listening_prompt,
+    get_revision_prompt
+)
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class PromptRegistry:
+    """Registry of compiled prompt templates by name and version id"""
+
+    def __init__(self):
+        self._templates: Dict[str, PromptTemplate] = {}
+
+    def register(self, name: str, function: Callable[..., str], version: int = 1) -> PromptTemplate:
+        """
+        Compile and register a prompt function.
+
+        Args:
+            name: Registry name
+            function: Prompt function
+            version: Template version
+
+        Returns:
+            PromptTemplate: The compiled template
+        """
+        template = PromptTemplate(name, function, version)
+        self._templates[name] = template
+        return template
+
+    def get(self, name: str) -> PromptTemplate:
+        """
+        Get a template by name.
+
+        Args:
+            name: Registry name
+
+        Returns:
+            PromptTemplate
+
+        Raises:
+            KeyError: If no template has that name
+        """
+        if name not in self._templates:
+            raise KeyError(f"Unknown prompt template: {name}")
+        return self._templates[name]
+
+    def render(self, name: str, **slots) -> Dict[str, Any]:
+        """
+        Render a registered template (see PromptTemplate.render).
+
+        Args:
+            name: Registry name
+            **slots: Slot values
+
+        Returns:
+            Dictionary with the rendered text, version identity and token accounting
+        """
+        return self.get(name).render(**slots)
+
+    def names(self) -> List[str]:
+        """Names of all registered templates, in registration order"""
+        return list(self._templates)
+
+    def manifest(self) -> Dict[str, str]:
+        """
+        Get the current version id of every template.
+
+        Returns:
+            Dictionary of template name -> version id
+        """
+        return {name: template.version_id for name, template in self._templates.items()}
+
+    def find_version(self, version_id: str) -> Optional[PromptTemplate]:
+        """
+        Find the registered template for a recorded version id.
+
+        Args:
+            version_id: Version id recorded with an artefact
+
+        Returns:
+            The template if that exact version is the current one, otherwise None
+        """
+        name = version_id.split("@", 1)[0]
+        template = self._templates.get(name)
+        if template and template.version_id == version_id:
+            return template
+        return None
+
+    def stage_versions(self, stage_templates: Dict[str, List[str]]) -> Dict[str, Dict[str, str]]:
+        """
+        Get current version ids grouped by pipeline stage.
+
+        Args:
+            stage_templates: Stage name -> template names rendered in that stage
+
+        Returns:
+            Stage name -> (template name -> version id)
+        """
+        return {stage: {name: self.get(name).version_id for name in names}
+                for stage, names in stage_templates.items()}
+
+
+prompt_registry = PromptRegistry()
+
+for _name, _function in [
+    ("audio_analysis", get_audio_analysis_prompt),
+    ("image_analysis", get_image_analysis_prompt),
+    ("content_analysis", get_content_analysis_prompt),
+    ("conversation_summary", get_conversation_summary_prompt),
+    ("image_prompt_from_audio", get_image_prompt_from_audio),
+    ("image_generation", get_image_generation_prompt),
+    ("story_generation", get_story_generation_prompt),
+    ("creative_expansion", get_creative_expansion_prompt),
+    ("step1", get_step1_prompt),
+    ("step2", get_step2_prompt),
+    ("step3", get_step3_prompt),
+    ("step4", get_step4_prompt),
+    ("step5", get_step5_prompt),
+    ("final_integration", get_final_integration_prompt),
+    ("refinement", get_refinement_prompt),
+    ("refinery_analyst1", get_refinery_analyst1_prompt),
+    ("refinery_analyst2", get_refinery_analyst2_prompt),
+    ("refinery_analyst3", get_refinery_analyst3_prompt),
+    ("refinery_analyst4", get_refinery_analyst4_prompt),
+    ("refinery_analyst5", get_refinery_analyst5_prompt),
+    ("final_refinery", get_final_refinery_prompt),
+    ("analysis_listening", get_analysis_listening_prompt),
+    ("generation_listening", get_generation_listening_prompt),
+    ("image_prompt_listening", get_image_prompt_listening_prompt),
+    ("image_listening", get_image_listening_prompt),
+    ("revision", get_revision_prompt),
+]:
+    prompt_registry.register(_name, _function)
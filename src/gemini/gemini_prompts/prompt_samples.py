@@ -0,0 +1,72 @@
+"""
+gemini_prompts/prompt_samples.py - Sample slot values for the prompt chain profile
+
+The profiler renders every call of the chain with a track's saved step outputs as slot
+values, so the report reflects real output sizes; outputs that were never saved are
+replaced by distinct placeholder text of a chosen size.
+
+Exports:
+- load_sample_outputs(analysis_dir, prompt_dir, track=None, synthetic_tokens=1500) -> Dict[str, str]
+
+Related files:
+- src/gemini/gemini_prompts/prompt_profiler.py: The profile these samples feed
+"""
+
+import json
+import logging
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def _synthetic_text(name: str, tokens: int) -> str:
+    """Distinct placeholder text of roughly the given size, so it repeats nowhere else"""
+    words = [f"{name}-sample-{index}" for index in range(max(tokens // 4, 1))]
+    return "\n".join(" ".join(words[start:start + 12]) for start in range(0, len(words), 12))
+
+
+def load_sample_outputs(analysis_dir: Path, prompt_dir: Path, track: Optional[str] = None,
+                        synthetic_tokens: int = 1500) -> Dict[str, str]:
+    """
+    Load a track's saved step outputs to use as sample slot values.
+
+    Args:
+        analysis_dir: Directory with the {stem}_*analysis.txt files
+        prompt_dir: Directory with the {stem}_prompt.json files
+        track: Track stem to use (defaults to the first track with a step 1 analysis)
+        synthetic_tokens: Size of the placeholder used for each missing output
+
+    Returns:
+        Dictionary of output name -> text, plus "track" (the stem used, or None)
+    """
+    analysis_dir, prompt_dir = Path(analysis_dir), Path(prompt_dir)
+    if track is None:
+        found = sorted(analysis_dir.glob("*_step1_analysis.txt"))
+        track = found[0].name[:-len("_step1_analysis.txt")] if found else None
+
+    files = {f"step{step}": f"_step{step}_analysis.txt" for step in range(1, 6)}
+    files.update({"final_analysis": "_analysis.txt", "refined_analysis": "_refined_analysis.txt",
+                  "revised_analysis": "_revised_analysis.txt"})
+
+    outputs: Dict[str, Any] = {"track": track}
+    for name, suffix in files.items():
+        path = analysis_dir / f"{track}{suffix}"
+        if track and path.exists():
+            outputs[name] = path.read_text(encoding="utf-8")
+        else:
+            outputs[name] = _synthetic_text(name, synthetic_tokens)
+
+    prompt_path = prompt_dir / f"{track}_prompt.json"
+    outputs["image_prompt"] = _synthetic_text("image_prompt", 200)
+    if track and prompt_path.exists():
+        try:
+            with open(prompt_path, "r", encoding="utf-8") as f:
+                outputs["image_prompt"] = json.load(f).get("prompt") or outputs["image_prompt"]
+        except (json.JSONDecodeError, OSError) as e:
+            logger.warning(f"Ignoring unreadable prompt file {prompt_path}: {str(e)}")
+
+    missing = [name for name in files if not (track and (analysis_dir / f"{track}{files[name]}").exists())]
+    if missing:
+        logger.info(f"Using synthetic sample text for: {', '.join(missing)}")
+    return outputs
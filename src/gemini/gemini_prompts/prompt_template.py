@@ -0,0 +1,143 @@
+"""
+gemini_prompts/prompt_template.py - One precompiled, versioned prompt template
+
+A prompt function is compiled once by calling it with sentinel slot markers, which splits
+its f-string into literal segments and named slots; rendering then only joins segments.
+Functions that transform their inputs cannot be split and are called on every render.
+The template's hash covers its text, so any edit gives it a new version id.
+
+Exports:
+- SLOT_MARKER: Sentinel passed for each slot while compiling
+- PromptTemplate(name: str, function: Callable[..., str], version: int = 1)
+  - render(**slots) -> Dict[str, Any], template_text -> str, hash -> str, version_id -> str
+
+Related files:
+- src/gemini/gemini_prompts/prompt_registry.py: Registry of the templates
+- src/gemini/gemini_utilities/token_utils.py: Token estimates
+"""
+
+import re
+import inspect
+import hashlib
+import logging
+from typing import Any, Callable, Dict, List, Tuple
+
+from src.gemini.gemini_utilities.token_utils import estimate_text_tokens
+
+logger = logging.getLogger(__name__)
+
+# Sentinel passed for each slot while compiling; cannot occur in real prompt text
+SLOT_MARKER = "\x00slot:{}\x00"
+_MARKER_PATTERN = re.compile("\x00slot:(\\w+)\x00")
+
+
+class PromptTemplate:
+    """A prompt function compiled into literal segments and named slots"""
+
+    def __init__(self, name: str, function: Callable[..., str], version: int = 1):
+        """
+        Compile a prompt function.
+
+        Args:
+            name: Registry name of the template
+            function: Prompt function whose parameters are the template slots
+            version: Human-maintained version, bumped for intentional prompt changes
+        """
+        self.name = name
+        self.function = function
+        self.version = version
+
+        parameters = inspect.signature(function).parameters
+        self.slots = list(parameters)
+        self.optional_slots = {slot for slot, parameter in parameters.items()
+                               if parameter.default is not inspect.Parameter.empty}
+
+        self.segments: List[Tuple[str, str]] = []
+        self.compiled = self._compile()
+        if self.compiled:
+            self.template_text = "".join(
+                value if kind == "text" else "{" + value + "}" for kind, value in self.segments)
+            self.static_tokens = sum(
+                estimate_text_tokens(value) for kind, value in self.segments if kind == "text")
+        else:
+            # Functions that transform their inputs are identified by their source instead
+            self.template_text = inspect.getsource(function)
+            self.static_tokens = None
+
+        self.hash = hashlib.sha256(
+            f"{name}\n{self.template_text}".encode("utf-8")).hexdigest()[:16]
+
+    @property
+    def version_id(self) -> str:
+        """Stable identity of this exact template, e.g. "step2@1:3fa9c2d41b7e0a55\""""
+        return f"{self.name}@{self.version}:{self.hash}"
+
+    def _compile(self) -> bool:
+        """Split the function's output into segments; False if it cannot be precompiled"""
+        try:
+            text = self.function(**{slot: SLOT_MARKER.format(slot) for slot in self.slots})
+        except Exception as e:
+            logger.warning(f"Prompt '{self.name}' cannot be precompiled: {str(e)}")
+            return False
+
+        position = 0
+        seen = set()
+        for match in _MARKER_PATTERN.finditer(text):
+            if match.start() > position:
+                self.segments.append(("text", text[position:match.start()]))
+            self.segments.append(("slot", match.group(1)))
+            seen.add(match.group(1))
+            position = match.end()
+        if position < len(text):
+            self.segments.append(("text", text[position:]))
+
+        # Every slot must be inserted verbatim for the segments to be a faithful template
+        return seen == set(self.slots)
+
+    def render(self, **slots) -> Dict[str, Any]:
+        """
+        Render the template.
+
+        Args:
+            **slots: Slot values (the prompt function's arguments)
+
+        Returns:
+            Dictionary with text, name, version, hash, version_id, static_tokens,
+            slot_tokens (per slot) and total_tokens
+
+        Raises:
+            TypeError: If a required slot is missing or an unknown slot is given
+        """
+        unknown = set(slots) - set(self.slots)
+        missing = [slot for slot in self.slots
+                   if slot not in slots and slot not in self.optional_slots]
+        if unknown or missing:
+            raise TypeError(
+                f"Prompt '{self.name}' got unknown slots {sorted(unknown)} "
+                f"or is missing {missing}")
+
+        slot_tokens = {slot: estimate_text_tokens(str(value))
+                       for slot, value in slots.items() if value}
+
+        # Optional slots that are left out may change the layout, so call the function
+        if self.compiled and all(slots.get(slot) for slot in self.slots):
+            text = "".join(value if kind == "text" else str(slots[value])
+                           for kind, value in self.segments)
+            occurrences = {slot: sum(1 for kind, value in self.segments
+                                     if kind == "slot" and value == slot) for slot in slot_tokens}
+            slot_tokens = {slot: tokens * occurrences[slot] for slot, tokens in slot_tokens.items()}
+            static_tokens = self.static_tokens
+        else:
+            text = self.function(**slots)
+            static_tokens = max(estimate_text_tokens(text) - sum(slot_tokens.values()), 0)
+
+        return {
+            "text": text,
+            "name": self.name,
+            "version": self.version,
+            "hash": self.hash,
+            "version_id": self.version_id,
+            "static_tokens": static_tokens,
+            "slot_tokens": slot_tokens,
+            "total_tokens": static_tokens + sum(slot_tokens.values())
+        }
@@ -0,0 +1,265 @@
+"""
+gemini_requests.py - One-shot generation and analysis calls of GeminiClient
+
+Text and image generation and image, audio and multimodal analysis, each sent through
+the client's transport and relayed to Discord, failures included; image generation
+returns a fallback image instead of raising.
+
+GeminiRequests is the request half of GeminiClient; it expects the client's transport,
+model_name, default_generation_config and _send_to_discord()/_send_error_to_discord().
+
+Exports:
+- GeminiRequests
+  - generate_content(prompt, temperature=0.7, system_instruction=None) -> str
+  - generate_image(prompt, temperature=0.9) -> Tuple[str, Image]
+  - generate_image_candidates(prompt, temperature=0.9, count=2) -> List[Tuple[str, Image]]
+  - analyze_image(image_path_or_file, prompt, temperature=0.4) -> str,
+    analyze_audio(audio_path_or_file, prompt, temperature=0.4) -> str,
+    analyze_multimodal(contents, temperature=0.4) -> str
+
+Related files:
+- src/gemini/gemini_client.py: GeminiClient
+- src/gemini/gemini_apis/: The API functions these methods call
+"""
+
+import logging
+from pathlib import Path
+from typing import Optional
+
+from src.gemini.gemini_apis.core_api import (
+    generate_content,
+    generate_image,
+    generate_image_candidates
+)
+from src.gemini.gemini_apis.audio_api import analyze_audio, is_uploaded_file
+from src.gemini.gemini_apis.image_api import analyze_image
+from src.gemini.gemini_apis.multimodal_api import analyze_multimodal
+
+logger = logging.getLogger(__name__)
+
+
+class GeminiRequests:
+    """Generation and analysis calls relayed to Discord"""
+
+    def generate_content(self, prompt: str, temperature: float = 0.7, system_instruction: Optional[str] = None) -> str:
+        """
+        Generate text based on a prompt and send the response to Discord.
+
+        Args:
+            prompt: Text prompt to generate content from
+            temperature: Controls randomness (0.0-2.0)
+            system_instruction: Optional instruction to guide the model's behavior
+
+        Returns:
+            Generated text
+        """
+        try:
+            response_text = generate_content(
+                client=self.transport,
+                model_name=self.model_name,
+                prompt=prompt,
+                temperature=temperature,
+                system_instruction=system_instruction,
+                max_output_tokens=self.default_generation_config["max_output_tokens"],
+                top_p=self.default_generation_config["top_p"],
+                top_k=self.default_generation_config["top_k"]
+            )
+
+            # Send to Discord
+            self._send_to_discord(
+                response=response_text,
+                prompt=prompt,
+                is_final=True,
+                content_type="text"
+            )
+
+            return response_text
+        except Exception as e:
+            logger.error(f"Error generating content: {str(e)}")
+            self._send_error_to_discord(e, prompt)
+            raise
+
+    def generate_image(self, prompt: str, temperature: float = 0.9):
+        """
+        Generate an image based on a text prompt and send the result to Discord.
+
+        Args:
+            prompt: Text description of the image to generate
+            temperature: Controls randomness (0.0-2.0)
+
+        Returns:
+            Tuple of (response_text, image)
+        """
+        try:
+            description_text, generated_image = generate_image(
+                client=self.transport,
+                prompt=prompt,
+                temperature=temperature
+            )
+
+            # Send description to Discord if available
+            if description_text:
+                self._send_to_discord(
+                    response=description_text,
+                    prompt=prompt,
+                    is_final=False,
+                    content_type="image"
+                )
+
+            return description_text, generated_image
+
+        except Exception as e:
+            logger.error(f"Error with image generation: {str(e)}")
+            self._send_error_to_discord(e, prompt)
+
+            # Create fallback image with error
+            from src.gemini.gemini_apis.image_api import create_fallback_image
+            fallback_image = create_fallback_image(
+                error_message=str(e), color=(255, 0, 0))
+            error_message = f"Failed to generate image: {str(e)}"
+
+            return error_message, fallback_image
+
+    def generate_image_candidates(self, prompt: str, temperature: float = 0.9, count: int = 2):
+        """
+        Generate several image candidates in parallel for local ranking.
+
+        Args:
+            prompt: Text description of the image to generate
+            temperature: Controls randomness (0.0-2.0)
+            count: Number of candidates to request
+
+        Returns:
+            List of (response_text, image) tuples; failed candidates are left out
+        """
+        try:
+            return generate_image_candidates(
+                client=self.transport,
+                prompt=prompt,
+                temperature=temperature,
+                count=count
+            )
+        except Exception as e:
+            logger.error(f"Error with image candidate generation: {str(e)}")
+            self._send_error_to_discord(e, prompt)
+            return []
+
+    def analyze_image(self, image_path_or_file, prompt: str, temperature: float = 0.4) -> str:
+        """
+        Analyze an image with an optional prompt for guidance and send results to Discord.
+
+        Args:
+            image_path_or_file: Path to image file or PIL Image object
+            prompt: Text prompt to guide the analysis
+            temperature: Controls randomness (0.0-2.0)
+
+        Returns:
+            Analysis text
+        """
+        try:
+            response_text = analyze_image(
+                client=self.transport,
+                image_path_or_file=image_path_or_file,
+                prompt=prompt,
+                temperature=temperature
+            )
+
+            # Get source info for logging
+            source = image_path_or_file if isinstance(
+                image_path_or_file, str) else "PIL Image"
+
+            # Send to Discord
+            self._send_to_discord(
+                response=response_text,
+                prompt=prompt,
+                is_final=True,
+                source=source,
+                content_type="image analysis"
+            )
+
+            return response_text
+        except Exception as e:
+            logger.error(f"Error analyzing image: {str(e)}")
+            self._send_error_to_discord(e, prompt)
+            raise
+
+    def analyze_audio(self, audio_path_or_file, prompt: str, temperature: float = 0.4) -> str:
+        """
+        Analyze audio content with a text prompt for guidance and send results to Discord.
+
+        Args:
+            audio_path_or_file: Path to audio file, BytesIO object, or uploaded file reference
+            prompt: Text prompt to guide the analysis
+            temperature: Controls randomness (0.0-2.0)
+
+        Returns:
+            Analysis text
+        """
+        try:
+            response_text = analyze_audio(
+                client=self.transport,
+                audio_path_or_file=audio_path_or_file,
+                prompt=prompt,
+                temperature=temperature
+            )
+
+            # Get source info for logging
+            if isinstance(audio_path_or_file, (str, Path)):
+                source = str(audio_path_or_file)
+            elif is_uploaded_file(audio_path_or_file):
+                source = audio_path_or_file.display_name or audio_path_or_file.name
+            else:
+                source = "BytesIO Audio"
+
+            # Send to Discord
+            self._send_to_discord(
+                response=response_text,
+                prompt=prompt,
+                is_final=True,
+                source=source,
+                content_type="audio analysis"
+            )
+
+            return response_text
+        except Exception as e:
+            logger.error(f"Error analyzing audio: {str(e)}")
+            self._send_error_to_discord(e, prompt)
+            raise
+
+    def analyze_multimodal(self, contents, temperature: float = 0.4) -> str:
+        """
+        Analyze multiple types of content (text, images, audio) in a single request
+        and send results to Discord.
+
+        Args:
+            contents: List of content items (text strings, images, file references)
+            temperature: Controls randomness (0.0-2.0)
+
+        Returns:
+            Analysis text
+        """
+        try:
+            response_text = analyze_multimodal(
+                client=self.transport,
+                contents=contents,
+                temperature=temperature
+            )
+
+            # Send to Discord
+            from src.gemini.gemini_apis.multimodal_api import determine_content_type
+            content_types = [determine_content_type(item) for item in contents]
+            content_summary = f"multimodal analysis ({', '.join(content_types)})"
+
+            self._send_to_discord(
+                response=response_text,
+                prompt=f"Analyzing {len(contents)} items: {content_summary}",
+                is_final=True,
+                content_type="multimodal"
+            )
+
+            return response_text
+        except Exception as e:
+            logger.error(f"Error with multimodal analysis: {str(e)}")
+            self._send_error_to_discord(
+                e, f"Multimodal analysis with {len(contents)} items")
+            raise
@@ -5,27 +5,86 @@ Exports utility functions to support the Gemini client:
 - File utilities: For file operations
 - Rate limiter: For API rate limiting
 - Image utilities: For image processing
+- Catalogue index: For incremental tracking of data_source tracks and stage status
+- Generated images: Lazily decoded API images and background post-processing
+- Image ranking: Local scoring of image candidates
+- Image index: Perceptual-hash index for duplicates, prompt reuse and similar covers
+- Token utilities: Offline token estimates
+- Session store: SQLite persistence of chat sessions
+- Artifact store: Pipeline outputs with content hashes and lineage
+- Analysis archive: zstd-compressed archive of the step analyses
+- Lazy imports: Module proxies and lazy package exports for fast startup
+
+Exports are imported from their submodules on first use (see lazy_import.py).
 
 Related files:
 - src/gemini/gemini_client.py: Main client that uses these utilities
 """
 
-from src.gemini.gemini_utilities.file_utils import (
-    save_text,
-    save_json,
-    save_image,
-    ensure_directory,
-    clean_output_directory
-)
+from src.gemini.gemini_utilities.lazy_import import lazy_exports
 
-from src.gemini.gemini_utilities.image_utils import (
-    create_fallback_image,
-    _create_description_visualization
-)
+# Submodules are imported on first access to one of their exports
+_EXPORTS = {
+    'src.gemini.gemini_utilities.file_utils': (
+        'save_text',
+        'save_json',
+        'save_image',
+        'ensure_directory',
+        'clean_output_directory',
+        'atomic_write_bytes',
+        'atomic_write_text',
+        'WriteBehindQueue',
+    ),
+    'src.gemini.gemini_utilities.image_utils': (
+        'create_fallback_image',
+        'create_fallback_images',
+        'render_procedural_art',
+        '_create_description_visualization',
+    ),
+    'src.gemini.gemini_utilities.rate_limiter': ('RateLimiter',),
+    'src.gemini.gemini_utilities.catalogue_index': (
+        'CatalogueIndex',
+        'parse_bpm_from_filename',
+        'get_mp3_duration',
+        'hash_file',
+    ),
+    'src.gemini.gemini_utilities.generated_image': (
+        'GeneratedImage',
+        'ImagePostProcessor',
+        'extension_for_mime',
+    ),
+    'src.gemini.gemini_utilities.image_ranking': (
+        'rank_candidates',
+        'extract_colour_targets',
+        'dhash',
+        'hamming_distance',
+    ),
+    'src.gemini.gemini_utilities.image_index': (
+        'ImageHashIndex',
+        'BKTree',
+        'phash',
+        'hash_prompt',
+    ),
+    'src.gemini.gemini_utilities.token_utils': (
+        'estimate_text_tokens',
+        'estimate_audio_tokens',
+        'estimate_image_tokens',
+        'truncate_text',
+    ),
+    'src.gemini.gemini_utilities.session_store': ('SessionStore',),
+    'src.gemini.gemini_utilities.artifact_store': (
+        'ArtifactStore',
+        'LocalArtifactStore',
+        'hash_bytes',
+    ),
+    'src.gemini.gemini_utilities.analysis_archive': (
+        'AnalysisArchive',
+        'parse_analysis_filename',
+        'analysis_filename',
+    )
+}
 
-from src.gemini.gemini_utilities.rate_limiter import (
-    RateLimiter
-)
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
 
 __all__ = [
     # File utilities
@@ -34,11 +93,58 @@ __all__ = [
     'save_image',
     'ensure_directory',
     'clean_output_directory',
+    'atomic_write_bytes',
+    'atomic_write_text',
+    'WriteBehindQueue',
 
     # Image utilities
     'create_fallback_image',
+    'create_fallback_images',
+    'render_procedural_art',
     '_create_description_visualization',
 
     # Rate limiting
-    'RateLimiter'
+    'RateLimiter',
+
+    # Catalogue index
+    'CatalogueIndex',
+    'parse_bpm_from_filename',
+    'get_mp3_duration',
+    'hash_file',
+
+    # Generated images
+    'GeneratedImage',
+    'ImagePostProcessor',
+    'extension_for_mime',
+
+    # Image ranking
+    'rank_candidates',
+    'extract_colour_targets',
+    'dhash',
+    'hamming_distance',
+
+    # Image index
+    'ImageHashIndex',
+    'BKTree',
+    'phash',
+    'hash_prompt',
+
+    # Token utilities
+    'estimate_text_tokens',
+    'estimate_audio_tokens',
+    'estimate_image_tokens',
+    'truncate_text',
+
+    # Session store
+    'SessionStore',
+
+    # Artifact store
+    'ArtifactStore',
+    'LocalArtifactStore',
+    'hash_bytes',
+
+    # Analysis archive
+    'AnalysisArchive',
+    'parse_analysis_filename',
+    'analysis_filename'
 ]
@@ -0,0 +1,293 @@
+"""
+gemini_utilities/analysis_archive.py - Compressed archive of the step analyses
+
+Every track leaves about eight analysis texts that repeat the same section headings and
+boilerplate across steps and tracks. Compressed one by one they shrink little; compressed
+with a zstd dictionary trained on the corpus, the shared text is stored once in the
+dictionary and each analysis only keeps what is particular to it.
+
+AnalysisArchive keeps one row per (track, step) in SQLite with the compressed text and the
+dictionary it was compressed with, so any single analysis is read with one index lookup and
+one decompression. Dictionaries are stored in the archive; retraining adds a new one and
+recompresses the stored analyses with it.
+
+The archive is meant for cold storage, backups and syncs of output/analysis/; the pipeline
+still reads and writes the uncompressed analyses through the artifact store, and files the
+catalogue records as stage outputs are never removed. Analyses that were migrated and
+removed are restored into the store by the pipeline when it reuses them
+(so archived tracks are not analysed again), and can be written back with export().
+
+Usage: python -m src.gemini.gemini_utilities.analysis_archive {migrate,get,export,status}
+(see analysis_archive_cli.py).
+
+Needs the optional zstandard package (pip install zstandard).
+
+Exports:
+- STEPS: Tuple[str, ...] - Archived steps in pipeline order
+- DEFAULT_ARCHIVE_PATH: Default archive database
+- parse_analysis_filename(name: str) -> Tuple[str, str] | None: (track, step) of an analysis file
+- analysis_filename(track: str, step: str) -> str: File name of an analysis in output/analysis
+- AnalysisArchive(db_path: str | Path = DEFAULT_ARCHIVE_PATH, level: int = 19,
+                  dict_size: int = 64 KB)
+  - put(track, step, text) -> Dict, put_many(entries) -> int
+  - get(track, step) -> str | None, get_track(track) -> Dict[str, str]
+  - list(track=None) -> List[Dict], tracks() -> List[str], delete(track, step=None) -> int
+  - train(...) -> int, migrate(...) -> Dict, export(directory, track=None) -> int,
+    get_status() -> Dict (see archive_maintenance.py)
+  - close() -> None
+- main(argv: List[str] | None = None) -> int
+
+Related files:
+- src/gemini/gemini_utilities/analysis_names.py: The steps and their file names
+- src/gemini/gemini_utilities/archive_maintenance.py: Training, migrate and export
+- src/gemini/gemini_utilities/analysis_archive_cli.py: The command line
+- src/gemini/gemini_utilities/artifact_store.py: Where the pipeline keeps the analyses
+- src/gemini/gemini_hooks/audio_to_image_processor.py: Restores removed analyses it reuses
+"""
+
+import sys
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+# The naming helpers are re-exported, so callers keep importing them from here
+from .analysis_names import STEPS, analysis_filename, parse_analysis_filename
+from .archive_maintenance import ArchiveMaintenance
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_ARCHIVE_PATH = "output/analysis_archive.sqlite"
+
+DEFAULT_LEVEL = 19
+DEFAULT_DICT_SIZE = 64 * 1024
+
+
+def _zstandard():
+    """
+    Import zstandard.
+
+    Raises:
+        ImportError: If zstandard is not installed
+    """
+    try:
+        import zstandard
+    except ImportError as e:
+        raise ImportError(
+            "The analysis archive needs the zstandard package: pip install zstandard") from e
+    return zstandard
+
+
+class AnalysisArchive(ArchiveMaintenance):
+    """SQLite archive of analyses compressed with a shared zstd dictionary"""
+
+    def __init__(self, db_path: Union[str, Path] = DEFAULT_ARCHIVE_PATH,
+                 level: int = DEFAULT_LEVEL, dict_size: int = DEFAULT_DICT_SIZE):
+        """
+        Open (or create) the archive.
+
+        Args:
+            db_path: SQLite database file
+            level: zstd compression level
+            dict_size: Maximum size of a trained dictionary in bytes
+
+        Raises:
+            ImportError: If zstandard is not installed
+        """
+        self.zstd = _zstandard()
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(exist_ok=True, parents=True)
+        self.level = level
+        self.dict_size = dict_size
+
+        self._lock = threading.RLock()
+        self._connection = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS dictionaries ("
+            " dict_id INTEGER PRIMARY KEY AUTOINCREMENT, data BLOB NOT NULL,"
+            " samples INTEGER NOT NULL, created_at REAL)")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS analyses ("
+            " track TEXT NOT NULL, step TEXT NOT NULL, dict_id INTEGER NOT NULL,"
+            " size INTEGER NOT NULL, content_hash TEXT NOT NULL, data BLOB NOT NULL,"
+            " archived_at REAL, PRIMARY KEY (track, step))")
+        self._connection.commit()
+
+        # dict_id -> dictionary, compressor and decompressor; 0 is "no dictionary"
+        self._dictionaries: Dict[int, Any] = {}
+        self._decompressors: Dict[int, Any] = {}
+        row = self._connection.execute("SELECT MAX(dict_id) FROM dictionaries").fetchone()
+        self._use_dictionary(row[0] or 0)
+
+    def _dictionary(self, dict_id: int) -> Any:
+        """Load a stored dictionary (None for dict_id 0)"""
+        if not dict_id:
+            return None
+        dictionary = self._dictionaries.get(dict_id)
+        if dictionary is None:
+            row = self._connection.execute(
+                "SELECT data FROM dictionaries WHERE dict_id = ?", (dict_id,)).fetchone()
+            if row is None:
+                raise KeyError(f"Analysis archive dictionary {dict_id} is missing")
+            dictionary = self._dictionaries[dict_id] = self.zstd.ZstdCompressionDict(row[0])
+        return dictionary
+
+    def _use_dictionary(self, dict_id: int) -> None:
+        """Compress new analyses with a dictionary"""
+        dictionary = self._dictionary(dict_id)
+        self._dict_id = dict_id
+        self._compressor = self.zstd.ZstdCompressor(level=self.level, dict_data=dictionary)
+
+    def _decompress(self, dict_id: int, data: bytes) -> str:
+        """Decompress an archived analysis"""
+        decompressor = self._decompressors.get(dict_id)
+        if decompressor is None:
+            decompressor = self._decompressors[dict_id] = self.zstd.ZstdDecompressor(
+                dict_data=self._dictionary(dict_id))
+        return decompressor.decompress(data).decode("utf-8")
+
+    def _row(self, track: str, step: str, text: str, now: float) -> tuple:
+        """Compress an analysis into an analyses row"""
+        if step not in STEPS:
+            raise ValueError(f"Unknown analysis step {step!r}; expected one of {', '.join(STEPS)}")
+        data = text.encode("utf-8")
+        return (track, step, self._dict_id, len(data), hashlib.sha256(data).hexdigest(),
+                self._compressor.compress(data), now)
+
+    def put(self, track: str, step: str, text: str) -> Dict[str, Any]:
+        """
+        Archive an analysis, replacing the one stored for the same track and step.
+
+        Args:
+            track: Track stem
+            step: One of STEPS
+            text: Analysis text
+
+        Returns:
+            The analysis record (see list)
+        """
+        self.put_many([(track, step, text)])
+        return self.list(track, step)[0]
+
+    def put_many(self, entries: Iterable[Tuple[str, str, str]]) -> int:
+        """
+        Archive analyses in one transaction.
+
+        Args:
+            entries: (track, step, text) tuples
+
+        Returns:
+            int: Number of analyses archived
+        """
+        with self._lock:
+            now = time.time()
+            rows = [self._row(track, step, text, now) for track, step, text in entries]
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO analyses VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+            self._connection.commit()
+        return len(rows)
+
+    def get(self, track: str, step: str) -> Optional[str]:
+        """
+        Read one analysis.
+
+        Args:
+            track: Track stem
+            step: One of STEPS
+
+        Returns:
+            The analysis text, or None if it is not archived
+        """
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT dict_id, data FROM analyses WHERE track = ? AND step = ?",
+                (track, step)).fetchone()
+            return self._decompress(*row) if row else None
+
+    def get_track(self, track: str) -> Dict[str, str]:
+        """
+        Read every archived analysis of a track.
+
+        Args:
+            track: Track stem
+
+        Returns:
+            Dictionary of step -> analysis text, in pipeline order
+        """
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT step, dict_id, data FROM analyses WHERE track = ?", (track,)).fetchall()
+            texts = {step: self._decompress(dict_id, data) for step, dict_id, data in rows}
+        return {step: texts[step] for step in STEPS if step in texts}
+
+    def list(self, track: Optional[str] = None, step: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        List archived analyses.
+
+        Args:
+            track: Only this track's analyses
+            step: Only this step's analyses
+
+        Returns:
+            List of dictionaries with track, step, size, stored_size, dict_id, content_hash and
+            archived_at
+        """
+        query = ("SELECT track, step, size, LENGTH(data), dict_id, content_hash, archived_at "
+                 "FROM analyses WHERE (? IS NULL OR track = ?) AND (? IS NULL OR step = ?) "
+                 "ORDER BY track")
+        with self._lock:
+            rows = self._connection.execute(query, (track, track, step, step)).fetchall()
+        records = [dict(zip(("track", "step", "size", "stored_size", "dict_id", "content_hash",
+                             "archived_at"), row)) for row in rows]
+        return sorted(records, key=lambda record: (record["track"], STEPS.index(record["step"])))
+
+    def tracks(self) -> List[str]:
+        """
+        List the archived tracks.
+
+        Returns:
+            Sorted track stems
+        """
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT DISTINCT track FROM analyses ORDER BY track").fetchall()
+        return [row[0] for row in rows]
+
+    def delete(self, track: str, step: Optional[str] = None) -> int:
+        """
+        Delete a track's analyses, or one of them.
+
+        Args:
+            track: Track stem
+            step: Only this step
+
+        Returns:
+            int: Number of analyses deleted
+        """
+        with self._lock:
+            deleted = self._connection.execute(
+                "DELETE FROM analyses WHERE track = ? AND (? IS NULL OR step = ?)",
+                (track, step, step)).rowcount
+            self._connection.commit()
+        return deleted
+
+    def close(self) -> None:
+        """Close the database"""
+        with self._lock:
+            self._connection.close()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point; the CLI is in analysis_archive_cli.py"""
+    from .analysis_archive_cli import main as run
+    return run(argv)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,102 @@
+"""
+gemini_utilities/analysis_archive_cli.py - Command line of the analysis archive
+
+Usage:
+    python -m src.gemini.gemini_utilities.analysis_archive migrate [--remove] [--retrain]
+        [--catalogue data_source/index.json]
+    python -m src.gemini.gemini_utilities.analysis_archive get TRACK [STEP]
+    python -m src.gemini.gemini_utilities.analysis_archive export DIRECTORY [--track TRACK]
+    python -m src.gemini.gemini_utilities.analysis_archive status
+
+Exports:
+- main(argv: List[str] | None = None) -> int
+
+Related files:
+- src/gemini/gemini_utilities/analysis_archive.py: The archive, and the module the CLI runs as
+"""
+
+import sys
+import json
+import argparse
+from pathlib import Path
+from typing import List, Optional
+
+from .analysis_archive import DEFAULT_ARCHIVE_PATH, AnalysisArchive
+from .analysis_names import STEPS
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Command-line entry point.
+
+    Args:
+        argv: Arguments (defaults to sys.argv[1:])
+
+    Returns:
+        int: Exit code
+    """
+    parser = argparse.ArgumentParser(description="Compressed archive of the step analyses")
+    parser.add_argument("--archive", default=DEFAULT_ARCHIVE_PATH,
+                        help=f"Archive database (default: {DEFAULT_ARCHIVE_PATH})")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    migrate = commands.add_parser("migrate", help="Archive the files of an analysis directory")
+    migrate.add_argument("--analysis-dir", default="output/analysis",
+                         help="Directory with saved analyses (default: output/analysis)")
+    migrate.add_argument("--remove", action="store_true",
+                         help="Remove the files (and their artifact store entries) once archived")
+    migrate.add_argument("--catalogue", default="data_source/index.json",
+                         help="Catalogue index whose stage outputs are kept "
+                              "(default: data_source/index.json)")
+    migrate.add_argument("--retrain", action="store_true",
+                         help="Train a new dictionary and recompress the whole archive")
+
+    get = commands.add_parser("get", help="Print a track's archived analyses")
+    get.add_argument("track", help="Track stem")
+    get.add_argument("step", nargs="?", choices=STEPS, help="Only this step")
+
+    export = commands.add_parser("export", help="Write archived analyses back as files")
+    export.add_argument("directory", help="Directory to write to")
+    export.add_argument("--track", help="Only this track")
+
+    commands.add_parser("status", help="Print the size of the archive")
+    args = parser.parse_args(argv)
+
+    archive = AnalysisArchive(args.archive)
+    try:
+        if args.command == "migrate":
+            artifacts = catalogue = None
+            artifact_db = Path(args.analysis_dir).parent / "artifacts.sqlite"
+            if args.remove and artifact_db.exists():
+                from .artifact_store import LocalArtifactStore
+                artifacts = LocalArtifactStore(Path(args.analysis_dir).parent)
+            if args.remove and Path(args.catalogue).exists():
+                from .catalogue_index import CatalogueIndex
+                catalogue = CatalogueIndex(Path(args.catalogue).parent, index_path=args.catalogue)
+            try:
+                print(json.dumps(archive.migrate(args.analysis_dir, remove=args.remove,
+                                                 retrain=args.retrain, artifacts=artifacts,
+                                                 catalogue=catalogue),
+                                 indent=2))
+            finally:
+                if artifacts is not None:
+                    artifacts.close()
+        elif args.command == "get":
+            texts = ({args.step: archive.get(args.track, args.step)} if args.step
+                     else archive.get_track(args.track))
+            texts = {step: text for step, text in texts.items() if text is not None}
+            if not texts:
+                print(f"No archived analyses for {args.track}", file=sys.stderr)
+                return 1
+            for step, text in texts.items():
+                if len(texts) > 1:
+                    print(f"===== {step} =====")
+                print(text)
+        elif args.command == "export":
+            print(f"Wrote {archive.export(args.directory, args.track)} analyses "
+                  f"to {args.directory}")
+        else:
+            print(json.dumps(archive.get_status(), indent=2))
+    finally:
+        archive.close()
+    return 0
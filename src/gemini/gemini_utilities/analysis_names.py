@@ -0,0 +1,50 @@
+"""
+gemini_utilities/analysis_names.py - The archived analysis steps and their file names
+
+Exports:
+- STEPS: Tuple[str, ...] - Archived steps in pipeline order
+- parse_analysis_filename(name: str) -> Tuple[str, str] | None: (track, step) of an analysis file
+- analysis_filename(track: str, step: str) -> str: File name of an analysis in output/analysis
+
+Related files:
+- src/gemini/gemini_utilities/analysis_archive.py: Archives the analyses by (track, step)
+- src/gemini/gemini_hooks/pipeline_steps.py: The steps and their file names
+"""
+
+import re
+from typing import Optional, Tuple
+
+STEPS = ("step1", "step2", "step3", "step4", "step5", "final", "refined", "revised")
+
+# {stem}_analysis.txt is the final analysis, {stem}_{step}_analysis.txt the other steps
+_FILENAME = re.compile(r"^(?P<track>.+?)(?:_(?P<step>step\d|refined|revised))?_analysis\.txt$")
+
+
+def parse_analysis_filename(name: str) -> Optional[Tuple[str, str]]:
+    """
+    Get the track and step of an analysis file.
+
+    Args:
+        name: File name (e.g. "track_step2_analysis.txt")
+
+    Returns:
+        Tuple of track stem and step, or None if the name is not an analysis file
+    """
+    match = _FILENAME.match(name)
+    if not match:
+        return None
+    return match.group("track"), match.group("step") or "final"
+
+
+def analysis_filename(track: str, step: str) -> str:
+    """
+    Get the file name the pipeline saves an analysis under.
+
+    Args:
+        track: Track stem
+        step: One of STEPS
+
+    Returns:
+        File name in output/analysis
+    """
+    return f"{track}_analysis.txt" if step == "final" else f"{track}_{step}_analysis.txt"
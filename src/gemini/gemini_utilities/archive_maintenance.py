@@ -0,0 +1,189 @@
+"""
+gemini_utilities/archive_maintenance.py - Dictionary training, migration and export
+
+Exports:
+- ArchiveMaintenance: Base of AnalysisArchive (expects its database, lock and compressors)
+  - train(samples=None, dict_size=None) -> int
+  - migrate(analysis_dir="output/analysis", remove=False, retrain=False, artifacts=None,
+            catalogue=None) -> Dict
+  - export(directory, track=None) -> int
+  - get_status() -> Dict
+
+Related files:
+- src/gemini/gemini_utilities/analysis_archive.py: AnalysisArchive
+- src/gemini/gemini_utilities/catalogue_index.py: Outputs it records are never removed
+- src/gemini/gemini_utilities/file_utils.py: Atomic writes used by export
+"""
+
+import time
+import logging
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+from .analysis_names import analysis_filename, parse_analysis_filename
+from .file_utils import atomic_write_text
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Below this much sample text a dictionary does not pay for itself, so none is trained
+MIN_TRAINING_SAMPLES = 8
+MIN_TRAINING_BYTES = 16 * 1024
+
+# A dictionary should be about a tenth of its samples or smaller
+SAMPLES_PER_DICT_BYTE = 10
+
+
+class ArchiveMaintenance:
+    """Trains the archive's dictionary and moves analyses between files and the archive"""
+
+    def train(self, samples: Optional[List[str]] = None, dict_size: Optional[int] = None) -> int:
+        """
+        Train a new dictionary and recompress the stored analyses with it.
+
+        Args:
+            samples: Texts to train on (defaults to the stored analyses)
+            dict_size: Maximum dictionary size (defaults to the archive's dict_size)
+
+        Returns:
+            int: ID of the new dictionary, or 0 if there was too little text to train one
+        """
+        with self._lock:
+            stored = [(track, step, self._decompress(dict_id, data))
+                      for track, step, dict_id, data in self._connection.execute(
+                          "SELECT track, step, dict_id, data FROM analyses").fetchall()]
+            if samples is None:
+                samples = [text for _, _, text in stored]
+            encoded = [text.encode("utf-8") for text in samples if text]
+            total = sum(len(sample) for sample in encoded)
+
+            dict_id = 0
+            if len(encoded) >= MIN_TRAINING_SAMPLES and total >= MIN_TRAINING_BYTES:
+                size = min(dict_size or self.dict_size, total // SAMPLES_PER_DICT_BYTE)
+                try:
+                    dictionary = self.zstd.train_dictionary(size, encoded, level=self.level)
+                except self.zstd.ZstdError as e:
+                    logger.warning(f"Training the analysis dictionary failed: {str(e)}")
+                else:
+                    dict_id = self._connection.execute(
+                        "INSERT INTO dictionaries (data, samples, created_at) VALUES (?, ?, ?)",
+                        (dictionary.as_bytes(), len(encoded), time.time())).lastrowid
+            else:
+                logger.info(f"Too few analyses to train a dictionary ({len(encoded)} texts, "
+                            f"{total} bytes); compressing without one")
+
+            self._use_dictionary(dict_id)
+            now = time.time()
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO analyses VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [self._row(track, step, text, now) for track, step, text in stored])
+            # Every analysis now uses the new dictionary
+            self._connection.execute("DELETE FROM dictionaries WHERE dict_id != ?", (dict_id,))
+            self._connection.commit()
+            self._dictionaries = {key: value for key, value in self._dictionaries.items()
+                                  if key == dict_id}
+            self._decompressors = {}
+        logger.info(f"Analysis archive dictionary {dict_id} trained on {len(encoded)} texts, "
+                    f"{len(stored)} analyses recompressed")
+        return dict_id
+
+    def migrate(self, analysis_dir: Union[str, Path] = "output/analysis", remove: bool = False,
+                retrain: bool = False, artifacts=None, catalogue=None) -> Dict[str, Any]:
+        """
+        Archive the analysis files of a directory.
+
+        A dictionary is trained on the files (and any analyses already archived) when the
+        archive has none yet or retrain is set. Each file is read back from the archive and
+        compared before it is removed. Files a catalogue stage recorded as its output are
+        archived but kept, since the catalogue schedules a track again when they are missing.
+
+        Args:
+            analysis_dir: Directory of {stem}_*analysis.txt files
+            remove: Remove each file once it is archived
+            retrain: Train a new dictionary even if the archive has one
+            artifacts: Artifact store the files are views of; removed files are deleted from
+                it as well, so their blobs are freed
+            catalogue: CatalogueIndex whose recorded stage outputs are not removed
+
+        Returns:
+            Dictionary with files, tracks, removed, kept, raw_bytes and the archive status
+        """
+        analysis_dir = Path(analysis_dir)
+        files = {}
+        for file_path in sorted(analysis_dir.glob("*_analysis.txt")):
+            parsed = parse_analysis_filename(file_path.name)
+            if parsed:
+                # Read as bytes so line endings are archived as they are
+                files[parsed] = (file_path, file_path.read_bytes().decode("utf-8"))
+        if not files:
+            logger.info(f"No analyses to archive in {analysis_dir}")
+            return {"files": 0, "tracks": 0, "removed": 0, "kept": 0, "raw_bytes": 0,
+                    **self.get_status()}
+
+        if retrain or not self._dict_id:
+            stored = [text for track in self.tracks()
+                      for text in self.get_track(track).values()]
+            self.train(stored + [text for _, text in files.values()])
+        self.put_many((track, step, text) for (track, step), (_, text) in files.items())
+
+        removed = kept = 0
+        if remove:
+            needed = catalogue.recorded_outputs() if catalogue is not None else set()
+            for (track, step), (file_path, text) in files.items():
+                if self.get(track, step) != text:
+                    logger.error(f"Archived {file_path.name} does not match the file; kept it")
+                    kept += 1
+                    continue
+                if file_path.resolve() in needed:
+                    kept += 1
+                    continue
+                if artifacts is not None and artifacts.record(file_path) is not None:
+                    artifacts.delete(file_path)
+                file_path.unlink(missing_ok=True)
+                removed += 1
+
+        raw_bytes = sum(len(text.encode("utf-8")) for _, text in files.values())
+        logger.info(f"Archived {len(files)} analyses ({raw_bytes} bytes) from {analysis_dir}"
+                    + (f", removed {removed} files and kept {kept}" if remove else ""))
+        return {"files": len(files), "tracks": len({track for track, _ in files}),
+                "removed": removed, "kept": kept, "raw_bytes": raw_bytes, **self.get_status()}
+
+    def export(self, directory: Union[str, Path], track: Optional[str] = None) -> int:
+        """
+        Write archived analyses back as files under their pipeline names.
+
+        Args:
+            directory: Directory to write to (e.g. output/analysis)
+            track: Only this track's analyses
+
+        Returns:
+            int: Number of files written
+        """
+        directory = Path(directory)
+        written = 0
+        for name in ([track] if track else self.tracks()):
+            for step, text in self.get_track(name).items():
+                atomic_write_text(text, directory / analysis_filename(name, step))
+                written += 1
+        return written
+
+    def get_status(self) -> Dict[str, Any]:
+        """
+        Get the size of the archive.
+
+        Returns:
+            Dictionary with analyses, tracks, raw_bytes, stored_bytes, dictionary_bytes,
+            dict_id and ratio (raw bytes per stored byte, dictionary included)
+        """
+        with self._lock:
+            analyses, tracks, raw_bytes, stored_bytes = self._connection.execute(
+                "SELECT COUNT(*), COUNT(DISTINCT track), COALESCE(SUM(size), 0),"
+                " COALESCE(SUM(LENGTH(data)), 0) FROM analyses").fetchone()
+            dictionary_bytes = self._connection.execute(
+                "SELECT COALESCE(SUM(LENGTH(data)), 0) FROM dictionaries").fetchone()[0]
+        archived = stored_bytes + dictionary_bytes
+        return {"analyses": analyses, "tracks": tracks, "raw_bytes": raw_bytes,
+                "stored_bytes": stored_bytes, "dictionary_bytes": dictionary_bytes,
+                "dict_id": self._dict_id,
+                "ratio": round(raw_bytes / archived, 2) if archived else None}
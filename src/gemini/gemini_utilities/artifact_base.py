@@ -0,0 +1,207 @@
+"""
+gemini_utilities/artifact_base.py - The artifact store interface and its helpers
+
+Exports:
+- ArtifactStore: Interface; put(key, data, kind, track=None, inputs=(), prompt_versions=None,
+  metadata=None, media_type=None) -> Dict, get(key) -> bytes | None,
+  get_text(key) -> str | None, get_json(key) -> Any, record(key) -> Dict | None,
+  exists(key) -> bool, list(kind=None, track=None) -> List[Dict], lineage(key) -> List[Dict],
+  is_stale(key) -> bool, adopt(key, kind, track=None) -> Dict | None, delete(key) -> bool,
+  clear(kind=None) -> int, path(key) -> Path, barrier(track=None) -> None
+- Key: A key (a path relative to the store root) as str or Path
+- hash_bytes(data: bytes) -> str: SHA-256 of the contents
+
+Related files:
+- src/gemini/gemini_utilities/artifact_store.py: LocalArtifactStore and the store's design
+"""
+
+import os
+import json
+import hashlib
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+DEFAULT_CACHE_BYTES = 8 * 1024 * 1024
+
+# Artifacts larger than this are read from disk every time instead of cached
+MAX_CACHED_ARTIFACT = 1024 * 1024
+
+# Windows cannot replace or delete read-only files, so view files are copies there
+LINK_VIEWS = os.name != "nt"
+
+Key = Union[str, Path]
+
+
+def hash_bytes(data: bytes) -> str:
+    """
+    Hash artifact contents.
+
+    Args:
+        data: Contents
+
+    Returns:
+        str: Hex SHA-256 digest
+    """
+    return hashlib.sha256(data).hexdigest()
+
+
+def _temp_name(name: str) -> str:
+    """Name of a temporary file next to name that no other writer uses"""
+    return f".{name}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+
+def _encode(data: Union[bytes, str, Dict, List]) -> bytes:
+    """Encode text as UTF-8 and dictionaries or lists as indented JSON"""
+    if isinstance(data, bytes):
+        return data
+    if isinstance(data, str):
+        return data.encode("utf-8")
+    return json.dumps(data, indent=2).encode("utf-8")
+
+
+class ArtifactStore:
+    """Interface of the stores pipeline artifacts are kept in"""
+
+    def put(self, key: Key, data: Union[bytes, str, Dict, List], kind: str,
+            track: Optional[str] = None, inputs: Iterable[Key] = (),
+            prompt_versions: Optional[Dict[str, str]] = None,
+            metadata: Optional[Dict[str, Any]] = None,
+            media_type: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Write an artifact, replacing any earlier artifact with the same key.
+
+        Args:
+            key: Artifact key (its path relative to the store root, or a path under it)
+            data: Contents; text is stored as UTF-8, dictionaries and lists as JSON
+            kind: Kind of artifact (e.g. "analysis", "prompt", "image")
+            track: Name of the track the artifact belongs to
+            inputs: Keys of the artifacts it was produced from
+            prompt_versions: Template name -> version id of the prompts that produced it
+            metadata: Any other JSON-serializable details
+            media_type: MIME type (guessed from the key if None)
+
+        Returns:
+            The artifact's record (see record)
+        """
+        raise NotImplementedError
+
+    def get(self, key: Key) -> Optional[bytes]:
+        """
+        Read an artifact.
+
+        Args:
+            key: Artifact key or path
+
+        Returns:
+            The contents, or None if there is no such artifact
+        """
+        raise NotImplementedError
+
+    def get_text(self, key: Key) -> Optional[str]:
+        """Read a text artifact, or None if there is no such artifact"""
+        data = self.get(key)
+        return data.decode("utf-8") if data is not None else None
+
+    def get_json(self, key: Key) -> Any:
+        """Read a JSON artifact, or None if there is no such artifact"""
+        data = self.get(key)
+        return json.loads(data) if data is not None else None
+
+    def record(self, key: Key) -> Optional[Dict[str, Any]]:
+        """
+        Get an artifact's record.
+
+        Args:
+            key: Artifact key or path
+
+        Returns:
+            Dictionary with key, kind, track, content_hash, size, media_type, created_at,
+            prompt_versions, metadata, inputs (key and content_hash of each input when the
+            artifact was written) and path, or None if there is no such artifact
+        """
+        raise NotImplementedError
+
+    def exists(self, key: Key) -> bool:
+        """Whether an artifact is stored under the key"""
+        return self.record(key) is not None
+
+    def adopt(self, key: Key, kind: str, track: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Get an artifact's record, recording a file written before the store existed.
+
+        Args:
+            key: Artifact key or path
+            kind: Kind of artifact
+            track: Name of the track the artifact belongs to
+
+        Returns:
+            The artifact's record, or None if there is no such artifact
+        """
+        return self.record(key)
+
+    def list(self, kind: Optional[str] = None, track: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        List artifact records.
+
+        Args:
+            kind: Only artifacts of this kind
+            track: Only artifacts of this track
+
+        Returns:
+            List of records (without inputs), ordered by key
+        """
+        raise NotImplementedError
+
+    def lineage(self, key: Key) -> List[Dict[str, Any]]:
+        """
+        Get every artifact an artifact was directly or indirectly produced from.
+
+        Args:
+            key: Artifact key or path
+
+        Returns:
+            List of dictionaries with key, used_by, content_hash (when used) and
+            current_hash (None if the input is gone), nearest inputs first
+        """
+        raise NotImplementedError
+
+    def is_stale(self, key: Key) -> bool:
+        """Whether any input of an artifact has changed or disappeared since it was written"""
+        return any(entry["current_hash"] != entry["content_hash"] for entry in self.lineage(key))
+
+    def delete(self, key: Key) -> bool:
+        """
+        Delete an artifact and its view file.
+
+        Args:
+            key: Artifact key or path
+
+        Returns:
+            bool: True if the artifact existed
+        """
+        raise NotImplementedError
+
+    def clear(self, kind: Optional[str] = None) -> int:
+        """
+        Delete all artifacts, or all artifacts of a kind.
+
+        Args:
+            kind: Only artifacts of this kind
+
+        Returns:
+            Number of deleted artifacts
+        """
+        raise NotImplementedError
+
+    def path(self, key: Key) -> Path:
+        """Path of an artifact's view file in the legacy layout"""
+        raise NotImplementedError
+
+    def barrier(self, track: Optional[str] = None) -> None:
+        """
+        Wait until artifacts are durable (stores that write synchronously return at once).
+
+        Args:
+            track: Only wait for the artifacts of this track (None waits for all)
+        """
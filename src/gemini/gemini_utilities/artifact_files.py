@@ -0,0 +1,178 @@
+"""
+gemini_utilities/artifact_files.py - Blob and view files of LocalArtifactStore
+
+Blobs are named by their content hash under artifacts/blobs/. Each artifact is also
+exported to its key's path under the store root (or another directory) as a hard link to
+its blob, or a copy on Windows; the blobs are read-only, so a view file is edited by
+replacing it, not in place. Blobs the write-behind queue has synced are marked durable
+here, and records whose blob never reached the disk are dropped when the store opens.
+
+Exports:
+- ArtifactFiles: Base of LocalArtifactStore (expects its root, blob_dir, view, cache_bytes,
+  write_behind, lock, cache and database connection)
+  - path(key) -> Path, get(key) -> bytes | None
+  - export_view(directory=None, kind=None, track=None) -> int
+
+Related files:
+- src/gemini/gemini_utilities/artifact_store.py: LocalArtifactStore
+- src/gemini/gemini_utilities/artifact_base.py: The interface and the constants
+"""
+
+import os
+import shutil
+import logging
+from pathlib import Path
+from typing import Optional, Union
+
+from .artifact_base import LINK_VIEWS, MAX_CACHED_ARTIFACT, ArtifactStore, Key, _temp_name
+from .file_utils import ensure_directory
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class ArtifactFiles(ArtifactStore):
+    """Content-addressed blob files, the in-memory cache and the exported view files"""
+
+    def _key(self, key: Key) -> str:
+        """Normalize a key or a path under the root to a POSIX path relative to the root"""
+        path = Path(key)
+        try:
+            path = path.relative_to(self.root)
+        except ValueError:
+            # An absolute path under a relative root (e.g. output/ in the working directory)
+            if path.is_absolute() and not self.root.is_absolute():
+                try:
+                    path = path.relative_to(self.root.resolve())
+                except ValueError:
+                    pass
+        return path.as_posix()
+
+    def path(self, key: Key) -> Path:
+        return self.root / self._key(key)
+
+    def _blob_path(self, content_hash: str) -> Path:
+        """Blob file of a content hash"""
+        return self.blob_dir / content_hash[:2] / content_hash
+
+    def _seal(self, blob_path: Path) -> None:
+        """Make a written blob read-only, so a hard-linked view file cannot change it"""
+        if LINK_VIEWS:
+            os.chmod(blob_path, 0o444)
+
+    def _recover(self) -> None:
+        """Settle records left not durable by a write-behind run that stopped"""
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT key, content_hash FROM artifacts WHERE durable = 0").fetchall()
+            lost = [key for key, content_hash in rows
+                    if not self._blob_path(content_hash).exists()]
+            for key in lost:
+                self._connection.execute("DELETE FROM artifacts WHERE key = ?", (key,))
+                self._connection.execute("DELETE FROM inputs WHERE key = ?", (key,))
+            # A blob is renamed into place only once synced, so one that exists is complete
+            self._connection.execute("UPDATE artifacts SET durable = 1 WHERE durable = 0")
+            self._connection.commit()
+        if lost:
+            logger.warning(f"Dropped {len(lost)} artifacts whose contents were never written: "
+                           f"{', '.join(lost[:5])}")
+        if self.view:
+            for key, content_hash in rows:
+                if key not in lost:
+                    self._export(key, self._blob_path(content_hash))
+
+    def _written(self, content_hash: str) -> None:
+        """Mark the records of a blob the write-behind queue has synced as durable"""
+        blob_path = self._blob_path(content_hash)
+        self._seal(blob_path)
+        with self._lock:
+            self._connection.execute(
+                "UPDATE artifacts SET durable = 1 WHERE content_hash = ?", (content_hash,))
+            self._connection.commit()
+            keys = [row[0] for row in self._connection.execute(
+                "SELECT key FROM artifacts WHERE content_hash = ?", (content_hash,))]
+        if self.view:
+            for key in keys:
+                self._export(key, blob_path)
+
+    def _export(self, key: str, blob_path: Path, directory: Optional[Path] = None) -> None:
+        """Atomically point a view file at a blob (hard link, or a copy where links fail)"""
+        view_path = (directory or self.root) / key
+        ensure_directory(view_path.parent)
+        # Renaming a link over another link to the same file does nothing, leaving the
+        # temporary file behind
+        if view_path.exists() and os.path.samefile(view_path, blob_path):
+            return
+        temp_path = view_path.with_name(_temp_name(view_path.name))
+        temp_path.unlink(missing_ok=True)
+        try:
+            if not LINK_VIEWS:
+                raise OSError("view files are copies")
+            os.link(blob_path, temp_path)
+        except OSError:
+            shutil.copyfile(blob_path, temp_path)
+        os.replace(temp_path, view_path)
+
+    def _remember(self, content_hash: str, data: bytes) -> None:
+        """Keep small contents in the in-memory cache, dropping the least recently used"""
+        if len(data) > MAX_CACHED_ARTIFACT or self.cache_bytes <= 0:
+            return
+        with self._lock:
+            if content_hash in self._cache:
+                self._cache.move_to_end(content_hash)
+                return
+            self._cache[content_hash] = data
+            self._cached_bytes += len(data)
+            while self._cached_bytes > self.cache_bytes:
+                _, dropped = self._cache.popitem(last=False)
+                self._cached_bytes -= len(dropped)
+
+    def get(self, key: Key) -> Optional[bytes]:
+        key = self._key(key)
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT content_hash FROM artifacts WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            data = self._cache.get(row[0])
+            if data is not None:
+                self._cache.move_to_end(row[0])
+                return data
+
+        try:
+            data = self._blob_path(row[0]).read_bytes()
+        except FileNotFoundError:
+            data = self.write_behind.pending(self._blob_path(row[0])) if self.write_behind else None
+            if data is None:
+                logger.error(f"Blob {row[0]} of artifact {key} is missing")
+                return None
+        self._remember(row[0], data)
+        return data
+
+    def export_view(self, directory: Union[str, Path, None] = None, kind: Optional[str] = None,
+                    track: Optional[str] = None) -> int:
+        """
+        Write the view files of stored artifacts (e.g. after the output folder was
+        cleaned by hand, or to give another tool a copy of the legacy layout).
+
+        Args:
+            directory: Directory to write the layout under (default: the store root)
+            kind: Only artifacts of this kind
+            track: Only artifacts of this track
+
+        Returns:
+            Number of view files written
+        """
+        directory = Path(directory) if directory is not None else None
+        self.barrier(track)
+        exported = 0
+        for record in self.list(kind=kind, track=track):
+            blob_path = self._blob_path(record["content_hash"])
+            if not blob_path.exists():
+                logger.error(f"Blob {record['content_hash']} of artifact {record['key']} is missing")
+                continue
+            self._export(record["key"], blob_path, directory)
+            exported += 1
+        logger.info(f"Exported {exported} artifacts to {directory or self.root}")
+        return exported
@@ -0,0 +1,281 @@
+"""
+gemini_utilities/artifact_store.py - Content-addressed store of pipeline artifacts
+
+Every output of the pipeline (step analyses, image prompts, images) is an artifact: bytes
+plus a metadata record of its kind, track, content hash, the prompt template versions it
+was rendered with and its lineage, i.e. the artifacts it was produced from and their
+hashes at the time. Lineage makes staleness a lookup: an artifact whose inputs have been
+rewritten since is stale, without comparing files.
+
+LocalArtifactStore keeps the records in SQLite and the bytes as content-addressed blobs.
+A blob is written to a temporary file and renamed into place before its record is
+committed, so a crash leaves no record pointing at a partial file. Existence checks and
+listings are index lookups instead of directory scans.
+
+With a WriteBehindQueue, put() returns before the blob is on disk: the record is committed
+as not yet durable and reads are served from the queue until the writer has synced the
+blob. barrier(track) waits until a track's artifacts are durable; records whose blob never
+reached the disk are dropped when the store is opened again.
+
+Artifacts are keyed by their path relative to the store root, and each one is also
+exported to that path (the legacy layout: output/analysis/{stem}_step1_analysis.txt,
+output/images/prompts/{stem}_prompt.json, ...), so code and tools that read the files
+keep working. The blob and view files are handled in artifact_files.py.
+
+Exports:
+- ArtifactStore: The interface (see artifact_base.py)
+- LocalArtifactStore(root: str | Path = "output", db_path: str | Path | None = None,
+                     view: bool = True, cache_bytes: int = 8 MB,
+                     write_behind: WriteBehindQueue | None = None)
+  - export_view(directory=None, kind=None, track=None) -> int
+  - close() -> None
+- hash_bytes(data: bytes) -> str: SHA-256 of the contents
+
+Related files:
+- src/gemini/gemini_utilities/artifact_base.py, artifact_files.py: The interface and the files
+- src/gemini/gemini_hooks/audio_to_image_processor.py: Writes and reads the pipeline outputs
+- src/gemini/gemini_hooks/batch_runner.py: Writes the batch results through the processor
+- src/gemini/gemini_utilities/catalogue_index.py: Stage status per track
+- src/gemini/gemini_utilities/file_utils.py: Atomic writes and the write-behind queue
+"""
+
+import json
+import time
+import sqlite3
+import logging
+import threading
+import mimetypes
+from collections import OrderedDict, deque
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+# ArtifactStore and hash_bytes are re-exported, so callers keep importing them from here
+from .artifact_base import DEFAULT_CACHE_BYTES, ArtifactStore, Key, _encode, hash_bytes
+from .artifact_files import ArtifactFiles
+from .file_utils import WriteBehindQueue, atomic_write_bytes
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class LocalArtifactStore(ArtifactFiles):
+    """Artifact store with SQLite records and content-addressed blob files"""
+
+    def __init__(self, root: Union[str, Path] = "output", db_path: Union[str, Path, None] = None,
+                 view: bool = True, cache_bytes: int = DEFAULT_CACHE_BYTES,
+                 write_behind: Optional[WriteBehindQueue] = None):
+        """
+        Open (or create) the store.
+
+        Args:
+            root: Directory the keys are relative to and the view files are written under
+            db_path: SQLite database file (default {root}/artifacts.sqlite)
+            view: Export every artifact to its path under root as it is written
+            cache_bytes: Memory for recently written or read small artifacts
+            write_behind: Queue that writes the blobs in the background; None writes and
+                syncs each blob before put() returns
+        """
+        self.root = Path(root)
+        self.db_path = Path(db_path or self.root / "artifacts.sqlite")
+        self.blob_dir = self.root / "artifacts" / "blobs"
+        self.view = view
+        self.cache_bytes = cache_bytes
+        self.write_behind = write_behind
+        self.blob_dir.mkdir(exist_ok=True, parents=True)
+        self.db_path.parent.mkdir(exist_ok=True, parents=True)
+
+        self._lock = threading.RLock()
+        self._connection = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS artifacts ("
+            " key TEXT PRIMARY KEY, kind TEXT NOT NULL, track TEXT, content_hash TEXT NOT NULL,"
+            " size INTEGER NOT NULL, media_type TEXT, created_at REAL,"
+            " prompt_versions TEXT, metadata TEXT, durable INTEGER NOT NULL DEFAULT 1)")
+        columns = [row[1] for row in self._connection.execute("PRAGMA table_info(artifacts)")]
+        if "durable" not in columns:
+            self._connection.execute(
+                "ALTER TABLE artifacts ADD COLUMN durable INTEGER NOT NULL DEFAULT 1")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS inputs ("
+            " key TEXT NOT NULL, input_key TEXT NOT NULL, content_hash TEXT,"
+            " PRIMARY KEY (key, input_key))")
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS artifacts_track ON artifacts (track, kind)")
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS artifacts_hash ON artifacts (content_hash)")
+        self._connection.commit()
+
+        # content hash -> bytes of recently used small artifacts
+        self._cache: "OrderedDict[str, bytes]" = OrderedDict()
+        self._cached_bytes = 0
+        self._recover()
+
+    def put(self, key: Key, data: Union[bytes, str, Dict, List], kind: str,
+            track: Optional[str] = None, inputs: Iterable[Key] = (),
+            prompt_versions: Optional[Dict[str, str]] = None,
+            metadata: Optional[Dict[str, Any]] = None,
+            media_type: Optional[str] = None) -> Dict[str, Any]:
+        key = self._key(key)
+        data = _encode(data)
+        content_hash = hash_bytes(data)
+        blob_path = self._blob_path(content_hash)
+        media_type = media_type or mimetypes.guess_type(key)[0]
+        input_keys = [self._key(input_key) for input_key in inputs]
+
+        # Contents stored before need no write
+        deferred = False
+        if not blob_path.exists() and self.write_behind is None:
+            atomic_write_bytes(data, blob_path)
+            self._seal(blob_path)
+        elif not blob_path.exists():
+            deferred = True
+
+        with self._lock:
+            try:
+                input_rows = []
+                for input_key in input_keys:
+                    row = self._connection.execute(
+                        "SELECT content_hash FROM artifacts WHERE key = ?", (input_key,)).fetchone()
+                    input_rows.append((key, input_key, row[0] if row else None))
+                self._connection.execute(
+                    "INSERT OR REPLACE INTO artifacts VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (key, kind, track, content_hash, len(data), media_type, time.time(),
+                     json.dumps(prompt_versions or {}), json.dumps(metadata or {}),
+                     0 if deferred else 1))
+                self._connection.execute("DELETE FROM inputs WHERE key = ?", (key,))
+                self._connection.executemany(
+                    "INSERT INTO inputs VALUES (?, ?, ?)", input_rows)
+                self._connection.commit()
+            except sqlite3.Error:
+                self._connection.rollback()
+                raise
+        self._remember(content_hash, data)
+
+        if deferred:
+            # The record becomes durable and its view file appears once the blob is synced
+            self.write_behind.submit(blob_path, data, group=track,
+                                     callback=lambda: self._written(content_hash))
+        elif self.view:
+            self._export(key, blob_path)
+        return self.record(key)
+
+    def adopt(self, key: Key, kind: str, track: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        # A file at the view path without a record was written before the store existed
+        record = self.record(key)
+        if record is not None:
+            return record
+        view_path = self.path(key)
+        if not view_path.is_file():
+            return None
+        logger.info(f"Adopting existing output {view_path} into the artifact store")
+        return self.put(key, view_path.read_bytes(), kind, track=track,
+                        metadata={"adopted": True})
+
+    @staticmethod
+    def _row_record(row: tuple, root: Path) -> Dict[str, Any]:
+        """Build a record from an artifacts row"""
+        return {"key": row[0], "kind": row[1], "track": row[2], "content_hash": row[3],
+                "size": row[4], "media_type": row[5], "created_at": row[6],
+                "prompt_versions": json.loads(row[7] or "{}"),
+                "metadata": json.loads(row[8] or "{}"), "path": str(root / row[0])}
+
+    def record(self, key: Key) -> Optional[Dict[str, Any]]:
+        key = self._key(key)
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT * FROM artifacts WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            inputs = [{"key": input_key, "content_hash": content_hash}
+                      for input_key, content_hash in self._connection.execute(
+                          "SELECT input_key, content_hash FROM inputs WHERE key = ? "
+                          "ORDER BY input_key", (key,))]
+        return dict(self._row_record(row, self.root), inputs=inputs)
+
+    def exists(self, key: Key) -> bool:
+        with self._lock:
+            return self._connection.execute(
+                "SELECT 1 FROM artifacts WHERE key = ?", (self._key(key),)).fetchone() is not None
+
+    def list(self, kind: Optional[str] = None, track: Optional[str] = None) -> List[Dict[str, Any]]:
+        conditions, parameters = [], []
+        for column, value in (("kind", kind), ("track", track)):
+            if value is not None:
+                conditions.append(f"{column} = ?")
+                parameters.append(value)
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+        with self._lock:
+            rows = self._connection.execute(
+                f"SELECT * FROM artifacts{where} ORDER BY key", parameters).fetchall()
+        return [self._row_record(row, self.root) for row in rows]
+
+    def lineage(self, key: Key) -> List[Dict[str, Any]]:
+        pending = deque([self._key(key)])
+        seen = set(pending)
+        entries = []
+        with self._lock:
+            while pending:
+                current = pending.popleft()
+                for input_key, used_hash, current_hash in self._connection.execute(
+                        "SELECT inputs.input_key, inputs.content_hash, artifacts.content_hash "
+                        "FROM inputs LEFT JOIN artifacts ON artifacts.key = inputs.input_key "
+                        "WHERE inputs.key = ? ORDER BY inputs.input_key", (current,)).fetchall():
+                    entries.append({"key": input_key, "used_by": current,
+                                    "content_hash": used_hash, "current_hash": current_hash})
+                    if input_key not in seen:
+                        seen.add(input_key)
+                        pending.append(input_key)
+        return entries
+
+    def _delete_rows(self, keys: List[str]) -> None:
+        """Delete records, their view files and the blobs no other record uses"""
+        # A blob still queued would be written after its deletion
+        self.barrier()
+        with self._lock:
+            hashes = {}
+            for key in keys:
+                row = self._connection.execute(
+                    "SELECT content_hash FROM artifacts WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    hashes[key] = row[0]
+                    self._connection.execute("DELETE FROM artifacts WHERE key = ?", (key,))
+                    self._connection.execute("DELETE FROM inputs WHERE key = ?", (key,))
+            self._connection.commit()
+
+            orphans = {content_hash for content_hash in hashes.values()
+                       if self._connection.execute(
+                           "SELECT 1 FROM artifacts WHERE content_hash = ?",
+                           (content_hash,)).fetchone() is None}
+            for content_hash in orphans:
+                dropped = self._cache.pop(content_hash, None)
+                if dropped is not None:
+                    self._cached_bytes -= len(dropped)
+
+        for content_hash in orphans:
+            self._blob_path(content_hash).unlink(missing_ok=True)
+        if self.view:
+            for key in hashes:
+                self.path(key).unlink(missing_ok=True)
+
+    def delete(self, key: Key) -> bool:
+        key = self._key(key)
+        existed = self.exists(key)
+        self._delete_rows([key])
+        return existed
+
+    def clear(self, kind: Optional[str] = None) -> int:
+        keys = [record["key"] for record in self.list(kind=kind)]
+        self._delete_rows(keys)
+        return len(keys)
+
+    def barrier(self, track: Optional[str] = None) -> None:
+        if self.write_behind is not None:
+            self.write_behind.barrier(track)
+
+    def close(self) -> None:
+        """Wait for queued blobs and close the database"""
+        self.barrier()
+        with self._lock:
+            self._connection.close()
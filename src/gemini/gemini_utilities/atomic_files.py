@@ -0,0 +1,153 @@
+"""
+gemini_utilities/atomic_files.py - Atomic file writes
+
+Every write goes to a temporary file in the target directory that is renamed over the
+target, so a reader or a crash sees either the old file or the complete new one, never a
+truncated one. With durable=True the data and the rename are also fsynced before the call
+returns. Directories are remembered once created, so repeated writes do not call mkdir.
+
+Exports:
+- ensure_directory(directory): Ensures a directory exists
+- atomic_write_bytes(data, file_path, durable=True) -> Path: Writes a file atomically
+- atomic_write_text(text, file_path, durable=True) -> Path
+
+Related files:
+- src/gemini/gemini_utilities/file_utils.py: The save_* helpers built on these writes
+- src/gemini/gemini_utilities/write_behind.py: Batches the fsyncs on a background thread
+"""
+
+import os
+import uuid
+import logging
+import threading
+from pathlib import Path
+from typing import Any, Callable, Set, Union
+
+logger = logging.getLogger(__name__)
+
+# Directories known to exist, so saves skip the mkdir
+_known_directories: Set[str] = set()
+_directories_lock = threading.Lock()
+
+
+def ensure_directory(directory: Union[str, Path]) -> None:
+    """
+    Ensure a directory exists, creating it if necessary.
+
+    Args:
+        directory: Directory path to ensure exists
+    """
+    key = os.path.abspath(directory)
+    if key in _known_directories:
+        return
+    directory_path = Path(directory)
+    directory_path.mkdir(parents=True, exist_ok=True)
+    with _directories_lock:
+        _known_directories.add(key)
+    logger.debug(f"Ensured directory exists: {directory}")
+
+
+def _forget_directories(directory: Union[str, Path]) -> None:
+    """Drop a directory and everything below it from the known directories"""
+    prefix = os.path.abspath(directory)
+    with _directories_lock:
+        for key in [key for key in _known_directories
+                    if key == prefix or key.startswith(prefix + os.sep)]:
+            _known_directories.discard(key)
+
+
+def _temp_path(file_path: Path) -> Path:
+    """Temporary file next to file_path that no other writer uses"""
+    return file_path.with_name(f".{file_path.name}.{uuid.uuid4().hex[:12]}.tmp")
+
+
+def _fsync_directory(directory: Union[str, Path]) -> None:
+    """Make a rename in a directory durable (not supported on Windows)"""
+    if os.name == "nt":
+        return
+    descriptor = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(descriptor)
+    finally:
+        os.close(descriptor)
+
+
+def _write_temp(file_path: Path, write: Callable[[Path], Any], durable: bool) -> Path:
+    """
+    Write a temporary file next to file_path with write(temp_path).
+
+    Returns:
+        The temporary file's path
+    """
+    ensure_directory(file_path.parent)
+    temp_path = _temp_path(file_path)
+    try:
+        write(temp_path)
+    except FileNotFoundError:
+        # The directory was removed behind the cache's back
+        _forget_directories(file_path.parent)
+        ensure_directory(file_path.parent)
+        write(temp_path)
+    try:
+        if durable:
+            with open(temp_path, "rb+") as f:
+                os.fsync(f.fileno())
+    except BaseException:
+        temp_path.unlink(missing_ok=True)
+        raise
+    return temp_path
+
+
+def _atomic_write(file_path: Union[str, Path], write: Callable[[Path], Any],
+                  durable: bool = True) -> Path:
+    """
+    Write a file atomically: write(temp_path) then rename over file_path.
+
+    Args:
+        file_path: Destination path
+        write: Writes the contents to the path it is given
+        durable: fsync the data and the rename before returning
+
+    Returns:
+        Path: The destination path
+    """
+    file_path = Path(file_path)
+    temp_path = _write_temp(file_path, write, durable)
+    try:
+        os.replace(temp_path, file_path)
+    except BaseException:
+        temp_path.unlink(missing_ok=True)
+        raise
+    if durable:
+        _fsync_directory(file_path.parent)
+    return file_path
+
+
+def atomic_write_bytes(data: bytes, file_path: Union[str, Path], durable: bool = True) -> Path:
+    """
+    Write bytes to a file atomically.
+
+    Args:
+        data: File contents
+        file_path: Destination path
+        durable: fsync the data and the rename before returning
+
+    Returns:
+        Path: The destination path
+    """
+    return _atomic_write(file_path, lambda path: path.write_bytes(data), durable)
+
+
+def atomic_write_text(text: str, file_path: Union[str, Path], durable: bool = True) -> Path:
+    """
+    Write text to a file atomically as UTF-8.
+
+    Args:
+        text: File contents
+        file_path: Destination path
+        durable: fsync the data and the rename before returning
+
+    Returns:
+        Path: The destination path
+    """
+    return atomic_write_bytes(text.encode("utf-8"), file_path, durable)
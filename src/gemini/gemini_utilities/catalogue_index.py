@@ -0,0 +1,240 @@
+"""
+gemini_utilities/catalogue_index.py - Incremental catalogue of the data_source folder
+
+Keeps data_source/index.json up to date with one record per MP3 track (path, size, mtime,
+content hash, duration, filename BPM) plus the status of each pipeline stage, so that
+batch runs only schedule tracks that are new or whose outputs are stale. Each stage also
+records the version ids of the prompt templates it was rendered with; a stage produced
+with a prompt that has since changed counts as stale. A stage that does not apply to a
+track (e.g. the revision without a refined analysis) is recorded as skipped, which counts
+as up to date.
+
+Exports:
+- CatalogueIndex(data_dir: str | Path = "data_source", index_path: str | Path | None = None,
+                 prompt_versions: Dict[str, Dict[str, str]] | None = None)
+  - scan() -> Dict[str, int]: Incrementally refresh track records (mtime checked before hashing)
+  - pending_tracks(stages: Sequence[str] = STAGES) -> List[Path]: New or stale tracks
+  - is_stale(audio_path: str | Path, stages: Sequence[str] = STAGES) -> bool
+  - prompts_changed(audio_path, stage: str) -> bool: Stage was rendered with older prompts
+  - mark_stage(...), record_result(...), find_artifact(...), recorded_outputs(),
+    reset_stages(...) (see catalogue_stages.py)
+  - save() -> None
+- parse_bpm_from_filename, get_mp3_duration, hash_file (see track_metadata.py)
+
+Related files:
+- src/gemini/gemini_utilities/catalogue_stages.py: Stage records of the indexed tracks
+- src/gemini/gemini_utilities/track_metadata.py: Duration, BPM and content hash of a track
+- src/main.py: Uses the index to schedule --all runs
+- src/gemini/gemini_hooks/audio_to_image_processor.py: Produces the result dicts recorded here
+- src/gemini/gemini_prompts/prompt_registry.py: Prompt template version ids
+"""
+
+import os
+import json
+import logging
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Sequence, Union
+
+# The stage records and track metadata helpers are re-exported, so callers keep importing
+# them from here
+from .catalogue_stages import STAGES, STAGE_RESULT_KEYS, CatalogueStages
+from .track_metadata import HASH_CHUNK_SIZE, get_mp3_duration, hash_file, parse_bpm_from_filename
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+INDEX_VERSION = 1
+
+
+class CatalogueIndex(CatalogueStages):
+    """Incremental index of the tracks in data_source and their pipeline status"""
+
+    def __init__(self, data_dir: Union[str, Path] = "data_source",
+                 index_path: Optional[Union[str, Path]] = None,
+                 prompt_versions: Optional[Dict[str, Dict[str, str]]] = None):
+        """
+        Initialize the catalogue index and load any existing index file.
+
+        Args:
+            data_dir: Directory containing the MP3 catalogue
+            index_path: Location of the JSON index (defaults to data_dir/index.json)
+            prompt_versions: Current prompt version ids per stage (template name -> version id);
+                stages recorded with other versions are stale. None disables the check.
+        """
+        self.data_dir = Path(data_dir)
+        self.index_path = Path(index_path) if index_path else self.data_dir / "index.json"
+        self.prompt_versions = prompt_versions or {}
+        self.tracks: Dict[str, Dict[str, Any]] = {}
+        # Guards tracks and the index file; the watch daemon shares one index across workers
+        self._lock = threading.RLock()
+        self.load()
+
+    def load(self) -> None:
+        """Load the index from disk, treating a missing or empty file as an empty index"""
+        self.tracks = {}
+        if not self.index_path.exists() or self.index_path.stat().st_size == 0:
+            return
+
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self.tracks = data.get("tracks", {})
+        except (json.JSONDecodeError, OSError) as e:
+            logger.warning(f"Ignoring unreadable catalogue index {self.index_path}: {e}")
+
+    def save(self) -> None:
+        """Write the index to disk atomically (temp file + rename)"""
+        with self._lock:
+            self.index_path.parent.mkdir(parents=True, exist_ok=True)
+            data = {
+                "version": INDEX_VERSION,
+                "updated_at": datetime.now().isoformat(),
+                "tracks": self.tracks
+            }
+            temp_path = self.index_path.with_suffix(self.index_path.suffix + ".tmp")
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=2)
+            os.replace(temp_path, self.index_path)
+
+    def _key(self, audio_path: Union[str, Path]) -> str:
+        """Return the index key (file name) for an audio path"""
+        return Path(audio_path).name
+
+    def scan(self) -> Dict[str, int]:
+        """
+        Refresh the index from the data directory.
+
+        Files whose size and mtime are unchanged keep their stored hash; only new or
+        modified files are re-hashed and re-parsed. Records for deleted files are dropped.
+
+        Returns:
+            Dictionary with counts of added, updated, unchanged and removed tracks
+        """
+        with self._lock:
+            counts = {"added": 0, "updated": 0, "unchanged": 0, "removed": 0}
+            seen = set()
+
+            for audio_path in sorted(self.data_dir.glob("*.mp3")):
+                key = self._key(audio_path)
+                seen.add(key)
+                stat = audio_path.stat()
+                record = self.tracks.get(key)
+
+                if record and record.get("size") == stat.st_size and record.get("mtime") == stat.st_mtime:
+                    counts["unchanged"] += 1
+                    continue
+
+                content_hash = hash_file(audio_path)
+                if record and record.get("content_hash") == content_hash:
+                    # Touched but not modified: refresh the stat fields only
+                    record.update({"size": stat.st_size, "mtime": stat.st_mtime})
+                    counts["unchanged"] += 1
+                    continue
+
+                new_record = {
+                    "path": str(audio_path),
+                    "size": stat.st_size,
+                    "mtime": stat.st_mtime,
+                    "content_hash": content_hash,
+                    "duration_seconds": get_mp3_duration(audio_path),
+                    "bpm": parse_bpm_from_filename(audio_path.name),
+                    "indexed_at": datetime.now().isoformat(),
+                    "stages": record.get("stages", {}) if record else {}
+                }
+                self.tracks[key] = new_record
+                counts["updated" if record else "added"] += 1
+
+            for key in list(self.tracks):
+                if key not in seen:
+                    del self.tracks[key]
+                    counts["removed"] += 1
+
+            self.save()
+            logger.info(
+                f"Catalogue scan: {counts['added']} added, {counts['updated']} updated, "
+                f"{counts['unchanged']} unchanged, {counts['removed']} removed")
+            return counts
+
+    def get_track(self, audio_path: Union[str, Path]) -> Optional[Dict[str, Any]]:
+        """
+        Get the index record for a track.
+
+        Args:
+            audio_path: Path or file name of the track
+
+        Returns:
+            The track record, or None if the track is not indexed
+        """
+        return self.tracks.get(self._key(audio_path))
+
+    def is_stale(self, audio_path: Union[str, Path], stages: Sequence[str] = STAGES) -> bool:
+        """
+        Check whether a track needs (re)processing.
+
+        A stage is up to date when it completed (or was skipped) against the current
+        content hash, all of its recorded outputs still exist on disk, and it was rendered
+        with the current prompt versions (stages recorded without prompt versions are not
+        checked).
+
+        Args:
+            audio_path: Path or file name of the track
+            stages: Stages that must be up to date
+
+        Returns:
+            True if any of the stages is missing, failed, or out of date
+        """
+        record = self.get_track(audio_path)
+        if not record:
+            return True
+
+        for stage in stages:
+            stage_record = record.get("stages", {}).get(stage)
+            if not stage_record or stage_record.get("status") not in ("done", "skipped"):
+                return True
+            if stage_record.get("content_hash") != record.get("content_hash"):
+                return True
+            if not all(Path(output).exists() for output in stage_record.get("outputs", [])):
+                return True
+            if self.prompts_changed(audio_path, stage):
+                return True
+
+        return False
+
+    def prompts_changed(self, audio_path: Union[str, Path], stage: str) -> bool:
+        """
+        Check whether a stage was recorded with prompt versions other than the current ones.
+
+        Only templates present in both the recorded and current versions are compared, so
+        registering an existing prompt (same text, new name) does not reschedule tracks.
+
+        Args:
+            audio_path: Path or file name of the track
+            stage: Stage name
+
+        Returns:
+            True if a template the stage was rendered with has changed since
+        """
+        record = self.get_track(audio_path) or {}
+        recorded_prompts = record.get("stages", {}).get(stage, {}).get("prompts") or {}
+        current_prompts = self.prompt_versions.get(stage) or {}
+        return any(current_prompts[name] != version
+                   for name, version in recorded_prompts.items() if name in current_prompts)
+
+    def pending_tracks(self, stages: Sequence[str] = STAGES) -> List[Path]:
+        """
+        Get the tracks that are new or stale for the given stages.
+
+        Args:
+            stages: Stages that must be up to date
+
+        Returns:
+            List of audio paths to schedule
+        """
+        with self._lock:
+            pending = [Path(record["path"]) for key, record in sorted(self.tracks.items())
+                       if self.is_stale(key, stages)]
+        logger.info(f"{len(pending)} of {len(self.tracks)} catalogue tracks need processing")
+        return pending
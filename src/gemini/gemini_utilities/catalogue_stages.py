@@ -0,0 +1,155 @@
+"""
+gemini_utilities/catalogue_stages.py - Pipeline stage records of the catalogue index
+
+Each indexed track records the status, outputs, error and prompt versions of every pipeline
+stage. CatalogueStages is the stage half of CatalogueIndex; it expects the index's tracks,
+_lock, get_track() and save().
+
+Exports:
+- STAGES: Pipeline stages tracked per track, in execution order
+- STAGE_RESULT_KEYS: Stage -> (success key, error key, output keys) of a processor result
+- CatalogueStages
+  - mark_stage(audio_path, stage: str, status: str, outputs: List[str] | None, error: str | None,
+               prompts: Dict[str, str] | None) -> None
+  - record_result(audio_path, result: Dict[str, Any]) -> None: Store a processor result dict
+  - find_artifact(output_path: str | Path) -> Dict[str, Any] | None: Track, stage and prompt versions
+  - recorded_outputs() -> Set[Path]: Resolved paths of every output a stage recorded
+  - reset_stages(audio_path: str | Path | None = None) -> None
+
+Related files:
+- src/gemini/gemini_utilities/catalogue_index.py: CatalogueIndex
+- src/gemini/gemini_hooks/audio_to_image_processor.py: Produces the result dicts recorded here
+"""
+
+import logging
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Set, Union
+
+logger = logging.getLogger(__name__)
+
+# Pipeline stages tracked per track, in execution order
+STAGES = ("analysis", "revision", "prompt", "image")
+
+# Result dict keys produced by AudioToImageProcessor for each stage
+STAGE_RESULT_KEYS = {
+    "analysis": ("analysis_success", "analysis_error",
+                 ("final_analysis_path", "refined_analysis_path")),
+    "revision": ("revision_success", "revision_error", ("revised_analysis_path",)),
+    "prompt": ("prompt_success", "prompt_error", ("prompt_path",)),
+    "image": ("image_success", "image_error", ("image_path",)),
+}
+
+
+class CatalogueStages:
+    """Stage status of the tracks in a CatalogueIndex"""
+
+    def mark_stage(self, audio_path: Union[str, Path], stage: str, status: str,
+                   outputs: Optional[List[str]] = None, error: Optional[str] = None,
+                   prompts: Optional[Dict[str, str]] = None) -> None:
+        """
+        Record the status of a pipeline stage for a track (does not save).
+
+        Args:
+            audio_path: Path or file name of the track
+            stage: Stage name (one of STAGES)
+            status: "done", "skipped" or "failed"
+            outputs: Output files produced by the stage
+            error: Error message for failed stages, or why a stage was skipped
+            prompts: Prompt version ids the stage was rendered with (None keeps the
+                previously recorded versions)
+        """
+        if stage not in STAGES:
+            raise ValueError(f"Unknown pipeline stage: {stage}")
+
+        with self._lock:
+            record = self.get_track(audio_path)
+            if record is None:
+                logger.warning(f"Cannot mark stage for unindexed track: {audio_path}")
+                return
+
+            stages = record.setdefault("stages", {})
+            if prompts is None:
+                prompts = stages.get(stage, {}).get("prompts")
+            stages[stage] = {
+                "status": status,
+                "content_hash": record.get("content_hash"),
+                "outputs": [str(output) for output in (outputs or [])],
+                "error": error,
+                "prompts": prompts,
+                "updated_at": datetime.now().isoformat()
+            }
+
+    def record_result(self, audio_path: Union[str, Path], result: Dict[str, Any]) -> None:
+        """
+        Store the stage outcomes of an AudioToImageProcessor result dict and save.
+
+        Stages that the result does not mention (e.g. never reached) are left untouched.
+
+        Args:
+            audio_path: Path of the processed track
+            result: Result dictionary from process_audio_file
+        """
+        with self._lock:
+            prompt_versions = result.get("prompt_versions", {})
+            for stage, (success_key, error_key, output_keys) in STAGE_RESULT_KEYS.items():
+                outputs = [result[key] for key in output_keys if result.get(key)]
+                if result.get(success_key):
+                    self.mark_stage(audio_path, stage, "done", outputs=outputs,
+                                    prompts=prompt_versions.get(stage))
+                elif result.get(error_key):
+                    self.mark_stage(audio_path, stage, "failed", error=str(result[error_key]))
+                elif result.get(f"{stage}_skipped"):
+                    self.mark_stage(audio_path, stage, "skipped",
+                                    error=str(result[f"{stage}_skipped"]))
+
+            self.save()
+
+    def find_artifact(self, output_path: Union[str, Path]) -> Optional[Dict[str, Any]]:
+        """
+        Find which track and stage produced an output file, and with which prompts.
+
+        Args:
+            output_path: Path of an output file recorded in the index
+
+        Returns:
+            Dictionary with track, stage, status and prompts, or None if no stage recorded it
+        """
+        target = Path(output_path).resolve()
+        with self._lock:
+            for key, record in self.tracks.items():
+                for stage, stage_record in record.get("stages", {}).items():
+                    if any(Path(output).resolve() == target for output in stage_record.get("outputs", [])):
+                        return {
+                            "track": key,
+                            "stage": stage,
+                            "status": stage_record.get("status"),
+                            "prompts": stage_record.get("prompts")
+                        }
+        return None
+
+    def recorded_outputs(self) -> Set[Path]:
+        """
+        Get every output file the stages of the indexed tracks recorded.
+
+        Returns:
+            Set of resolved output paths
+        """
+        with self._lock:
+            return {Path(output).resolve() for record in self.tracks.values()
+                    for stage_record in record.get("stages", {}).values()
+                    for output in stage_record.get("outputs", [])}
+
+    def reset_stages(self, audio_path: Optional[Union[str, Path]] = None) -> None:
+        """
+        Forget stage status for one track, or for every track, and save.
+
+        Args:
+            audio_path: Track to reset (None resets the whole catalogue)
+        """
+        with self._lock:
+            records = [self.get_track(audio_path)] if audio_path else list(self.tracks.values())
+            for record in records:
+                if record:
+                    record["stages"] = {}
+            self.save()
@@ -2,98 +2,104 @@
 gemini_utilities/file_utils.py - File handling utilities for the Gemini client
 
 Provides utility functions for file operations:
-- save_text(text, file_path): Saves text to a file
-- save_json(data, file_path): Saves JSON data to a file
-- save_image(image, file_path): Saves a PIL image to a file
+- save_text(text, file_path, durable=False): Saves text to a file
+- save_json(data, file_path, durable=False): Saves JSON data to a file
+- save_image(image, file_path, durable=False): Saves a PIL image or GeneratedImage (raw bytes) to a file
+- atomic_write_bytes(data, file_path, durable=True) -> Path: Writes a file atomically
+- atomic_write_text(text, file_path, durable=True) -> Path
 - ensure_directory(directory): Ensures a directory exists
 - clean_output_directory(directory): Cleans the content of a directory
+- WriteBehindQueue(max_batch=64): Atomic writes whose fsyncs are batched on a background thread
+  - submit(file_path, data, group=None, callback=None) -> Future
+  - pending(file_path) -> bytes | None, barrier(group=None) -> None, close() -> None
+
+Every save is atomic (see atomic_files.py); the save_* helpers only fsync with
+durable=True, since an fsync per output dominates a pipeline step, while the atomic_write_*
+primitives sync by default. A WriteBehindQueue (see write_behind.py) batches those fsyncs on
+a background thread.
 
 Related files:
+- src/gemini/gemini_utilities/atomic_files.py: Atomic writes and the directory cache
+- src/gemini/gemini_utilities/write_behind.py: WriteBehindQueue
 - src/gemini/gemini_client.py: Main client that uses these utilities
 - src/gemini/gemini_apis/file_api.py: API functions for file operations
+- src/gemini/gemini_utilities/artifact_store.py: Blob writes and the write-behind mode
 """
 
-import os
 import json
 import logging
 import shutil
 from pathlib import Path
-from typing import Dict, Any, Union
+from typing import Any, Dict, Union
 from PIL import Image
 
+from .generated_image import GeneratedImage, PIL_FORMATS
+# The atomic write primitives and the write-behind queue are re-exported, so callers keep
+# importing them from here
+from .atomic_files import (_atomic_write, _forget_directories, atomic_write_bytes,
+                           atomic_write_text, ensure_directory)
+from .write_behind import DEFAULT_WRITE_BATCH, WriteBehindQueue
+
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
-def ensure_directory(directory: Union[str, Path]) -> None:
-    """
-    Ensure a directory exists, creating it if necessary.
-
-    Args:
-        directory: Directory path to ensure exists
-    """
-    directory_path = Path(directory)
-    directory_path.mkdir(parents=True, exist_ok=True)
-    logger.debug(f"Ensured directory exists: {directory}")
-
-
-def save_text(text: str, file_path: Union[str, Path]) -> None:
+def save_text(text: str, file_path: Union[str, Path], durable: bool = False) -> None:
     """
     Save text content to a file.
 
     Args:
         text: Text content to save
         file_path: Path where the file should be saved
+        durable: fsync the file before returning
     """
     try:
-        # Ensure parent directory exists
-        ensure_directory(Path(file_path).parent)
-
-        # Write the text file
-        with open(file_path, 'w', encoding='utf-8') as f:
-            f.write(text)
+        atomic_write_text(text, file_path, durable)
         logger.info(f"Saved text file: {file_path}")
     except Exception as e:
         logger.error(f"Error saving text file {file_path}: {e}")
         raise
 
 
-def save_json(data: Dict[str, Any], file_path: Union[str, Path]) -> None:
+def save_json(data: Dict[str, Any], file_path: Union[str, Path], durable: bool = False) -> None:
     """
     Save data as a JSON file.
 
     Args:
         data: Dictionary data to save as JSON
         file_path: Path where the file should be saved
+        durable: fsync the file before returning
     """
     try:
-        # Ensure parent directory exists
-        ensure_directory(Path(file_path).parent)
-
-        # Write the JSON file
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2)
+        atomic_write_text(json.dumps(data, indent=2), file_path, durable)
         logger.info(f"Saved JSON file: {file_path}")
     except Exception as e:
         logger.error(f"Error saving JSON file {file_path}: {e}")
         raise
 
 
-def save_image(image: Image.Image, file_path: Union[str, Path]) -> None:
+def save_image(image: Union[Image.Image, GeneratedImage], file_path: Union[str, Path],
+               durable: bool = False) -> None:
     """
-    Save a PIL image to a file.
+    Save an image to a file.
+
+    A GeneratedImage is written as its raw bytes when file_path has the matching
+    extension, so no decode/re-encode happens.
 
     Args:
-        image: PIL Image object to save
+        image: PIL Image or GeneratedImage to save
         file_path: Path where the image should be saved
+        durable: fsync the file before returning
     """
     try:
-        # Ensure parent directory exists
-        ensure_directory(Path(file_path).parent)
-
-        # Save the image
-        image.save(file_path)
+        # The temporary file has no image suffix, so the format comes from the target's
+        suffix = Path(file_path).suffix.lower()
+        if isinstance(image, GeneratedImage):
+            target_format = PIL_FORMATS.get(suffix)
+        else:
+            target_format = Image.registered_extensions().get(suffix)
+        _atomic_write(file_path, lambda path: image.save(path, format=target_format), durable)
         logger.info(f"Saved image: {file_path}")
     except Exception as e:
         logger.error(f"Error saving image {file_path}: {e}")
@@ -116,7 +122,7 @@ def clean_output_directory(directory: Union[str, Path]) -> bool:
         # Check if directory exists
         if not directory_path.exists():
             logger.info(f"Directory does not exist, creating: {directory}")
-            directory_path.mkdir(parents=True, exist_ok=True)
+            ensure_directory(directory_path)
             return True
 
         # Delete contents
@@ -124,6 +130,7 @@ def clean_output_directory(directory: Union[str, Path]) -> bool:
             if item.is_file():
                 item.unlink()
             elif item.is_dir():
+                _forget_directories(item)
                 shutil.rmtree(item)
 
         logger.info(f"Cleaned directory: {directory}")
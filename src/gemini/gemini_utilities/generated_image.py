@@ -0,0 +1,212 @@
+"""
+gemini_utilities/generated_image.py - Lazily decoded images returned by the Gemini API
+
+Keeps generated images as the raw bytes the API returned so they can be written to disk
+without a PIL decode/re-encode round trip; decoding happens only when a caller actually
+needs a PIL Image. Optional format conversion and thumbnailing run in a background pool.
+
+Exports:
+- GeneratedImage(data: bytes, mime_type: str = "image/png")
+  - extension -> str, image -> PIL.Image.Image (decoded on first access)
+  - save(file_path: str | Path) -> Path: Write raw bytes (or convert if the suffix differs)
+- ImagePostProcessor(convert_to: str | None = None, thumbnail_size: Tuple[int, int] | None = None,
+                     max_workers: int = 2)
+  - submit(image_path: str | Path) -> Future[Dict[str, str]]
+  - wait() -> None, shutdown() -> None
+- extension_for_mime(mime_type: str) -> str
+
+Related files:
+- src/gemini/gemini_apis/core_api.py: Wraps inline_data from image generation responses
+- src/gemini/gemini_utilities/file_utils.py: save_image writes GeneratedImage bytes directly
+- src/gemini/gemini_hooks/audio_to_image_processor.py: Persists images and schedules post-processing
+"""
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, Future, wait as wait_for
+from io import BytesIO
+from pathlib import Path
+from typing import Dict, Optional, Set, Tuple, Union
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+MIME_EXTENSIONS = {
+    "image/png": ".png",
+    "image/jpeg": ".jpg",
+    "image/jpg": ".jpg",
+    "image/webp": ".webp",
+    "image/gif": ".gif",
+}
+
+# PIL format names for conversion targets
+PIL_FORMATS = {".png": "PNG", ".jpg": "JPEG", ".jpeg": "JPEG", ".webp": "WEBP", ".gif": "GIF"}
+
+
+def extension_for_mime(mime_type: Optional[str]) -> str:
+    """
+    Get the file extension for an image MIME type.
+
+    Args:
+        mime_type: MIME type reported by the API (e.g. "image/png")
+
+    Returns:
+        str: File extension including the dot (".png" for unknown types)
+    """
+    return MIME_EXTENSIONS.get((mime_type or "").lower(), ".png")
+
+
+class GeneratedImage:
+    """Raw image bytes from the API with on-demand PIL decoding"""
+
+    def __init__(self, data: bytes, mime_type: str = "image/png"):
+        """
+        Initialize the generated image.
+
+        Args:
+            data: Encoded image bytes exactly as returned by the API
+            mime_type: MIME type of the encoded bytes
+        """
+        self.data = data
+        self.mime_type = mime_type or "image/png"
+        self._image = None
+        self._decode_lock = threading.Lock()
+
+    @property
+    def extension(self) -> str:
+        """File extension matching the encoded bytes"""
+        return extension_for_mime(self.mime_type)
+
+    @property
+    def image(self):
+        """The decoded PIL Image (decoded once, on first access)"""
+        if self._image is None:
+            with self._decode_lock:
+                if self._image is None:
+                    from PIL import Image
+                    image = Image.open(BytesIO(self.data))
+                    image.load()
+                    self._image = image
+        return self._image
+
+    def save(self, file_path: Union[str, Path], format: Optional[str] = None) -> Path:
+        """
+        Save the image, writing the raw bytes when the target format matches.
+
+        Args:
+            file_path: Destination path; its suffix selects the format
+            format: Optional explicit PIL format name (forces a conversion if it differs)
+
+        Returns:
+            Path: The path that was written
+        """
+        file_path = Path(file_path)
+        suffix = file_path.suffix.lower()
+        target_format = format or PIL_FORMATS.get(suffix)
+        source_format = PIL_FORMATS.get(self.extension)
+
+        if target_format is None or target_format == source_format:
+            file_path.write_bytes(self.data)
+        else:
+            image = self.image
+            if target_format == "JPEG" and image.mode not in ("RGB", "L"):
+                image = image.convert("RGB")
+            image.save(file_path, format=target_format)
+        return file_path
+
+    def __getattr__(self, name):
+        # Anything else (size, mode, show, ...) is served by the decoded PIL image
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self.image, name)
+
+    def __repr__(self) -> str:
+        return f"GeneratedImage(mime_type={self.mime_type!r}, bytes={len(self.data)})"
+
+
+class ImagePostProcessor:
+    """Background format conversion and thumbnailing of saved images"""
+
+    def __init__(self, convert_to: Optional[str] = None,
+                 thumbnail_size: Optional[Tuple[int, int]] = None, max_workers: int = 2):
+        """
+        Initialize the post-processor.
+
+        Args:
+            convert_to: Extension of an additional converted copy (e.g. ".png"), or None
+            thumbnail_size: Maximum (width, height) of a thumbnail copy, or None
+            max_workers: Number of background worker threads
+        """
+        if convert_to and not convert_to.startswith("."):
+            convert_to = f".{convert_to}"
+        self.convert_to = convert_to.lower() if convert_to else None
+        self.thumbnail_size = thumbnail_size
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="image-post")
+        # Futures still running; each removes itself and logs its error when done
+        self._futures: Set[Future] = set()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        """Whether there is any post-processing to do"""
+        return bool(self.convert_to or self.thumbnail_size)
+
+    def submit(self, image_path: Union[str, Path]) -> Optional[Future]:
+        """
+        Schedule conversion and thumbnailing of an image already written to disk.
+
+        Args:
+            image_path: Path of the saved image
+
+        Returns:
+            Future resolving to a dict with converted_path and thumbnail_path, or None if disabled
+        """
+        if not self.enabled:
+            return None
+        future = self._executor.submit(self._process, Path(image_path))
+        with self._lock:
+            self._futures.add(future)
+        future.add_done_callback(self._finished)
+        return future
+
+    def _finished(self, future: Future) -> None:
+        """Forget a finished future and report its error"""
+        with self._lock:
+            self._futures.discard(future)
+        if not future.cancelled() and future.exception() is not None:
+            logger.error(f"Image post-processing failed: {str(future.exception())}")
+
+    def wait(self) -> None:
+        """Block until all scheduled post-processing has finished"""
+        with self._lock:
+            futures = list(self._futures)
+        wait_for(futures)
+
+    def shutdown(self) -> None:
+        """Finish pending work and stop the worker threads"""
+        self.wait()
+        self._executor.shutdown(wait=True)
+
+    def _process(self, image_path: Path) -> Dict[str, str]:
+        """Convert and thumbnail one image (runs on a worker thread)"""
+        from PIL import Image
+
+        outputs = {}
+        with Image.open(image_path) as image:
+            if self.convert_to and image_path.suffix.lower() != self.convert_to:
+                converted_path = image_path.with_suffix(self.convert_to)
+                converted = image.convert("RGB") if self.convert_to in (".jpg", ".jpeg") else image
+                converted.save(converted_path, format=PIL_FORMATS.get(self.convert_to))
+                outputs["converted_path"] = str(converted_path)
+
+            if self.thumbnail_size:
+                thumbnail = image.copy()
+                thumbnail.thumbnail(self.thumbnail_size)
+                thumbnail_path = image_path.with_name(f"{image_path.stem}_thumb{image_path.suffix}")
+                thumbnail.save(thumbnail_path)
+                outputs["thumbnail_path"] = str(thumbnail_path)
+
+        logger.info(f"Post-processed {image_path.name}: {', '.join(outputs) or 'nothing to do'}")
+        return outputs
@@ -0,0 +1,133 @@
+"""
+gemini_utilities/image_hashes.py - Perceptual hashes and Hamming-distance search
+
+A pHash keeps the low frequencies of an image's DCT, so resized, recompressed or slightly
+edited copies of an image hash to nearby values; a BK-tree answers "every hash within
+distance d" queries without comparing against every stored hash.
+
+Exports:
+- phash(image, hash_size: int = 8) -> int: DCT-based perceptual hash (NumPy)
+- BKTree(): add(hash_value, key), remove(hash_value, key) -> bool,
+  search(hash_value, max_distance) -> List[Tuple[int, str]]
+
+Related files:
+- src/gemini/gemini_utilities/image_index.py: Stores the hashes of the generated images
+- src/gemini/gemini_utilities/image_ranking.py: dHash
+"""
+
+from functools import lru_cache
+from typing import List, Tuple
+
+import numpy as np
+from PIL import Image
+
+
+@lru_cache(maxsize=4)
+def _dct_matrix(size: int) -> np.ndarray:
+    """Orthonormal DCT-II matrix of the given size"""
+    n = np.arange(size, dtype=np.float32)
+    matrix = np.cos(np.pi * (2 * n[None, :] + 1) * n[:, None] / (2 * size))
+    matrix[0] *= 1 / np.sqrt(2)
+    return matrix * np.sqrt(2 / size)
+
+
+def phash(image, hash_size: int = 8) -> int:
+    """
+    Compute the DCT perceptual hash of an image.
+
+    Args:
+        image: PIL image or GeneratedImage
+        hash_size: Hash width/height in bits (hash has hash_size ** 2 bits)
+
+    Returns:
+        int: The hash as an unsigned integer
+    """
+    size = hash_size * 4
+    grey = getattr(image, "image", image).convert("L").resize((size, size), Image.BILINEAR)
+    pixels = np.asarray(grey, dtype=np.float32)
+    matrix = _dct_matrix(size)
+    low = (matrix @ pixels @ matrix.T)[:hash_size, :hash_size].flatten()
+    # Median excludes the DC term, which only carries overall brightness
+    bits = low > np.median(low[1:])
+    return int("".join("1" if bit else "0" for bit in bits), 2)
+
+
+class BKTree:
+    """Burkhard-Keller tree over 64-bit hashes with Hamming distance"""
+
+    def __init__(self):
+        # Node: [hash_value, keys, {distance: child node}]
+        self._root = None
+        self.size = 0
+
+    def add(self, hash_value: int, key: str) -> None:
+        """
+        Add a hash with its key (several keys may share one hash).
+
+        Args:
+            hash_value: Hash to insert
+            key: Identifier returned by searches (e.g. the image path)
+        """
+        self.size += 1
+        if self._root is None:
+            self._root = [hash_value, [key], {}]
+            return
+
+        node = self._root
+        while True:
+            distance = (node[0] ^ hash_value).bit_count()
+            if distance == 0:
+                node[1].append(key)
+                return
+            child = node[2].get(distance)
+            if child is None:
+                node[2][distance] = [hash_value, [key], {}]
+                return
+            node = child
+
+    def remove(self, hash_value: int, key: str) -> bool:
+        """
+        Remove a key from the node of its hash (the node stays, as it routes its children).
+
+        Args:
+            hash_value: Hash the key was added with
+            key: Identifier to remove
+
+        Returns:
+            bool: True if the key was found
+        """
+        node = self._root
+        while node is not None:
+            distance = (node[0] ^ hash_value).bit_count()
+            if distance == 0:
+                if key not in node[1]:
+                    return False
+                node[1].remove(key)
+                self.size -= 1
+                return True
+            node = node[2].get(distance)
+        return False
+
+    def search(self, hash_value: int, max_distance: int) -> List[Tuple[int, str]]:
+        """
+        Find all keys within max_distance of a hash.
+
+        Args:
+            hash_value: Query hash
+            max_distance: Maximum Hamming distance
+
+        Returns:
+            List of (distance, key) tuples, closest first
+        """
+        matches = []
+        stack = [self._root] if self._root is not None else []
+        while stack:
+            node = stack.pop()
+            distance = (node[0] ^ hash_value).bit_count()
+            if distance <= max_distance:
+                matches.extend((distance, key) for key in node[1])
+            # Triangle inequality: only children within distance +- max_distance can match
+            low, high = distance - max_distance, distance + max_distance
+            stack.extend(child for edge, child in node[2].items() if low <= edge <= high)
+        matches.sort()
+        return matches
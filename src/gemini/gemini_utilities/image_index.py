@@ -0,0 +1,267 @@
+"""
+gemini_utilities/image_index.py - Perceptual-hash index over generated images
+
+Stores a pHash and dHash for every generated image in SQLite and keeps an in-memory
+BK-tree over the pHashes for Hamming-distance queries. Used to flag near-identical
+outputs across tracks and reruns, to reuse the cached image of a prompt whose score
+already meets the target, and to find similar covers.
+
+Exports:
+- phash, BKTree (see image_hashes.py)
+- ImageHashIndex(db_path: str | Path = "output/image_index.sqlite")
+  - add(image_path, image=None, track=None, prompt_hash=None, score=None) -> Dict[str, Any]
+  - find_similar(image_or_path, max_distance: int = 10, limit: int = 10) -> List[Dict[str, Any]]
+  - find_duplicates(image_path, max_distance: int = 4) -> List[Dict[str, Any]]
+  - lookup_prompt(prompt_hash: str, min_score: float = 0.0) -> Dict[str, Any] | None
+  - scan(directory: str | Path) -> int: Index images not indexed yet
+- hash_prompt(prompt: str) -> str
+
+Related files:
+- src/gemini/gemini_utilities/image_hashes.py: pHash and the BK-tree
+- src/gemini/gemini_utilities/image_ranking.py: dHash and candidate scores
+- src/gemini/gemini_hooks/audio_to_image_processor.py: Indexes images and reuses cached prompts
+- src/main.py: --similar lookup
+"""
+
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+from PIL import Image
+
+# phash and BKTree are re-exported, so callers keep importing them from here
+from .image_hashes import BKTree, phash
+from .image_ranking import dhash
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+IMAGE_EXTENSIONS = {".png", ".jpg", ".jpeg", ".webp", ".gif"}
+
+# Distance at or below which two 64-bit pHashes are treated as the same image
+DUPLICATE_DISTANCE = 4
+
+
+def hash_prompt(prompt: str) -> str:
+    """
+    Hash an image generation prompt for cache lookups.
+
+    Args:
+        prompt: Full prompt text sent to the image model
+
+    Returns:
+        str: Hex SHA-256 digest
+    """
+    return hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+
+
+def _to_signed(value: int) -> int:
+    """Map an unsigned 64-bit hash into SQLite's signed INTEGER range"""
+    return value - (1 << 64) if value >= (1 << 63) else value
+
+
+def _to_unsigned(value: int) -> int:
+    """Inverse of _to_signed"""
+    return value + (1 << 64) if value < 0 else value
+
+
+class ImageHashIndex:
+    """SQLite-backed perceptual-hash index of generated images"""
+
+    def __init__(self, db_path: Union[str, Path] = "output/image_index.sqlite"):
+        """
+        Open (or create) the index.
+
+        Args:
+            db_path: SQLite database file
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(exist_ok=True, parents=True)
+        self._lock = threading.RLock()
+        self._connection = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS images ("
+            " path TEXT PRIMARY KEY, track TEXT, prompt_hash TEXT,"
+            " phash INTEGER NOT NULL, dhash INTEGER NOT NULL, score REAL, created_at REAL)")
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS images_prompt_hash ON images (prompt_hash)")
+        self._connection.commit()
+        self._tree: Optional[BKTree] = None
+
+    @property
+    def tree(self) -> BKTree:
+        """BK-tree over all indexed pHashes (built from SQLite on first use)"""
+        with self._lock:
+            if self._tree is None:
+                started = time.monotonic()
+                tree = BKTree()
+                for path, value in self._connection.execute("SELECT path, phash FROM images"):
+                    tree.add(_to_unsigned(value), path)
+                self._tree = tree
+                logger.info(
+                    f"Built image hash tree with {tree.size} entries in "
+                    f"{time.monotonic() - started:.2f}s")
+            return self._tree
+
+    def add(self, image_path: Union[str, Path], image=None, track: Optional[str] = None,
+            prompt_hash: Optional[str] = None, score: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Hash an image and add (or update) it in the index.
+
+        Args:
+            image_path: Path of the saved image
+            image: Already loaded image (PIL or GeneratedImage); loaded from image_path if None
+            track: Name of the track the image was generated for
+            prompt_hash: hash_prompt() of the prompt that produced the image
+            score: Quality score (e.g. from rank_candidates) for prompt cache lookups
+
+        Returns:
+            Dictionary with path, phash, dhash and duplicates (near-identical indexed images)
+        """
+        image_path = str(image_path)
+        if image is None:
+            with Image.open(image_path) as opened:
+                opened.load()
+                perceptual, difference = phash(opened), dhash(opened)
+        else:
+            perceptual, difference = phash(image), dhash(image)
+
+        duplicates = [entry for entry in self._search(perceptual, DUPLICATE_DISTANCE)
+                      if entry["path"] != image_path]
+
+        with self._lock:
+            existing = self._connection.execute(
+                "SELECT phash FROM images WHERE path = ?", (image_path,)).fetchone()
+            self._connection.execute(
+                "INSERT OR REPLACE INTO images VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (image_path, track, prompt_hash, _to_signed(perceptual),
+                 _to_signed(difference), score, time.time()))
+            self._connection.commit()
+            if self._tree is not None:
+                # A re-added image moves to its new hash
+                if existing:
+                    self._tree.remove(_to_unsigned(existing[0]), image_path)
+                self._tree.add(perceptual, image_path)
+
+        if duplicates:
+            logger.warning(
+                f"{Path(image_path).name} is near-identical to "
+                f"{', '.join(Path(entry['path']).name for entry in duplicates[:3])}")
+
+        return {"path": image_path, "phash": f"{perceptual:016x}",
+                "dhash": f"{difference:016x}", "duplicates": duplicates}
+
+    def find_similar(self, image_or_path, max_distance: int = 10,
+                     limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        Find indexed images that look similar to an image ("similar covers").
+
+        Args:
+            image_or_path: Image path, PIL image or GeneratedImage
+            max_distance: Maximum pHash Hamming distance
+            limit: Maximum number of results
+
+        Returns:
+            List of dictionaries with path, track, distance and score, closest first
+        """
+        if isinstance(image_or_path, (str, Path)):
+            with Image.open(image_or_path) as opened:
+                opened.load()
+                perceptual = phash(opened)
+            exclude = str(image_or_path)
+        else:
+            perceptual = phash(image_or_path)
+            exclude = None
+
+        matches = [entry for entry in self._search(perceptual, max_distance)
+                   if entry["path"] != exclude]
+        return matches[:limit]
+
+    def find_duplicates(self, image_path: Union[str, Path],
+                        max_distance: int = DUPLICATE_DISTANCE) -> List[Dict[str, Any]]:
+        """
+        Find near-identical copies of an indexed or new image.
+
+        Args:
+            image_path: Image path
+            max_distance: Maximum pHash Hamming distance
+
+        Returns:
+            List of dictionaries with path, track, distance and score
+        """
+        return self.find_similar(image_path, max_distance=max_distance, limit=1000)
+
+    def lookup_prompt(self, prompt_hash: str, min_score: float = 0.0) -> Optional[Dict[str, Any]]:
+        """
+        Find the best existing image generated from a prompt.
+
+        Args:
+            prompt_hash: hash_prompt() of the prompt
+            min_score: Minimum score the cached image must have
+
+        Returns:
+            Dictionary with path, track and score, or None if nothing usable is cached
+        """
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT path, track, score FROM images WHERE prompt_hash = ? AND score >= ? "
+                "ORDER BY score DESC", (prompt_hash, min_score)).fetchall()
+
+        for path, track, score in rows:
+            if Path(path).exists():
+                return {"path": path, "track": track, "score": score}
+        return None
+
+    def scan(self, directory: Union[str, Path]) -> int:
+        """
+        Index every image in a directory that is not indexed yet.
+
+        Args:
+            directory: Directory to scan (not recursive)
+
+        Returns:
+            int: Number of newly indexed images
+        """
+        with self._lock:
+            known = {row[0] for row in self._connection.execute("SELECT path FROM images")}
+
+        added = 0
+        for path in sorted(Path(directory).glob("*.*")):
+            if path.suffix.lower() in IMAGE_EXTENSIONS and not path.is_symlink() \
+                    and str(path) not in known:
+                try:
+                    self.add(path)
+                    added += 1
+                except Exception as e:
+                    logger.warning(f"Could not index {path.name}: {str(e)}")
+        return added
+
+    def _search(self, perceptual: int, max_distance: int) -> List[Dict[str, Any]]:
+        """Query the tree and attach stored metadata, skipping files that no longer exist"""
+        matches = self.tree.search(perceptual, max_distance)
+        if not matches:
+            return []
+
+        paths = [path for _, path in matches]
+        with self._lock:
+            rows = {}
+            # Stay under SQLite's bound-parameter limit
+            for start in range(0, len(paths), 500):
+                chunk = paths[start:start + 500]
+                rows.update({
+                    row[0]: row for row in self._connection.execute(
+                        f"SELECT path, track, score FROM images WHERE path IN "
+                        f"({', '.join('?' * len(chunk))})", chunk)
+                })
+
+        results = []
+        for distance, path in matches:
+            if path in rows and Path(path).exists():
+                results.append({"path": path, "track": rows[path][1],
+                                "distance": distance, "score": rows[path][2]})
+        return results
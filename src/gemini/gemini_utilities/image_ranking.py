@@ -0,0 +1,226 @@
+"""
+gemini_utilities/image_ranking.py - Cheap local ranking of generated image candidates
+
+Scores image candidates without any model calls so several generations can be compared
+in one pass: palette match against colour words and hex codes found in the analysis or
+prompt text, Laplacian sharpness, and perceptual-hash (dHash) diversity between candidates.
+Scores are absolute (a weighted mean of the components that apply), so a lone image can be
+compared with a fixed threshold such as the processor's reuse_min_score.
+
+Exports:
+- extract_colour_targets(text: str) -> List[Tuple[int, int, int]]
+- palette_score(image, targets: List[Tuple[int, int, int]]) -> float
+- sharpness_score(image) -> float
+- dhash(image, hash_size: int = 8) -> int
+- hamming_distance(hash_a: int, hash_b: int) -> int
+- rank_candidates(images: List, reference_text: str = "", weights: Dict[str, float] | None = None)
+  -> List[Dict[str, Any]]
+
+Related files:
+- src/gemini/gemini_hooks/audio_to_image_processor.py: Ranks candidates in multi-candidate mode
+- src/gemini/gemini_utilities/generated_image.py: Candidates are usually GeneratedImage instances
+"""
+
+import re
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Colour words commonly used in analyses and image prompts
+COLOUR_WORDS = {
+    "black": (0, 0, 0), "white": (255, 255, 255), "grey": (128, 128, 128),
+    "gray": (128, 128, 128), "silver": (192, 192, 192), "red": (220, 20, 60),
+    "crimson": (220, 20, 60), "scarlet": (255, 36, 0), "maroon": (128, 0, 0),
+    "burgundy": (128, 0, 32), "orange": (255, 140, 0), "amber": (255, 191, 0),
+    "gold": (255, 215, 0), "golden": (255, 215, 0), "yellow": (255, 230, 0),
+    "green": (34, 139, 34), "emerald": (0, 155, 119), "lime": (50, 205, 50),
+    "olive": (128, 128, 0), "teal": (0, 128, 128), "turquoise": (64, 224, 208),
+    "cyan": (0, 255, 255), "aqua": (0, 255, 255), "blue": (30, 80, 220),
+    "navy": (0, 0, 128), "cobalt": (0, 71, 171), "azure": (0, 127, 255),
+    "indigo": (75, 0, 130), "violet": (143, 0, 255), "purple": (128, 0, 128),
+    "magenta": (255, 0, 255), "pink": (255, 105, 180), "neon": (57, 255, 20),
+    "brown": (139, 69, 19), "bronze": (205, 127, 50), "copper": (184, 115, 51),
+    "beige": (245, 245, 220), "cream": (255, 253, 208),
+}
+
+HEX_COLOUR_PATTERN = re.compile(r"#([0-9a-fA-F]{6}|[0-9a-fA-F]{3})\b")
+WORD_PATTERN = re.compile(r"[a-zA-Z]+")
+
+# Largest possible distance between two RGB colours
+MAX_RGB_DISTANCE = float(np.sqrt(3 * 255 ** 2))
+
+DEFAULT_WEIGHTS = {"palette": 0.5, "sharpness": 0.3, "diversity": 0.2}
+
+# Laplacian variance that scores 0.5 sharpness; sharper images approach 1.0
+SHARPNESS_REFERENCE = 300.0
+
+
+def _as_pil(image) -> Image.Image:
+    """Return a PIL image for a PIL image or GeneratedImage"""
+    return getattr(image, "image", image)
+
+
+def _rgb_array(image, size: int = 64) -> np.ndarray:
+    """Downsample an image to size x size and return its pixels as an (N, 3) float array"""
+    small = _as_pil(image).convert("RGB").resize((size, size), Image.BILINEAR)
+    return np.asarray(small, dtype=np.float32).reshape(-1, 3)
+
+
+def extract_colour_targets(text: str) -> List[Tuple[int, int, int]]:
+    """
+    Extract target colours from colour words and hex codes in a text.
+
+    Args:
+        text: Analysis or prompt text
+
+    Returns:
+        List of distinct RGB tuples, in order of first mention
+    """
+    targets = []
+    for match in HEX_COLOUR_PATTERN.finditer(text or ""):
+        value = match.group(1)
+        if len(value) == 3:
+            value = "".join(c * 2 for c in value)
+        targets.append(tuple(int(value[i:i + 2], 16) for i in (0, 2, 4)))
+
+    for word in WORD_PATTERN.findall((text or "").lower()):
+        if word in COLOUR_WORDS:
+            targets.append(COLOUR_WORDS[word])
+
+    return list(dict.fromkeys(targets))
+
+
+def palette_score(image, targets: List[Tuple[int, int, int]]) -> float:
+    """
+    Score how well an image covers the target colours.
+
+    For each target the distance to its closest pixels (5th percentile, so a single
+    stray pixel does not count) is measured; the score is one minus the mean distance.
+
+    Args:
+        image: PIL image or GeneratedImage
+        targets: Target RGB colours
+
+    Returns:
+        float: Score between 0.0 and 1.0 (0.0 when there are no targets)
+    """
+    if not targets:
+        return 0.0
+
+    pixels = _rgb_array(image)
+    target_array = np.asarray(targets, dtype=np.float32)
+    distances = np.linalg.norm(pixels[:, None, :] - target_array[None, :, :], axis=2)
+    closest = np.percentile(distances, 5, axis=0) / MAX_RGB_DISTANCE
+    return float(1.0 - closest.mean())
+
+
+def sharpness_score(image) -> float:
+    """
+    Measure image sharpness as the variance of the Laplacian of the greyscale image.
+
+    Args:
+        image: PIL image or GeneratedImage
+
+    Returns:
+        float: Laplacian variance (higher is sharper; not normalised)
+    """
+    grey = np.asarray(_as_pil(image).convert("L"), dtype=np.float32)
+    if grey.shape[0] < 3 or grey.shape[1] < 3:
+        return 0.0
+    laplacian = (grey[:-2, 1:-1] + grey[2:, 1:-1] + grey[1:-1, :-2] + grey[1:-1, 2:]
+                 - 4 * grey[1:-1, 1:-1])
+    return float(laplacian.var())
+
+
+def dhash(image, hash_size: int = 8) -> int:
+    """
+    Compute the difference hash of an image.
+
+    Args:
+        image: PIL image or GeneratedImage
+        hash_size: Hash width/height in bits (hash has hash_size ** 2 bits)
+
+    Returns:
+        int: The hash as an integer
+    """
+    small = _as_pil(image).convert("L").resize((hash_size + 1, hash_size), Image.BILINEAR)
+    pixels = np.asarray(small, dtype=np.int16)
+    bits = (pixels[:, 1:] > pixels[:, :-1]).flatten()
+    return int("".join("1" if bit else "0" for bit in bits), 2)
+
+
+def hamming_distance(hash_a: int, hash_b: int) -> int:
+    """
+    Count the differing bits between two hashes.
+
+    Args:
+        hash_a: First hash
+        hash_b: Second hash
+
+    Returns:
+        int: Number of differing bits
+    """
+    return bin(hash_a ^ hash_b).count("1")
+
+
+def rank_candidates(images: List, reference_text: str = "",
+                    weights: Optional[Dict[str, float]] = None) -> List[Dict[str, Any]]:
+    """
+    Rank image candidates by palette match, sharpness and diversity.
+
+    Sharpness is mapped to 0-1 against SHARPNESS_REFERENCE. Diversity is the distance to
+    the most similar other candidate, so near-duplicates are ranked down. The score is the
+    weighted mean of the components that apply: palette only when the text names colours,
+    diversity only when there are other candidates.
+
+    Args:
+        images: Candidate images (PIL images or GeneratedImage)
+        reference_text: Text whose colour words/hex codes the palette should match
+        weights: Weights for "palette", "sharpness" and "diversity" (defaults to DEFAULT_WEIGHTS)
+
+    Returns:
+        List of dictionaries with index, score, palette, sharpness, diversity and dhash,
+        best candidate first
+    """
+    weights = {**DEFAULT_WEIGHTS, **(weights or {})}
+    targets = extract_colour_targets(reference_text)
+
+    palettes = [palette_score(image, targets) for image in images]
+    sharpness = [sharpness_score(image) for image in images]
+    hashes = [dhash(image) for image in images]
+
+    hash_bits = 64
+
+    ranking = []
+    for index in range(len(images)):
+        others = [hamming_distance(hashes[index], hashes[other])
+                  for other in range(len(images)) if other != index]
+        diversity = min(others) / hash_bits if others else 1.0
+        normalised_sharpness = sharpness[index] / (sharpness[index] + SHARPNESS_REFERENCE)
+
+        components = {"sharpness": normalised_sharpness}
+        if targets:
+            components["palette"] = palettes[index]
+        if others:
+            components["diversity"] = diversity
+        total_weight = sum(weights[name] for name in components) or 1.0
+        score = sum(weights[name] * value for name, value in components.items()) / total_weight
+        ranking.append({
+            "index": index,
+            "score": round(score, 4),
+            "palette": round(palettes[index], 4),
+            "sharpness": round(normalised_sharpness, 4),
+            "diversity": round(diversity, 4),
+            "dhash": f"{hashes[index]:016x}"
+        })
+
+    ranking.sort(key=lambda entry: entry["score"], reverse=True)
+    if targets:
+        logger.info(f"Ranked {len(images)} candidates against {len(targets)} target colours")
+    return ranking
@@ -3,21 +3,204 @@ image_utils.py - Image handling utilities for Gemini client
 
 Provides utilities for:
 - Creating fallback/placeholder images when API calls fail
-- Image processing functionality for use with Gemini API
+- Procedural fallback art rendered with NumPy array operations, seeded from the
+  description text so the same analysis always renders the same image
+- Batch rendering of many fallbacks in one call (create_fallback_images)
 
 Dependencies:
 - PIL (Pillow)
-- io
+- numpy
 """
 
+import math
+import hashlib
 import logging
-import random
+import colorsys
+from functools import lru_cache
+from typing import List, Optional, Tuple
+
+import numpy as np
 from PIL import Image, ImageDraw, ImageFont
-from io import BytesIO
-from typing import Optional
+
+from .image_ranking import extract_colour_targets
 
 logger = logging.getLogger(__name__)
 
+# Number of soft shapes layered onto each procedural image
+SHAPES_PER_IMAGE = 7
+
+# Height of the caption strip at the bottom of description visualizations
+CAPTION_HEIGHT = 80
+
+# Procedural art is smooth, so it is rendered at 1/RENDER_SCALE size and upscaled
+RENDER_SCALE = 4
+
+
+def _text_seed(text: Optional[str]) -> int:
+    """Deterministic 64-bit seed for a text (stable across runs, unlike hash())"""
+    digest = hashlib.blake2b((text or "").encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big")
+
+
+@lru_cache(maxsize=8)
+def _coordinate_grid(width: int, height: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Normalised x/y coordinate arrays (0.0-1.0) for an image size"""
+    ys, xs = np.mgrid[0:height, 0:width].astype(np.float32)
+    return xs / max(width - 1, 1), ys / max(height - 1, 1)
+
+
+@lru_cache(maxsize=8)
+def _vignette(width: int, height: int) -> np.ndarray:
+    """Radial darkening mask for an image size"""
+    xs, ys = _coordinate_grid(width, height)
+    return 1.0 - 0.7 * ((xs - 0.5) ** 2 + (ys - 0.5) ** 2)
+
+
+@lru_cache(maxsize=16)
+def _load_font(size: int):
+    """Load a TrueType font once per size, falling back to PIL's default font"""
+    for name in ("DejaVuSans.ttf", "Arial.ttf", "arial.ttf"):
+        try:
+            return ImageFont.truetype(name, size)
+        except OSError:
+            continue
+    return ImageFont.load_default()
+
+
+def _wrap_text(text: str, line_length: int = 40) -> List[str]:
+    """Split text into lines of at most line_length characters"""
+    lines = []
+    line = ""
+    for word in text.split():
+        if len(line + " " + word) <= line_length:
+            line = line + " " + word if line else word
+        else:
+            lines.append(line)
+            line = word
+    if line:
+        lines.append(line)
+    return lines
+
+
+def _palette(text: str, rng: np.random.Generator) -> np.ndarray:
+    """
+    Three colours (0.0-1.0 RGB) for a description: colours named in the text first,
+    then a harmonious base/analogous/complementary set derived from the seed.
+    """
+    named = [tuple(c / 255.0 for c in colour) for colour in extract_colour_targets(text)[:3]]
+    hue = rng.random()
+    generated = [
+        colorsys.hsv_to_rgb(h, 0.5 + 0.35 * rng.random(), 0.45 + 0.45 * rng.random())
+        for h in (hue, (hue + 0.08) % 1.0, (hue + 0.5) % 1.0)
+    ]
+    return np.asarray((named + generated)[:3], dtype=np.float32)
+
+
+def _value_noise(rng: np.random.Generator, width: int, height: int, cells: int) -> np.ndarray:
+    """Smoothly interpolated value noise (0.0-1.0) on a cells x cells lattice"""
+    lattice = rng.random((cells + 1, cells + 1), dtype=np.float32)
+
+    def axis(size):
+        position = np.linspace(0, cells, size, dtype=np.float32)
+        index = np.minimum(position.astype(np.int64), cells - 1)
+        fraction = position - index
+        return index, fraction * fraction * (3 - 2 * fraction)
+
+    x0, fx = axis(width)
+    y0, fy = axis(height)
+    top = lattice[np.ix_(y0, x0)] * (1 - fx) + lattice[np.ix_(y0, x0 + 1)] * fx
+    bottom = lattice[np.ix_(y0 + 1, x0)] * (1 - fx) + lattice[np.ix_(y0 + 1, x0 + 1)] * fx
+    return top * (1 - fy)[:, None] + bottom * fy[:, None]
+
+
+def render_procedural_art(descriptions: List[str], width: int = 512, height: int = 512) -> np.ndarray:
+    """
+    Render procedural artwork for a batch of descriptions.
+
+    Each image is a rotated colour gradient modulated by two octaves of value noise,
+    rhythmic bands, soft layered discs and a vignette, all computed as array operations.
+    The random generator is seeded from the description, so renders are reproducible.
+
+    Args:
+        descriptions: Texts to seed the images from (one image per text)
+        width: Image width
+        height: Image height
+
+    Returns:
+        uint8 array of shape (len(descriptions), height, width, 3)
+    """
+    xs, ys = _coordinate_grid(width, height)
+    vignette = _vignette(width, height)
+    canvases = np.empty((len(descriptions), height, width, 3), dtype=np.uint8)
+
+    for index, description in enumerate(descriptions):
+        rng = np.random.default_rng(_text_seed(description))
+        palette = _palette(description or "", rng)
+
+        # Rotated linear gradient between the first two palette colours
+        angle = rng.random() * 2 * math.pi
+        t = np.clip((np.cos(angle) * (xs - 0.5) + np.sin(angle) * (ys - 0.5)) / math.sqrt(0.5) + 0.5,
+                    0.0, 1.0)
+        image = palette[0] * (1 - t)[..., None] + palette[1] * t[..., None]
+
+        # Noise field and rhythmic bands for texture
+        noise = 0.65 * _value_noise(rng, width, height, 4) + 0.35 * _value_noise(rng, width, height, 12)
+        frequency = 4 + 14 * rng.random()
+        bands = 0.5 + 0.5 * np.sin(2 * math.pi * frequency * t + 5 * noise)
+        image *= (0.7 + 0.4 * noise + 0.1 * bands)[..., None]
+
+        # Soft discs in the accent colour, composited in one step
+        centre_x = rng.random(SHAPES_PER_IMAGE, dtype=np.float32)[:, None, None]
+        centre_y = rng.random(SHAPES_PER_IMAGE, dtype=np.float32)[:, None, None]
+        radius = (0.04 + 0.18 * rng.random(SHAPES_PER_IMAGE, dtype=np.float32))[:, None, None]
+        opacity = (0.2 + 0.5 * rng.random(SHAPES_PER_IMAGE, dtype=np.float32))[:, None, None]
+        distance = np.sqrt((xs - centre_x) ** 2 + (ys - centre_y) ** 2)
+        alpha = np.clip((radius - distance) / 0.02, 0.0, 1.0) * opacity
+        coverage = 1.0 - np.prod(1.0 - alpha, axis=0)
+        image = image * (1 - coverage)[..., None] + palette[2] * coverage[..., None]
+
+        image *= vignette[..., None]
+        canvases[index] = np.clip(image * 255, 0, 255).astype(np.uint8)
+
+    return canvases
+
+
+def create_fallback_images(descriptions: List[str], width: int = 512, height: int = 512) -> List[Image.Image]:
+    """
+    Create description visualizations for many descriptions in one call.
+
+    Args:
+        descriptions: Description texts to visualize
+        width: Image width
+        height: Image height
+
+    Returns:
+        List of PIL Images, one per description
+    """
+    render_width = max(width // RENDER_SCALE, 1)
+    render_height = max(height // RENDER_SCALE, 1)
+    canvases = render_procedural_art(descriptions, render_width, render_height)
+
+    # Darken the caption strip before upscaling so the text stays readable
+    caption_rows = CAPTION_HEIGHT * render_height // height
+    canvases[:, render_height - caption_rows:] = (
+        canvases[:, render_height - caption_rows:] * 0.3).astype(np.uint8)
+
+    font = _load_font(14)
+    images = []
+    for description, canvas in zip(descriptions, canvases):
+        image = Image.fromarray(canvas, mode="RGB").resize((width, height), Image.BICUBIC)
+        summary = description[:100] + "..." if len(description) > 100 else description
+        draw = ImageDraw.Draw(image)
+        y_position = height - CAPTION_HEIGHT + 10
+        for line in _wrap_text(summary)[:3]:
+            draw.text((10, y_position), line, fill=(255, 255, 255), font=font)
+            y_position += 20
+        images.append(image)
+
+    logger.info(f"Created {len(images)} procedural visualization(s) from description text")
+    return images
+
 
 def create_fallback_image(error_message: Optional[str], prompt: str) -> Image.Image:
     """
@@ -35,46 +218,33 @@ def create_fallback_image(error_message: Optional[str], prompt: str) -> Image.Im
 
     # If there's no error, create a visualization of the description
     if error_message is None:
-        # Generate a gradient background based on the text content
-        image = _create_description_visualization(prompt, width, height)
-        return image
+        return _create_description_visualization(prompt, width, height)
 
     # Otherwise create an error image
     image = Image.new('RGB', (width, height), color=(240, 240, 240))
     draw = ImageDraw.Draw(image)
+    font = _load_font(14)
 
     # Add title
-    draw.text((20, 30), "Image Generation Failed", fill=(200, 0, 0))
+    draw.text((20, 30), "Image Generation Failed", fill=(200, 0, 0), font=font)
     draw.text(
-        (20, 50), prompt[:50] + "..." if len(prompt) > 50 else prompt, fill=(0, 0, 200))
+        (20, 50), prompt[:50] + "..." if len(prompt) > 50 else prompt, fill=(0, 0, 200), font=font)
 
     # Add separator line
     draw.line([(20, 80), (width-20, 80)],
               fill=(200, 200, 200), width=2)
 
     # Add error message
-    error_msg = str(error_message)
-    lines = []
-    line = ""
-    for word in error_msg.split():
-        if len(line + " " + word) <= 40:  # 40 chars per line
-            line = line + " " + word if line else word
-        else:
-            lines.append(line)
-            line = word
-    if line:
-        lines.append(line)
-
     y_position = 100
-    for line in lines[:10]:
-        draw.text((20, y_position), line, fill=(200, 0, 0))
+    for line in _wrap_text(str(error_message))[:10]:
+        draw.text((20, y_position), line, fill=(200, 0, 0), font=font)
         y_position += 25
 
     # Add note about fallback
     draw.text((20, height-50),
-              "Note: This is a fallback placeholder image.", fill=(0, 0, 0))
+              "Note: This is a fallback placeholder image.", fill=(0, 0, 0), font=font)
     draw.text((20, height-30),
-              "The actual image generation API call failed.", fill=(0, 0, 0))
+              "The actual image generation API call failed.", fill=(0, 0, 0), font=font)
 
     logger.info("Falling back to placeholder image generation")
     return image
@@ -82,7 +252,7 @@ def create_fallback_image(error_message: Optional[str], prompt: str) -> Image.Im
 
 def _create_description_visualization(description: str, width: int, height: int) -> Image.Image:
     """
-    Create a simple visualization based on a text description.
+    Create a procedural visualization based on a text description.
 
     Args:
         description: The text description to visualize
@@ -92,77 +262,4 @@ def _create_description_visualization(description: str, width: int, height: int)
     Returns:
         A PIL Image representing the description
     """
-    # Generate a color palette based on the text
-    def text_to_color(text):
-        # Simple hash-based approach to get consistent colors from text
-        hash_val = sum(ord(c) for c in text)
-        r = (hash_val * 1234) % 256
-        g = (hash_val * 2345) % 256
-        b = (hash_val * 3456) % 256
-        return (r, g, b)
-
-    # Get base colors from the description
-    base_color = text_to_color(
-        description[:20]) if description else (100, 100, 200)
-    accent_color = ((base_color[0] + 128) % 256,
-                    (base_color[1] + 128) % 256,
-                    (base_color[2] + 128) % 256)
-
-    # Create gradient background
-    image = Image.new('RGB', (width, height), color=base_color)
-    draw = ImageDraw.Draw(image)
-
-    # Add some random shapes based on the description
-    for i in range(10):
-        # Use different parts of the description for different shapes
-        shape_seed = description[i*5:(i+1)*5] if i * \
-            5 < len(description) else str(i)
-        shape_color = text_to_color(shape_seed)
-
-        # Draw either circle, rectangle, or line
-        shape_type = sum(ord(c) for c in shape_seed) % 3
-        x1 = (sum(ord(c) for c in shape_seed) * 1234) % width
-        y1 = (sum(ord(c) for c in shape_seed) * 2345) % height
-        size = (sum(ord(c) for c in shape_seed) * 3456) % 100 + 20
-
-        if shape_type == 0:  # Circle
-            draw.ellipse([x1, y1, x1+size, y1+size], fill=shape_color)
-        elif shape_type == 1:  # Rectangle
-            draw.rectangle([x1, y1, x1+size, y1+size], fill=shape_color)
-        else:  # Line
-            x2 = (x1 + size*2) % width
-            y2 = (y1 + size*2) % height
-            draw.line([x1, y1, x2, y2], fill=shape_color, width=5)
-
-    # Add text with description summary
-    summary = description[:100] + \
-        "..." if len(description) > 100 else description
-    # Draw a background box for text
-    text_box_height = 80
-    draw.rectangle([0, height-text_box_height, width, height],
-                   fill=(255, 255, 255, 180))
-
-    # Add the text in chunks
-    lines = []
-    line = ""
-    for word in summary.split():
-        if len(line + " " + word) <= 40:  # 40 chars per line
-            line = line + " " + word if line else word
-        else:
-            lines.append(line)
-            line = word
-    if line:
-        lines.append(line)
-
-    # Draw the text
-    y_position = height - text_box_height + 10
-    for line in lines[:3]:
-        draw.text((10, y_position), line, fill=(0, 0, 0))
-        y_position += 20
-
-    # Add a border
-    for i in range(3):
-        draw.rectangle([i, i, width-i-1, height-i-1], outline=accent_color)
-
-    logger.info("Created visualization from description text")
-    return image
+    return create_fallback_images([description or ""], width, height)[0]
@@ -0,0 +1,115 @@
+"""
+gemini_utilities/lazy_import.py - Deferred imports for fast startup
+
+Importing the Gemini SDKs, NumPy and the processor modules costs most of the start-up time
+of short CLI invocations. A LazyModule stands in for a module and imports it on first
+attribute access, so modules can keep a module-level name (e.g. `types`) for SDKs they only
+use inside functions. lazy_exports gives packages a PEP 562 __getattr__ that imports the
+submodule of an export the first time it is requested.
+
+Exports:
+- LazyModule(name: str): Module proxy that imports `name` on first attribute access
+- lazy_import(name: str) -> ModuleType: The module if already imported, else a LazyModule
+- lazy_exports(package_name: str, exports: Dict[str, Tuple[str, ...]]) -> Tuple[Callable, Callable]:
+  __getattr__ and __dir__ for a package, from submodule -> exported names
+
+Related files:
+- src/gemini/__init__.py, src/gemini/gemini_*/__init__.py: Lazy package exports
+- src/gemini/gemini_client.py: Lazy SDK client and processors
+- benchmark_startup.py: Measures import and construction time
+"""
+
+import sys
+import time
+import logging
+import importlib
+import threading
+from types import ModuleType
+from typing import Any, Callable, Dict, List, Tuple
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+_load_lock = threading.RLock()
+
+
+class LazyModule(ModuleType):
+    """Proxy for a module that is imported on first attribute access"""
+
+    def __init__(self, name: str):
+        """
+        Create the proxy without importing the module.
+
+        Args:
+            name: Fully qualified module name
+        """
+        super().__init__(name)
+        self.__dict__["_module"] = None
+
+    def _load(self) -> ModuleType:
+        """Import the module (once) and return it"""
+        module = self.__dict__["_module"]
+        if module is None:
+            with _load_lock:
+                module = self.__dict__["_module"]
+                if module is None:
+                    started = time.perf_counter()
+                    module = importlib.import_module(self.__name__)
+                    self.__dict__["_module"] = module
+                    logger.debug(
+                        f"Imported {self.__name__} on first use in "
+                        f"{(time.perf_counter() - started) * 1000:.0f} ms")
+        return module
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._load(), name)
+
+    def __dir__(self) -> List[str]:
+        return dir(self._load())
+
+    def __repr__(self) -> str:
+        state = "loaded" if self.__dict__["_module"] is not None else "not loaded"
+        return f"<lazy module '{self.__name__}' ({state})>"
+
+
+def lazy_import(name: str) -> ModuleType:
+    """
+    Get a module without importing it until it is used.
+
+    Args:
+        name: Fully qualified module name (e.g. "google.genai.types")
+
+    Returns:
+        The module itself if it is already imported, otherwise a LazyModule proxy
+    """
+    return sys.modules.get(name) or LazyModule(name)
+
+
+def lazy_exports(package_name: str,
+                 exports: Dict[str, Tuple[str, ...]]) -> Tuple[Callable[[str], Any], Callable[[], List[str]]]:
+    """
+    Build a PEP 562 __getattr__/__dir__ pair that imports package exports on first use.
+
+    Args:
+        package_name: The package's __name__
+        exports: Submodule name -> names exported from it
+
+    Returns:
+        (__getattr__, __dir__) to assign at module level in the package __init__
+    """
+    owners = {name: module_name for module_name, names in exports.items() for name in names}
+
+    def __getattr__(name: str) -> Any:
+        module_name = owners.get(name)
+        if module_name is None:
+            raise AttributeError(f"module '{package_name}' has no attribute '{name}'")
+        value = getattr(importlib.import_module(module_name), name)
+        # Cache on the package so later lookups bypass __getattr__
+        setattr(sys.modules[package_name], name, value)
+        return value
+
+    def __dir__() -> List[str]:
+        return sorted(set(vars(sys.modules[package_name])) | set(owners))
+
+    return __getattr__, __dir__
@@ -3,7 +3,10 @@ rate_limiter.py - Rate limiting utility for API calls
 
 A rate limiter to prevent exceeding API quotas:
 - Tracks API calls per minute and per day
+- Optionally tracks input tokens per minute (callers pass each request's token estimate)
 - Provides waiting functionality when limits are reached
+- Safe to share between threads: the counters are updated under a lock, and a caller that
+  has to wait sleeps without holding it
 - Returns remaining quota information
 
 Dependencies:
@@ -16,9 +19,10 @@ Related files:
 
 import time
 import logging
+import threading
 from datetime import datetime, timedelta
 from collections import deque
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
 logger = logging.getLogger(__name__)
 
@@ -26,66 +30,117 @@ logger = logging.getLogger(__name__)
 class RateLimiter:
     """Rate limiter for Gemini API calls"""
 
-    def __init__(self, max_calls_per_minute: int = 30, max_calls_per_day: int = 500):
+    def __init__(self, max_calls_per_minute: int = 30, max_calls_per_day: int = 500,
+                 max_tokens_per_minute: Optional[int] = None):
         """
         Initialize rate limiter with default limits.
 
         Args:
             max_calls_per_minute: Maximum API calls per minute
             max_calls_per_day: Maximum API calls per day
+            max_tokens_per_minute: Maximum input tokens per minute (None for no token limit)
         """
         self.max_calls_per_minute = max_calls_per_minute
         self.max_calls_per_day = max_calls_per_day
+        self.max_tokens_per_minute = max_tokens_per_minute
+        self._lock = threading.RLock()
 
         # Initialize counters
         self.reset_counters()
 
     def reset_counters(self):
         """Reset all rate limit counters"""
-        self.minute_calls = 0
-        self.day_calls = 0
-        self.last_minute_reset = datetime.now()
-        self.last_day_reset = datetime.now()
+        with self._lock:
+            self.minute_calls = 0
+            self.minute_tokens = 0
+            self.day_calls = 0
+            self.last_minute_reset = datetime.now()
+            self.last_day_reset = datetime.now()
 
     def update_counters(self):
         """Update counters based on elapsed time"""
-        now = datetime.now()
+        with self._lock:
+            now = datetime.now()
 
-        # Check if minute has elapsed
-        if now - self.last_minute_reset > timedelta(minutes=1):
-            self.minute_calls = 0
-            self.last_minute_reset = now
+            # Check if minute has elapsed
+            if now - self.last_minute_reset > timedelta(minutes=1):
+                self.minute_calls = 0
+                self.minute_tokens = 0
+                self.last_minute_reset = now
 
-        # Check if day has elapsed
-        if now - self.last_day_reset > timedelta(days=1):
-            self.day_calls = 0
-            self.last_day_reset = now
+            # Check if day has elapsed
+            if now - self.last_day_reset > timedelta(days=1):
+                self.day_calls = 0
+                self.last_day_reset = now
 
-    def check_and_wait(self):
+    def tokens_exceed_limit(self, tokens: int) -> bool:
         """
-        Check rate limits and wait if necessary.
+        Check whether a request of this many tokens would exceed the minute's token limit.
+
+        A request larger than the whole limit still goes through once the minute is empty.
+
+        Args:
+            tokens: Estimated input tokens of the request
 
         Returns:
-            None
+            bool: True if the request has to wait for the next minute
         """
-        self.update_counters()
+        return (self.max_tokens_per_minute is not None and self.minute_tokens > 0 and
+                self.minute_tokens + tokens > self.max_tokens_per_minute)
 
-        # Check if we're approaching minute limit
-        if self.minute_calls >= self.max_calls_per_minute:
-            wait_time = 60 - (datetime.now() - self.last_minute_reset).seconds
-            logger.warning(
-                f"Rate limit approaching: waiting {wait_time} seconds")
-            time.sleep(wait_time + 1)  # Add 1 second buffer
-            self.update_counters()  # Refresh counters after waiting
+    def reserve(self, tokens: int = 0) -> float:
+        """
+        Count a request against the limits if they leave room for it now.
+
+        Args:
+            tokens: Estimated input tokens of the request, counted against the token limit
 
-        # Check if we're approaching day limit
-        if self.day_calls >= self.max_calls_per_day:
-            logger.error("Daily rate limit reached, cannot proceed")
-            raise Exception("Daily API rate limit reached")
+        Returns:
+            float: 0 if the request was counted, otherwise the seconds to wait before
+            trying again (the request is then not counted)
 
-        # Increment counters
-        self.minute_calls += 1
-        self.day_calls += 1
+        Raises:
+            Exception: If the daily limit has been reached
+        """
+        with self._lock:
+            self.update_counters()
+
+            # Check if we're approaching day limit
+            if self.day_calls >= self.max_calls_per_day:
+                logger.error("Daily rate limit reached, cannot proceed")
+                raise Exception("Daily API rate limit reached")
+
+            # Check if we're approaching minute limit
+            if self.minute_calls >= self.max_calls_per_minute or self.tokens_exceed_limit(tokens):
+                # Add 1 second buffer
+                return 60 - (datetime.now() - self.last_minute_reset).seconds + 1
+
+            # Increment counters
+            self.minute_calls += 1
+            self.minute_tokens += tokens
+            self.day_calls += 1
+            return 0
+
+    def check_and_wait(self, tokens: int = 0):
+        """
+        Check rate limits and wait if necessary.
+
+        The wait happens outside the limiter's lock, so other threads can still check the
+        limits (and take a slot that frees up) meanwhile.
+
+        Args:
+            tokens: Estimated input tokens of the request, counted against the token limit
+
+        Returns:
+            None
+        """
+        while True:
+            wait_time = self.reserve(tokens)
+            if not wait_time:
+                return
+            logger.warning(
+                f"Rate limit approaching: waiting {wait_time - 1} seconds")
+            time.sleep(wait_time)
 
     def get_status(self) -> Dict[str, Any]:
         """
@@ -94,9 +149,13 @@ class RateLimiter:
         Returns:
             Dictionary with rate limit information
         """
-        self.update_counters()
+        with self._lock:
+            self.update_counters()
+            return self._status()
 
-        return {
+    def _status(self) -> Dict[str, Any]:
+        """Build the status from the current counters"""
+        status = {
             "minute": {
                 "used": self.minute_calls,
                 "limit": self.max_calls_per_minute,
@@ -110,3 +169,11 @@ class RateLimiter:
                 "resets_in_seconds": 86400 - (datetime.now() - self.last_day_reset).seconds
             }
         }
+        if self.max_tokens_per_minute is not None:
+            status["tokens"] = {
+                "used": self.minute_tokens,
+                "limit": self.max_tokens_per_minute,
+                "remaining": self.max_tokens_per_minute - self.minute_tokens,
+                "resets_in_seconds": status["minute"]["resets_in_seconds"]
+            }
+        return status
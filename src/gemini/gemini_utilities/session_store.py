@@ -0,0 +1,245 @@
+"""
+gemini_utilities/session_store.py - SQLite persistence of chat sessions
+
+Stores every chat session as one row of settings (model, system instruction) and its
+messages as compact turn records: one row per message holding the role and the parts as
+JSON (inline data base64-encoded, uploaded files as references). Saves are written by a
+background thread; the saves that pile up while the writer is busy are written in one
+transaction, keeping only the latest save of each session. A save whose history extends the one written before only
+appends the new messages; a history that was rewritten (e.g. compacted) replaces the
+stored one.
+
+Exports:
+- SessionStore(db_path: str | Path = "output/sessions.sqlite")
+  - save(session_id, messages, generation=None, model=None, system_instruction=None) -> None
+  - load(session_id) -> Dict[str, Any] | None
+  - delete(session_id) -> bool
+  - list_sessions() -> List[Dict[str, Any]]
+  - flush() -> None, close() -> None
+
+Related files:
+- src/gemini/gemini_hooks/session_pool.py: Keeps the active sessions in memory
+"""
+
+import json
+import time
+import sqlite3
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def _record(message: Any) -> Tuple[str, str]:
+    """
+    Convert a chat message into a (role, parts JSON) record.
+
+    Args:
+        message: SDK Content or a dictionary with role and parts
+
+    Returns:
+        Tuple of role and compact JSON of the parts
+    """
+    if hasattr(message, "model_dump"):
+        message = message.model_dump(mode="json", exclude_none=True)
+    return message.get("role") or "user", json.dumps(message.get("parts") or [],
+                                                     separators=(",", ":"))
+
+
+class SessionStore:
+    """SQLite store of chat sessions with background writes"""
+
+    def __init__(self, db_path: Union[str, Path] = "output/sessions.sqlite"):
+        """
+        Open (or create) the store.
+
+        Args:
+            db_path: SQLite database file
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(exist_ok=True, parents=True)
+        self._lock = threading.RLock()
+        self._connection = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        # Sessions are rewritten often; WAL keeps the writer from blocking readers
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            " session_id TEXT PRIMARY KEY, model TEXT, system_instruction TEXT,"
+            " message_count INTEGER NOT NULL, created_at REAL, updated_at REAL)")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS messages ("
+            " session_id TEXT NOT NULL, seq INTEGER NOT NULL, role TEXT NOT NULL,"
+            " parts TEXT NOT NULL, PRIMARY KEY (session_id, seq))")
+        self._connection.commit()
+
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="session-writer")
+        self._futures: List[Future] = []
+        self._scheduled = False
+        # session_id -> latest snapshot that is waiting for the writer
+        self._queued: Dict[str, Dict[str, Any]] = {}
+        # session_id -> (generation, message count) of what is on disk
+        self._saved: Dict[str, Tuple[Any, int]] = {}
+
+    def save(self, session_id: str, messages: List[Any], generation: Any = None,
+             model: Optional[str] = None, system_instruction: Optional[str] = None) -> None:
+        """
+        Schedule a background save of a session's history.
+
+        Args:
+            session_id: Session ID
+            messages: The whole history (SDK Contents or role/parts dictionaries)
+            generation: Identity of the history; a save with the generation of the previous
+                save only appends messages, any other generation replaces the stored ones
+            model: Model of the session
+            system_instruction: System instruction of the session
+        """
+        with self._lock:
+            self._queued[session_id] = {"messages": list(messages), "generation": generation,
+                                        "model": model,
+                                        "system_instruction": system_instruction}
+            if not self._scheduled:
+                self._scheduled = True
+                self._futures = [future for future in self._futures if not future.done()]
+                self._futures.append(self._executor.submit(self._write_queued))
+
+    def _records(self, session_id: str, snapshot: Dict[str, Any]) -> Tuple[bool, List[tuple]]:
+        """
+        Turn a snapshot into message rows, only the new ones if the stored history is a prefix.
+
+        Returns:
+            Tuple of whether the rows are appended and the rows
+        """
+        messages, generation = snapshot["messages"], snapshot["generation"]
+        with self._lock:
+            saved = self._saved.get(session_id)
+        # A generation of None was loaded from disk and matches any chat rebuilt from it
+        append = (saved is not None and saved[0] in (None, generation)
+                  and len(messages) >= saved[1])
+        start = saved[1] if append else 0
+        return append, [(session_id, seq, *_record(message))
+                        for seq, message in enumerate(messages[start:], start)]
+
+    def _write_queued(self) -> None:
+        """Write every queued snapshot in one transaction (runs on the writer thread)"""
+        with self._lock:
+            snapshots, self._queued = self._queued, {}
+            self._scheduled = False
+        if not snapshots:
+            return
+
+        # Serializing happens outside the lock, so saves are not held up by it
+        rows = {session_id: self._records(session_id, snapshot)
+                for session_id, snapshot in snapshots.items()}
+
+        with self._lock:
+            now = time.time()
+            try:
+                for session_id, (append, records) in rows.items():
+                    snapshot = snapshots[session_id]
+                    if not append:
+                        self._connection.execute(
+                            "DELETE FROM messages WHERE session_id = ?", (session_id,))
+                    self._connection.executemany(
+                        "INSERT OR REPLACE INTO messages VALUES (?, ?, ?, ?)", records)
+                    self._connection.execute(
+                        "INSERT INTO sessions VALUES (?, ?, ?, ?, ?, ?) "
+                        "ON CONFLICT(session_id) DO UPDATE SET model = excluded.model, "
+                        "system_instruction = excluded.system_instruction, "
+                        "message_count = excluded.message_count, "
+                        "updated_at = excluded.updated_at",
+                        (session_id, snapshot["model"], snapshot["system_instruction"],
+                         len(snapshot["messages"]), now, now))
+                self._connection.commit()
+            except sqlite3.Error as e:
+                self._connection.rollback()
+                for session_id in snapshots:
+                    self._saved.pop(session_id, None)
+                logger.error(f"Saving {len(snapshots)} chat sessions failed: {str(e)}")
+                return
+            for session_id, snapshot in snapshots.items():
+                self._saved[session_id] = (snapshot["generation"], len(snapshot["messages"]))
+
+    def flush(self) -> None:
+        """Block until all scheduled saves are written"""
+        with self._lock:
+            futures = list(self._futures)
+        for future in futures:
+            try:
+                future.result()
+            except Exception as e:
+                logger.error(f"Chat session write failed: {str(e)}")
+
+    def load(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Load a session, including saves that are still queued.
+
+        Args:
+            session_id: Session ID
+
+        Returns:
+            Dictionary with session_id, model, system_instruction, created_at, updated_at and
+            messages (role/parts dictionaries), or None if the session is not stored
+        """
+        self.flush()
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT model, system_instruction, created_at, updated_at FROM sessions "
+                "WHERE session_id = ?", (session_id,)).fetchone()
+            if row is None:
+                return None
+            messages = [{"role": role, "parts": json.loads(parts)}
+                        for role, parts in self._connection.execute(
+                            "SELECT role, parts FROM messages WHERE session_id = ? "
+                            "ORDER BY seq", (session_id,))]
+            self._saved[session_id] = (None, len(messages))
+
+        return {"session_id": session_id, "model": row[0], "system_instruction": row[1],
+                "created_at": row[2], "updated_at": row[3], "messages": messages}
+
+    def delete(self, session_id: str) -> bool:
+        """
+        Delete a session and its messages.
+
+        Args:
+            session_id: Session ID
+
+        Returns:
+            bool: True if the session was stored
+        """
+        self.flush()
+        with self._lock:
+            self._saved.pop(session_id, None)
+            self._connection.execute("DELETE FROM messages WHERE session_id = ?", (session_id,))
+            deleted = self._connection.execute(
+                "DELETE FROM sessions WHERE session_id = ?", (session_id,)).rowcount
+            self._connection.commit()
+        return deleted > 0
+
+    def list_sessions(self) -> List[Dict[str, Any]]:
+        """
+        List the stored sessions.
+
+        Returns:
+            List of dictionaries with session_id, model, message_count and updated_at,
+            most recently updated first
+        """
+        self.flush()
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT session_id, model, message_count, updated_at FROM sessions "
+                "ORDER BY updated_at DESC").fetchall()
+        return [{"session_id": row[0], "model": row[1], "message_count": row[2],
+                 "updated_at": row[3]} for row in rows]
+
+    def close(self) -> None:
+        """Write pending saves, stop the writer thread and close the database"""
+        self.flush()
+        self._executor.shutdown(wait=True)
+        with self._lock:
+            self._connection.close()
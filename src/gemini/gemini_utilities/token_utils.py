@@ -0,0 +1,112 @@
+"""
+gemini_utilities/token_utils.py - Offline token estimates for prompts and responses
+
+Approximates Gemini token counts without an API call, for accounting and reports where
+an exact count_tokens round trip is not worth it. English text averages about four
+characters per token; long words are split into several tokens and punctuation counts
+separately, which tracks the real tokenizer more closely than a flat character ratio.
+Audio is billed at a fixed rate per second of input and images per 768x768 tile.
+
+Exports:
+- estimate_text_tokens(text: str) -> int
+- estimate_audio_tokens(seconds: float) -> int
+- estimate_image_tokens(width: int, height: int) -> int
+- truncate_text(text: str, max_tokens: int) -> str: Cut the middle of a text to fit a budget
+
+Related files:
+- src/gemini/gemini_prompts/prompt_registry.py: Slot-level token accounting of rendered prompts
+- src/gemini/gemini_prompts/prompt_profiler.py: Per-track token, cost and latency report
+- src/gemini/gemini_apis/token_accounting.py: Preflight token counts of every model call
+"""
+
+import re
+import math
+
+# Word pieces, single punctuation/symbol characters
+_TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+
+# Characters per token within a long word
+CHARS_PER_WORD_PIECE = 6
+
+# Gemini represents audio input as 32 tokens per second
+AUDIO_TOKENS_PER_SECOND = 32
+
+# Images up to 384 pixels on both sides are one tile; larger ones are split into 768x768 tiles
+IMAGE_TOKENS_PER_TILE = 258
+IMAGE_SMALL_SIDE = 384
+IMAGE_TILE_SIDE = 768
+
+# Share of a truncated text kept from its start; the rest is kept from its end
+TRUNCATE_HEAD_SHARE = 0.7
+
+
+def estimate_text_tokens(text: str) -> int:
+    """
+    Estimate the number of tokens in a text.
+
+    Args:
+        text: Text to estimate
+
+    Returns:
+        int: Estimated token count (0 for empty text)
+    """
+    if not text:
+        return 0
+    tokens = 0
+    for piece in _TOKEN_PATTERN.findall(text):
+        tokens += 1 + (len(piece) - 1) // CHARS_PER_WORD_PIECE
+    return tokens
+
+
+def estimate_audio_tokens(seconds: float) -> int:
+    """
+    Estimate the number of tokens an audio clip adds to a request.
+
+    Args:
+        seconds: Clip duration in seconds
+
+    Returns:
+        int: Estimated token count
+    """
+    return int(round(max(seconds, 0) * AUDIO_TOKENS_PER_SECOND))
+
+
+def estimate_image_tokens(width: int, height: int) -> int:
+    """
+    Estimate the number of tokens an image adds to a request.
+
+    Args:
+        width: Image width in pixels
+        height: Image height in pixels
+
+    Returns:
+        int: Estimated token count
+    """
+    if width <= IMAGE_SMALL_SIDE and height <= IMAGE_SMALL_SIDE:
+        return IMAGE_TOKENS_PER_TILE
+    tiles = math.ceil(width / IMAGE_TILE_SIDE) * math.ceil(height / IMAGE_TILE_SIDE)
+    return IMAGE_TOKENS_PER_TILE * max(tiles, 1)
+
+
+def truncate_text(text: str, max_tokens: int) -> str:
+    """
+    Shorten a text to about max_tokens by cutting out its middle.
+
+    The start and the end of a prompt usually carry the instructions, so both are kept
+    and a marker replaces the part that was cut.
+
+    Args:
+        text: Text to shorten
+        max_tokens: Token budget for the result
+
+    Returns:
+        str: The text itself if it fits, otherwise its start, a marker and its end
+    """
+    tokens = estimate_text_tokens(text)
+    if tokens <= max_tokens:
+        return text
+    marker = f"\n\n[... about {tokens - max_tokens} tokens omitted ...]\n\n"
+    keep_chars = max(int(len(text) * max_tokens / tokens) - len(marker), 0)
+    head = int(keep_chars * TRUNCATE_HEAD_SHARE)
+    tail = keep_chars - head
+    return text[:head] + marker + (text[len(text) - tail:] if tail else "")
@@ -0,0 +1,139 @@
+"""
+gemini_utilities/track_metadata.py - Metadata the catalogue index keeps per track
+
+Reads what the index records about an MP3 without decoding it: the BPM written in the
+file name, the duration from the MPEG frame headers and a content hash that detects
+modified files.
+
+Exports:
+- HASH_CHUNK_SIZE: Bytes read per chunk when hashing
+- parse_bpm_from_filename(filename: str) -> Optional[int]
+- get_mp3_duration(path: str | Path) -> Optional[float]
+- hash_file(path: str | Path) -> str: SHA-256 of a file's contents
+
+Related files:
+- src/gemini/gemini_utilities/catalogue_index.py: Stores the metadata per track
+"""
+
+import re
+import struct
+import hashlib
+import logging
+from pathlib import Path
+from typing import Optional, Union
+
+logger = logging.getLogger(__name__)
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+_BPM_PATTERN = re.compile(r"(?:^|[_\-\s])(\d{2,3})\s?bpm(?:[_\-\s.]|$)", re.IGNORECASE)
+
+# MPEG audio frame header tables (kbps / Hz), indexed by [version][layer][index]
+_MPEG_BITRATES = {
+    1: {1: [0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448],
+        2: [0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384],
+        3: [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320]},
+    2: {1: [0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256],
+        2: [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+        3: [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160]},
+}
+_MPEG_SAMPLE_RATES = {1: [44100, 48000, 32000], 2: [22050, 24000, 16000],
+                      2.5: [11025, 12000, 8000]}
+
+
+def parse_bpm_from_filename(filename: str) -> Optional[int]:
+    """
+    Parse a tempo tag such as "_130bpm_" from a track filename.
+
+    Args:
+        filename: File name (with or without extension)
+
+    Returns:
+        The BPM as an integer, or None if the name carries no tempo tag
+    """
+    match = _BPM_PATTERN.search(Path(filename).stem + ".")
+    return int(match.group(1)) if match else None
+
+
+def get_mp3_duration(path: Union[str, Path]) -> Optional[float]:
+    """
+    Read the duration of an MP3 file from its frame headers without decoding audio.
+
+    Uses the Xing/Info frame count when present (VBR files) and falls back to a
+    constant-bitrate estimate from the first frame otherwise.
+
+    Args:
+        path: Path to the MP3 file
+
+    Returns:
+        Duration in seconds, or None if no MPEG frame header could be found
+    """
+    path = Path(path)
+    try:
+        file_size = path.stat().st_size
+        with open(path, "rb") as f:
+            header = f.read(10)
+            offset = 0
+            # Skip an ID3v2 tag (size is stored as a 28-bit syncsafe integer)
+            if header[:3] == b"ID3" and len(header) == 10:
+                size = header[6:10]
+                offset = 10 + ((size[0] << 21) | (size[1] << 14) | (size[2] << 7) | size[3])
+            f.seek(offset)
+            data = f.read(64 * 1024)
+    except OSError as e:
+        logger.warning(f"Could not read MP3 header for {path}: {e}")
+        return None
+
+    for i in range(len(data) - 4):
+        if data[i] != 0xFF or (data[i + 1] & 0xE0) != 0xE0:
+            continue
+
+        version_bits = (data[i + 1] >> 3) & 0x03
+        layer_bits = (data[i + 1] >> 1) & 0x03
+        bitrate_index = (data[i + 2] >> 4) & 0x0F
+        sample_rate_index = (data[i + 2] >> 2) & 0x03
+        if version_bits == 1 or layer_bits == 0 or bitrate_index in (0, 15) or sample_rate_index == 3:
+            continue
+
+        version = {3: 1, 2: 2, 0: 2.5}[version_bits]
+        layer = 4 - layer_bits
+        bitrate = _MPEG_BITRATES[1 if version == 1 else 2][layer][bitrate_index] * 1000
+        sample_rate = _MPEG_SAMPLE_RATES[version][sample_rate_index]
+        if layer == 1:
+            samples_per_frame = 384
+        elif layer == 3 and version != 1:
+            samples_per_frame = 576
+        else:
+            samples_per_frame = 1152
+
+        # VBR files carry the total frame count in a Xing/Info header
+        for tag in (b"Xing", b"Info"):
+            tag_pos = data.find(tag, i + 4, i + 64)
+            if tag_pos != -1 and tag_pos + 12 <= len(data):
+                flags = struct.unpack(">I", data[tag_pos + 4:tag_pos + 8])[0]
+                if flags & 0x01:
+                    frames = struct.unpack(">I", data[tag_pos + 8:tag_pos + 12])[0]
+                    return round(frames * samples_per_frame / sample_rate, 3)
+
+        audio_bytes = file_size - (offset + i)
+        return round(audio_bytes * 8 / bitrate, 3)
+
+    logger.warning(f"No MPEG frame header found in {path}")
+    return None
+
+
+def hash_file(path: Union[str, Path]) -> str:
+    """
+    Return the SHA-256 hex digest of a file, read in chunks.
+
+    Args:
+        path: Path to the file
+
+    Returns:
+        Hex digest of the file contents
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
@@ -0,0 +1,205 @@
+"""
+gemini_utilities/write_behind.py - Atomic writes made durable on a background thread
+
+A WriteBehindQueue moves the fsync latency of atomic writes off the caller's thread:
+submitted files are written, fsynced and renamed in batches, with one fsync per directory
+per batch, and barrier() waits until a group of writes (e.g. one track's outputs) is on disk.
+
+Exports:
+- DEFAULT_WRITE_BATCH: Most files written per batch
+- WriteBehindQueue(max_batch=64): Atomic writes whose fsyncs are batched on a background thread
+  - submit(file_path, data, group=None, callback=None) -> Future
+  - pending(file_path) -> bytes | None, barrier(group=None) -> None, close() -> None
+
+Related files:
+- src/gemini/gemini_utilities/atomic_files.py: The temporary file and fsync steps
+- src/gemini/gemini_utilities/artifact_store.py: Blob writes and the write-behind mode
+"""
+
+import os
+import atexit
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Union
+
+from .atomic_files import _fsync_directory, _write_temp
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WRITE_BATCH = 64
+
+
+class _PendingWrite:
+    """A file submitted to a WriteBehindQueue"""
+
+    def __init__(self, file_path: Path, data: bytes, group: Optional[str],
+                 callback: Optional[Callable[[], Any]]):
+        self.file_path = file_path
+        self.data = data
+        self.group = group
+        self.callbacks = [callback] if callback else []
+        self.future: Future = Future()
+
+
+class WriteBehindQueue:
+    """Background writer that makes atomic writes durable in batches"""
+
+    def __init__(self, max_batch: int = DEFAULT_WRITE_BATCH):
+        """
+        Start the writer thread.
+
+        Args:
+            max_batch: Most files written per batch
+        """
+        self.max_batch = max(1, max_batch)
+        self._condition = threading.Condition()
+        # Files waiting for the writer (a newer submit of a file replaces its data)
+        self._queued: "OrderedDict[str, _PendingWrite]" = OrderedDict()
+        # Files submitted and not on disk yet, including the batch being written
+        self._pending: Dict[str, _PendingWrite] = {}
+        self._closed = False
+        self._stats = {"files": 0, "batches": 0, "coalesced": 0}
+        self._thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+        self._thread.start()
+        # Queued files are still written when the interpreter exits
+        atexit.register(self.close)
+
+    def submit(self, file_path: Union[str, Path], data: bytes, group: Optional[str] = None,
+               callback: Optional[Callable[[], Any]] = None) -> Future:
+        """
+        Schedule an atomic, durable write.
+
+        Args:
+            file_path: Destination path
+            data: File contents
+            group: Group the write belongs to, for barrier() (e.g. the track name)
+            callback: Called on the writer thread once the file is on disk
+
+        Returns:
+            Future that is done when the file is on disk
+        """
+        file_path = Path(file_path)
+        key = os.path.abspath(file_path)
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("WriteBehindQueue is closed")
+            write = _PendingWrite(file_path, data, group, callback)
+            queued = self._queued.pop(key, None)
+            if queued is not None:
+                # Only the newest contents are written; the older write completes with it
+                write.callbacks = queued.callbacks + write.callbacks
+                write.future.add_done_callback(lambda done: _chain(done, queued.future))
+                self._stats["coalesced"] += 1
+            self._queued[key] = write
+            self._pending[key] = write
+            self._condition.notify_all()
+        return write.future
+
+    def pending(self, file_path: Union[str, Path]) -> Optional[bytes]:
+        """
+        Get the contents of a file that was submitted but is not on disk yet.
+
+        Args:
+            file_path: Destination path
+
+        Returns:
+            The newest submitted contents, or None if nothing is pending for the file
+        """
+        with self._condition:
+            write = self._pending.get(os.path.abspath(file_path))
+            return write.data if write is not None else None
+
+    def barrier(self, group: Optional[str] = None) -> None:
+        """
+        Wait until submitted writes are on disk.
+
+        Args:
+            group: Only wait for the writes of this group (None waits for all)
+        """
+        with self._condition:
+            futures = [write.future for write in self._pending.values()
+                       if group is None or write.group == group]
+        for future in futures:
+            try:
+                future.result()
+            except Exception as e:
+                logger.error(f"Write-behind write failed: {str(e)}")
+
+    def get_status(self) -> Dict[str, int]:
+        """Counts of pending and written files, batches and coalesced writes"""
+        with self._condition:
+            return {"pending": len(self._pending), **self._stats}
+
+    def _run(self) -> None:
+        """Write batches until the queue is closed and empty (runs on the writer thread)"""
+        while True:
+            with self._condition:
+                while not self._queued and not self._closed:
+                    self._condition.wait()
+                if not self._queued:
+                    return
+                batch = []
+                while self._queued and len(batch) < self.max_batch:
+                    batch.append(self._queued.popitem(last=False)[1])
+            self._write_batch(batch)
+
+    def _write_batch(self, batch: List[_PendingWrite]) -> None:
+        """Write, fsync and rename a batch of files, then fsync their directories once"""
+        written = []
+        for write in batch:
+            try:
+                data = write.data
+                temp_path = _write_temp(write.file_path, lambda path: path.write_bytes(data),
+                                        durable=True)
+                os.replace(temp_path, write.file_path)
+                written.append(write)
+            except BaseException as e:
+                logger.error(f"Write-behind write of {write.file_path} failed: {str(e)}")
+                self._finish(write, e)
+
+        for directory in {str(write.file_path.parent) for write in written}:
+            try:
+                _fsync_directory(directory)
+            except OSError as e:
+                logger.warning(f"Could not fsync directory {directory}: {str(e)}")
+
+        for write in written:
+            for callback in write.callbacks:
+                try:
+                    callback()
+                except Exception as e:
+                    logger.error(f"Write-behind callback for {write.file_path} failed: {str(e)}")
+            self._finish(write)
+
+        with self._condition:
+            self._stats["files"] += len(written)
+            self._stats["batches"] += 1
+
+    def _finish(self, write: _PendingWrite, error: Optional[BaseException] = None) -> None:
+        """Drop a write from the pending files and complete its future"""
+        with self._condition:
+            key = os.path.abspath(write.file_path)
+            if self._pending.get(key) is write:
+                del self._pending[key]
+        if error is None:
+            write.future.set_result(write.file_path)
+        else:
+            write.future.set_exception(error)
+
+    def close(self) -> None:
+        """Write everything still queued and stop the writer thread"""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        self._thread.join()
+
+
+def _chain(done: Future, future: Future) -> None:
+    """Complete a coalesced write's future like the write that replaced it"""
+    if done.exception() is not None:
+        future.set_exception(done.exception())
+    else:
+        future.set_result(done.result())
@@ -11,14 +11,18 @@ This script processes MP3 files from the data_source folder:
 
 Dependencies:
 - os, json, datetime
-- google.generativeai
+- google.genai
 - PIL
 - src.gemini.gemini_client
 - src.discord.discord_client
 
 Related files: 
+- src/audio_image_generator.py: AudioImageGenerator, the pipeline this script drives
 - src/gemini/gemini_client.py
 - src/discord/discord_client.py
+- src/gemini/gemini_utilities/catalogue_index.py
+- src/gemini/gemini_hooks/watch_folder_daemon.py
+- src/gemini/gemini_utilities/image_index.py
 """
 
 import os
@@ -27,19 +31,16 @@ import logging
 import argparse
 import sys
 from pathlib import Path
-from typing import Dict, Any, List
 
 # Import the necessary modules
 try:
     # When run from root directory
-    from src.gemini.gemini_client import GeminiClient, AudioImageProcessor
-    from src.discord.discord_client import DiscordClient
+    from src.audio_image_generator import AudioImageGenerator
 except ModuleNotFoundError:
     # When run directly from src directory
     sys.path.insert(0, os.path.abspath(
         os.path.join(os.path.dirname(__file__), '..')))
-    from src.gemini.gemini_client import GeminiClient, AudioImageProcessor
-    from src.discord.discord_client import DiscordClient
+    from src.audio_image_generator import AudioImageGenerator
 
 # Configure logging
 logging.basicConfig(
@@ -49,93 +50,6 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-class AudioImageGenerator:
-    """Pipeline for generating images from audio files using Gemini API with Discord integration"""
-
-    def __init__(self, client=None):
-        """
-        Initialize the generator with client and processor
-
-        Args:
-            client: Optional GeminiClient instance
-        """
-        # Initialize Gemini client
-        self.client = client or GeminiClient()
-
-        # Initialize the audio processor from gemini_client.py
-        self.processor = AudioImageProcessor(client=self.client)
-
-        # Set up data directory
-        self.data_dir = Path("data_source")
-
-        # Get a reference to the Discord client
-        self.discord_client = self.client.discord_client or DiscordClient()
-
-        logger.info("AudioImageGenerator initialized with Discord integration")
-
-    def get_audio_files(self) -> List[Path]:
-        """
-        Get all MP3 files from the data source directory
-
-        Returns:
-            List of paths to MP3 files
-        """
-        mp3_files = list(self.data_dir.glob("*.mp3"))
-        logger.info(f"Found {len(mp3_files)} MP3 files in data_source folder")
-        return mp3_files
-
-    def clean_output_directories(self):
-        """
-        Clean the output directories before processing files.
-        This is optional and only used when explicitly requested.
-        """
-        for path in [
-            self.processor.image_dir,
-            self.processor.prompt_dir,
-            self.processor.analysis_dir
-        ]:
-            # Keep the directory but delete its contents
-            if path.exists():
-                for file in path.glob("*"):
-                    file.unlink()
-                logger.info(f"Cleaned directory: {path}")
-
-        logger.info("Output directories cleaned")
-
-    def process_audio_file(self, audio_path: Path) -> Dict[str, Any]:
-        """
-        Process a single audio file through the processor pipeline
-
-        Args:
-            audio_path: Path to the audio file
-
-        Returns:
-            Dictionary with results of the processing
-        """
-        # Simply delegate to the processor
-        return self.processor.process_audio_file(audio_path)
-
-    def process_all(self, clean_first=False) -> List[Dict[str, Any]]:
-        """
-        Process all MP3 files in the data source directory
-
-        Args:
-            clean_first: Whether to clean output directories before processing
-
-        Returns:
-            List of dictionaries with processing results
-        """
-        # Clean output directories if requested
-        if clean_first:
-            self.clean_output_directories()
-
-        # Get all audio files
-        audio_files = self.get_audio_files()
-
-        # Process all files through the processor
-        return self.processor.process_multiple_files(audio_files)
-
-
 def main():
     """Main function to run the audio processing pipeline"""
     parser = argparse.ArgumentParser(
@@ -143,16 +57,45 @@ def main():
     parser.add_argument(
         "--file", help="Process a single MP3 file from data_source folder")
     parser.add_argument("--all", action="store_true",
-                        help="Process all MP3 files in data_source folder")
+                        help="Process new or stale MP3 files in data_source folder")
     parser.add_argument("--clean", action="store_true",
                         help="Clean output directories before processing")
+    parser.add_argument("--force", action="store_true",
+                        help="With --all, process every file even if its outputs are up to date")
+    parser.add_argument("--watch", action="store_true",
+                        help="Run as a daemon that processes files as they appear in data_source")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="With --watch, number of tracks processed concurrently")
+    parser.add_argument("--settle", type=float, default=5.0,
+                        help="With --watch, seconds a file must stop changing before it is processed")
+    parser.add_argument("--lookahead", type=int, default=1,
+                        help="With --all, tracks uploaded and prepared ahead of the current one (0 disables)")
+    parser.add_argument("--candidates", type=int, default=1,
+                        help="Image candidates generated in parallel per track and ranked locally")
+    parser.add_argument("--reuse-score", type=float, default=None,
+                        help="Reuse the cached image of an identical prompt scoring at least this value")
+    parser.add_argument("--batch", action="store_true",
+                        help="With --all, run the analyses as batch jobs (cheaper, resumes after a restart)")
+    parser.add_argument("--poll", type=float, default=60,
+                        help="With --batch, seconds between batch job status checks")
+    parser.add_argument("--no-write-behind", dest="write_behind", action="store_false",
+                        help="Sync every output file as it is written instead of in the background")
+    parser.add_argument("--similar", metavar="IMAGE",
+                        help="List generated images that look similar to IMAGE")
 
     args = parser.parse_args()
 
     # Initialize the AudioImageGenerator
-    generator = AudioImageGenerator()
+    generator = AudioImageGenerator(
+        prefetch_lookahead=args.lookahead, image_candidates=args.candidates,
+        reuse_min_score=args.reuse_score, write_behind=args.write_behind)
 
-    if args.file:
+    if args.similar:
+        # Similar-cover lookup over the perceptual-hash index
+        for match in generator.find_similar_covers(Path(args.similar)):
+            print(f"{match['distance']:>3}  {match['path']}  ({match['track']})")
+
+    elif args.file:
         # Process a single file
         audio_path = Path("data_source") / args.file
         if not audio_path.exists():
@@ -162,10 +105,17 @@ def main():
         result = generator.process_audio_file(audio_path)
         print(json.dumps(result, indent=2))
 
+    elif args.watch:
+        # Process files continuously until interrupted
+        generator.watch(max_workers=args.workers, settle_seconds=args.settle)
+
     elif args.all:
         # Process all files
-        results = generator.process_all(clean_first=args.clean)
-        print(f"Processed {len(results)} files")
+        results = generator.process_all(
+            clean_first=args.clean, force=args.force, batch=args.batch,
+            poll_interval=args.poll)
+        elided = sum(len(result.get("elided_calls", [])) for result in results)
+        print(f"Processed {len(results)} files ({elided} dead model calls elided)")
 
     else:
         # Show usage
@@ -0,0 +1,267 @@
+"""
+tests/conftest.py - Shared fixtures for the behaviour tests
+
+The tests run offline: FakeGenai stands in for the google.genai client (files, models,
+chats, caches and batches) and records every call it receives, and GeminiClient is built
+with it so requests still pass through the real middleware chain. Each test runs in its own
+scratch directory with a data_source/ of small placeholder tracks.
+
+Exports:
+- FakeGenai(label: str = "default"): google.genai client stand-in with a call log
+- png_bytes(color=(10, 20, 30), size=(64, 64)) -> bytes
+- run_app(cwd, *args) -> CompletedProcess: run_app.py run in cwd with a placeholder key
+- Fixtures: workdir, fake_sdk, client, processor
+
+Related files:
+- src/gemini/gemini_client.py: GeminiClient, built here around FakeGenai
+- src/gemini/gemini_hooks/audio_to_image_processor.py: The pipeline most tests drive
+"""
+
+import io
+import sys
+import os
+import json
+import threading
+import subprocess
+import types as pytypes
+from pathlib import Path
+
+import pytest
+from PIL import Image
+
+# Run from anywhere: the tests import the package as src.gemini
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+TRACKS = ("alpha_120bpm_test.mp3", "beta_95bpm_test.mp3")
+
+IMAGE_PROMPT_JSON = json.dumps({"prompt": "neon city at night", "mood": "dark",
+                                "colors": ["#191970", "magenta"], "style": "synthwave"})
+
+
+def png_bytes(color=(10, 20, 30), size=(64, 64)) -> bytes:
+    """Encode a plain image as PNG"""
+    buffer = io.BytesIO()
+    Image.new("RGB", size, color).save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+def run_app(cwd, *args) -> subprocess.CompletedProcess:
+    """Run the run_app.py entry point in cwd with a placeholder API key"""
+    env = {**os.environ, "GEMINI_API_KEY": "test-key-0000"}
+    env.pop("GEMINI_API_KEYS", None)
+    return subprocess.run([sys.executable, str(ROOT / "run_app.py"), *args], cwd=cwd,
+                          env=env, capture_output=True, text=True, timeout=120)
+
+
+def _ns(**fields):
+    return pytypes.SimpleNamespace(**fields)
+
+
+class FakePart:
+    def __init__(self, text=None, data=None, mime_type="image/png"):
+        self.text = text
+        self.inline_data = _ns(data=data, mime_type=mime_type) if data else None
+        self.file_data = None
+
+
+class FakeResponse:
+    def __init__(self, text, parts=None, prompt_tokens=10):
+        self.text = text
+        self.candidates = [_ns(content=_ns(parts=parts or [FakePart(text=text)]))]
+        self.usage_metadata = _ns(prompt_token_count=prompt_tokens, candidates_token_count=5,
+                                  total_token_count=prompt_tokens + 5)
+
+
+class FakeFiles:
+    def __init__(self, sdk):
+        self.sdk = sdk
+        self.count = 0
+        self.lock = threading.Lock()
+
+    def upload(self, file, config=None, **options):
+        with self.lock:
+            self.count += 1
+            name = f"files/{self.sdk.label}{self.count}"
+        self.sdk.record("upload", str(file))
+        return _ns(name=name, uri=f"https://fake/v1beta/{name}", mime_type="audio/mpeg",
+                   display_name=str(file), state="ACTIVE")
+
+    def get(self, name):
+        self.sdk.record("get_file", name)
+        return _ns(name=name, uri=f"https://fake/v1beta/{name}", mime_type="audio/mpeg",
+                   state="ACTIVE")
+
+    def delete(self, name):
+        self.sdk.record("delete_file", name)
+
+    def list(self):
+        return []
+
+    def download(self, file):
+        self.sdk.record("download", file)
+        return self.sdk.downloads[file]
+
+
+class FakeModels:
+    def __init__(self, sdk):
+        self.sdk = sdk
+
+    def generate_content(self, model, contents, config=None, **options):
+        self.sdk.record("generate", model)
+        if self.sdk.fail_with is not None:
+            raise self.sdk.fail_with
+        if config is not None and getattr(config, "response_modalities", None):
+            return FakeResponse("an image", [FakePart(text="an image"),
+                                             FakePart(data=png_bytes())])
+        if isinstance(contents, str):
+            text = contents
+        elif isinstance(contents, list):
+            text = " ".join(item for item in contents if isinstance(item, str))
+        else:
+            text = ""
+        if "json" in text.lower():
+            return FakeResponse(IMAGE_PROMPT_JSON)
+        return FakeResponse(f"analysis text from {model}")
+
+    def generate_content_stream(self, model, contents, config=None, **options):
+        self.sdk.record("generate_stream", model)
+
+        def chunks():
+            for text in self.sdk.stream_chunks:
+                if isinstance(text, Exception):
+                    raise text
+                yield FakeResponse(text)
+        return chunks()
+
+    def count_tokens(self, model, contents, **options):
+        self.sdk.record("count_tokens", model)
+        return _ns(total_tokens=100)
+
+
+class FakeChat:
+    def __init__(self, sdk, model, config, history):
+        self.sdk = sdk
+        self._model = model
+        self._config = config
+        self.history = list(history or [])
+
+    def get_history(self, curated=False):
+        return list(self.history)
+
+    def send_message(self, message, config=None):
+        from google.genai import types
+        self.sdk.record("send_message", self._model)
+        self.history.append(types.Content(role="user", parts=[types.Part.from_text(
+            text=message if isinstance(message, str) else "message")]))
+        self.history.append(types.Content(role="model", parts=[types.Part.from_text(
+            text="reply")]))
+        return FakeResponse("reply")
+
+
+class FakeChats:
+    def __init__(self, sdk):
+        self.sdk = sdk
+
+    def create(self, model, config=None, history=None):
+        self.sdk.record("create_chat", model)
+        return FakeChat(self.sdk, model, config, history)
+
+
+class FakeCaches:
+    def __init__(self, sdk):
+        self.sdk = sdk
+        self.count = 0
+
+    def create(self, model, config=None):
+        self.sdk.record("create_cache", model)
+        self.count += 1
+        return _ns(name=f"cachedContents/{self.sdk.label}{self.count}", model=model)
+
+    def delete(self, name):
+        self.sdk.record("delete_cache", name)
+
+
+class FakeBatches:
+    def __init__(self, sdk):
+        self.sdk = sdk
+        self.jobs = {}
+
+    def create(self, model, src, config=None):
+        self.sdk.record("create_batch", src)
+        name = f"batches/{self.sdk.label}{len(self.jobs) + 1}"
+        self.jobs[name] = src
+        return _ns(name=name, state="JOB_STATE_PENDING")
+
+    def get(self, name):
+        self.sdk.record("get_batch", name)
+        if name not in self.jobs:
+            raise KeyError(f"{name} does not belong to {self.sdk.label}")
+        result = f"files/{name.split('/')[-1]}-results"
+        self.sdk.downloads[result] = b""
+        return _ns(name=name, state="JOB_STATE_SUCCEEDED", dest=_ns(file_name=result))
+
+
+class FakeGenai:
+    """google.genai client stand-in that records every call as (label, operation, detail)"""
+
+    def __init__(self, label: str = "default"):
+        self.label = label
+        self.log = []
+        self.fail_with = None
+        self.stream_chunks = ["one ", "two"]
+        self.downloads = {}
+        self.files = FakeFiles(self)
+        self.models = FakeModels(self)
+        self.chats = FakeChats(self)
+        self.caches = FakeCaches(self)
+        self.batches = FakeBatches(self)
+        self.aio = _ns(chats=self.chats)
+
+    def record(self, operation, detail=None):
+        self.log.append((self.label, operation, detail))
+
+    def calls(self, operation):
+        return [entry for entry in self.log if entry[1] == operation]
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    """Scratch working directory with a data_source/ of placeholder tracks"""
+    source = tmp_path / "data_source"
+    source.mkdir()
+    for name in TRACKS:
+        (source / name).write_bytes(b"ID3" + name.encode() * 64)
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+@pytest.fixture
+def fake_sdk():
+    return FakeGenai()
+
+
+class _FakeDiscord:
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: True
+
+
+@pytest.fixture
+def client(fake_sdk, monkeypatch):
+    """GeminiClient whose SDK calls go to fake_sdk, without Discord or pauses"""
+    import src.gemini.gemini_hooks.pipeline_calls as pipeline_calls
+    from src.gemini.gemini_client import GeminiClient
+
+    monkeypatch.setattr(pipeline_calls, "RATE_LIMIT_PAUSE", 0)
+    monkeypatch.delenv("GEMINI_API_KEYS", raising=False)
+    gemini = GeminiClient(api_key="test-key-0000")
+    gemini.__dict__["client"] = fake_sdk
+    gemini.__dict__["discord_client"] = _FakeDiscord()
+    return gemini
+
+
+@pytest.fixture
+def processor(workdir, client):
+    """AudioToImageProcessor writing under the scratch directory"""
+    from src.gemini.gemini_hooks.audio_to_image_processor import AudioToImageProcessor
+    return AudioToImageProcessor(client)
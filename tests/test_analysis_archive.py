@@ -0,0 +1,56 @@
+"""
+tests/test_analysis_archive.py - Archiving analyses without losing them to the pipeline (user-050)
+
+Related files:
+- src/gemini/gemini_utilities/analysis_archive.py
+- src/gemini/gemini_hooks/audio_to_image_processor.py
+"""
+
+from pathlib import Path
+
+import pytest
+
+from src.gemini.gemini_hooks.audio_to_image_processor import AudioToImageProcessor
+from src.gemini.gemini_utilities.catalogue_index import CatalogueIndex
+
+from conftest import TRACKS
+
+pytest.importorskip("zstandard")
+from src.gemini.gemini_utilities.analysis_archive import AnalysisArchive  # noqa: E402
+
+
+@pytest.fixture
+def archived(processor, workdir):
+    """A processed track whose analyses were migrated with remove=True"""
+    track = workdir / "data_source" / TRACKS[0]
+    catalogue = CatalogueIndex(workdir / "data_source")
+    catalogue.scan()
+    catalogue.record_result(track, processor.process_audio_file(track))
+    archive = AnalysisArchive(workdir / "output" / "analysis_archive.sqlite")
+    summary = archive.migrate(workdir / "output" / "analysis", remove=True,
+                              artifacts=processor.artifacts, catalogue=catalogue)
+    archive.close()
+    return track, catalogue, summary
+
+
+def test_migrate_keeps_the_outputs_the_catalogue_needs(archived):
+    track, catalogue, summary = archived
+    analysis_dir = Path("output/analysis")
+
+    assert summary["removed"] > 0 and summary["kept"] > 0
+    assert not (analysis_dir / f"{track.stem}_step1_analysis.txt").exists()
+    assert (analysis_dir / f"{track.stem}_analysis.txt").exists()
+    assert not catalogue.is_stale(track)
+
+
+def test_removed_analyses_are_restored_instead_of_rerun(archived, client, fake_sdk):
+    track, _, _ = archived
+    step1 = Path("output/analysis") / f"{track.stem}_step1_analysis.txt"
+    generated = len(fake_sdk.calls("generate"))
+
+    result = AudioToImageProcessor(client).perform_multi_step_analysis(track)
+
+    assert result["analysis_success"]
+    assert len(fake_sdk.calls("generate")) == generated
+    assert step1.read_text(encoding="utf-8").startswith("analysis text")
+
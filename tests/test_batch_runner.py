@@ -0,0 +1,126 @@
+"""
+tests/test_batch_runner.py - Batch runs of the pipeline (user-042)
+
+Related files:
+- src/gemini/gemini_hooks/batch_runner.py
+- src/gemini/gemini_apis/batch_api.py
+"""
+
+import json
+from pathlib import Path
+
+import pytest
+
+from src.gemini.gemini_apis.batch_api import GeminiBatchBackend, LocalBatchBackend
+from src.gemini.gemini_apis.key_pool import ApiKeyPool, KeyPoolMiddleware
+from src.gemini.gemini_apis.transport import GeminiTransport
+from src.gemini.gemini_hooks.batch_runner import BatchPipelineRunner
+from src.gemini.gemini_hooks.pipeline_steps import ANALYSIS_STEPS
+
+from conftest import FakeGenai, IMAGE_PROMPT_JSON, run_app
+
+
+def _responder(calls):
+    def respond(model, request):
+        prompt = request["contents"][0]["parts"][0]["text"]
+        calls.append(prompt)
+        return IMAGE_PROMPT_JSON if "json" in prompt.lower() else f"batch analysis {len(calls)}"
+    return respond
+
+
+def _tracks(workdir):
+    return sorted((workdir / "data_source").glob("*.mp3"))
+
+
+def test_runs_every_stage_through_the_local_backend(processor, workdir):
+    calls = []
+    backend = LocalBatchBackend(_responder(calls), workdir / "output" / "batch" / "jobs")
+    results = BatchPipelineRunner(processor, backend, poll_interval=0).run(_tracks(workdir))
+
+    assert [result["image_success"] for result in results] == [True, True]
+    # One request per track for every analysis step, the revision and the image prompt
+    assert len(calls) == 2 * (len(ANALYSIS_STEPS) + 2)
+    for result in results:
+        for step in ANALYSIS_STEPS:
+            assert Path(result[step.result_key]).read_text(encoding="utf-8").startswith(
+                "batch analysis")
+    state = json.loads((workdir / "output" / "batch" / "batch_state.json").read_text())
+    assert state["tracks"] == {} and state["jobs"] == []
+
+
+def test_resumes_submitted_jobs_instead_of_resubmitting(processor, workdir):
+    calls = []
+    backend = LocalBatchBackend(_responder(calls), workdir / "output" / "batch" / "jobs")
+    submitted = []
+    submit, poll = backend.submit, backend.poll
+    backend.submit = lambda *args, **kwargs: submitted.append(args) or submit(*args, **kwargs)
+
+    polls = {"count": 0}
+
+    def crash_on_third_poll(job_name):
+        polls["count"] += 1
+        if polls["count"] == 3:
+            raise KeyboardInterrupt
+        return poll(job_name)
+    backend.poll = crash_on_third_poll
+
+    with pytest.raises(KeyboardInterrupt):
+        BatchPipelineRunner(processor, backend, poll_interval=0).run(_tracks(workdir))
+    state = json.loads((workdir / "output" / "batch" / "batch_state.json").read_text())
+    assert [job["state"] for job in state["jobs"]] == ["pending"]
+    submitted_before = len(submitted)
+
+    backend.poll = poll
+    results = BatchPipelineRunner(processor, backend, poll_interval=0).run(_tracks(workdir))
+
+    assert all(result["image_success"] for result in results)
+    # The interrupted job was polled, not submitted again
+    assert submitted_before == 3
+    assert len(submitted) == submitted_before + len(ANALYSIS_STEPS) + 2 - 3
+    assert len(calls) == 2 * (len(ANALYSIS_STEPS) + 2)
+
+
+def test_gemini_backend_keeps_uploads_and_jobs_on_one_key(tmp_path):
+    pool = ApiKeyPool(["first-key-aaaa", "second-key-bbbb"])
+    sdks = {}
+    for key in pool.keys:
+        sdks[key.label] = key.__dict__["client"] = FakeGenai(key.label)
+    transport = GeminiTransport(client=FakeGenai("unpooled"),
+                                middleware=[KeyPoolMiddleware(pool)])
+    audio = tmp_path / "song.mp3"
+    audio.write_bytes(b"ID3")
+    requests = tmp_path / "requests.jsonl"
+    requests.write_text("{}\n")
+
+    backend = GeminiBatchBackend(transport)
+    for _ in range(4):
+        backend.upload_audio(audio)
+    job = backend.submit("gemini-2.0-flash", requests, "test")
+
+    used = {label for label, sdk in sdks.items() if sdk.log}
+    assert used == {backend.key}
+
+    # A resumed backend polls the job on the key that created it
+    resumed = GeminiBatchBackend(transport, key=backend.key)
+    assert resumed.poll(job) == "succeeded"
+    assert resumed.results(job) == {}
+
+
+def test_runner_restores_the_key_of_a_resumed_run(tmp_path):
+    state_path = tmp_path / "batch_state.json"
+    state_path.write_text(json.dumps({
+        "version": 1, "next_key": 1, "tracks": {}, "history": [], "backend_key": "key2(...bbbb)",
+        "jobs": [{"step": "step1", "job": "batches/1", "state": "running"}]}))
+    backend = LocalBatchBackend(lambda model, request: "", tmp_path / "jobs")
+
+    BatchPipelineRunner(None, backend, state_path=state_path)
+
+    assert backend.key == "key2(...bbbb)"
+
+
+def test_the_entry_point_accepts_the_batch_options(tmp_path):
+    # Without a mode the usage is printed, after both parsers accepted the options
+    completed = run_app(tmp_path, "--batch", "--poll", "5")
+
+    assert completed.returncode == 0, completed.stderr
+    assert "--batch" in completed.stdout
@@ -0,0 +1,43 @@
+"""
+tests/test_catalogue_index.py - Stage status per track (user-026)
+
+Related files:
+- src/gemini/gemini_utilities/catalogue_index.py
+- src/gemini/gemini_hooks/audio_to_image_processor.py
+"""
+
+from pathlib import Path
+
+from src.gemini.gemini_utilities.catalogue_index import CatalogueIndex
+
+from conftest import TRACKS
+
+
+def test_processed_tracks_are_no_longer_pending(processor, workdir):
+    catalogue = CatalogueIndex(workdir / "data_source")
+    catalogue.scan()
+    track = workdir / "data_source" / TRACKS[0]
+
+    catalogue.record_result(track, processor.process_audio_file(track))
+
+    assert catalogue.pending_tracks() == [workdir / "data_source" / TRACKS[1]]
+    (workdir / "data_source" / TRACKS[0]).write_bytes(b"ID3 changed")
+    catalogue.scan()
+    assert catalogue.is_stale(track)
+
+
+def test_a_skipped_revision_counts_as_up_to_date(processor, workdir):
+    track = workdir / "data_source" / TRACKS[0]
+    processor.process_audio_file(track)
+    # Existing analyses without a refinement are reused, so there is nothing to revise
+    for name in ("refined", "revised"):
+        processor.artifacts.delete(Path("output/analysis") / f"{track.stem}_{name}_analysis.txt")
+    catalogue = CatalogueIndex(workdir / "data_source")
+    catalogue.scan()
+
+    result = processor.process_audio_file(track)
+    catalogue.record_result(track, result)
+
+    assert result["revision_skipped"] == "no refined analysis"
+    assert catalogue.get_track(track)["stages"]["revision"]["status"] == "skipped"
+    assert not catalogue.is_stale(track)
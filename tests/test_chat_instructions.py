@@ -0,0 +1,48 @@
+"""
+tests/test_chat_instructions.py - Native system instructions and cached long ones (user-046)
+
+Related files:
+- src/gemini/gemini_apis/chat_api.py
+- src/gemini/gemini_apis/instruction_cache.py
+"""
+
+from src.gemini.gemini_apis.chat_api import create_chat
+from src.gemini.gemini_apis.instruction_cache import InstructionCache
+
+LONG_INSTRUCTION = "Describe every instrument you hear in the track. " * 40
+
+
+def test_the_instruction_travels_in_the_chat_config(client, fake_sdk):
+    chat = create_chat(client.transport, "gemini-2.0-flash", "Answer briefly.")
+
+    assert chat._config.system_instruction == "Answer briefly."
+    assert chat.history == []
+    assert not fake_sdk.calls("send_message") and not fake_sdk.calls("create_cache")
+
+
+def test_a_long_instruction_is_cached_once_for_every_chat(client, fake_sdk):
+    cache = InstructionCache(client.transport, min_tokens=100)
+
+    chats = [create_chat(client.transport, "gemini-2.0-flash", LONG_INSTRUCTION,
+                         instruction_cache=cache) for _ in range(3)]
+    cache.clear()
+
+    names = {chat._config.cached_content for chat in chats}
+    assert len(names) == 1 and None not in names
+    assert all(chat._config.system_instruction is None for chat in chats)
+    assert len(fake_sdk.calls("create_cache")) == 1
+    assert fake_sdk.calls("delete_cache") == [("default", "delete_cache", names.pop())]
+
+
+def test_a_short_or_uncacheable_instruction_is_sent_inline(client, fake_sdk, monkeypatch):
+    cache = InstructionCache(client.transport, min_tokens=100)
+    assert cache.get("gemini-2.0-flash", "Answer briefly.") is None
+
+    def refuse(model, config=None):
+        raise RuntimeError("caching unavailable")
+    monkeypatch.setattr(fake_sdk.caches, "create", refuse)
+    chat = create_chat(client.transport, "gemini-2.0-flash", LONG_INSTRUCTION,
+                       instruction_cache=cache)
+
+    assert chat._config.system_instruction == LONG_INSTRUCTION
+    assert chat._config.cached_content is None
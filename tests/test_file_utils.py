@@ -0,0 +1,65 @@
+"""
+tests/test_file_utils.py - Atomic saves and where their fsyncs happen (user-049)
+
+Related files:
+- src/gemini/gemini_utilities/file_utils.py
+- src/gemini/gemini_utilities/atomic_files.py
+- src/gemini/gemini_hooks/audio_to_image_processor.py
+"""
+
+import os
+import threading
+from pathlib import Path
+
+import pytest
+
+from src.gemini.gemini_utilities import atomic_files
+from src.gemini.gemini_utilities.file_utils import save_json, save_text
+
+from conftest import TRACKS, run_app
+
+
+@pytest.fixture
+def fsyncs(monkeypatch):
+    """Names of the threads that called os.fsync"""
+    threads = []
+    real_fsync = os.fsync
+
+    def recording_fsync(descriptor):
+        threads.append(threading.current_thread().name)
+        real_fsync(descriptor)
+    monkeypatch.setattr(atomic_files.os, "fsync", recording_fsync)
+    return threads
+
+
+def test_saves_are_atomic_and_sync_only_when_asked(tmp_path, fsyncs):
+    target = tmp_path / "out" / "notes.txt"
+
+    save_text("first", target)
+    save_json({"a": 1}, tmp_path / "out" / "data.json")
+    assert fsyncs == []
+    assert target.read_text() == "first"
+
+    save_text("second", target, durable=True)
+    assert fsyncs and target.read_text() == "second"
+    assert sorted(path.name for path in target.parent.iterdir()) == ["data.json", "notes.txt"]
+
+
+def test_the_pipeline_syncs_its_outputs_off_the_step_thread(processor, workdir, fsyncs):
+    track = workdir / "data_source" / TRACKS[0]
+
+    results = processor.process_audio_file(track)
+
+    assert results["image_success"]
+    assert fsyncs and set(fsyncs) == {"write-behind"}
+    # The track's outputs are on disk by the time its result is returned
+    paths = [value for key, value in results.items() if key.endswith("_path") and value]
+    assert results["image_path"] in paths
+    assert all(Path(path).exists() for path in paths)
+
+
+def test_the_entry_point_accepts_no_write_behind(tmp_path):
+    completed = run_app(tmp_path, "--no-write-behind")
+
+    assert completed.returncode == 0, completed.stderr
+    assert "--no-write-behind" in completed.stdout
@@ -0,0 +1,67 @@
+"""
+tests/test_generated_image.py - Images saved as the bytes the API returned (user-029)
+
+Related files:
+- src/gemini/gemini_utilities/generated_image.py
+- src/gemini/gemini_hooks/image_stage.py
+"""
+
+from pathlib import Path
+
+from PIL import Image
+
+from src.gemini.gemini_utilities.generated_image import GeneratedImage, ImagePostProcessor
+
+import conftest
+from conftest import png_bytes
+
+
+def test_the_pipeline_writes_the_returned_bytes(processor, workdir, monkeypatch):
+    # Trailing bytes survive only if the image is never decoded and encoded again
+    returned = png_bytes() + b"untouched"
+    monkeypatch.setattr(conftest, "png_bytes", lambda *args, **kwargs: returned)
+    track = sorted((workdir / "data_source").glob("*.mp3"))[0]
+
+    result = processor.process_audio_file(track)
+
+    image_path = Path(result["image_path"])
+    assert image_path.suffix == ".png"
+    assert image_path.read_bytes() == returned
+
+
+def test_an_image_is_only_decoded_to_change_its_format(tmp_path):
+    image = GeneratedImage(png_bytes(), "image/png")
+
+    image.save(tmp_path / "same.png")
+    assert image._image is None
+    assert (tmp_path / "same.png").read_bytes() == image.data
+
+    image.save(tmp_path / "other.jpg")
+    assert image._image is not None
+    with Image.open(tmp_path / "other.jpg") as converted:
+        assert converted.format == "JPEG"
+
+
+def test_conversions_and_thumbnails_run_in_the_background(tmp_path):
+    source = GeneratedImage(png_bytes(size=(200, 100))).save(tmp_path / "cover.png")
+    post_processor = ImagePostProcessor(convert_to="jpg", thumbnail_size=(50, 50))
+
+    outputs = post_processor.submit(source).result()
+    post_processor.shutdown()
+
+    assert Path(outputs["converted_path"]) == tmp_path / "cover.jpg"
+    with Image.open(outputs["thumbnail_path"]) as thumbnail:
+        assert thumbnail.size == (50, 25)
+
+
+def test_finished_post_processing_is_forgotten_and_failures_logged(tmp_path, caplog):
+    source = GeneratedImage(png_bytes()).save(tmp_path / "cover.png")
+    post_processor = ImagePostProcessor(thumbnail_size=(16, 16))
+
+    post_processor.submit(source)
+    post_processor.submit(tmp_path / "missing.png")
+    # Joins the workers, so the done callbacks have run as well
+    post_processor.shutdown()
+
+    assert post_processor._futures == set()
+    assert "Image post-processing failed" in caplog.text
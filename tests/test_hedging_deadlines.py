@@ -0,0 +1,81 @@
+"""
+tests/test_hedging_deadlines.py - Hedged requests and per-step deadlines (user-041)
+
+Related files:
+- src/gemini/gemini_apis/hedging_middleware.py
+- src/gemini/gemini_apis/middleware_layers.py
+- src/gemini/gemini_apis/model_request.py
+"""
+
+import threading
+
+import pytest
+
+from src.gemini.gemini_apis.middleware import (HedgingMiddleware, ModelRequest, RetryMiddleware,
+                                               TimeoutMiddleware, call_context)
+
+
+def _request():
+    with call_context(step="Step 1"):
+        return ModelRequest("generate_content", model="gemini-2.0-flash")
+
+
+def test_a_slow_call_is_hedged_and_the_first_response_wins():
+    hedging = HedgingMiddleware(min_samples=2, max_hedge_ratio=1.0)
+    for _ in range(2):
+        hedging(_request(), lambda request: "warm")
+    release = threading.Event()
+    primary = _request()
+
+    def send(request):
+        if request.tags.get("hedge"):
+            return "hedge"
+        release.wait(5)
+        return "primary"
+
+    assert hedging(primary, send) == "hedge"
+    assert primary.cancelled.is_set()
+    release.set()
+    assert hedging.get_status()["hedges"] == 1 and hedging.hedge_wins == 1
+
+
+def test_no_hedge_is_sent_past_the_hedge_budget():
+    hedging = HedgingMiddleware(min_samples=2, max_hedge_ratio=0.1)
+    for _ in range(2):
+        hedging(_request(), lambda request: "warm")
+    sent = []
+
+    def send(request):
+        sent.append(request)
+        threading.Event().wait(0.05)
+        return "primary"
+
+    assert hedging(_request(), send) == "primary"
+    assert len(sent) == 1 and hedging.hedges == 0
+
+
+def test_a_call_is_abandoned_at_its_deadline():
+    release = threading.Event()
+    with call_context(deadline=0.2, step="Step 1"):
+        # A nested block cannot extend the deadline around it
+        with call_context(deadline=60):
+            request = ModelRequest("generate_content", model="gemini-2.0-flash")
+
+    with pytest.raises(TimeoutError):
+        TimeoutMiddleware(timeout=600)(request, lambda request: release.wait(5))
+    release.set()
+    assert request.http_timeout <= 0.2
+
+
+def test_no_retry_is_started_that_could_not_finish_in_time():
+    attempts = []
+
+    def fail(request):
+        attempts.append(request.attempt)
+        raise TimeoutError("slow")
+
+    with call_context(deadline=1.0):
+        request = ModelRequest("generate_content", model="gemini-2.0-flash")
+    with pytest.raises(TimeoutError):
+        RetryMiddleware(max_attempts=3, base_delay=10)(request, fail)
+    assert attempts == [1]
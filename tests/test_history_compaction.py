@@ -0,0 +1,63 @@
+"""
+tests/test_history_compaction.py - Bounded chat histories through compaction (user-044)
+
+Related files:
+- src/gemini/gemini_hooks/conversation_manager.py
+- src/gemini/gemini_hooks/history_compaction.py
+- src/gemini/gemini_hooks/history_offload.py
+"""
+
+from google.genai import types
+
+from src.gemini.gemini_hooks.conversation_manager import SUMMARY_PREFIX, ConversationManager
+from src.gemini.gemini_utilities.rate_limiter import RateLimiter
+
+from conftest import png_bytes
+
+
+def _manager(client, **options):
+    return ConversationManager(api_key="test-key-0000", model_name="gemini-2.0-flash",
+                               rate_limiter=RateLimiter(), transport=client.transport,
+                               **options)
+
+
+def _texts(content):
+    return [part.text for part in content.parts if part.text]
+
+
+def test_old_turns_are_replaced_by_a_summary(client, fake_sdk):
+    manager = _manager(client, max_history_tokens=1, keep_recent_turns=1)
+
+    for message in ("first", "second", "third"):
+        assert manager.send_message(message) == "reply"
+        # Waits for the compaction the turn scheduled
+        history = manager.get_history_contents()
+    manager.close()
+
+    assert _texts(history[0])[0].startswith(SUMMARY_PREFIX)
+    assert _texts(history[-2]) == ["third"] and _texts(history[-1]) == ["reply"]
+    assert len(history) == 4
+    assert fake_sdk.calls("generate")
+    assert manager.get_compaction_stats()["summarised_turns"] == 3
+
+
+def test_large_inline_parts_are_uploaded_once_and_referenced(client, fake_sdk):
+    manager = _manager(client, max_history_tokens=None, offload_inline_bytes=100)
+    image = types.Part.from_bytes(data=png_bytes(size=(256, 256)), mime_type="image/png")
+    manager.create_chat(history=[
+        types.Content(role="user", parts=[types.Part.from_text(text="cover"), image]),
+        types.Content(role="model", parts=[types.Part.from_text(text="nice")]),
+        types.Content(role="user", parts=[image]),
+        types.Content(role="model", parts=[types.Part.from_text(text="same one")])])
+
+    manager.send_message("and now?")
+    history = manager.get_history_contents()
+    stats = manager.get_compaction_stats()
+    manager.close()
+
+    references = [part.file_data for content in history for part in content.parts
+                  if part.file_data is not None]
+    assert len(references) == 2 and references[0].file_uri == references[1].file_uri
+    assert not any(part.inline_data for content in history for part in content.parts)
+    assert len(fake_sdk.calls("upload")) == 1
+    assert stats["offloaded_parts"] == 1 and stats["resident_bytes"] < len(image.inline_data.data)
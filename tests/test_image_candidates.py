@@ -0,0 +1,43 @@
+"""
+tests/test_image_candidates.py - Several image candidates ranked locally (user-030)
+
+Related files:
+- src/gemini/gemini_hooks/image_stage.py
+- src/gemini/gemini_utilities/image_ranking.py
+"""
+
+import os
+from pathlib import Path
+
+from PIL import Image
+
+from src.gemini.gemini_hooks.audio_to_image_processor import AudioToImageProcessor
+from src.gemini.gemini_utilities.image_ranking import rank_candidates
+
+
+def test_the_palette_named_in_the_prompt_wins():
+    navy = Image.new("RGB", (64, 64), (25, 25, 112))
+    red = Image.new("RGB", (64, 64), (220, 20, 20))
+
+    ranking = rank_candidates([red, navy], reference_text="deep #191970 sky")
+
+    assert [entry["index"] for entry in ranking] == [1, 0]
+    assert ranking[0]["palette"] > ranking[1]["palette"]
+
+
+def test_every_candidate_is_saved_and_the_best_is_linked(client, workdir, fake_sdk):
+    processor = AudioToImageProcessor(client, image_candidates=3)
+    track = sorted((workdir / "data_source").glob("*.mp3"))[0]
+
+    result = processor.process_audio_file(track)
+
+    assert result["image_success"]
+    ranking = result["image_candidates"]
+    assert len(ranking) == 3
+    assert [entry["score"] for entry in ranking] == sorted(
+        (entry["score"] for entry in ranking), reverse=True)
+    assert all(Path(entry["path"]).exists() for entry in ranking)
+
+    best = Path(result["image_path"])
+    assert best.name == f"{track.stem}_best.png"
+    assert os.path.samefile(best, ranking[0]["path"])
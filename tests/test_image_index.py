@@ -0,0 +1,46 @@
+"""
+tests/test_image_index.py - Image scores and the perceptual-hash index (user-033)
+
+Related files:
+- src/gemini/gemini_utilities/image_index.py
+- src/gemini/gemini_utilities/image_ranking.py
+"""
+
+import numpy as np
+from PIL import Image
+
+from src.gemini.gemini_utilities.image_index import ImageHashIndex
+from src.gemini.gemini_utilities.image_ranking import rank_candidates
+
+
+def _noise(seed, size=64):
+    pixels = np.random.default_rng(seed).integers(0, 256, (size, size, 3), dtype=np.uint8)
+    return Image.fromarray(pixels)
+
+
+def test_a_lone_image_gets_an_absolute_score():
+    flat = Image.new("RGB", (64, 64), (25, 25, 112))
+
+    # A flat image has no detail, so nothing in the score favours it
+    assert rank_candidates([flat])[0]["score"] == 0.0
+    assert rank_candidates([_noise(1)])[0]["score"] > 0.9
+    # A matching palette counts; a palette the text does not ask for does not
+    assert rank_candidates([flat], "midnight blue #191970")[0]["score"] > 0.5
+    assert rank_candidates([flat], "bright yellow")[0]["score"] < 0.5
+
+
+def test_re_adding_an_image_updates_the_tree_in_place(tmp_path):
+    index = ImageHashIndex(tmp_path / "index.sqlite")
+    first, second = _noise(1), _noise(2)
+    first.save(tmp_path / "a.png")
+    _noise(3).save(tmp_path / "b.png")
+    index.add(tmp_path / "a.png", first)
+    index.add(tmp_path / "b.png")
+    tree = index.tree
+
+    index.add(tmp_path / "a.png", second)
+
+    assert index.tree is tree and tree.size == 2
+    assert [entry["path"] for entry in index.find_similar(second, max_distance=0)] == [
+        str(tmp_path / "a.png")]
+    assert index.find_similar(first, max_distance=0) == []
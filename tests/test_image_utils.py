@@ -0,0 +1,38 @@
+"""
+tests/test_image_utils.py - Procedural fallback art (user-032)
+
+Related files:
+- src/gemini/gemini_utilities/image_utils.py
+"""
+
+import numpy as np
+
+from src.gemini.gemini_utilities.image_utils import (create_fallback_image,
+                                                     create_fallback_images,
+                                                     render_procedural_art)
+
+
+def test_a_description_always_renders_the_same_art():
+    first = render_procedural_art(["warm synthwave", "cold ambient"], 64, 48)
+    again = render_procedural_art(["cold ambient"], 64, 48)
+
+    assert first.shape == (2, 48, 64, 3) and first.dtype == np.uint8
+    assert np.array_equal(first[1], again[0])
+    assert not np.array_equal(first[0], first[1])
+
+
+def test_colours_named_in_the_text_lead_the_palette():
+    red, blue = render_procedural_art(["crimson red red red", "deep blue blue blue"], 64, 64)
+
+    assert red[..., 0].mean() > red[..., 2].mean()
+    assert blue[..., 2].mean() > blue[..., 0].mean()
+
+
+def test_batch_and_single_fallbacks_match():
+    batch = create_fallback_images(["first track", "second track"], 128, 128)
+    single = create_fallback_image(None, "second track")
+
+    assert [image.size for image in batch] == [(128, 128), (128, 128)]
+    assert single.size == (512, 512)
+    assert np.array_equal(np.asarray(create_fallback_images(["second track"])[0]),
+                          np.asarray(single))
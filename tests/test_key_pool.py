@@ -0,0 +1,67 @@
+"""
+tests/test_key_pool.py - Several API keys balanced by remaining quota (user-039)
+
+Related files:
+- src/gemini/gemini_apis/key_pool.py
+- src/gemini/gemini_apis/api_key_pool.py
+- src/gemini/gemini_apis/api_key.py
+"""
+
+import pytest
+from google.genai import types
+
+from conftest import FakeGenai, TRACKS
+
+
+class QuotaExceeded(Exception):
+    code = 429
+
+
+@pytest.fixture
+def pooled(client, monkeypatch):
+    """The client fixture's GeminiClient, rebuilt over two keys with a fake SDK each"""
+    from src.gemini.gemini_client import GeminiClient
+
+    gemini = GeminiClient(api_keys=["test-key-aaaa", "test-key-bbbb"])
+    gemini.__dict__["discord_client"] = client.discord_client
+    for key, label in zip(gemini.key_pool.keys, "ab"):
+        key.__dict__["client"] = FakeGenai(label)
+    return gemini
+
+
+def _sdks(gemini):
+    return [key.client for key in gemini.key_pool.keys]
+
+
+def test_calls_are_spread_over_the_keys(pooled):
+    for _ in range(4):
+        pooled.generate_content("hello")
+
+    assert [len(sdk.calls("generate")) for sdk in _sdks(pooled)] == [2, 2]
+
+
+def test_a_key_over_quota_cools_down_and_the_call_moves_on(pooled):
+    first, second = _sdks(pooled)
+    first.fail_with = QuotaExceeded("quota")
+
+    assert pooled.generate_content("hello") == "analysis text from " + pooled.model_name
+    pooled.generate_content("hello again")
+
+    status = pooled.key_pool.get_status()
+    assert len(first.calls("generate")) == 1 and len(second.calls("generate")) == 2
+    assert status[pooled.key_pool.keys[0].label]["cooldown_seconds"] > 0
+    assert not status[pooled.key_pool.keys[0].label]["available"]
+
+
+def test_uploaded_files_stay_on_the_key_that_owns_them(pooled, workdir):
+    uploaded = pooled.upload_file(str(workdir / "data_source" / TRACKS[0]))
+    owner = pooled.key_pool.owner(uploaded.name)
+    # The upload spent a call of the owner, so balancing alone would pick the other key
+
+    pooled.analyze_audio(uploaded, "Describe the track")
+    by_uri = types.Part.from_uri(file_uri=uploaded.uri, mime_type="audio/mpeg")
+    pooled.transport.generate_content(model=pooled.model_name,
+                                      contents=["Describe the track", by_uri])
+
+    assert len(owner.client.calls("generate")) == 2
+    assert all(not sdk.calls("generate") for sdk in _sdks(pooled) if sdk is not owner.client)
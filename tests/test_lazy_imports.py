@@ -0,0 +1,53 @@
+"""
+tests/test_lazy_imports.py - Deferred SDK imports for fast startup (user-036)
+
+Related files:
+- src/gemini/gemini_utilities/lazy_import.py
+- src/gemini/gemini_client.py
+- src/audio_image_generator.py
+"""
+
+import sys
+import json
+import subprocess
+from pathlib import Path
+
+from src.gemini.gemini_utilities.lazy_import import LazyModule, lazy_import
+
+ROOT = Path(__file__).resolve().parent.parent
+
+HEAVY = ("google.genai", "requests", "numpy",
+         "src.gemini.gemini_hooks.audio_to_image_processor")
+
+# Runs in a fresh interpreter, since this test session has already imported everything
+PROBE = f"""
+import sys, json
+loaded = lambda: [name for name in {HEAVY!r} if name in sys.modules]
+from src.main import AudioImageGenerator
+from src.gemini.gemini_client import GeminiClient
+client = GeminiClient(api_key="test-key")
+after_start = loaded()
+client.client
+print(json.dumps({{"after_start": after_start, "after_use": loaded()}}))
+"""
+
+
+def test_startup_defers_the_sdk_until_the_first_call():
+    probe = subprocess.run([sys.executable, "-c", PROBE], cwd=ROOT, check=True,
+                           capture_output=True, text=True)
+
+    loaded = json.loads(probe.stdout.strip().splitlines()[-1])
+    assert loaded["after_start"] == []
+    assert "google.genai" in loaded["after_use"]
+
+
+def test_a_lazy_module_imports_on_first_attribute_access():
+    sys.modules.pop("colorsys", None)
+
+    module = lazy_import("colorsys")
+
+    assert isinstance(module, LazyModule)
+    assert "colorsys" not in sys.modules
+    assert module.rgb_to_hsv(1, 0, 0) == (0.0, 1.0, 1)
+    assert "colorsys" in sys.modules
+    assert lazy_import("colorsys") is sys.modules["colorsys"]
@@ -0,0 +1,53 @@
+"""
+tests/test_legacy_processors.py - AudioProcessor and ImageProcessor save through the store (user-048)
+
+Related files:
+- src/gemini/gemini_hooks/audio_processor.py
+- src/gemini/gemini_hooks/image_processor.py
+- src/gemini/gemini_utilities/artifact_store.py
+"""
+
+import os
+import json
+from pathlib import Path
+
+from conftest import TRACKS
+
+
+def test_audio_processor_saves_the_analysis_as_an_artifact(processor, workdir):
+    track = workdir / "data_source" / TRACKS[0]
+
+    text = processor.audio_processor.analyze_audio(track)
+
+    analysis_path = Path("output/analysis") / f"{track.stem}_analysis.txt"
+    record = processor.artifacts.record(analysis_path)
+    assert record["kind"] == "analysis" and record["track"] == track.name
+    assert analysis_path.read_text(encoding="utf-8") == text
+    assert processor.audio_processor.load_analysis(track.stem) == text
+
+
+def test_image_processor_replaces_outputs_without_touching_their_blobs(processor, workdir,
+                                                                      fake_sdk):
+    track = workdir / "data_source" / TRACKS[0]
+    assert processor.process_audio_file(track)["image_success"]
+    prompt_path = Path("output/images/prompts") / f"{track.stem}_prompt.json"
+    image_path = Path("output/images") / f"{track.stem}_image.png"
+    old_prompt = processor.artifacts.record(prompt_path)
+    old_image = processor.artifacts.record(image_path)
+
+    images = processor.image_processor
+    images.save_prompt({"prompt": "changed", "audio_file": track.name}, track.stem)
+    fake_sdk.fail_with = RuntimeError("image model down")
+    _, fallback_path = images.generate_image(
+        {"prompt": "changed", "audio_file": track.name}, track.stem)
+
+    assert fallback_path == image_path
+    assert json.loads(prompt_path.read_text())["prompt"] == "changed"
+    assert processor.artifacts.get_json(prompt_path)["prompt"] == "changed"
+    assert processor.artifacts.record(image_path)["content_hash"] != old_image["content_hash"]
+    # The view files point at the new blobs; the earlier versions are still intact
+    for path, old in ((prompt_path, old_prompt), (image_path, old_image)):
+        blob = processor.artifacts._blob_path(processor.artifacts.record(path)["content_hash"])
+        assert os.path.samefile(path, blob)
+    old_blob = processor.artifacts._blob_path(old_prompt["content_hash"])
+    assert json.loads(old_blob.read_text())["prompt"] == "neon city at night"
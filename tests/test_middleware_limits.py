@@ -0,0 +1,56 @@
+"""
+tests/test_middleware_limits.py - Rate limit layers that wait without holding a lock (user-038)
+
+Related files:
+- src/gemini/gemini_apis/middleware.py
+- src/gemini/gemini_apis/key_pool.py
+- src/gemini/gemini_apis/model_router.py
+"""
+
+import threading
+
+import src.gemini.gemini_utilities.rate_limiter as rate_limiter_module
+from src.gemini.gemini_apis.middleware import (HedgingMiddleware, ModelRequest,
+                                               RateLimitMiddleware, default_middleware)
+from src.gemini.gemini_utilities.rate_limiter import RateLimiter
+
+
+def test_requests_over_the_limit_wait_side_by_side(monkeypatch):
+    limiter = RateLimiter(max_calls_per_minute=1)
+    limiter.check_and_wait()
+    layer = RateLimitMiddleware(limiter)
+    sleepers, release = [], threading.Event()
+    both_waiting = threading.Barrier(3, timeout=5)
+
+    def sleep(seconds):
+        sleepers.append(threading.current_thread().name)
+        both_waiting.wait()
+        release.wait(5)
+        limiter.max_calls_per_minute = 10
+    monkeypatch.setattr(rate_limiter_module.time, "sleep", sleep)
+
+    sent = []
+    threads = [threading.Thread(target=layer, args=(
+        ModelRequest("generate_content", model="gemini-2.0-flash"), sent.append))
+        for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    # Neither request holds the layer while it waits, so both reach the wait
+    both_waiting.wait()
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert len(sleepers) == 2 and len(sent) == 2
+
+
+def test_a_hedge_is_only_counted_when_it_need_not_wait():
+    limiter = RateLimiter(max_calls_per_minute=2)
+    hedging = next(layer for layer in default_middleware(rate_limiter=limiter)
+                   if isinstance(layer, HedgingMiddleware))
+    request = ModelRequest("generate_content", model="gemini-2.0-flash")
+
+    assert hedging.has_quota(request) is True
+    assert hedging.has_quota(request) is True
+    assert hedging.has_quota(request) is False
+    assert limiter.get_status()["minute"]["used"] == 2
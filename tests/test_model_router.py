@@ -0,0 +1,30 @@
+"""
+tests/test_model_router.py - Model tiers and their limits (user-040)
+
+Related files:
+- src/gemini/gemini_apis/model_router.py
+- src/gemini/gemini_client.py
+"""
+
+from src.gemini.gemini_apis.model_router import default_tiers
+from src.gemini.gemini_client import GeminiClient
+
+
+def test_tier_limits_scale_with_the_number_of_keys():
+    single, pooled = default_tiers(), default_tiers(key_count=3)
+    for name, tier in single.items():
+        for limit in ("max_calls_per_minute", "max_calls_per_day", "max_tokens_per_minute"):
+            assert pooled[name][limit] == 3 * tier[limit]
+
+
+def test_pooled_client_can_use_every_key_budget(monkeypatch):
+    monkeypatch.delenv("GEMINI_API_KEYS", raising=False)
+    gemini = GeminiClient(api_keys=["first-key-aaaa", "second-key-bbbb", "third-key-cccc"])
+    tier = gemini.model_router.tiers["standard"]
+    minute_limit = tier.rate_limiter.get_status()["minute"]["limit"]
+
+    assert minute_limit == 3 * default_tiers()["standard"]["max_calls_per_minute"]
+    # One key's worth of calls leaves the tier open for the other keys
+    for _ in range(default_tiers()["standard"]["max_calls_per_minute"]):
+        tier.rate_limiter.check_and_wait()
+    assert tier.exhausted() is None
@@ -0,0 +1,49 @@
+"""
+tests/test_pipeline_planner.py - Call elision and strict planning (user-031)
+
+Related files:
+- src/gemini/gemini_hooks/pipeline_planner.py
+- src/gemini/gemini_hooks/audio_to_image_processor.py
+"""
+
+import pytest
+
+from src.gemini.gemini_hooks.audio_to_image_processor import AudioToImageProcessor
+from src.gemini.gemini_hooks.pipeline_planner import (PIPELINE_CALLS, DeadCallError,
+                                                      PipelinePlanner)
+
+from conftest import TRACKS
+
+
+def test_the_prelisten_call_is_elided(processor, workdir, fake_sdk):
+    result = processor.process_audio_file(workdir / "data_source" / TRACKS[0])
+
+    assert result["image_success"]
+    assert result["elided_calls"] == ["image_prelisten"]
+    assert processor.planner.get_summary()["elided_calls"] == {"image_prelisten": 1}
+
+
+def test_strict_mode_accepts_the_declared_pipeline(client, workdir):
+    processor = AudioToImageProcessor(client, strict_planning=True)
+
+    assert processor.process_audio_file(workdir / "data_source" / TRACKS[0])["image_success"]
+
+
+def test_strict_mode_raises_for_a_call_missing_from_the_graph(client, workdir, fake_sdk):
+    processor = AudioToImageProcessor(client, strict_planning=True)
+    processor.planner = PipelinePlanner(
+        {name: call for name, call in PIPELINE_CALLS.items() if name != "step3_analysis"},
+        strict=True)
+
+    with pytest.raises(DeadCallError, match="step3_analysis"):
+        processor.process_audio_file(workdir / "data_source" / TRACKS[0])
+    # Steps 1 and 2 ran; nothing after the undeclared step was sent
+    assert len(fake_sdk.calls("generate")) == 2
+
+
+def test_strict_mode_raises_for_a_dead_call():
+    calls = dict(PIPELINE_CALLS, notes={"inputs": ["audio"], "outputs": ["notes"]})
+
+    with pytest.raises(DeadCallError, match="notes"):
+        PipelinePlanner(calls, strict=True)
+    assert not PipelinePlanner(calls).should_run("notes")
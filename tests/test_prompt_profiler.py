@@ -0,0 +1,44 @@
+"""
+tests/test_prompt_profiler.py - Token and redundancy report of the prompt chain (user-035)
+
+Related files:
+- src/gemini/gemini_prompts/prompt_profiler.py
+- src/gemini/gemini_prompts/prompt_redundancy.py
+- src/gemini/gemini_prompts/prompt_profiler_cli.py
+"""
+
+import json
+
+from src.gemini.gemini_prompts.prompt_profiler import PIPELINE_CHAIN
+from src.gemini.gemini_prompts.prompt_profiler_cli import main
+from src.gemini.gemini_prompts.prompt_redundancy import find_repeated_spans
+
+SHARED = "Listen to the whole track five times before you write anything down."
+
+
+def test_a_sentence_sent_in_two_calls_is_reported_once():
+    spans = find_repeated_spans({"first": [f"{SHARED} Drums?"],
+                                 "second": [f"{SHARED} Vocals?"]})
+
+    assert len(spans) == 1
+    assert spans[0]["text"] == SHARED
+    assert spans[0]["calls"] == ["first", "second"]
+    assert spans[0]["wasted_tokens"] == spans[0]["tokens"]
+
+
+def test_the_cli_profiles_every_call_offline(tmp_path, capsys):
+    report = tmp_path / "profile.json"
+
+    assert main(["--analysis-dir", str(tmp_path), "--prompt-dir", str(tmp_path),
+                 "--synthetic-tokens", "50", "--json", str(report)]) == 0
+
+    profile = json.loads(report.read_text())
+    assert [call["call"] for call in profile["calls"]] == [
+        step["call"] for step in PIPELINE_CHAIN]
+    for call in profile["calls"]:
+        assert sum(section["tokens"] for section in call["sections"]) == call["input_tokens"]
+    assert profile["totals"]["input_tokens"] == sum(
+        call["input_tokens"] for call in profile["calls"])
+    step1 = next(slot for slot in profile["resent_slots"] if slot["output"] == "step1")
+    assert step1["sends"] == len(step1["calls"])
+    assert "step1_analysis" in capsys.readouterr().out
@@ -0,0 +1,43 @@
+"""
+tests/test_prompt_registry.py - Precompiled, versioned prompt templates (user-034)
+
+Related files:
+- src/gemini/gemini_prompts/prompt_registry.py
+- src/gemini/gemini_prompts/prompt_template.py
+"""
+
+import pytest
+
+from src.gemini.gemini_prompts.prompt_registry import PromptRegistry, prompt_registry
+
+
+def test_compiled_templates_render_like_their_functions():
+    for name in prompt_registry.names():
+        template = prompt_registry.get(name)
+        slots = {slot: f"<{slot} value>" for slot in template.slots}
+
+        rendered = prompt_registry.render(name, **slots)
+
+        assert rendered["text"] == template.function(**slots), name
+        assert rendered["version_id"] == template.version_id
+
+
+def test_a_changed_prompt_gets_a_new_version_id():
+    registry = PromptRegistry()
+    old = registry.register("greeting", lambda artist: f"Hello {artist}.").version_id
+    new = registry.register("greeting", lambda artist: f"Hello there {artist}.").version_id
+
+    assert old != new
+    assert registry.find_version(old) is None
+    assert registry.find_version(new) is registry.get("greeting")
+    assert registry.render("greeting", artist="Ada")["text"] == "Hello there Ada."
+
+
+def test_wrong_slots_are_rejected():
+    registry = PromptRegistry()
+    registry.register("greeting", lambda artist: f"Hello {artist}.")
+
+    with pytest.raises(TypeError):
+        registry.render("greeting")
+    with pytest.raises(TypeError):
+        registry.render("greeting", artist="Ada", mood="happy")
@@ -0,0 +1,48 @@
+"""
+tests/test_rate_limiter.py - Waiting for the rate limits without blocking other callers (user-043)
+
+Related files:
+- src/gemini/gemini_utilities/rate_limiter.py
+"""
+
+import threading
+
+import src.gemini.gemini_utilities.rate_limiter as rate_limiter_module
+from src.gemini.gemini_utilities.rate_limiter import RateLimiter
+
+
+def test_reserve_counts_a_call_only_when_it_fits():
+    limiter = RateLimiter(max_calls_per_minute=5, max_tokens_per_minute=1000)
+
+    assert limiter.reserve(tokens=800) == 0
+    wait = limiter.reserve(tokens=300)
+
+    assert 0 < wait <= 61
+    assert limiter.get_status()["tokens"]["used"] == 800
+    assert limiter.get_status()["minute"]["used"] == 1
+
+
+def test_a_waiting_caller_does_not_hold_the_limiter(monkeypatch):
+    limiter = RateLimiter(max_calls_per_minute=1, max_tokens_per_minute=1000)
+    limiter.check_and_wait(tokens=10)
+    sleeping, release = threading.Event(), threading.Event()
+
+    def sleep(seconds):
+        sleeping.set()
+        release.wait(5)
+        limiter.reset_counters()
+    monkeypatch.setattr(rate_limiter_module.time, "sleep", sleep)
+
+    waiter = threading.Thread(target=limiter.check_and_wait, kwargs={"tokens": 50})
+    waiter.start()
+    assert sleeping.wait(5)
+
+    # Other threads still read and check the limits while the waiter sleeps
+    checker = threading.Thread(target=lambda: (limiter.get_status(), limiter.reserve()))
+    checker.start()
+    checker.join(1)
+    assert not checker.is_alive()
+
+    release.set()
+    waiter.join(5)
+    assert limiter.get_status()["tokens"]["used"] == 50
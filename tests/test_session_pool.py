@@ -0,0 +1,53 @@
+"""
+tests/test_session_pool.py - Persistent chat sessions in an LRU pool (user-045)
+
+Related files:
+- src/gemini/gemini_hooks/session_pool.py
+- src/gemini/gemini_hooks/session_residency.py
+- src/gemini/gemini_utilities/session_store.py
+"""
+
+from src.gemini.gemini_hooks.session_pool import ChatSessionPool
+from src.gemini.gemini_utilities.rate_limiter import RateLimiter
+from src.gemini.gemini_utilities.session_store import SessionStore
+
+
+def _pool(client, db_path, **options):
+    return ChatSessionPool(api_key="test-key-0000", model_name="gemini-2.0-flash",
+                           rate_limiter=RateLimiter(), transport=client.transport,
+                           store=SessionStore(db_path), max_history_tokens=None,
+                           offload_inline_bytes=None, **options)
+
+
+def test_idle_sessions_are_evicted_and_rehydrated(client, tmp_path):
+    pool = _pool(client, tmp_path / "sessions.sqlite", max_resident_sessions=1)
+
+    pool.send_message("alice", "hello")
+    pool.send_message("bob", "hi")
+    assert pool.get_status()["resident"] == 1 and pool.get_status()["evicted"] == 1
+
+    pool.send_message("alice", "again")
+    history = pool.get_chat_history("alice")
+    status = pool.get_status()
+    pool.close()
+
+    assert [message["content"] for message in history] == ["hello", "reply", "again", "reply"]
+    assert status["rehydrated"] == 1 and status["created"] == 2
+
+
+def test_sessions_outlive_the_pool(client, tmp_path):
+    first = _pool(client, tmp_path / "sessions.sqlite")
+    first.send_message("alice", "hello", system_instruction="Answer briefly.")
+    first.close()
+
+    second = _pool(client, tmp_path / "sessions.sqlite")
+    history = second.get_chat_history("alice")
+    with second.session("alice") as manager:
+        system_instruction = manager.system_instruction
+    sessions = second.list_sessions()
+    second.close()
+
+    assert [message["role"] for message in history] == ["user", "model"]
+    assert system_instruction == "Answer briefly."
+    assert [(session["session_id"], session["message_count"]) for session in sessions] == [
+        ("alice", 2)]
@@ -0,0 +1,71 @@
+"""
+tests/test_stream_relay.py - Streamed responses relayed to sinks with back-pressure (user-047)
+
+Related files:
+- src/gemini/gemini_hooks/stream_relay.py
+"""
+
+import asyncio
+
+from src.gemini.gemini_hooks.stream_relay import CallbackSink, DiscordStreamSink, relay_stream
+
+
+async def _chunks(texts, produced=None):
+    for text in texts:
+        if produced is not None:
+            produced.append(text)
+        yield text
+
+
+def test_a_slow_sink_holds_the_stream_back():
+    produced, leads = [], []
+
+    async def slow(text):
+        leads.append(len(produced) - len(leads))
+        await asyncio.sleep(0.01)
+
+    async def run():
+        texts = [f"chunk{i} " for i in range(10)]
+        relay = relay_stream(_chunks(texts, produced), [CallbackSink(slow)], queue_size=1)
+        return [text async for text in relay]
+
+    received = asyncio.run(run())
+
+    assert received == produced and len(leads) == 10
+    # One chunk queued, one being sent and one waiting for the queue
+    assert max(leads) <= 3
+
+
+def test_discord_gets_the_response_in_segments():
+    posts = []
+    sink = DiscordStreamSink(lambda text, first, final: posts.append((text, first, final)),
+                             segment_chars=12)
+    texts = ["first line\n", "second ", "line\n", "end"]
+
+    async def run():
+        return [text async for text in relay_stream(_chunks(texts), [sink])]
+
+    asyncio.run(run())
+
+    assert "".join(text for text, _, _ in posts) == "".join(texts)
+    assert all(len(text) <= 12 for text, _, _ in posts)
+    assert [(first, final) for _, first, final in posts] == (
+        [(True, False)] + [(False, False)] * (len(posts) - 2) + [(False, True)])
+
+
+def test_a_stream_cut_short_is_marked_as_interrupted():
+    posts = []
+    sink = DiscordStreamSink(lambda text, first, final: posts.append((text, final)))
+
+    async def run():
+        relay = relay_stream(_chunks(["one ", "two ", "three"]), [sink])
+        async for text in relay:
+            if text == "two ":
+                break
+        await relay.aclose()
+
+    asyncio.run(run())
+
+    text, final = posts[-1]
+    assert final and text.startswith("one two ") and "three" not in text
+    assert text.endswith("*(response interrupted)*")
@@ -0,0 +1,69 @@
+"""
+tests/test_track_prefetcher.py - Uploads prepared ahead of the current track (user-028)
+
+Related files:
+- src/gemini/gemini_hooks/track_prefetcher.py
+- src/gemini/gemini_hooks/pipeline_runs.py
+"""
+
+import threading
+
+import pytest
+
+from src.gemini.gemini_hooks.track_prefetcher import TrackPrefetcher
+from src.gemini.gemini_utilities.catalogue_index import hash_file
+
+
+def _tracks(workdir):
+    return sorted((workdir / "data_source").glob("*.mp3"))
+
+
+def test_every_step_of_a_run_uses_the_track_upload(processor, workdir, fake_sdk):
+    results = processor.process_multiple_files(_tracks(workdir))
+
+    assert all(result["image_success"] for result in results)
+    uploads = [name for _, _, name in fake_sdk.calls("upload")]
+    assert sorted(uploads) == sorted(str(track) for track in _tracks(workdir))
+    # Each upload is deleted once its track is done
+    assert len(fake_sdk.calls("delete_file")) == len(uploads)
+
+
+@pytest.mark.parametrize("cap", ["files", "bytes"])
+def test_later_tracks_wait_for_the_capacity_of_earlier_ones(client, workdir, fake_sdk,
+                                                            monkeypatch, cap):
+    first, second = _tracks(workdir)
+    limits = {"max_outstanding_files": 1} if cap == "files" else {
+        "max_prefetch_bytes": first.stat().st_size + second.stat().st_size - 1}
+    second_uploaded = threading.Event()
+    upload = fake_sdk.files.upload
+
+    def watched_upload(file, **options):
+        if file == str(second):
+            second_uploaded.set()
+        return upload(file, **options)
+    monkeypatch.setattr(fake_sdk.files, "upload", watched_upload)
+
+    prefetcher = TrackPrefetcher(client, lookahead=2, count_tokens=False, **limits)
+    prefetcher.schedule([first, second])
+
+    prepared = prefetcher.get(first)
+    assert prepared["uploaded_file"] is not None
+    assert prepared["content_hash"] == hash_file(first)
+    assert not second_uploaded.wait(0.2)
+
+    prefetcher.release(first)
+    assert second_uploaded.wait(5)
+    assert prefetcher.get(second)["uploaded_file"] is not None
+    prefetcher.shutdown()
+    assert len(fake_sdk.calls("delete_file")) == 2
+
+
+def test_the_awaited_track_skips_the_queue(client, workdir, fake_sdk):
+    first, second = _tracks(workdir)
+    prefetcher = TrackPrefetcher(client, lookahead=2, max_outstanding_files=1,
+                                 count_tokens=False)
+    prefetcher.schedule([first, second])
+
+    # The first track is never fetched, yet the second one does not wait for its slot
+    assert prefetcher.get(second)["uploaded_file"] is not None
+    prefetcher.shutdown()
@@ -0,0 +1,112 @@
+"""
+tests/test_transport_streams.py - Streams opened inside the middleware chain (user-037)
+
+Related files:
+- src/gemini/gemini_apis/transport.py
+- src/gemini/gemini_apis/middleware.py, metrics_middleware.py
+"""
+
+import time
+
+import pytest
+
+import src.gemini.gemini_apis.middleware_layers as middleware_layers
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(middleware_layers.random, "uniform", lambda low, high: 0.0)
+
+
+def _texts(stream):
+    return [chunk.text for chunk in stream]
+
+
+def test_a_stream_that_fails_to_open_is_retried(client, fake_sdk):
+    opened = fake_sdk.models.generate_content_stream
+    attempts = []
+
+    def flaky(*args, **kwargs):
+        attempts.append(1)
+        if len(attempts) == 1:
+            def broken():
+                raise ConnectionError("connection reset")
+                yield
+            return broken()
+        return opened(*args, **kwargs)
+    fake_sdk.models.generate_content_stream = flaky
+
+    assert _texts(client.transport.generate_content_stream("gemini-2.0-flash", "hi")) == [
+        "one ", "two"]
+    assert len(attempts) == 2
+
+
+def test_the_timeout_covers_the_first_chunk(client, fake_sdk):
+    def slow(*args, **kwargs):
+        def chunks():
+            time.sleep(1.0)
+            yield None
+        return chunks()
+    fake_sdk.models.generate_content_stream = slow
+
+    started = time.perf_counter()
+    with pytest.raises(TimeoutError):
+        client.transport.generate_content_stream("gemini-2.0-flash", "hi", timeout=0.1)
+    assert time.perf_counter() - started < 1.0
+
+
+def test_metrics_record_the_whole_stream(client, fake_sdk):
+    fake_sdk.stream_chunks = ["one ", ValueError("stream cut")]
+
+    stream = client.transport.generate_content_stream("gemini-2.0-flash", "hi")
+    with pytest.raises(ValueError):
+        _texts(stream)
+
+    metrics = client.metrics.get_metrics()
+    entry = next(entry for entry in metrics.values()
+                 if entry["operation"] == "generate_content_stream")
+    assert entry["calls"] == 1 and entry["errors"] == 1
+    assert entry["prompt_tokens"] == 10
+
+
+def test_async_turns_wait_in_the_chain_off_the_default_executor(client, monkeypatch):
+    import asyncio
+    import threading
+
+    from src.gemini.gemini_apis import transport as transport_module
+
+    transport = client.transport
+    release = threading.Event()
+    threads = []
+
+    def waiting_chain(request):
+        # Stands in for a chain that sleeps for the rate limits
+        threads.append(threading.current_thread().name)
+        release.wait(5)
+
+        async def opening():
+            async def chunks():
+                yield "reply"
+            return chunks()
+        return opening()
+    monkeypatch.setattr(transport, "call_model", waiting_chain)
+
+    async def turn():
+        return [chunk async for chunk in transport.send_message_stream_async(object(), "hi")]
+
+    async def main():
+        loop = asyncio.get_running_loop()
+        loop.set_default_executor(
+            transport_module.ThreadPoolExecutor(max_workers=1, thread_name_prefix="default"))
+        turns = [asyncio.ensure_future(turn())
+                 for _ in range(transport_module.ASYNC_CHAIN_WORKERS + 2)]
+        await asyncio.sleep(0.1)
+        # The one default executor thread is still free while every turn waits
+        assert await asyncio.wait_for(asyncio.to_thread(lambda: "loaded"), 1) == "loaded"
+        release.set()
+        return await asyncio.gather(*turns)
+
+    results = asyncio.run(main())
+
+    assert results == [["reply"]] * (transport_module.ASYNC_CHAIN_WORKERS + 2)
+    assert all(name.startswith("gemini-chain") for name in threads)
@@ -0,0 +1,98 @@
+"""
+tests/test_watch_folder_daemon.py - Watch-folder ingestion (user-027)
+
+Related files:
+- src/gemini/gemini_hooks/watch_folder_daemon.py
+- src/main.py: AudioImageGenerator.watch and its worker factory
+"""
+
+import threading
+import time
+
+from src.gemini.gemini_hooks.watch_folder_daemon import WatchFolderDaemon
+from src.gemini.gemini_utilities.catalogue_index import CatalogueIndex
+
+from conftest import TRACKS
+
+
+def _run_until(daemon, done, timeout=10.0, meanwhile=None):
+    thread = threading.Thread(target=daemon.run, daemon=True)
+    thread.start()
+    if meanwhile is not None:
+        meanwhile()
+    deadline = time.monotonic() + timeout
+    while not done() and time.monotonic() < deadline:
+        time.sleep(0.02)
+    daemon.stop()
+    thread.join(timeout)
+    assert not thread.is_alive()
+
+
+def test_tracks_pending_at_startup_settle_first(workdir):
+    growing = workdir / "data_source" / TRACKS[0]
+    seen = []
+
+    def process(audio_path):
+        seen.append((audio_path.name, audio_path.stat().st_size, time.monotonic()))
+        return {"image_success": True}
+
+    catalogue = CatalogueIndex(workdir / "data_source")
+    daemon = WatchFolderDaemon(process, catalogue, settle_seconds=0.4, poll_interval=0.05,
+                               use_inotify=False)
+
+    def keep_copying():
+        # Still being copied when the daemon started
+        time.sleep(0.2)
+        with open(growing, "ab") as f:
+            f.write(b"more audio")
+
+    started = time.monotonic()
+    _run_until(daemon, lambda: len(seen) == len(TRACKS), meanwhile=keep_copying)
+
+    assert sorted(name for name, _, _ in seen) == sorted(TRACKS)
+    assert all(at - started >= 0.4 for _, _, at in seen)
+    # The file that was still growing waited for its last write
+    assert [size for name, size, _ in seen if name == growing.name] == [growing.stat().st_size]
+
+
+def test_each_worker_builds_its_own_process_function(workdir):
+    built = []
+    lock = threading.Lock()
+
+    def make_worker():
+        owner = threading.current_thread()
+        with lock:
+            built.append(owner)
+
+        def process(audio_path):
+            assert threading.current_thread() is owner
+            time.sleep(0.2)
+            return {"image_success": True}
+        return process
+
+    catalogue = CatalogueIndex(workdir / "data_source")
+    daemon = WatchFolderDaemon(None, catalogue, max_workers=2, settle_seconds=0,
+                               poll_interval=0.05, use_inotify=False, worker_factory=make_worker)
+    _run_until(daemon, lambda: daemon.get_status()["processed"] == len(TRACKS))
+
+    assert daemon.get_status()["processed"] == len(TRACKS)
+    assert len(built) == len(set(built)) == 2
+
+
+def test_generator_workers_process_tracks_with_their_own_processors(client, workdir):
+    from src.main import AudioImageGenerator
+
+    generator = AudioImageGenerator(client=client)
+    make_worker = generator._watch_worker_factory()
+    first, second = make_worker(), make_worker()
+    processors = [cell.cell_contents for worker in (first, second)
+                  for cell in worker.__closure__ if hasattr(cell.cell_contents, "artifacts")]
+
+    assert processors[0] is generator.processor.processor
+    assert processors[1] is not processors[0]
+    assert processors[1].artifacts is processors[0].artifacts
+
+    generator.catalogue.scan()
+    first(workdir / "data_source" / TRACKS[0])
+    second(workdir / "data_source" / TRACKS[1])
+    assert generator.catalogue.pending_tracks() == []